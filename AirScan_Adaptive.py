@@ -0,0 +1,154 @@
+"""
+Calibração adaptativa do AirScan (aprendizado ativo).
+
+Em vez de um layout fixo, a calibração começa pelos quatro cantos da área e,
+depois de cada ponto, estima a incerteza da previsão numa grade da área
+selecionada. Cada modelo de AirScan_Fitting contribui com uma
+previsão do próprio erro: os globais (linear, afim, homografia...) erram em
+toda a área o mesmo que o pior ponto no leave-one-out; o da malha, que interpola os
+pontos, erra como um processo gaussiano sobre a tela (kernel
+quadrático-exponencial com escala ADAPTIVE_LENGTH_SCALE da diagonal), cujo
+desvio vale 0 sobre os pontos e cresce longe deles, com a amplitude
+calibrada pelo LOO. Vale o melhor modelo em cada célula. Parede bem
+descrita por um modelo simples -> poucos pontos; parede distorcida -> mais
+pontos onde a cobertura é pior. O próximo alvo vai para a célula de maior
+incerteza de cobertura; a calibração para quando a maior incerteza prevista cai abaixo
+de ADAPTIVE_TARGET_ERROR (ou em ADAPTIVE_MAX_POINTS pontos).
+
+    python AirScan_Adaptive.py     # incerteza prevista da calibração atual (mapa em texto)
+"""
+
+import argparse
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from AirScan_Fitting import MODELS, point_arrays, point_weights, render_text, target_rect
+from AirScan_Storage import CALIBRATION_FILE, load_json
+
+ADAPTIVE_TARGET_ERROR = 8.0   # pixels - incerteza máxima prevista para encerrar
+ADAPTIVE_MIN_POINTS = 6       # cantos + dois pontos escolhidos pela cobertura
+ADAPTIVE_MAX_POINTS = 16
+ADAPTIVE_GRID = (32, 18)      # colunas, linhas
+ADAPTIVE_LENGTH_SCALE = 0.2   # fração da diagonal da área: alcance da correlação do erro
+ADAPTIVE_MIN_SPACING = 0.08   # fração da diagonal da área: distância mínima entre pontos
+
+Target = namedtuple("Target", ["x", "y", "uncertainty"])
+
+
+def _kernel(a, b, length):
+    return np.exp(-((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=-1) / (2 * length ** 2))
+
+
+def coverage_field(data, rect, cols=ADAPTIVE_GRID[0], rows=ADAPTIVE_GRID[1]):
+    """(cell centres (rows, cols, 2), normalised posterior std in 0..1, leave-one-out std at each point)"""
+    _, _, screen = point_arrays(data)
+    x1, y1, x2, y2 = rect
+    xs = x1 + (np.arange(cols) + 0.5) * (x2 - x1) / cols
+    ys = y1 + (np.arange(rows) + 0.5) * (y2 - y1) / rows
+    centres = np.stack(np.meshgrid(xs, ys), axis=-1)
+    cells = centres.reshape(-1, 2)
+    if not len(screen):
+        return centres, np.ones((rows, cols)), np.ones(0)
+
+    length = ADAPTIVE_LENGTH_SCALE * np.hypot(x2 - x1, y2 - y1)
+    # Pequeno termo na diagonal: pontos repetidos não tornam a matriz singular
+    inverse = np.linalg.inv(_kernel(screen, screen, length) + 1e-6 * np.eye(len(screen)))
+    cross = _kernel(cells, screen, length)
+    variance = 1.0 - np.einsum("ij,jk,ik->i", cross, inverse, cross)
+    # Variância de cada ponto prevista pelos demais: 1 / (K^-1)_ii
+    loo_variance = 1.0 / np.diag(inverse)
+    return (centres, np.sqrt(np.clip(variance, 0.0, 1.0)).reshape(rows, cols),
+            np.sqrt(np.clip(loo_variance, 0.0, 1.0)))
+
+
+def uncertainty_field(data, rect, cols=ADAPTIVE_GRID[0], rows=ADAPTIVE_GRID[1]):
+    """(cell centres, predicted error in px or None while undefined, normalised std)
+
+    Para cada modelo com erro LOO definido: modelos globais erram em qualquer
+    lugar o mesmo que no LOO (constante); o interpolador (mesh) erra
+    proporcionalmente ao desvio do processo gaussiano, com a amplitude
+    calibrada pelo próprio LOO. O erro previsto é o do melhor modelo em cada
+    célula.
+    """
+    centres, std, loo_std = coverage_field(data, rect, cols, rows)
+    names, airscan, screen = point_arrays(data)
+    weights = point_weights(data, names)
+    field = None
+    for model in MODELS.values():
+        if len(names) <= model.min_points:
+            continue
+        try:
+            predicted = model.loo_predict(airscan, screen, rect, weights)
+        except ValueError:
+            continue
+        error = np.hypot(*(predicted - screen).T)
+        if not np.all(np.isfinite(error)):
+            continue
+        # Maior erro LOO: o critério de parada é o erro máximo, não o médio
+        worst = float(error.max())
+        if getattr(model, "interpolating", False):
+            amplitude = worst / max(float(loo_std[int(np.argmax(error))]), 1e-6)
+            # Limitado: com poucos pontos a amplitude estimada é instável
+            candidate = np.minimum(amplitude * std, worst * 2)
+        else:
+            candidate = np.full(std.shape, worst)
+        field = candidate if field is None else np.minimum(field, candidate)
+    return centres, field, std
+
+
+def next_target(data, rect, target_error=ADAPTIVE_TARGET_ERROR, min_points=ADAPTIVE_MIN_POINTS,
+                max_points=ADAPTIVE_MAX_POINTS, min_spacing=ADAPTIVE_MIN_SPACING):
+    """(Target or None when calibration can stop, predicted max error in px; inf while unknown)"""
+    centres, field, std = uncertainty_field(data, rect)
+    worst = float(field.max()) if field is not None else float("inf")
+    count = len((data.get("points") or {}))
+    if count >= max_points or (count >= min_points and worst < target_error):
+        return None, worst
+
+    # O próximo ponto vai onde a cobertura é pior (o erro dos modelos globais
+    # não depende do lugar); células perto de pontos já capturados não são candidatas
+    _, _, screen = point_arrays(data)
+    x1, y1, x2, y2 = rect
+    spacing = min_spacing * np.hypot(x2 - x1, y2 - y1)
+    distance = np.sqrt(((centres[..., None, :] - screen) ** 2).sum(axis=-1)).min(axis=-1)
+    candidates = np.where(distance >= spacing, std, -1.0)
+    if candidates.max() < 0:
+        return None, worst
+    row, col = np.unravel_index(int(np.argmax(candidates)), candidates.shape)
+    x, y = centres[row, col]
+    uncertainty = float(field[row, col]) if field is not None else float("inf")
+    return Target(int(x), int(y), uncertainty), worst
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incerteza prevista da calibração do AirScan")
+    parser.add_argument("--file", default=CALIBRATION_FILE)
+    args = parser.parse_args(argv)
+
+    data = load_json(args.file)
+    if not data:
+        print(f"[ERROR] {args.file} não encontrado")
+        return 2
+    screen = data.get("screen") or {}
+    rect = target_rect(data, screen.get("width", 1920), screen.get("height", 1080))
+    try:
+        _, field, _ = uncertainty_field(data, rect)
+        target, worst = next_target(data, rect, max_points=len(data["points"]) + 1)
+    except (KeyError, ValueError, np.linalg.LinAlgError) as e:
+        print(f"[ERROR] Incerteza não estimada: {e}")
+        return 1
+    if field is None:
+        print("[ERROR] Pontos insuficientes para estimar a escala do erro")
+        return 1
+    print(f"[ADAPTATIVO] Incerteza máxima prevista: {worst:.1f}px (alvo {ADAPTIVE_TARGET_ERROR}px)")
+    for line in render_text(field):
+        print("    " + line)
+    if target:
+        print(f"[ADAPTATIVO] Próximo ponto sugerido: ({target.x}, {target.y}) - {target.uncertainty:.1f}px")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+"""
+Ajuste automático da suavização e do delay de soltura do AirScan.
+
+SensorStatsEstimator se inscreve no tee como mais um consumidor e mede, com
+custo constante por amostra:
+  * a distribuição do intervalo entre amostras dentro de um toque (janela
+    circular; intervalos maiores que `touch_gap` separam toques);
+  * o jitter com o dedo parado: desvio padrão da posição numa janela
+    deslizante de amostras, contado só quando a janela inteira cabe em
+    `stationary_radius` e a média da metade recente não se afastou da
+    média da metade antiga mais que o próprio desvio (arrasto lento não é
+    jitter).
+
+A partir disso AutoTuner recomenda:
+    mouse_release_delay = p99(intervalo) x auto_tune_release_factor
+    smoothing_samples   = menor janela cuja média reduz o jitter abaixo de
+                          auto_tune_target_jitter pixels, limitada para não
+                          atrasar o cursor mais que MAX_SMOOTHING_LAG
+
+Com auto_tune = "recommend" as recomendações só são registradas e gravadas
+em AirScan_Calibration_Tuning.json (ao lado do arquivo de calibração); com
+"apply" também são aplicadas a quente, e reaplicadas na próxima partida.
+
+    python AirScan_AutoTune.py sessao.jsonl   # recomendação a partir de uma sessão gravada
+"""
+
+import argparse
+import math
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+
+from AirScan_Storage import TUNING_FILE, atomic_write_json, load_json
+
+TUNING_VERSION = 1
+
+# Atraso máximo (segundos) que a média móvel pode introduzir no cursor
+MAX_SMOOTHING_LAG = 0.05
+
+# Mesmos limites do SCHEMA em AirScan_Config
+RELEASE_DELAY_RANGE = (0.01, 5.0)
+
+# Variação relativa mínima do delay de soltura para trocar o valor em uso
+RELEASE_HYSTERESIS = 0.1
+SMOOTHING_RANGE = (1, 50)
+
+# Passo das diferenças finitas em transform_scale (fração do sensor): grande o
+# bastante para o truncamento em pixels inteiros não pesar
+SCALE_STEP = 0.05
+
+Recommendation = namedtuple("Recommendation", ["mouse_release_delay", "smoothing_samples", "stats"])
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(math.ceil(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def transform_scale(transform, sensor_width, sensor_height, step=SCALE_STEP):
+    """Pixels per sensor unit of a compiled transform at the sensor centre, or None if degenerate
+
+    Diferenças centrais nos dois eixos; a escala é sqrt(|det J|), a média
+    geométrica dos ganhos (a área de um pixel de jitter no sensor).
+    """
+    cx, cy = sensor_width / 2, sensor_height / 2
+    hx, hy = sensor_width * step, sensor_height * step
+    try:
+        (ax, ay), (bx, by) = transform(cx + hx, cy), transform(cx - hx, cy)
+        (cx1, cy1), (dx, dy) = transform(cx, cy + hy), transform(cx, cy - hy)
+    except (ArithmeticError, TypeError, ValueError):
+        return None
+    j11, j21 = (ax - bx) / (2 * hx), (ay - by) / (2 * hx)
+    j12, j22 = (cx1 - dx) / (2 * hy), (cy1 - dy) / (2 * hy)
+    determinant = abs(j11 * j22 - j12 * j21)
+    if not determinant or not math.isfinite(determinant):
+        return None
+    return math.sqrt(determinant)
+
+
+class SensorStatsEstimator:
+    """Tee consumer (x, y, t) collecting inter-arrival and stationary-jitter statistics"""
+
+    def __init__(self, touch_gap=0.5, jitter_window=16, stationary_radius=20.0, history=4096):
+        self.touch_gap = touch_gap
+        self.jitter_window = max(2, int(jitter_window))
+        self.stationary_radius = stationary_radius
+        self.intervals = deque(maxlen=history)
+        self.jitter = deque(maxlen=history)
+        self.samples = 0
+        self.touches = 0
+        self._last_time = None
+        self._window = deque()
+        self._sum_x = self._sum_y = 0.0
+        self._sum_xx = self._sum_yy = 0.0
+        # Soma da metade antiga da janela: detecta deriva da média (arrasto lento)
+        self._half = self.jitter_window // 2
+        self._old_x = self._old_y = 0.0
+
+    def __call__(self, x, y, timestamp):
+        self.samples += 1
+        last = self._last_time
+        self._last_time = timestamp
+        if last is not None:
+            interval = timestamp - last
+            if 0 < interval <= self.touch_gap:
+                self.intervals.append(interval)
+            elif interval > self.touch_gap:
+                # Novo toque: a janela de jitter não atravessa toques
+                self._reset_window()
+                self.touches += 1
+        else:
+            self.touches += 1
+
+        window = self._window
+        window.append((x, y))
+        self._sum_x += x
+        self._sum_y += y
+        self._sum_xx += x * x
+        self._sum_yy += y * y
+        if len(window) <= self._half:
+            self._old_x += x
+            self._old_y += y
+        if len(window) > self.jitter_window:
+            old_x, old_y = window.popleft()
+            self._sum_x -= old_x
+            self._sum_y -= old_y
+            self._sum_xx -= old_x * old_x
+            self._sum_yy -= old_y * old_y
+            # A amostra do meio passa para a metade antiga
+            middle_x, middle_y = window[self._half - 1]
+            self._old_x += middle_x - old_x
+            self._old_y += middle_y - old_y
+        if len(window) == self.jitter_window:
+            n = self.jitter_window
+            mean_x = self._sum_x / n
+            mean_y = self._sum_y / n
+            variance = max(0.0, self._sum_xx / n - mean_x * mean_x) + max(0.0, self._sum_yy / n - mean_y * mean_y)
+            deviation = math.sqrt(variance)
+            # Diferença entre as médias das duas metades: ~0.5 desvio com o dedo
+            # parado, ~1.7 desvio num arrasto em velocidade constante
+            recent = n - self._half
+            drift = math.hypot((self._sum_x - self._old_x) / recent - self._old_x / self._half,
+                               (self._sum_y - self._old_y) / recent - self._old_y / self._half)
+            if deviation <= self.stationary_radius and drift <= deviation:
+                self.jitter.append(deviation)
+
+    def _reset_window(self):
+        self._window.clear()
+        self._sum_x = self._sum_y = 0.0
+        self._sum_xx = self._sum_yy = 0.0
+        self._old_x = self._old_y = 0.0
+
+    def reset(self):
+        self.intervals.clear()
+        self.jitter.clear()
+        self.samples = 0
+        self.touches = 0
+        self._last_time = None
+        self._reset_window()
+
+    def snapshot(self):
+        """Summary statistics (seconds / sensor units); None fields while there is no data"""
+        intervals = sorted(self.intervals)
+        jitter = sorted(self.jitter)
+        p50 = percentile(intervals, 0.50)
+        return {
+            "samples": self.samples,
+            "touches": self.touches,
+            "intervals": len(intervals),
+            "interval_p50": p50,
+            "interval_p95": percentile(intervals, 0.95),
+            "interval_p99": percentile(intervals, 0.99),
+            "interval_max": intervals[-1] if intervals else None,
+            "sample_rate": 1.0 / p50 if p50 else None,
+            "stationary_windows": len(jitter),
+            "jitter": percentile(jitter, 0.50),
+        }
+
+
+def recommend(stats, release_factor=3.0, target_jitter=1.0, scale=1.0, update_rate=None,
+              max_lag=MAX_SMOOTHING_LAG, min_intervals=200):
+    """Recommendation from estimator stats, or None while there is not enough data
+
+    scale converte unidades do sensor em pixels; update_rate (Hz) limita a taxa
+    efetiva que chega ao filtro (o throttle vem antes da suavização).
+    """
+    if stats["intervals"] < min_intervals or not stats["interval_p99"]:
+        return None
+
+    release = release_factor * stats["interval_p99"]
+    release = round(min(RELEASE_DELAY_RANGE[1], max(RELEASE_DELAY_RANGE[0], release)), 3)
+
+    smoothing = None
+    if stats["jitter"] is not None:
+        jitter_px = stats["jitter"] * scale
+        # Média de n amostras independentes reduz o desvio por sqrt(n)
+        smoothing = max(1, int(math.ceil((jitter_px / target_jitter) ** 2)))
+        rate = stats["sample_rate"]
+        if update_rate:
+            rate = min(rate, update_rate)
+        # Média móvel de n amostras atrasa (n - 1) / 2 intervalos
+        smoothing = min(smoothing, max(1, int(1 + 2 * max_lag * rate)))
+        smoothing = min(SMOOTHING_RANGE[1], max(SMOOTHING_RANGE[0], smoothing))
+
+    summary = dict(stats)
+    summary["jitter_px"] = stats["jitter"] * scale if stats["jitter"] is not None else None
+    return Recommendation(release, smoothing, summary)
+
+
+def load_tuning(path=TUNING_FILE):
+    """Persisted recommendation as a config dict ({} if there is none)"""
+    try:
+        data = load_json(path) or {}
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] Ajuste automático não carregado ({path}): {e}")
+        return {}
+    recommended = data.get("recommended") or {}
+    return {key: value for key, value in recommended.items()
+            if key in ("mouse_release_delay", "smoothing_samples") and value is not None}
+
+
+class AutoTuner:
+    """Periodically turns estimator stats into a recommendation; logs, persists and optionally applies it
+
+    path=None não grava nada (ex.: análise de uma sessão gravada).
+    """
+
+    def __init__(self, estimator, on_apply=None, apply=False, interval=30.0, release_factor=3.0,
+                 target_jitter=1.0, scale=1.0, update_rate=None, path=TUNING_FILE):
+        self.estimator = estimator
+        self.on_apply = on_apply
+        self.apply = apply
+        self.interval = interval
+        self.release_factor = release_factor
+        self.target_jitter = target_jitter
+        self.scale = scale
+        self.update_rate = update_rate
+        self.path = path
+        self.current = {}
+        self.thread = None
+        self._stop = threading.Event()
+
+    def update(self):
+        """Evaluate once; returns the changed settings (empty if nothing changed)"""
+        rec = recommend(self.estimator.snapshot(), self.release_factor, self.target_jitter,
+                        self.scale, self.update_rate)
+        if rec is None:
+            return {}
+        settings = {"mouse_release_delay": rec.mouse_release_delay}
+        if rec.smoothing_samples is not None:
+            settings["smoothing_samples"] = rec.smoothing_samples
+        changed = {key: value for key, value in settings.items() if self._significant(key, value)}
+        if not changed:
+            return {}
+        self.current.update(changed)
+
+        stats = rec.stats
+        jitter = f"{stats['jitter_px']:.2f}px" if stats["jitter_px"] is not None else "n/d"
+        print(f"[AUTOTUNE] {stats['sample_rate']:.1f}Hz, intervalo p99 {stats['interval_p99'] * 1000:.1f}ms, "
+              f"jitter parado {jitter} -> "
+              + ", ".join(f"{key}={value}" for key, value in settings.items()))
+        if self.path:
+            self.persist(rec)
+        if self.apply and self.on_apply:
+            self.on_apply(changed)
+        return changed
+
+    def _significant(self, key, value):
+        old = self.current.get(key)
+        if old is None or key == "smoothing_samples":
+            return old != value
+        # Histerese: o p99 oscila um pouco a cada avaliação
+        return abs(value - old) > RELEASE_HYSTERESIS * old
+
+    def persist(self, rec):
+        try:
+            atomic_write_json(self.path, {
+                "version": TUNING_VERSION,
+                "updated_at": time.time(),
+                "applied": self.apply,
+                "recommended": {"mouse_release_delay": rec.mouse_release_delay,
+                                "smoothing_samples": rec.smoothing_samples},
+                "parameters": {"release_factor": self.release_factor, "target_jitter": self.target_jitter,
+                               "scale": self.scale, "update_rate": self.update_rate},
+                "stats": rec.stats,
+            })
+        except OSError as e:
+            print(f"[WARNING] Recomendação não gravada ({self.path}): {e}")
+
+    def start(self):
+        if self.thread is None:
+            self._stop.clear()
+            self.thread = threading.Thread(target=self._run, name="airscan-autotune", daemon=True)
+            self.thread.start()
+        return self.thread
+
+    def stop(self):
+        self._stop.set()
+        self.thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.update()
+            except Exception as e:
+                print(f"[WARNING] Erro no ajuste automático: {e}")
+
+
+def main(argv=None):
+    from AirScan_Replay import read_session
+
+    parser = argparse.ArgumentParser(description="Recomenda suavização e delay de soltura a partir de uma sessão gravada")
+    parser.add_argument("session", help="arquivo JSONL gravado com SESSION_RECORD_PATH")
+    parser.add_argument("--release-factor", type=float, default=3.0)
+    parser.add_argument("--target-jitter", type=float, default=1.0, help="jitter residual desejado (pixels)")
+    parser.add_argument("--scale", type=float, default=1.0, help="pixels por unidade do sensor")
+    parser.add_argument("--update-rate", type=float, default=None, help="mouse_update_rate (Hz)")
+    parser.add_argument("--save", action="store_true", help=f"grava a recomendação em {TUNING_FILE}")
+    args = parser.parse_args(argv)
+
+    try:
+        _, samples = read_session(args.session)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Não foi possível ler a sessão: {e}")
+        return 2
+
+    estimator = SensorStatsEstimator()
+    for t, x, y in samples:
+        estimator(x, y, t)
+    tuner = AutoTuner(estimator, release_factor=args.release_factor, target_jitter=args.target_jitter,
+                      scale=args.scale, update_rate=args.update_rate, path=TUNING_FILE if args.save else None)
+    if not tuner.update():
+        print(f"[AUTOTUNE] Dados insuficientes ({len(estimator.intervals)} intervalos dentro de toques)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
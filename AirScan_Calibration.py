@@ -1,162 +1,66 @@
 import tkinter as tk
-import json
 import time
 import threading
-from collections import deque
+import queue
 import os
 import atexit
+import math
 import socket
 import subprocess
 import sys
 from pythonosc.dispatcher import Dispatcher
 from pythonosc import osc_server
+from AirScan_Capture import CalibrationPoint, generate_points
+from AirScan_Clock import CLOCK
+from AirScan_Config import ConfigError, active_config, load_config
+from AirScan_Dwell import DwellClusterer, TargetAssigner
+from AirScan_Mapping import compile_transform, output_calibration, output_rect, sensor_calibration
+from AirScan_Storage import CalibrationSession, CALIBRATION_FILE, JOURNAL_FILE, load_json
+from AirScan_Verification import (PointErrorAttribution, RunningErrorStats, VERIFICATION_CAPTURE_DURATION,
+                                  VERIFICATION_TARGETS, VERIFICATION_TOLERANCE, random_targets)
 
-# Screen dimensions
+# Screen dimensions (relidas a cada janela: a resolução pode mudar com o controle rodando)
 import pyautogui
 screen_width, screen_height = pyautogui.size()
 
+
+def refresh_screen_size():
+    global screen_width, screen_height
+    screen_width, screen_height = pyautogui.size()
+
 # ====================================
 # CONFIGURAÇÃO DO AIRSCAN
 # ====================================
-AIRSCAN_MODE = "Cave"  # Opções: "Arena" ou "Cave"
-AIRSCAN_PORT = 8030
+# Mesma configuração do controle (AirScan_Config.json / AIRSCAN_* / --set k=v);
+# em processo, reutiliza a configuração já carregada pelo controle.
+try:
+    CONFIG = load_config(argv=sys.argv[1:]) if __name__ == "__main__" else active_config()
+except ConfigError as e:
+    print("[ERROR] Configuração inválida:")
+    for error in e.errors:
+        print(f"[ERROR]   • {error}")
+    sys.exit(1)
 
-# Configurações padrão por modo
-MODE_CONFIG = {
-    "Arena": {
-        "blob_id": 5,
-        "width": 1920,
-        "height": 1080
-    },
-    "Cave": {
-        "blob_id": 6,
-        "width": 1920,
-        "height": 1080
-    }
-}
+AIRSCAN_MODE = CONFIG["mode"]  # Opções: chaves de "modes" ("Arena" ou "Cave")
+AIRSCAN_PORT = CONFIG["port"]
 
-# Carrega configuração do modo selecionado
-if AIRSCAN_MODE not in MODE_CONFIG:
-    print(f"[ERROR] Modo '{AIRSCAN_MODE}' inválido! Use 'Arena' ou 'Cave'")
-    sys.exit(1)
+# Configurações padrão por modo
+MODE_CONFIG = CONFIG["modes"]
 
+# Carrega configuração do modo selecionado (validado em AirScan_Config)
 CURRENT_CONFIG = MODE_CONFIG[AIRSCAN_MODE]
 BLOB_ID = CURRENT_CONFIG["blob_id"]
 DEFAULT_AIRSCAN_WIDTH = CURRENT_CONFIG["width"]
 DEFAULT_AIRSCAN_HEIGHT = CURRENT_CONFIG["height"]
 
-print(f"[CALIBRAÇÃO] Modo selecionado: {AIRSCAN_MODE} (Blob {BLOB_ID})")
+# Ordem livre: todos os alvos na tela, cada permanência vai para o alvo mais próximo
+CALIBRATION_ORDER = CONFIG["calibration_order"]
+FREE_ORDER_MAX_DISTANCE = 0.25  # fração da diagonal da área: permanência mais longe que isso é ignorada
 
-class CalibrationPoint:
-    def __init__(self, x, y, name):
-        self.x = x
-        self.y = y
-        self.name = name
-        self.airscan_data = {"x": deque(maxlen=500), "y": deque(maxlen=500)}
-        self.start_time = None
-        self.is_capturing = False
-        self.last_data_time = None
-        self.capture_duration = 5.0
-        self.data_interruption_threshold = 0.5
-        self.is_ready = True
-        self.is_collecting = False
-    
-    def start_capture(self):
-        """Start capturing data for this point"""
-        self.start_time = time.time()
-        self.last_data_time = self.start_time
-        self.is_capturing = True
-        self.is_ready = False
-        self.is_collecting = True
-        self.airscan_data["x"].clear()
-        self.airscan_data["y"].clear()
-        print(f"[CALIBRAÇÃO] Iniciando captura para {self.name}...")
-    
-    def add_data(self, x, y):
-        """Add new coordinate data"""
-        if not self.is_capturing:
-            return False
-            
-        current_time = time.time()
-        
-        # Check for data interruption
-        if self.last_data_time and (current_time - self.last_data_time) > self.data_interruption_threshold:
-            print(f"[CALIBRAÇÃO] Interrupção detectada! Reiniciando captura para {self.name}")
-            self.reset_capture()
-            return False
-        
-        # Add data
-        self.airscan_data["x"].append(x)
-        self.airscan_data["y"].append(y)
-        self.last_data_time = current_time
-        
-        # Check if we have enough continuous data
-        if self.capture_complete():
-            print(f"[CALIBRAÇÃO] Captura completa para {self.name}!")
-            return True
-            
-        return True
-    
-    def check_interruption(self):
-        """Check for data interruption and reset if needed"""
-        if not self.is_capturing or not self.last_data_time:
-            return False
-            
-        current_time = time.time()
-        if (current_time - self.last_data_time) > self.data_interruption_threshold:
-            print(f"[CALIBRAÇÃO] Interrupção detectada! Reiniciando captura para {self.name}")
-            self.reset_capture()
-            return True
-        return False
-    
-    def get_average(self):
-        """Calculate average position from captured data"""
-        if not self.airscan_data["x"] or not self.airscan_data["y"]:
-            return None
-        
-        avg_x = sum(self.airscan_data["x"]) / len(self.airscan_data["x"])
-        avg_y = sum(self.airscan_data["y"]) / len(self.airscan_data["y"])
-            
-        return {
-            "x": float(avg_x),
-            "y": float(avg_y)
-        }
-    
-    def capture_complete(self):
-        """Check if we have enough continuous data (5 seconds worth)"""
-        if not self.is_capturing or not self.start_time or not self.last_data_time:
-            return False
-        
-        continuous_duration = self.last_data_time - self.start_time
-        return continuous_duration >= self.capture_duration
-    
-    def reset_capture(self):
-        """Reset capture state"""
-        self.is_capturing = False
-        self.is_collecting = False
-        self.is_ready = True
-        self.start_time = None
-        self.last_data_time = None
-        self.airscan_data["x"].clear()
-        self.airscan_data["y"].clear()
-        print(f"[CALIBRAÇÃO] Captura resetada para {self.name} - pronto para receber dados")
-    
-    def force_ready(self):
-        """Force point to ready state"""
-        self.is_capturing = False
-        self.is_collecting = False
-        self.is_ready = True
-        self.start_time = None
-        self.last_data_time = None
-    
-    def get_status(self):
-        """Get current status for visual feedback"""
-        if self.is_collecting:
-            return "collecting"  # Red
-        elif self.is_ready:
-            return "ready"  # Green
-        else:
-            return "waiting"  # Yellow
+# Desktop estendido (vários projetores): cada saída é calibrada com os seus próprios pontos
+OUTPUTS = {output["id"]: output_rect(output) for output in CONFIG["outputs"]}
+
+print(f"[CALIBRAÇÃO] Modo selecionado: {AIRSCAN_MODE} (Blob {BLOB_ID})")
 
 class AreaSelector:
     """Area selection tool similar to Windows Snipping Tool"""
@@ -433,97 +337,35 @@ class CalibrationLevelSelector:
                 "description": "Calibração máxima com 13 pontos",
                 "time": "~65 segundos", 
                 "accuracy": "Precisão máxima"
+            },
+            "adaptive": {
+                "name": "ADAPTATIVO",
+                "points": "6 a 16",
+                "description": "Cantos e depois os pontos onde o modelo está mais incerto",
+                "time": "~25-80 segundos",
+                "accuracy": "Para quando o erro previsto fica abaixo de 8px"
             }
         }
     
     def generate_points(self, level, selected_area=None):
         """Generate calibration points based on level and selected area"""
-        if level == "basic":
-            return self._generate_basic_points(selected_area)
-        elif level == "advanced":
-            return self._generate_advanced_points(selected_area)
-        elif level == "professional":
-            return self._generate_professional_points(selected_area)
-        return []
-    
-    def _generate_basic_points(self, area=None):
-        """Generate 5 basic points (corners + center) within selected area"""
-        if area is None:
-            area = {"x1": 0, "y1": 0, "x2": screen_width, "y2": screen_height}
-        
-        x1, y1, x2, y2 = area["x1"], area["y1"], area["x2"], area["y2"]
-        cx = (x1 + x2) // 2
-        cy = (y1 + y2) // 2
-        
-        return [
-            CalibrationPoint(x1, y1, "TOP_LEFT"),
-            CalibrationPoint(x2 - 1, y1, "TOP_RIGHT"),
-            CalibrationPoint(x2 - 1, y2 - 1, "BOTTOM_RIGHT"),
-            CalibrationPoint(x1, y2 - 1, "BOTTOM_LEFT"),
-            CalibrationPoint(cx, cy, "CENTER")
-        ]
-    
-    def _generate_advanced_points(self, area=None):
-        """Generate 9 advanced points (corners + edges + center) within selected area"""
-        if area is None:
-            area = {"x1": 0, "y1": 0, "x2": screen_width, "y2": screen_height}
-        
-        x1, y1, x2, y2 = area["x1"], area["y1"], area["x2"], area["y2"]
-        cx = (x1 + x2) // 2
-        cy = (y1 + y2) // 2
-        
-        return [
-            # Corners
-            CalibrationPoint(x1, y1, "TOP_LEFT"),
-            CalibrationPoint(x2 - 1, y1, "TOP_RIGHT"),
-            CalibrationPoint(x2 - 1, y2 - 1, "BOTTOM_RIGHT"),
-            CalibrationPoint(x1, y2 - 1, "BOTTOM_LEFT"),
-            # Edges
-            CalibrationPoint(cx, y1, "TOP_CENTER"),
-            CalibrationPoint(x2 - 1, cy, "RIGHT_CENTER"),
-            CalibrationPoint(cx, y2 - 1, "BOTTOM_CENTER"),
-            CalibrationPoint(x1, cy, "LEFT_CENTER"),
-            # Center
-            CalibrationPoint(cx, cy, "CENTER")
-        ]
-    
-    def _generate_professional_points(self, area=None):
-        """Generate 13 professional points (corners + edges + quarters + center) within selected area"""
-        if area is None:
-            area = {"x1": 0, "y1": 0, "x2": screen_width, "y2": screen_height}
-        
-        x1, y1, x2, y2 = area["x1"], area["y1"], area["x2"], area["y2"]
-        width = x2 - x1
-        height = y2 - y1
-        cx = x1 + width // 2
-        cy = y1 + height // 2
-        q1x = x1 + width // 4
-        q1y = y1 + height // 4
-        q3x = x1 + 3 * width // 4
-        q3y = y1 + 3 * height // 4
-        
-        return [
-            # Corners
-            CalibrationPoint(x1, y1, "TOP_LEFT"),
-            CalibrationPoint(x2 - 1, y1, "TOP_RIGHT"),
-            CalibrationPoint(x2 - 1, y2 - 1, "BOTTOM_RIGHT"),
-            CalibrationPoint(x1, y2 - 1, "BOTTOM_LEFT"),
-            # Edges
-            CalibrationPoint(cx, y1, "TOP_CENTER"),
-            CalibrationPoint(x2 - 1, cy, "RIGHT_CENTER"),
-            CalibrationPoint(cx, y2 - 1, "BOTTOM_CENTER"),
-            CalibrationPoint(x1, cy, "LEFT_CENTER"),
-            # Quarters
-            CalibrationPoint(q1x, q1y, "TOP_LEFT_QUARTER"),
-            CalibrationPoint(q3x, q1y, "TOP_RIGHT_QUARTER"),
-            CalibrationPoint(q3x, q3y, "BOTTOM_RIGHT_QUARTER"),
-            CalibrationPoint(q1x, q3y, "BOTTOM_LEFT_QUARTER"),
-            # Center
-            CalibrationPoint(cx, cy, "CENTER")
-        ]
+        if selected_area is None:
+            selected_area = {"x1": 0, "y1": 0, "x2": screen_width, "y2": screen_height}
+        return generate_points(level, selected_area)
 
 class CalibrationWindow:
-    def __init__(self):
+    def __init__(self, sample_source=None, stop_event=None, sensor_id=None, clock=None):
+        # sample_source: tee do controle em execução (calibração em processo);
+        # sem ele, a janela abre seu próprio servidor OSC (modo standalone)
+        self.sample_source = sample_source
+        self.standalone = sample_source is None
+        self.stop_event = stop_event
+        self.sensor_id = sensor_id  # Multi-sensor: calibração gravada em "sensors"
+        # Mesmo relógio que gerou os timestamps das amostras (o do controle em processo)
+        self.clock = clock or CLOCK
+        self.completed = False
+        refresh_screen_size()
+        
         self.root = tk.Tk()
         self.root.title("AirScan Calibration v1.1")
         self.root.attributes('-alpha', 0.9)
@@ -549,6 +391,10 @@ class CalibrationWindow:
         self.current_y = None
         self.data_count = 0
         
+        # Fila de ingestão: threads OSC apenas enfileiram (x, y, timestamp);
+        # o loop Tk (thread principal) drena em lote a cada tick
+        self.osc_queue = queue.SimpleQueue()
+        
         # Pause system between points
         self.pause_start_time = None
         self.pause_duration = 5.0
@@ -559,6 +405,32 @@ class CalibrationWindow:
         self.current_point_index = 0
         self.points = []
         self.waiting_for_final_touch = False
+        self.session = None  # Sessão de calibração (gravada uma vez ao final)
+        self.all_points = []  # Pontos do nível escolhido (self.points muda na recaptura)
+        
+        # Verificação com alvos aleatórios (após o último ponto)
+        self.verifying = False
+        self.verification_transform = None
+        self.verification_targets = []
+        self.verification_index = 0
+        self.verification_stats = None
+        self.verification_attribution = None
+        self.verification_results = []  # (alvo_x, alvo_y, tela_x, tela_y, erro)
+        self.verification_suggestions = []
+        self.verification_summary = None
+        self.verification_last_sample = None
+        self.verification_wait_lift = False
+        
+        # Seleção do modelo (pool de processos) depois da verificação
+        self.model_selection = None
+        self.model_selection_job = None
+        self.selected_model = None
+        self.adaptive = False
+        
+        # Ordem livre (calibration_order = "free")
+        self.free_order = False
+        self.dwell_clusterer = None
+        self.target_assigner = None
         
         # Area selector (FIRST step)
         self.area_selector = AreaSelector(self)
@@ -631,6 +503,11 @@ class CalibrationWindow:
         self.root.bind('<KeyPress-Escape>', self.on_escape_pressed)
         self.root.bind_all('<Escape>', self.on_escape_pressed)  # Global binding
         
+        # Verificação: ENTER finaliza, R recaptura os piores pontos
+        self.root.bind('<Return>', self.on_finish_key)
+        self.root.bind('<KeyPress-r>', self.on_recapture_key)
+        self.root.bind('<KeyPress-R>', self.on_recapture_key)
+        
         # Bind window close event
         self.root.protocol("WM_DELETE_WINDOW", self.on_window_close)
         
@@ -643,11 +520,31 @@ class CalibrationWindow:
     
     def on_escape_pressed(self, event=None):
         """Handle ESC key press to cancel calibration"""
+        if self.model_selection:
+            # Pontos já aceitos: pula a seleção e grava com o modelo padrão
+            print("[CALIBRAÇÃO] ESC pressionado - seleção de modelo interrompida (usando linear_range)")
+            self.stop_model_selection()
+            self.complete_calibration()
+            return
         print("[CALIBRAÇÃO] ESC pressionado - cancelando calibração...")
         self.cleanup()
     
+    def on_finish_key(self, event=None):
+        """ENTER during verification: accept the calibration as it is"""
+        if self.verifying and not self.calibration_complete:
+            print("[VERIFICAÇÃO] ENTER pressionado - finalizando calibração")
+            self.finish_calibration()
+    
+    def on_recapture_key(self, event=None):
+        """R after verification: re-capture only the suggested points"""
+        if self.verifying and self.waiting_for_final_touch and self.verification_suggestions:
+            self.recapture_points(self.verification_suggestions)
+    
     def on_window_close(self):
         """Handle window close event (X button)"""
+        if self.model_selection:
+            self.on_escape_pressed()
+            return
         print("[CALIBRAÇÃO] Janela fechada - cancelando calibração...")
         self.cleanup()
     
@@ -776,16 +673,72 @@ class CalibrationWindow:
         self.selected_area = self.area_selector.selected_area
         
         # Generate points for selected level within the selected area
-        self.points = self.level_selector.generate_points(level, self.selected_area)
+        if OUTPUTS:
+            self.points = self.generate_output_points(level)
+        else:
+            self.points = self.level_selector.generate_points(level, self.selected_area)
+        for point in self.points:
+            point.clock = self.clock
+        self.all_points = list(self.points)
         self.current_point_index = 0
-        
-        area_info = f"{self.selected_area['width']}x{self.selected_area['height']}" if self.selected_area else "tela cheia"
+        # Nível adaptativo: novos pontos são acrescentados ao final de cada captura
+        self.adaptive = level == "adaptive" and not OUTPUTS
+        if level == "adaptive" and OUTPUTS:
+            print("[CALIBRAÇÃO] Várias saídas: nível adaptativo limitado aos cantos de cada saída")
+        self.free_order = CALIBRATION_ORDER == "free" and not self.adaptive
+        if CALIBRATION_ORDER == "free" and self.adaptive:
+            print("[CALIBRAÇÃO] Nível adaptativo escolhe um ponto por vez - ordem livre ignorada")
+        
+        # Nova sessão: pontos de calibrações anteriores não são reaproveitados
+        metadata = {
+            "screen": {"width": screen_width, "height": screen_height},
+            "airscan": {
+                "width": DEFAULT_AIRSCAN_WIDTH,
+                "height": DEFAULT_AIRSCAN_HEIGHT,
+                "port": AIRSCAN_PORT
+            },
+            "calibration_level": level,
+            "total_points": len(self.points)
+        }
+        if OUTPUTS:
+            # Cada saída é mapeada para o seu retângulo (sem calibration_area única)
+            metadata["outputs"] = {output_id: dict(rect) for output_id, rect in OUTPUTS.items()}
+        elif self.selected_area:
+            metadata["calibration_area"] = self.selected_area
+        self.session = CalibrationSession(metadata, sensor_id=self.sensor_id)
+        
+        if OUTPUTS:
+            area_info = f"{len(OUTPUTS)} saídas ({', '.join(OUTPUTS)})"
+        elif self.selected_area:
+            area_info = f"{self.selected_area['width']}x{self.selected_area['height']}"
+        else:
+            area_info = "tela cheia"
         print(f"[CALIBRAÇÃO] Iniciando calibração {level.upper()} com {len(self.points)} pontos")
         print(f"[CALIBRAÇÃO] Área de calibração: {area_info}")
         
+        if self.free_order:
+            self.start_free_order(self.previous_transform())
+        
         # Show first point
         self.show_current_point()
     
+    def generate_output_points(self, level):
+        """Points of every configured output, named "<output>:<point>" and tagged with their output"""
+        points = []
+        for output_id, rect in OUTPUTS.items():
+            for point in generate_points(level, rect):
+                point.name = f"{output_id}:{point.name}"
+                point.output = output_id
+                points.append(point)
+        # Área total (retângulo envolvente): ordem livre e telas de progresso
+        self.selected_area = {
+            "x1": min(r["x1"] for r in OUTPUTS.values()), "y1": min(r["y1"] for r in OUTPUTS.values()),
+            "x2": max(r["x2"] for r in OUTPUTS.values()), "y2": max(r["y2"] for r in OUTPUTS.values()),
+        }
+        self.selected_area["width"] = self.selected_area["x2"] - self.selected_area["x1"]
+        self.selected_area["height"] = self.selected_area["y2"] - self.selected_area["y1"]
+        return points
+    
     def show_current_point(self):
         """Show the current calibration point"""
         self.canvas.delete("all")
@@ -793,10 +746,18 @@ class CalibrationWindow:
         if self.showing_level_selector:
             return
         
+        if self.verifying:
+            self.show_verification()
+            return
+        
+        if self.free_order:
+            self.show_free_order()
+            return
+        
         point = self.points[self.current_point_index]
         
         # OSC Status - Top right corner (discrete)
-        current_time = time.time()
+        current_time = self.clock.now()
         osc_status = "OSC: DESCONECTADO"
         osc_color = "#ff4444"
         
@@ -849,17 +810,10 @@ class CalibrationWindow:
         )
         
         # Show status instructions with proper spacing
-        if self.waiting_for_final_touch:
-            # Waiting for final touch state
-            status_text = f"✅ CALIBRAÇÃO CONCLUÍDA!\n"
-            status_text += f"Todos os {len(self.points)} pontos foram capturados\n\n"
-            status_text += "🟡 TOQUE NO PONTO AMARELO PARA FINALIZAR\n"
-            status_text += "Posicione a mão sobre o ponto amarelo\n"
-            status_text += "e toque para encerrar a calibração"
-        elif self.is_pausing:
+        if self.is_pausing:
             # Pause state - show next point
             next_point_index = self.current_point_index + 1
-            elapsed = time.time() - self.pause_start_time
+            elapsed = self.clock.now() - self.pause_start_time
             remaining = max(0, self.pause_duration - elapsed)
             
             status_text = f"CONCLUÍDO!\n"
@@ -871,7 +825,7 @@ class CalibrationWindow:
             status = point.get_status()
             
             if status == "collecting":
-                elapsed = time.time() - point.start_time
+                elapsed = point.captured_duration()
                 remaining = max(0, 5.0 - elapsed)
                 status_text = f"🔴 COLETANDO DADOS... {remaining:.1f}s restantes\n"
                 status_text += "Mantenha a mão FIRME sobre o ponto vermelho\n"
@@ -906,11 +860,7 @@ class CalibrationWindow:
         # Draw point with status-based color
         radius = 25
         
-        if self.waiting_for_final_touch:
-            # Show yellow point at center for final touch
-            color = '#ffaa00'  # Yellow - final touch
-            point_to_draw = type('obj', (object,), {'x': screen_width // 2, 'y': screen_height // 2})
-        elif self.is_pausing:
+        if self.is_pausing:
             # During pause, show next point in yellow
             next_point = self.points[self.current_point_index + 1] if self.current_point_index + 1 < len(self.points) else point
             color = '#ffaa00'  # Yellow - repositioning
@@ -956,10 +906,10 @@ class CalibrationWindow:
             fill='#ffffff', width=3
         )
         
-        # Show progress if collecting or pausing (but not when waiting for final touch)
-        if self.is_pausing and not self.waiting_for_final_touch:
+        # Show progress if collecting or pausing
+        if self.is_pausing:
             # Pause progress
-            elapsed = time.time() - self.pause_start_time
+            elapsed = self.clock.now() - self.pause_start_time
             if elapsed <= self.pause_duration:
                 progress = elapsed / self.pause_duration
                 width = 500
@@ -984,7 +934,7 @@ class CalibrationWindow:
                 # Progress text
                 remaining = max(0, self.pause_duration - elapsed)
                 if self.current_point_index >= len(self.points) - 1:
-                    progress_text = f"FINALIZANDO: {remaining:.1f}s restantes ({progress * 100:.0f}%)"
+                    progress_text = f"VERIFICAÇÃO EM: {remaining:.1f}s ({progress * 100:.0f}%)"
                 else:
                     progress_text = f"REPOSICIONANDO: {remaining:.1f}s restantes ({progress * 100:.0f}%)"
                 self.canvas.create_text(
@@ -996,7 +946,7 @@ class CalibrationWindow:
                 
                 # Next point info
                 if self.current_point_index >= len(self.points) - 1:
-                    next_point_text = "Toque no ponto amarelo para encerrar"
+                    next_point_text = "Em seguida: toque nos alvos aleatórios para medir o erro"
                 else:
                     next_point_text = f"Próximo: Ponto {self.current_point_index + 2} de {len(self.points)}"
                 self.canvas.create_text(
@@ -1007,8 +957,8 @@ class CalibrationWindow:
                 )
                 
         elif point.is_collecting and point.start_time:
-            # Collection progress
-            elapsed = time.time() - point.start_time
+            # Collection progress (tempo válido acumulado entre trechos)
+            elapsed = point.captured_duration()
             if elapsed <= 5.0:
                 progress = elapsed / 5.0
                 width = 500
@@ -1049,17 +999,169 @@ class CalibrationWindow:
                     font=('Arial', 14)
                 )
     
+    def show_free_order(self):
+        """Draw every target of the free-order walk (filled ones dimmed) and the current dwell"""
+        assigner = self.target_assigner
+        clusterer = self.dwell_clusterer
+        clusterer.expire(self.clock.now())
+        filled = len(self.points) - len(assigner.unfilled)
+        
+        level_info = self.level_selector.levels[self.selected_level]
+        self.canvas.create_text(
+            screen_width // 2, 30,
+            text=f"{level_info['name']} - ORDEM LIVRE",
+            fill='#00ff88',
+            font=('Arial', 16, 'bold'),
+            justify=tk.CENTER
+        )
+        self.canvas.create_text(
+            screen_width // 2, 80,
+            text=f"{filled} de {len(self.points)} alvos preenchidos\n"
+                 f"Toque e segure cada ponto verde por {clusterer.dwell_time:.0f}s, em qualquer ordem",
+            fill='#ffffff',
+            font=('Arial', 16, 'bold'),
+            justify=tk.CENTER
+        )
+        self.canvas.create_text(
+            screen_width // 2, screen_height - 50,
+            text="ESC para cancelar",
+            fill='#888888',
+            font=('Arial', 14),
+            justify=tk.CENTER
+        )
+        
+        radius = 25
+        for point in self.points:
+            color = '#555555' if point.name in assigner.assigned else '#44ff44'
+            self.canvas.create_oval(
+                point.x - radius, point.y - radius,
+                point.x + radius, point.y + radius,
+                fill=color,
+                outline='#ffffff',
+                width=3
+            )
+            self.canvas.create_line(point.x - radius - 15, point.y, point.x + radius + 15, point.y,
+                                    fill='#ffffff', width=2)
+            self.canvas.create_line(point.x, point.y - radius - 15, point.x, point.y + radius + 15,
+                                    fill='#ffffff', width=2)
+        
+        # Permanência em andamento: posição estimada e progresso
+        progress = clusterer.progress
+        if progress > 0:
+            screen_x, screen_y = assigner.mapping(clusterer.mean_x, clusterer.mean_y)
+            ring = radius + 15
+            self.canvas.create_oval(
+                screen_x - ring, screen_y - ring,
+                screen_x + ring, screen_y + ring,
+                outline='#ff4444',
+                width=4
+            )
+            width = 500
+            height = 50
+            x = screen_width // 2 - width // 2
+            y = screen_height - 150
+            self.canvas.create_rectangle(x, y, x + width, y + height, fill='#2a2a2a', outline='#ffffff', width=3)
+            self.canvas.create_rectangle(x, y, x + width * progress, y + height, fill='#ff4444')
+            remaining = clusterer.dwell_time * (1 - progress)
+            self.canvas.create_text(
+                screen_width // 2, y + height // 2,
+                text=f"COLETANDO: {remaining:.1f}s restantes ({progress * 100:.0f}%)",
+                fill='#ffffff',
+                font=('Arial', 18, 'bold')
+            )
+    
+    def show_verification(self):
+        """Draw the current verification target, previous errors and the final summary"""
+        self.canvas.delete("all")
+        total = len(self.verification_targets)
+        stats = self.verification_stats
+        
+        if self.waiting_for_final_touch:
+            title = "✅ VERIFICAÇÃO CONCLUÍDA"
+        else:
+            title = f"VERIFICAÇÃO - Alvo {self.verification_index + 1} de {total}"
+        self.canvas.create_text(
+            screen_width // 2, 30,
+            text=title,
+            fill='#00ff88',
+            font=('Arial', 16, 'bold'),
+            justify=tk.CENTER
+        )
+        
+        if stats and stats.count:
+            stats_text = f"Erro médio {stats.mean:.1f}px | p95 {stats.percentile(0.95):.0f}px | máx {stats.max:.1f}px"
+            self.canvas.create_text(
+                screen_width // 2, 60,
+                text=stats_text,
+                fill='#ffffff',
+                font=('Arial', 14, 'bold'),
+                justify=tk.CENTER
+            )
+        
+        # Alvos anteriores: alvo -> posição mapeada (verde dentro da tolerância, vermelho fora)
+        for target_x, target_y, mapped_x, mapped_y, error in self.verification_results:
+            color = '#44ff44' if error <= VERIFICATION_TOLERANCE else '#ff4444'
+            self.canvas.create_oval(target_x - 10, target_y - 10, target_x + 10, target_y + 10, outline='#888888', width=2)
+            self.canvas.create_line(target_x, target_y, mapped_x, mapped_y, fill=color, width=2)
+            self.canvas.create_oval(mapped_x - 5, mapped_y - 5, mapped_x + 5, mapped_y + 5, fill=color, outline='')
+            self.canvas.create_text(target_x + 16, target_y - 16, text=f"{error:.0f}px", fill=color,
+                                    font=('Arial', 11), anchor=tk.W)
+        
+        radius = 25
+        if self.waiting_for_final_touch:
+            summary_text = "🟡 TOQUE NO PONTO AMARELO (ou ENTER) PARA FINALIZAR"
+            if self.verification_suggestions:
+                summary_text = (f"Pontos com erro acima de {VERIFICATION_TOLERANCE}px: "
+                                f"{', '.join(self.verification_suggestions)}\n"
+                                "R: recapturar apenas esses pontos\n\n" + summary_text)
+            target_x, target_y, color = screen_width // 2, screen_height // 2, '#ffaa00'
+        else:
+            target = self.verification_targets[self.verification_index]
+            if self.verification_wait_lift:
+                summary_text = "Levante a mão e toque no próximo alvo"
+            elif target.is_collecting:
+                summary_text = "🔴 MANTENHA A MÃO FIRME SOBRE O ALVO"
+            else:
+                summary_text = f"Toque e segure o alvo azul por {VERIFICATION_CAPTURE_DURATION:.1f}s"
+            target_x, target_y = target.x, target.y
+            color = '#ff4444' if target.is_collecting else '#44ddff'
+        
+        self.canvas.create_text(
+            screen_width // 2, 110,
+            text=summary_text,
+            fill='#ffffff',
+            font=('Arial', 16, 'bold'),
+            justify=tk.CENTER
+        )
+        self.canvas.create_oval(
+            target_x - radius, target_y - radius,
+            target_x + radius, target_y + radius,
+            fill=color,
+            outline='#ffffff',
+            width=3
+        )
+        self.canvas.create_line(target_x - radius - 15, target_y, target_x + radius + 15, target_y, fill='#ffffff', width=3)
+        self.canvas.create_line(target_x, target_y - radius - 15, target_x, target_y + radius + 15, fill='#ffffff', width=3)
+        
+        self.canvas.create_text(
+            screen_width // 2, screen_height - 50,
+            text="ENTER para finalizar • ESC para cancelar",
+            fill='#888888',
+            font=('Arial', 14),
+            justify=tk.CENTER
+        )
+    
     def start_pause(self):
         """Start pause between points"""
         self.is_pausing = True
-        self.pause_start_time = time.time()
+        self.pause_start_time = self.clock.now()
         print(f"[CALIBRAÇÃO] Pausa iniciada - {self.pause_duration}s para reposicionamento")
     
     def is_pause_complete(self):
         """Check if pause is complete"""
-        if not self.is_pausing or not self.pause_start_time:
+        if not self.is_pausing or self.pause_start_time is None:
             return False
-        return time.time() - self.pause_start_time >= self.pause_duration
+        return self.clock.now() - self.pause_start_time >= self.pause_duration
     
     def end_pause(self):
         """End pause and prepare for next point"""
@@ -1069,9 +1171,8 @@ class CalibrationWindow:
         # Move to next point
         self.current_point_index += 1
         if self.current_point_index >= len(self.points):
-            # Last point completed - wait for user touch to finish
-            self.waiting_for_final_touch = True
-            print(f"[CALIBRAÇÃO] Último ponto concluído - Aguardando toque do usuário para finalizar")
+            # Último ponto concluído - mede o erro real com alvos aleatórios
+            self.start_verification()
         else:
             # Reset capture state and show next point
             point = self.points[self.current_point_index]
@@ -1089,62 +1190,70 @@ class CalibrationWindow:
         if avg_pos:
             print(f"📡 AirScan: ({avg_pos['x']:.2f}, {avg_pos['y']:.2f})")
         print(f"📊 Dados coletados: {len(point.airscan_data['x'])} pontos")
-        print(f"💾 Arquivo: AirScan_Calibration_Data.json atualizado")
+        print(f"💾 Sessão: {len(self.session.points)} de {len(self.points)} pontos (gravação ao finalizar)")
         print("=" * 50)
     
-    def handle_osc_data(self, x, y):
-        """Handle incoming OSC data"""
-        if self.calibration_complete or self.showing_level_selector:
+    def enqueue_osc_data(self, x, y, timestamp=None):
+        """Enqueue a sample from the OSC thread (never touches Tk)"""
+        self.osc_queue.put((x, y, timestamp if timestamp is not None else self.clock.now()))
+    
+    def process_osc_queue(self):
+        """Drain all queued samples on the Tk thread; returns how many were processed"""
+        processed = 0
+        last_sample = None
+        while True:
+            try:
+                last_sample = self.osc_queue.get_nowait()
+            except queue.Empty:
+                break
+            processed += 1
+            self.handle_osc_data(*last_sample)
+            if self.calibration_complete:
+                break
+        
+        # Estatísticas de captura atualizadas em lote (desenhadas uma vez por tick)
+        if processed:
+            self.osc_connected = True
+            self.data_count += processed
+            self.current_x, self.current_y, self.last_osc_data_time = last_sample
+        return processed
+    
+    def handle_osc_data(self, x, y, timestamp):
+        """Handle one queued OSC sample (Tk thread only, no drawing)"""
+        if self.calibration_complete or self.showing_level_selector or self.showing_area_selector:
             return
         
-        # Update OSC status
-        self.osc_connected = True
-        self.last_osc_data_time = time.time()
-        self.current_x = x
-        self.current_y = y
-        self.data_count += 1
+        # Verificação (alvos aleatórios e toque final no ponto amarelo)
+        if self.verifying:
+            self.handle_verification_data(x, y, timestamp)
+            return
         
-        # Check if waiting for final touch
-        if self.waiting_for_final_touch:
-            # Detect touch on the yellow point to finish calibration
-            center_x = screen_width // 2
-            center_y = screen_height // 2
-            radius = 30  # Slightly larger radius for easier touch detection
-            
-            # Check if the touch is within the yellow point area
-            if (abs(x - center_x) <= radius and abs(y - center_y) <= radius):
-                print("[CALIBRAÇÃO] Toque detectado no ponto amarelo - finalizando calibração!")
-                self.finish_calibration()
-                return
+        if self.free_order:
+            self.handle_free_order_data(x, y, timestamp)
+            return
         
         # If pausing, check if we should end pause
         if self.is_pausing:
             # Normal pause logic - wait for timeout
             if self.is_pause_complete():
                 self.end_pause()
-                self.show_current_point()
             return
             
         point = self.points[self.current_point_index]
         
         # Check for interruption if currently capturing
         if point.is_capturing:
-            if point.check_interruption():
-                self.show_current_point()
+            if point.check_interruption(timestamp):
                 return
         
         # Start capturing if we receive data and point is ready
         if point.is_ready and not point.is_capturing:
-            point.start_capture()
-            self.show_current_point()
+            point.start_capture(timestamp)
             return
         
         # Add data point (this will handle interruption detection)
         if point.is_capturing:
-            success = point.add_data(x, y)
-            
-            # Update display after each data point
-            self.show_current_point()
+            point.add_data(x, y, timestamp)
             
             # Check if capture is complete
             if point.capture_complete():
@@ -1160,84 +1269,403 @@ class CalibrationWindow:
                     # Show success message
                     self.show_success_message(point)
                     
+                    if self.adaptive and self.current_point_index == len(self.points) - 1:
+                        self.plan_adaptive_point()
+                    
                     # Start pause before next point
                     self.start_pause()
-                    self.show_current_point()
                 else:
                     print(f"[CALIBRAÇÃO] Erro: dados insuficientes para {point.name}")
                     point.reset_capture()
-                    self.show_current_point()
     
-    def save_point_data(self, point, avg_pos):
-        """Save calibration data for a point"""
+    def previous_transform(self):
+        """Coarse sensor -> screen mapping for free order: the last calibration, else the proportional default"""
         try:
-            with open('AirScan_Calibration_Data.json', 'r') as f:
-                data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            data = {
-                "points": {},
-                "screen": {"width": screen_width, "height": screen_height},
-                "airscan": {
-                    "width": DEFAULT_AIRSCAN_WIDTH,
-                    "height": DEFAULT_AIRSCAN_HEIGHT,
-                    "port": AIRSCAN_PORT
-                },
-                "calibration_level": self.selected_level,
-                "calibration_version": "1.1"
-            }
-        
-        # Update point data
-        data["points"][point.name] = {
-            "screen": {"x": point.x, "y": point.y},
-            "airscan": {"x": avg_pos["x"], "y": avg_pos["y"]}
-        }
+            previous = sensor_calibration(load_json(CALIBRATION_FILE), self.sensor_id)
+        except (OSError, ValueError) as e:
+            # Arquivo ilegível (JSONDecodeError é ValueError): compile_transform({}) cai no mapeamento proporcional
+            print(f"[WARNING] Calibração anterior ilegível ({CALIBRATION_FILE}: {e}) - usando mapeamento proporcional")
+            previous = {}
+        return compile_transform(previous, screen_width, screen_height,
+                                 DEFAULT_AIRSCAN_WIDTH, DEFAULT_AIRSCAN_HEIGHT)
+    
+    def start_free_order(self, coarse):
+        """Show every pending point at once; dwells are assigned to the nearest unfilled one"""
+        area = self.selected_area
+        rect = (area["x1"], area["y1"], area["x2"], area["y2"]) if area else (0, 0, screen_width, screen_height)
+        max_distance = FREE_ORDER_MAX_DISTANCE * math.hypot(rect[2] - rect[0], rect[3] - rect[1])
+        self.target_assigner = TargetAssigner({p.name: (p.x, p.y) for p in self.points}, coarse, rect, max_distance)
+        self.dwell_clusterer = DwellClusterer(self.points[0].capture_duration,
+                                              max_gap=self.points[0].data_interruption_threshold)
+        print(f"[CALIBRAÇÃO] Ordem livre: {len(self.points)} alvos - toque e segure cada um por "
+              f"{self.dwell_clusterer.dwell_time:.0f}s, em qualquer ordem")
+    
+    def handle_free_order_data(self, x, y, timestamp):
+        """Free order: segment the stream into dwells and fill the target each dwell belongs to"""
+        dwell = self.dwell_clusterer.add(x, y, timestamp)
+        if dwell is None:
+            return
+        name = self.target_assigner.assign(dwell.x, dwell.y)
+        if name is None:
+            screen_x, screen_y = self.target_assigner.mapping(dwell.x, dwell.y)
+            print(f"[CALIBRAÇÃO] Permanência em ({dwell.x:.1f}, {dwell.y:.1f}) ~ tela ({screen_x}, {screen_y}) "
+                  f"ignorada: longe dos alvos pendentes ou sobre um alvo já preenchido")
+            return
         
-        # Update calibration info
-        data["calibration_level"] = self.selected_level
-        data["calibration_version"] = "1.2"  # Bumped version for area selection feature
-        data["total_points"] = len(self.points)
+        point = next(p for p in self.points if p.name == name)
+        self.save_point_data(point, {"x": dwell.x, "y": dwell.y}, DwellClusterer.statistics(dwell))
+        remaining = len(self.target_assigner.unfilled)
+        print(f"[CALIBRAÇÃO] {name} preenchido ({len(self.points) - remaining} de {len(self.points)}, "
+              f"{dwell.count} amostras)")
+        if not remaining:
+            # Todos os alvos preenchidos - mede o erro real com alvos aleatórios
+            self.start_verification()
+    
+    def start_verification(self):
+        """Fit the captured points and show random targets to measure the real on-screen error"""
+        data = self.session.build()
+        self.verification_transform = compile_transform(data, screen_width, screen_height,
+                                                        DEFAULT_AIRSCAN_WIDTH, DEFAULT_AIRSCAN_HEIGHT)
+        area = self.selected_area
+        rect = (area["x1"], area["y1"], area["x2"], area["y2"]) if area else (0, 0, screen_width, screen_height)
+        if OUTPUTS:
+            # Alvos em todas as saídas (o retângulo envolvente pode ter vãos entre elas)
+            count = math.ceil(VERIFICATION_TARGETS / len(OUTPUTS))
+            targets = [target for r in OUTPUTS.values()
+                       for target in random_targets((r["x1"], r["y1"], r["x2"], r["y2"]), count)]
+        else:
+            targets = random_targets(rect)
+        self.verification_targets = []
+        for index, (x, y) in enumerate(targets):
+            target = CalibrationPoint(x, y, f"VERIFICAÇÃO {index + 1}", self.clock)
+            target.capture_duration = VERIFICATION_CAPTURE_DURATION
+            self.verification_targets.append(target)
+        self.verification_index = 0
+        self.verification_stats = RunningErrorStats()
+        self.verification_attribution = PointErrorAttribution(
+            {p.name: (p.x, p.y) for p in self.all_points if p.name in self.session.points})
+        self.verification_results = []
+        self.verification_suggestions = []
+        self.verification_summary = None
+        self.verification_last_sample = None
+        self.verification_wait_lift = False
+        self.waiting_for_final_touch = False
+        self.verifying = True
+        print(f"[VERIFICAÇÃO] {len(self.verification_targets)} alvos aleatórios - toque e segure cada um por "
+              f"{VERIFICATION_CAPTURE_DURATION:.1f}s (ENTER pula a verificação)")
+    
+    def handle_verification_data(self, x, y, timestamp):
+        """Verification phase: capture touches on random targets, then wait for the final touch"""
+        last = self.verification_last_sample
+        self.verification_last_sample = timestamp
+        if self.verification_wait_lift:
+            # Só começa o próximo alvo depois que a mão saiu da tela
+            if last is not None and timestamp - last <= self.verification_targets[0].data_interruption_threshold:
+                return
+            self.verification_wait_lift = False
         
-        # Save selected area (new feature)
-        if self.selected_area:
-            data["calibration_area"] = self.selected_area
-            print(f"[CALIBRAÇÃO] Área de trabalho: {self.selected_area['width']}x{self.selected_area['height']}")
+        if self.waiting_for_final_touch:
+            # Toque no ponto amarelo, já mapeado para a tela pela nova transformação
+            screen_x, screen_y = self.verification_transform(x, y)
+            if math.hypot(screen_x - screen_width // 2, screen_y - screen_height // 2) <= 60:
+                print("[CALIBRAÇÃO] Toque detectado no ponto amarelo - finalizando calibração!")
+                self.finish_calibration()
+            return
         
-        # Save to file
-        with open('AirScan_Calibration_Data.json', 'w') as f:
-            json.dump(data, f, indent=2)
+        target = self.verification_targets[self.verification_index]
+        if target.is_capturing and target.check_interruption(timestamp):
+            return
+        if target.is_ready and not target.is_capturing:
+            target.start_capture(timestamp)
+            return
+        if target.is_capturing:
+            target.add_data(x, y, timestamp)
+            if target.capture_complete():
+                self.record_verification(target)
+    
+    def record_verification(self, target):
+        """Map the averaged touch through the fitted transform and accumulate its error"""
+        avg_pos = target.get_average()
+        screen_x, screen_y = self.verification_transform(avg_pos["x"], avg_pos["y"])
+        error = math.hypot(screen_x - target.x, screen_y - target.y)
+        stats = self.verification_stats
+        stats.add(error)
+        nearest = self.verification_attribution.add(target.x, target.y, error)
+        self.verification_results.append((target.x, target.y, screen_x, screen_y, error))
+        print(f"[VERIFICAÇÃO] Alvo {self.verification_index + 1}/{len(self.verification_targets)}: "
+              f"erro {error:.1f}px (ponto mais próximo: {nearest}) | média {stats.mean:.1f}px | máx {stats.max:.1f}px")
+        
+        self.verification_index += 1
+        self.verification_wait_lift = True
+        if self.verification_index >= len(self.verification_targets):
+            self.finish_verification()
+    
+    def finish_verification(self):
+        """Summarise the verification and offer to re-capture the worst points"""
+        summary = self.verification_stats.summary()
+        self.verification_suggestions = self.verification_attribution.worst()
+        summary["point_errors"] = {name: round(error, 2)
+                                   for name, error in self.verification_attribution.mean_errors().items()}
+        summary["tolerance"] = VERIFICATION_TOLERANCE
+        summary["suggested_recapture"] = list(self.verification_suggestions)
+        self.verification_summary = summary
+        self.waiting_for_final_touch = True
+        
+        print(f"[VERIFICAÇÃO] Erro médio {summary['mean']}px | p95 {summary['p95']}px | máx {summary['max']}px")
+        if self.verification_suggestions:
+            print(f"[VERIFICAÇÃO] Acima de {VERIFICATION_TOLERANCE}px: {', '.join(self.verification_suggestions)} "
+                  f"- R recaptura só esses pontos")
+        print("[CALIBRAÇÃO] Toque no ponto amarelo (ou ENTER) para finalizar")
+    
+    def recapture_points(self, names):
+        """Capture the given points again (keeping the others) and verify once more"""
+        originals = {point.name: point for point in self.all_points}
+        self.points = [CalibrationPoint(originals[name].x, originals[name].y, name, self.clock) for name in names]
+        for point in self.points:
+            point.output = originals[point.name].output
+        for name in names:
+            self.session.remove_point(name)
+        self.current_point_index = 0
+        self.verifying = False
+        self.waiting_for_final_touch = False
+        self.is_pausing = False
+        self.adaptive = False  # Recaptura não acrescenta pontos
+        if self.free_order:
+            # A transformação da verificação já é uma boa estimativa inicial
+            self.start_free_order(self.verification_transform)
+        print(f"[CALIBRAÇÃO] Recapturando {len(names)} ponto(s): {', '.join(names)}")
+    
+    def plan_adaptive_point(self):
+        """Adaptive level: append the next target where the fitted models disagree most"""
+        try:
+            # Import tardio: NumPy só é carregado no nível adaptativo
+            from AirScan_Adaptive import ADAPTIVE_TARGET_ERROR, next_target
+        except ImportError:
+            print("[WARNING] NumPy não instalado - calibração adaptativa encerrada com os pontos atuais")
+            self.adaptive = False
+            return
+        area = self.selected_area
+        rect = (area["x1"], area["y1"], area["x2"], area["y2"]) if area else (0, 0, screen_width, screen_height)
+        try:
+            target, worst = next_target(self.session.build(), rect)
+        except (KeyError, ValueError) as e:
+            print(f"[WARNING] Incerteza não estimada ({e}) - calibração adaptativa encerrada")
+            self.adaptive = False
+            return
+        if target is None:
+            print(f"[CALIBRAÇÃO] Erro máximo previsto {worst:.1f}px (alvo {ADAPTIVE_TARGET_ERROR}px) - "
+                  f"calibração adaptativa concluída com {len(self.session.points)} pontos")
+            return
+        point = CalibrationPoint(target.x, target.y, f"ADAPTIVE_{len(self.all_points) + 1}", self.clock)
+        self.points.append(point)
+        self.all_points.append(point)
+        predicted = f"{worst:.1f}px" if math.isfinite(worst) else "ainda indefinido"
+        print(f"[CALIBRAÇÃO] Erro máximo previsto {predicted} - próximo ponto em ({target.x}, {target.y})")
+    
+    def save_point_data(self, point, avg_pos, stats=None):
+        """Record calibration data for a point in the current session"""
+        # Estatísticas das amostras: o ajuste pondera cada ponto pela incerteza da média
+        if stats is None:
+            stats = point.get_statistics()
+        extra = {"samples": stats} if stats else {}
+        if point.output is not None:
+            extra["output"] = point.output
+        self.session.add_point(
+            point.name,
+            {"x": point.x, "y": point.y},
+            {"x": avg_pos["x"], "y": avg_pos["y"]},
+            **extra
+        )
         
-        print(f"[CALIBRAÇÃO] Dados salvos para {point.name}:")
+        print(f"[CALIBRAÇÃO] Dados registrados para {point.name}:")
         print(f"  Tela: ({point.x}, {point.y})")
         print(f"  AirScan: ({avg_pos['x']:.2f}, {avg_pos['y']:.2f})")
-        print(f"[CALIBRAÇÃO] Arquivo AirScan_Calibration_Data.json atualizado!")
+        if stats:
+            print(f"  Amostras: {stats['count']} | desvio X {math.sqrt(stats['var_x']):.2f} | "
+                  f"desvio Y {math.sqrt(stats['var_y']):.2f}")
+    
+    def evaluate_session(self, **extra):
+        """Accuracy report (residuals / leave-one-out) of the captured points, or None"""
+        try:
+            # Import tardio: NumPy só é carregado ao finalizar a calibração
+            from AirScan_Fitting import evaluate, format_summary
+        except ImportError:
+            print("[WARNING] NumPy não instalado - relatório de precisão indisponível (pip install numpy)")
+            return None
+        try:
+            report = evaluate(self.session.build(**extra), screen_width, screen_height)
+        except (KeyError, ValueError) as e:
+            print(f"[WARNING] Precisão não avaliada: {e}")
+            return None
+        for line in format_summary(report):
+            print(line)
+        return report
+    
+    def evaluate_outputs(self):
+        """The "outputs" entry of the session, with each output's accuracy report"""
+        data = self.session.build()
+        outputs = {output_id: dict(rect) for output_id, rect in data["outputs"].items()}
+        try:
+            from AirScan_Fitting import evaluate, format_summary
+        except ImportError:
+            print("[WARNING] NumPy não instalado - relatório de precisão indisponível (pip install numpy)")
+            return outputs
+        for output_id in outputs:
+            try:
+                report = evaluate(output_calibration(data, output_id), screen_width, screen_height)
+            except (KeyError, ValueError) as e:
+                print(f"[WARNING] Precisão da saída {output_id} não avaliada: {e}")
+                continue
+            print(f"[PRECISÃO] Saída {output_id}:")
+            for line in format_summary(report):
+                print(line)
+            outputs[output_id]["accuracy"] = report
+        return outputs
+    
+    def commit_session(self):
+        """Write the whole calibration once, atomically; True if the file was written"""
+        if not self.session:
+            return False
+        try:
+            extra = {"total_points": len(self.session.points)}
+            if self.selected_model:
+                extra["model"] = self.selected_model
+            if OUTPUTS:
+                extra["outputs"] = self.evaluate_outputs()
+            else:
+                accuracy = self.evaluate_session(**extra)
+                if accuracy:
+                    extra["accuracy"] = accuracy
+            if self.verification_summary:
+                extra["verification"] = self.verification_summary
+            self.session.commit(**extra)
+            if OUTPUTS:
+                print(f"[CALIBRAÇÃO] Saídas: {', '.join(OUTPUTS)}")
+            elif self.selected_area:
+                print(f"[CALIBRAÇÃO] Área de trabalho: {self.selected_area['width']}x{self.selected_area['height']}")
+            print(f"[CALIBRAÇÃO] Arquivo {CALIBRATION_FILE} gravado ({len(self.session.points)} pontos)")
+            return True
+        except Exception as e:
+            print(f"[ERROR] Erro ao gravar calibração: {e}")
+            print(f"[INFO] Pontos preservados em {JOURNAL_FILE} - recupere com: python AirScan_Calibration.py --recover")
+            return False
     
     def finish_calibration(self):
         """Complete the calibration process"""
+        print("[CALIBRAÇÃO] Todos os pontos capturados")
+        self.calibration_complete = True
+        self.completed = True
+        
+        # Modelos ajustados em outros processos; a janela segue respondendo e
+        # complete_calibration é chamado quando todos terminarem
+        if self.start_model_selection():
+            return
+        self.complete_calibration()
+    
+    def start_model_selection(self):
+        """Submit every candidate model fit to a process pool; False if selection is unavailable"""
+        if not self.session:
+            return False
+        if OUTPUTS:
+            # Um modelo por saída: escolhido depois, com a CLI de precisão
+            print("[CALIBRAÇÃO] Várias saídas: modelo linear_range em cada uma - para escolher o modelo de uma "
+                  "saída: python AirScan_Fitting.py --output ID --select --save")
+            return False
+        try:
+            from AirScan_Fitting import ModelSelection
+        except ImportError:
+            print("[WARNING] NumPy não instalado - usando o modelo linear_range (pip install numpy)")
+            return False
+        try:
+            selection = ModelSelection(self.session.build(), screen_width, screen_height)
+        except (OSError, ValueError, KeyError, RuntimeError) as e:
+            print(f"[WARNING] Seleção de modelo indisponível ({e}) - usando linear_range")
+            return False
+        if not selection.candidates:
+            return False
+        self.model_selection = selection
+        print(f"[CALIBRAÇÃO] Ajustando modelos em segundo plano: {', '.join(selection.candidates)}")
+        self.model_selection_job = self.root.after(100, self.poll_model_selection)
+        return True
+    
+    def poll_model_selection(self):
+        """Tk timer: show progress until every candidate fit has finished, then commit"""
+        selection = self.model_selection
+        if selection is None:
+            return
+        if self.stop_event and self.stop_event.is_set():
+            # Controle sendo encerrado: não espera o pool
+            self.stop_model_selection()
+            self.complete_calibration()
+            return
+        if not selection.done():
+            self.show_model_selection()
+            self.model_selection_job = self.root.after(100, self.poll_model_selection)
+            return
+        
+        self.model_selection = None
+        self.model_selection_job = None
+        self.selected_model = selection.result()
+        if self.selected_model:
+            from AirScan_Fitting import format_selection
+            for line in format_selection(self.selected_model):
+                print(line)
+        else:
+            print("[WARNING] Nenhum modelo pôde ser avaliado - usando linear_range")
+        self.complete_calibration()
+    
+    def stop_model_selection(self):
+        if self.model_selection_job:
+            self.root.after_cancel(self.model_selection_job)
+            self.model_selection_job = None
+        if self.model_selection:
+            self.model_selection.cancel()
+            self.model_selection = None
+    
+    def show_model_selection(self):
+        """Progress screen while the candidate models are being fitted"""
+        finished, total = self.model_selection.progress()
+        self.canvas.delete("all")
+        self.canvas.create_text(
+            screen_width // 2, screen_height // 2 - 40,
+            text="⏳ AJUSTANDO MODELOS DE CALIBRAÇÃO",
+            fill='#00ff88',
+            font=('Arial', 20, 'bold'),
+            justify=tk.CENTER
+        )
+        self.canvas.create_text(
+            screen_width // 2, screen_height // 2 + 10,
+            text=f"{finished} de {total} modelos avaliados (leave-one-out)",
+            fill='#ffffff',
+            font=('Arial', 16),
+            justify=tk.CENTER
+        )
+        self.canvas.create_text(
+            screen_width // 2, screen_height - 50,
+            text="ESC para pular e usar o modelo linear_range",
+            fill='#888888',
+            font=('Arial', 14),
+            justify=tk.CENTER
+        )
+    
+    def complete_calibration(self):
+        """Commit the session (with the selected model, if any) and close the window"""
+        # Gravação única da sessão; sucesso só é anunciado depois dela
+        self.completed = self.commit_session()
         print("\n" + "=" * 60)
-        print("✅ CALIBRAÇÃO CONCLUÍDA COM SUCESSO!")
+        print("✅ CALIBRAÇÃO CONCLUÍDA COM SUCESSO!" if self.completed else "❌ CALIBRAÇÃO NÃO GRAVADA")
         print("=" * 60)
-        self.calibration_complete = True
         
-        # Stop OSC server first
-        if hasattr(self, 'server') and self.server:
-            try:
-                self.server.shutdown()
-                self.server.server_close()
-                print("[CALIBRAÇÃO] Servidor OSC encerrado")
-            except Exception as e:
-                print(f"[WARNING] Erro ao encerrar servidor: {e}")
+        self.close_window()
         
-        # Wait a bit for port to be released
-        time.sleep(1)
+        if not self.standalone:
+            # Em processo: o controle recarrega a calibração a quente
+            return
         
-        # Destroy window properly
-        try:
-            self.root.after_cancel(self.update_job) if hasattr(self, 'update_job') else None
-            self.root.quit()
-            self.root.destroy()
-            print("[CALIBRAÇÃO] Janela encerrada com sucesso")
-        except Exception as e:
-            print(f"[WARNING] Erro ao fechar janela: {e}")
+        if not self.completed:
+            print(f"[INFO] Modo configurado: {AIRSCAN_MODE} (Blob {BLOB_ID})")
+            print("=" * 60 + "\n")
+            sys.exit(1)
         
         # Show completion message
         print("\n[CALIBRAÇÃO] Processo de calibração finalizado com sucesso!")
@@ -1254,9 +1682,30 @@ class CalibrationWindow:
         print("⚠️  CALIBRAÇÃO CANCELADA")
         print("=" * 60)
         self.calibration_complete = True
+        self.stop_model_selection()
+        
+        # Sessão cancelada não altera o arquivo de calibração
+        if self.session:
+            self.session.discard()
+        
+        self.close_window()
+        
+        if not self.standalone:
+            return
         
-        # Stop OSC server
-        if hasattr(self, 'server') and self.server:
+        print("\n[CALIBRAÇÃO] Sistema encerrado")
+        print(f"[INFO] Modo estava configurado: {AIRSCAN_MODE} (Blob {BLOB_ID})")
+        print(f"[INFO] Para iniciar o controle, execute: python AirScan_Control.py")
+        print("=" * 60 + "\n")
+        sys.exit(0)
+    
+    def close_window(self):
+        """Detach from the sample source and destroy the Tk window"""
+        if self.sample_source:
+            # Em processo: apenas cancela a inscrição no tee do controle
+            self.sample_source.unsubscribe(self.enqueue_osc_data)
+        elif hasattr(self, 'server') and self.server:
+            # Stop OSC server
             try:
                 self.server.shutdown()
                 self.server.server_close()
@@ -1264,18 +1713,7 @@ class CalibrationWindow:
             except Exception as e:
                 print(f"[WARNING] Erro ao encerrar servidor: {e}")
         
-        # Wait a bit for port to be released
-        time.sleep(1)
-        
-        # Create a flag file to indicate calibration was cancelled
-        try:
-            with open('calibration_cancelled.flag', 'w') as f:
-                f.write('cancelled')
-            print("[CALIBRAÇÃO] Arquivo de cancelamento criado")
-        except:
-            pass
-        
-        # Destroy window and exit
+        # Destroy window properly
         try:
             self.root.after_cancel(self.update_job) if hasattr(self, 'update_job') else None
             self.root.quit()
@@ -1283,13 +1721,6 @@ class CalibrationWindow:
             print("[CALIBRAÇÃO] Janela encerrada")
         except Exception as e:
             print(f"[WARNING] Erro ao fechar janela: {e}")
-        
-        print("\n[CALIBRAÇÃO] Sistema encerrado")
-        print(f"[INFO] Modo estava configurado: {AIRSCAN_MODE} (Blob {BLOB_ID})")
-        print(f"[INFO] Para iniciar o controle, execute: python AirScan_Control.py")
-        print("=" * 60 + "\n")
-        sys.exit(0)
-    
     
     def start_osc_server(self):
         """Start OSC server to receive coordinates"""
@@ -1304,21 +1735,25 @@ class CalibrationWindow:
             
             dispatcher = Dispatcher()
             
+            # Último X/Y recebido - pertence exclusivamente à thread do servidor
+            latest = {"x": None, "y": None}
+            
             def handle_x(unused_addr, x):
-                self.current_x = x
-                if hasattr(self, 'current_y') and self.current_y is not None:
-                    self.handle_osc_data(x, self.current_y)
+                latest["x"] = x
+                if latest["y"] is not None:
+                    self.enqueue_osc_data(x, latest["y"])
             
             def handle_y(unused_addr, y):
-                self.current_y = y
-                if hasattr(self, 'current_x') and self.current_x is not None:
-                    self.handle_osc_data(self.current_x, y)
+                latest["y"] = y
+                if latest["x"] is not None:
+                    self.enqueue_osc_data(latest["x"], y)
             
             dispatcher.map(f"/airscan/blob/{BLOB_ID}/x", handle_x)
             dispatcher.map(f"/airscan/blob/{BLOB_ID}/y", handle_y)
             
-            # Start server in a separate thread
-            self.server = osc_server.ThreadingOSCUDPServer(
+            # Servidor bloqueante em uma única thread: mantém a ordem dos pacotes
+            # e evita criar uma thread por datagrama
+            self.server = osc_server.BlockingOSCUDPServer(
                 ("0.0.0.0", AIRSCAN_PORT),
                 dispatcher
             )
@@ -1333,12 +1768,16 @@ class CalibrationWindow:
             self.osc_connected = False
     
     def start(self):
-        """Start the calibration window"""
+        """Start the calibration window; returns True if the calibration was completed"""
         try:
             print("[CALIBRAÇÃO] Iniciando janela de calibração v1.1...")
             
-            # Start OSC server first
-            self.start_osc_server()
+            # Em processo: segundo consumidor do tee; standalone: servidor próprio
+            if self.sample_source:
+                self.sample_source.subscribe(self.enqueue_osc_data)
+                print("[CALIBRAÇÃO] Recebendo amostras do servidor do controle (sem troca de porta)")
+            else:
+                self.start_osc_server()
             
             # Force window to appear immediately
             self.root.update()
@@ -1347,7 +1786,17 @@ class CalibrationWindow:
             
             # Start update loop
             def update():
+                if self.stop_event and self.stop_event.is_set() and not self.calibration_complete:
+                    # Controle sendo encerrado: cancela a calibração
+                    self.cleanup()
+                    return
+                
                 if not self.calibration_complete:
+                    # Drena amostras OSC pendentes antes de redesenhar
+                    self.process_osc_queue()
+                    if self.calibration_complete:
+                        return
+                    
                     # Debug: log current state
                     if hasattr(self, '_last_state'):
                         current_state = "AREA" if self.showing_area_selector else ("LEVEL" if self.showing_level_selector else "CALIBRATION")
@@ -1387,7 +1836,8 @@ class CalibrationWindow:
             
             print("[CALIBRAÇÃO] Janela de calibração v1.1 ativa!")
             print("[CALIBRAÇÃO] Aguardando seleção de nível...")
-            print(f"[CALIBRAÇÃO] Servidor OSC escutando em 0.0.0.0:{AIRSCAN_PORT}")
+            if self.standalone:
+                print(f"[CALIBRAÇÃO] Servidor OSC escutando em 0.0.0.0:{AIRSCAN_PORT}")
             print(f"[CALIBRAÇÃO] Modo: {AIRSCAN_MODE} (Blob {BLOB_ID})")
             print("[CALIBRAÇÃO] Pressione ESC para cancelar a qualquer momento")
             
@@ -1401,7 +1851,35 @@ class CalibrationWindow:
             import traceback
             traceback.print_exc()
             self.cleanup()
+        
+        return self.completed
+
+def recover_calibration(journal_path=JOURNAL_FILE):
+    """Commit the points left in the journal by an interrupted calibration"""
+    if not os.path.exists(journal_path):
+        print(f"[CALIBRAÇÃO] Nenhum journal encontrado ({journal_path})")
+        return False
+    
+    session = CalibrationSession.recover(journal_path)
+    if not session or not session.points:
+        print("[CALIBRAÇÃO] Journal sem pontos válidos - nada a recuperar")
+        return False
+    
+    session.commit(total_points=len(session.points))
+    print(f"[CALIBRAÇÃO] {len(session.points)} pontos recuperados e gravados em {CALIBRATION_FILE}")
+    return True
 
 if __name__ == "__main__":
+    if "--recover" in sys.argv[1:]:
+        # --recover [journal]: journal guardado por uma calibração posterior (ver rotate_journal)
+        following = sys.argv[sys.argv.index("--recover") + 1:]
+        journal = following[0] if following and not following[0].startswith("--") else JOURNAL_FILE
+        sys.exit(0 if recover_calibration(journal) else 1)
+    
+    if os.path.exists(JOURNAL_FILE):
+        print(f"[WARNING] Journal de uma calibração interrompida encontrado ({JOURNAL_FILE})")
+        print("[INFO] Para gravar os pontos já capturados: python AirScan_Calibration.py --recover")
+        print("[INFO] Uma nova calibração guarda esse journal com outro nome antes de começar")
+    
     calibration = CalibrationWindow()
     calibration.start()
@@ -0,0 +1,345 @@
+"""
+Captura de pontos de calibração do AirScan, sem interface.
+
+CalibrationPoint acumula as amostras de um alvo (tempo válido somado entre
+trechos, descartando trechos inconsistentes) e generate_points monta o
+layout de cada nível dentro de uma área. A janela Tk (AirScan_Calibration)
+e a calibração offline (AirScan_Offline) usam as mesmas regras.
+"""
+
+import math
+from collections import deque
+
+from AirScan_Clock import CLOCK
+
+# Captura por trechos: falha maior que data_interruption_threshold só fecha o trecho;
+# sem dados por SEGMENT_RESET_GAP a captura recomeça (a mão saiu do ponto)
+SEGMENT_RESET_GAP = 3.0          # segundos
+SEGMENT_CONSISTENCY_SIGMA = 3.0  # desvios das amostras aceitos entre médias de trechos
+SEGMENT_MIN_TOLERANCE = 10.0     # unidades do sensor - tolerância mínima entre médias
+
+
+class CalibrationPoint:
+    def __init__(self, x, y, name, clock=CLOCK):
+        self.x = x
+        self.y = y
+        self.name = name
+        self.clock = clock
+        self.airscan_data = {"x": deque(maxlen=500), "y": deque(maxlen=500)}
+        self.start_time = None
+        self.is_capturing = False
+        self.last_data_time = None
+        self.capture_duration = 5.0
+        self.data_interruption_threshold = 0.5
+        self.is_ready = True
+        self.is_collecting = False
+        # Captura em trechos: falhas curtas do sensor fecham o trecho em vez de reiniciar
+        self.segments = []  # trechos aceitos
+        self.segment = None  # trecho em andamento
+        self.discarded_segments = 0
+        self.output = None  # id da saída (desktop com vários projetores)
+    
+    def start_capture(self, timestamp=None):
+        """Start capturing data for this point"""
+        self.start_time = timestamp if timestamp is not None else self.clock.now()
+        self.last_data_time = self.start_time
+        self.is_capturing = True
+        self.is_ready = False
+        self.is_collecting = True
+        self.airscan_data["x"].clear()
+        self.airscan_data["y"].clear()
+        self.segments = []
+        self.segment = self._new_segment(self.start_time)
+        self.discarded_segments = 0
+        print(f"[CALIBRAÇÃO] Iniciando captura para {self.name}...")
+    
+    @staticmethod
+    def _new_segment(timestamp):
+        # Somas acumuladas: média e dispersão do trecho sem percorrer as amostras
+        return {"start": timestamp, "end": timestamp, "x": [], "y": [],
+                "n": 0, "sx": 0.0, "sy": 0.0, "sxx": 0.0, "syy": 0.0}
+    
+    @staticmethod
+    def _segment_duration(segment):
+        return segment["end"] - segment["start"]
+    
+    def _pooled(self):
+        """(count, mean x, mean y, sample std) of the accepted segments"""
+        n = sum(seg["n"] for seg in self.segments)
+        if not n:
+            return 0, 0.0, 0.0, 0.0
+        mean_x = sum(seg["sx"] for seg in self.segments) / n
+        mean_y = sum(seg["sy"] for seg in self.segments) / n
+        variance = (sum(seg["sxx"] + seg["syy"] for seg in self.segments) / n
+                    - mean_x ** 2 - mean_y ** 2)
+        return n, mean_x, mean_y, math.sqrt(max(variance, 0.0))
+    
+    def _is_consistent(self, segment):
+        """Segment mean agrees with the accepted segments (always true for the first one)"""
+        n, mean_x, mean_y, spread = self._pooled()
+        if not n or not segment["n"]:
+            return True
+        distance = math.hypot(segment["sx"] / segment["n"] - mean_x, segment["sy"] / segment["n"] - mean_y)
+        return distance <= max(SEGMENT_MIN_TOLERANCE, SEGMENT_CONSISTENCY_SIGMA * spread)
+    
+    def _rebuild_data(self):
+        self.airscan_data["x"].clear()
+        self.airscan_data["y"].clear()
+        for seg in self.segments + ([self.segment] if self.segment else []):
+            self.airscan_data["x"].extend(seg["x"])
+            self.airscan_data["y"].extend(seg["y"])
+    
+    def _accepted_duration(self):
+        return sum(self._segment_duration(seg) for seg in self.segments)
+    
+    def _discard_accepted(self):
+        print(f"[CALIBRAÇÃO] {self.name}: trechos anteriores inconsistentes descartados "
+              f"({self._accepted_duration():.1f}s)")
+        self.discarded_segments += len(self.segments)
+        self.segments = []
+    
+    def _close_segment(self):
+        """Keep the current segment if consistent; otherwise the longer side wins"""
+        segment = self.segment
+        self.segment = None
+        if not segment or not segment["n"]:
+            return
+        if self._is_consistent(segment):
+            self.segments.append(segment)
+            return
+        if self._segment_duration(segment) > self._accepted_duration():
+            self._discard_accepted()
+            self.segments = [segment]
+        else:
+            print(f"[CALIBRAÇÃO] {self.name}: trecho inconsistente descartado "
+                  f"({self._segment_duration(segment):.1f}s)")
+            self.discarded_segments += 1
+        self._rebuild_data()
+    
+    def captured_duration(self):
+        """Accumulated valid dwell time: accepted segments plus the current one when consistent"""
+        total = self._accepted_duration()
+        if self.segment and self._is_consistent(self.segment):
+            total += self._segment_duration(self.segment)
+        return total
+    
+    def add_data(self, x, y, timestamp=None):
+        """Add new coordinate data (timestamp = momento de recepção do pacote)"""
+        if not self.is_capturing:
+            return False
+            
+        current_time = timestamp if timestamp is not None else self.clock.now()
+        
+        # Check for data interruption
+        if self.last_data_time is not None and (current_time - self.last_data_time) > SEGMENT_RESET_GAP:
+            print(f"[CALIBRAÇÃO] Sem dados por {current_time - self.last_data_time:.1f}s! "
+                  f"Reiniciando captura para {self.name}")
+            self.reset_capture()
+            return False
+        if self.last_data_time is not None and (current_time - self.last_data_time) > self.data_interruption_threshold:
+            # Falha curta: o tempo já acumulado é mantido, um novo trecho começa aqui
+            self._close_segment()
+            self.segment = self._new_segment(current_time)
+        elif self.segment is None:
+            self.segment = self._new_segment(current_time)
+        
+        # Add data
+        segment = self.segment
+        segment["x"].append(x)
+        segment["y"].append(y)
+        segment["n"] += 1
+        segment["sx"] += x
+        segment["sy"] += y
+        segment["sxx"] += x * x
+        segment["syy"] += y * y
+        segment["end"] = current_time
+        self.airscan_data["x"].append(x)
+        self.airscan_data["y"].append(y)
+        self.last_data_time = current_time
+        
+        # Trecho atual inconsistente e mais longo que os aceitos: os anteriores é que estavam errados
+        if (self.segments and self._segment_duration(segment) > self._accepted_duration()
+                and not self._is_consistent(segment)):
+            self._discard_accepted()
+            self._rebuild_data()
+        
+        # Check if we have enough continuous data
+        if self.capture_complete():
+            print(f"[CALIBRAÇÃO] Captura completa para {self.name}!")
+            return True
+            
+        return True
+    
+    def check_interruption(self, timestamp=None):
+        """Reset the capture after a long interruption (short gaps only split it into segments)"""
+        if not self.is_capturing or self.last_data_time is None:
+            return False
+            
+        current_time = timestamp if timestamp is not None else self.clock.now()
+        if (current_time - self.last_data_time) > SEGMENT_RESET_GAP:
+            print(f"[CALIBRAÇÃO] Interrupção detectada! Reiniciando captura para {self.name}")
+            self.reset_capture()
+            return True
+        return False
+    
+    def get_average(self):
+        """Calculate average position from captured data"""
+        if not self.airscan_data["x"] or not self.airscan_data["y"]:
+            return None
+        
+        avg_x = sum(self.airscan_data["x"]) / len(self.airscan_data["x"])
+        avg_y = sum(self.airscan_data["y"]) / len(self.airscan_data["y"])
+            
+        return {
+            "x": float(avg_x),
+            "y": float(avg_y)
+        }
+    
+    def get_statistics(self):
+        """Sample count, variances and x/y covariance of the captured data (AirScan units)"""
+        xs = self.airscan_data["x"]
+        ys = self.airscan_data["y"]
+        count = min(len(xs), len(ys))
+        if count == 0:
+            return None
+        mean_x = sum(xs) / count
+        mean_y = sum(ys) / count
+        if count < 2:
+            var_x = var_y = cov_xy = 0.0
+        else:
+            var_x = sum((x - mean_x) ** 2 for x in xs) / (count - 1)
+            var_y = sum((y - mean_y) ** 2 for y in ys) / (count - 1)
+            cov_xy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / (count - 1)
+        return {
+            "count": count,
+            "var_x": float(var_x),
+            "var_y": float(var_y),
+            "cov_xy": float(cov_xy)
+        }
+    
+    def capture_complete(self):
+        """Check if we have enough valid data (5 seconds worth, possibly across segments)"""
+        if not self.is_capturing or self.start_time is None or self.last_data_time is None:
+            return False
+        
+        if self.captured_duration() < self.capture_duration:
+            return False
+        # Só as amostras dos trechos consistentes entram na média
+        self._close_segment()
+        return True
+    
+    def reset_capture(self):
+        """Reset capture state"""
+        self.is_capturing = False
+        self.is_collecting = False
+        self.is_ready = True
+        self.start_time = None
+        self.last_data_time = None
+        self.airscan_data["x"].clear()
+        self.airscan_data["y"].clear()
+        self.segments = []
+        self.segment = None
+        print(f"[CALIBRAÇÃO] Captura resetada para {self.name} - pronto para receber dados")
+    
+    def force_ready(self):
+        """Force point to ready state"""
+        self.is_capturing = False
+        self.is_collecting = False
+        self.is_ready = True
+        self.start_time = None
+        self.last_data_time = None
+        self.segments = []
+        self.segment = None
+    
+    def get_status(self):
+        """Get current status for visual feedback"""
+        if self.is_collecting:
+            return "collecting"  # Red
+        elif self.is_ready:
+            return "ready"  # Green
+        else:
+            return "waiting"  # Yellow
+
+
+def generate_points(level, area):
+    """Calibration points of a level inside area ({"x1", "y1", "x2", "y2"}); [] for an unknown level"""
+    if level == "basic":
+        return _basic_points(area)
+    elif level == "advanced":
+        return _advanced_points(area)
+    elif level == "professional":
+        return _professional_points(area)
+    elif level == "adaptive":
+        # Só os cantos; os demais pontos são escolhidos durante a calibração (AirScan_Adaptive)
+        return _basic_points(area)[:4]
+    return []
+
+
+def _basic_points(area):
+    """5 basic points (corners + center)"""
+    x1, y1, x2, y2 = area["x1"], area["y1"], area["x2"], area["y2"]
+    cx = (x1 + x2) // 2
+    cy = (y1 + y2) // 2
+    
+    return [
+        CalibrationPoint(x1, y1, "TOP_LEFT"),
+        CalibrationPoint(x2 - 1, y1, "TOP_RIGHT"),
+        CalibrationPoint(x2 - 1, y2 - 1, "BOTTOM_RIGHT"),
+        CalibrationPoint(x1, y2 - 1, "BOTTOM_LEFT"),
+        CalibrationPoint(cx, cy, "CENTER")
+    ]
+
+
+def _advanced_points(area):
+    """9 advanced points (corners + edges + center)"""
+    x1, y1, x2, y2 = area["x1"], area["y1"], area["x2"], area["y2"]
+    cx = (x1 + x2) // 2
+    cy = (y1 + y2) // 2
+    
+    return [
+        # Corners
+        CalibrationPoint(x1, y1, "TOP_LEFT"),
+        CalibrationPoint(x2 - 1, y1, "TOP_RIGHT"),
+        CalibrationPoint(x2 - 1, y2 - 1, "BOTTOM_RIGHT"),
+        CalibrationPoint(x1, y2 - 1, "BOTTOM_LEFT"),
+        # Edges
+        CalibrationPoint(cx, y1, "TOP_CENTER"),
+        CalibrationPoint(x2 - 1, cy, "RIGHT_CENTER"),
+        CalibrationPoint(cx, y2 - 1, "BOTTOM_CENTER"),
+        CalibrationPoint(x1, cy, "LEFT_CENTER"),
+        # Center
+        CalibrationPoint(cx, cy, "CENTER")
+    ]
+
+
+def _professional_points(area):
+    """13 professional points (corners + edges + quarters + center)"""
+    x1, y1, x2, y2 = area["x1"], area["y1"], area["x2"], area["y2"]
+    width = x2 - x1
+    height = y2 - y1
+    cx = x1 + width // 2
+    cy = y1 + height // 2
+    q1x = x1 + width // 4
+    q1y = y1 + height // 4
+    q3x = x1 + 3 * width // 4
+    q3y = y1 + 3 * height // 4
+    
+    return [
+        # Corners
+        CalibrationPoint(x1, y1, "TOP_LEFT"),
+        CalibrationPoint(x2 - 1, y1, "TOP_RIGHT"),
+        CalibrationPoint(x2 - 1, y2 - 1, "BOTTOM_RIGHT"),
+        CalibrationPoint(x1, y2 - 1, "BOTTOM_LEFT"),
+        # Edges
+        CalibrationPoint(cx, y1, "TOP_CENTER"),
+        CalibrationPoint(x2 - 1, cy, "RIGHT_CENTER"),
+        CalibrationPoint(cx, y2 - 1, "BOTTOM_CENTER"),
+        CalibrationPoint(x1, cy, "LEFT_CENTER"),
+        # Quarters
+        CalibrationPoint(q1x, q1y, "TOP_LEFT_QUARTER"),
+        CalibrationPoint(q3x, q1y, "TOP_RIGHT_QUARTER"),
+        CalibrationPoint(q3x, q3y, "BOTTOM_RIGHT_QUARTER"),
+        CalibrationPoint(q1x, q3y, "BOTTOM_LEFT_QUARTER"),
+        # Center
+        CalibrationPoint(cx, cy, "CENTER")
+    ]
@@ -0,0 +1,123 @@
+"""
+Relógio injetável do AirScan.
+
+Todo o pipeline (throttle, watchdog, estabilização, duração de captura e
+pausas da calibração) lê o tempo de um objeto relógio em vez de chamar
+time.time(). Em produção é o MonotonicClock (time.perf_counter_ns: imune a
+ajustes de NTP); em simulação/replay é o VirtualClock, avançado pelo próprio
+driver, de modo que uma sessão gravada roda em segundos.
+
+Os timestamps são segundos (float) na base do relógio, não epoch: servem
+para medir intervalos, não para exibir data/hora.
+"""
+
+import threading
+import time
+
+
+class MonotonicClock:
+    """Production clock: time.perf_counter_ns in seconds"""
+
+    virtual = False
+
+    def now(self):
+        return time.perf_counter_ns() / 1e9
+
+    def now_ns(self):
+        return time.perf_counter_ns()
+
+
+class VirtualClock:
+    """Simulation clock that only moves when the driver advances it"""
+
+    virtual = True
+
+    def __init__(self, start=0.0):
+        self.current = float(start)
+
+    def now(self):
+        return self.current
+
+    def now_ns(self):
+        return int(self.current * 1e9)
+
+    def set(self, t):
+        # Nunca volta no tempo (amostras reordenadas na gravação)
+        if t > self.current:
+            self.current = float(t)
+
+    def advance(self, dt):
+        self.current += dt
+
+
+CLOCK = MonotonicClock()
+
+
+class DeadlineWatchdog:
+    """Calls on_timeout() once no feed() arrived for `timeout` seconds
+
+    feed() só atualiza o prazo (nenhuma thread ou Timer por amostra). Com
+    relógio real, uma única thread dorme até o prazo; com relógio virtual,
+    o driver chama check(now) depois de avançar o tempo.
+    """
+
+    def __init__(self, timeout, on_timeout, clock=CLOCK):
+        self.timeout = timeout
+        self.on_timeout = on_timeout
+        self.clock = clock
+        self.deadline = None
+        self.thread = None
+        self._wake = threading.Event()
+        self._stopped = False
+
+    def feed(self, now):
+        was_idle = self.deadline is None
+        self.deadline = now + self.timeout
+        if was_idle and self.thread is not None:
+            self._wake.set()
+
+    def cancel(self):
+        self.deadline = None
+
+    def check(self, now):
+        """Fire if the deadline has passed; returns True when it fired"""
+        deadline = self.deadline
+        if deadline is None or now < deadline:
+            return False
+        # Um feed() concorrente pode ter movido o prazo: só dispara se ainda é o mesmo
+        if self.deadline is not deadline:
+            return False
+        self.deadline = None
+        self.on_timeout()
+        return True
+
+    def start(self):
+        """Start the background thread (real clocks only)"""
+        if self.thread is None:
+            self._stopped = False
+            self.thread = threading.Thread(target=self._run, name="airscan-watchdog", daemon=True)
+            self.thread.start()
+        return self.thread
+
+    def stop(self):
+        self._stopped = True
+        self.deadline = None
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped:
+            deadline = self.deadline
+            if deadline is None:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            remaining = deadline - self.clock.now()
+            if remaining > 0:
+                # Espera interrompível: stop() acorda a thread sem esperar o prazo
+                self._wake.wait(remaining)
+                self._wake.clear()
+                continue
+            try:
+                self.check(self.clock.now())
+            except Exception as e:
+                print(f"[WARNING] Erro no watchdog: {e}")
@@ -0,0 +1,321 @@
+"""
+Configuração compartilhada do AirScan (controle, calibração e ferramentas).
+
+Ordem de precedência (a última vence):
+    padrões do SCHEMA < arquivo (AirScan_Config.json ou .toml) < variáveis
+    de ambiente AIRSCAN_<CHAVE> < linha de comando (--set chave=valor)
+
+Tudo é validado antes de ser usado; um valor inválido aborta a partida com
+a lista completa de erros. Parâmetros marcados como "hot" (taxa, suavização,
+delay de soltura, nível de log) são reaplicados em tempo de execução quando o
+arquivo muda; os demais pedem reinício.
+
+Exemplos:
+    python AirScan_Control.py --mode Arena --set mouse_update_rate=120
+    python AirScan_Control.py --headless      # saída nula, sem pyautogui
+    AIRSCAN_SMOOTHING_SAMPLES=4 python AirScan_Control.py
+    AIRSCAN_CONFIG=sala2.toml python AirScan_Control.py
+"""
+
+import argparse
+import copy
+import json
+import os
+from collections import namedtuple
+
+from AirScan_Gestures import validate_actions
+from AirScan_Storage import FileWatcher
+
+CONFIG_FILE = "AirScan_Config.json"
+ENV_PREFIX = "AIRSCAN_"
+
+# type: tipo(s) aceitos; nullable: aceita None; hot: pode mudar sem reiniciar
+Option = namedtuple("Option", ["type", "default", "minimum", "maximum", "choices", "nullable", "hot"])
+
+
+def option(type_, default, minimum=None, maximum=None, choices=None, nullable=False, hot=False):
+    return Option(type_, default, minimum, maximum, choices, nullable, hot)
+
+
+NUMBER = (int, float)
+
+SCHEMA = {
+    "mode": option(str, "Cave"),  # chave de "modes"
+    "port": option(int, 8030, 1, 65535),
+    "mouse_update_rate": option(NUMBER, 60, 1, 1000, hot=True),     # Hz
+    "smoothing_samples": option(int, 2, 1, 50, hot=True),           # média móvel
+    "mouse_release_delay": option(NUMBER, 0.1, 0.01, 5.0, hot=True),  # segundos
+    "auto_tune": option(str, "off", choices=("off", "recommend", "apply")),  # AirScan_AutoTune
+    "auto_tune_interval": option(NUMBER, 30, 1, 3600),           # segundos entre avaliações
+    "auto_tune_release_factor": option(NUMBER, 3.0, 1.0, 20.0),  # delay de soltura = p99(intervalo) x fator
+    "auto_tune_target_jitter": option(NUMBER, 1.0, 0.1, 50.0),   # pixels de jitter residual com o dedo parado
+    "gestures": option(bool, False),                  # AirScan_Gestures (swipe, long press, scroll, pinch)
+    "gesture_blobs": option(int, 2, 2, 10),           # blobs rastreados: blob_id do modo e os seguintes
+    "gesture_actions": option(dict, {
+        "swipe_left": ["alt", "left"],
+        "swipe_right": ["alt", "right"],
+        "swipe_up": None,
+        "swipe_down": None,
+        "long_press": "right_click",
+        "pinch_in": ["ctrl", "-"],
+        "pinch_out": ["ctrl", "+"],
+    }),
+    "output_backend": option(str, "pyautogui", choices=("pyautogui", "null")),
+    "session_record_path": option(str, None, nullable=True),
+    "log_level": option(str, "INFO", choices=("DEBUG", "INFO", "WARNING", "ERROR"), hot=True),
+    "log_jsonl_path": option(str, None, nullable=True),
+    "metrics_port": option(int, 9108, 0, 65535, nullable=True),
+    "metrics_unix_socket": option(str, None, nullable=True),
+    "sensors": option(list, []),
+    "sensor_workers_per_port": option(int, 1, 1, 64),
+    "overlap_dedupe_radius": option(NUMBER, 40, 1, 2000),
+    "overlap_dedupe_window": option(NUMBER, 0.1, 0.0, 5.0),
+    "calibration_order": option(str, "sequential", choices=("sequential", "free")),  # free: todos os alvos de uma vez
+    "display_poll_interval": option(NUMBER, 2.0, 0.1, 60.0, nullable=True),  # segundos; null desliga o observador de tela
+    "outputs": option(list, []),  # [{"id", "x", "y", "width", "height"}]: saídas do desktop estendido
+    "modes": option(dict, {
+        "Arena": {"blob_id": 5, "width": 1920, "height": 1080},
+        "Cave": {"blob_id": 6, "width": 1920, "height": 1080},
+    }),
+}
+
+HOT_RELOAD_KEYS = frozenset(key for key, spec in SCHEMA.items() if spec.hot)
+
+_active = None
+_active_loader = None
+
+
+class ConfigError(ValueError):
+    """Invalid configuration; .errors lists every problem found"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("; ".join(self.errors))
+
+
+def defaults():
+    return {key: copy.deepcopy(spec.default) for key, spec in SCHEMA.items()}
+
+
+def parse_value(text, key=None):
+    """Value from env/CLI text: JSON when it parses (numbers, null, lists), else the raw string
+
+    Chaves de texto ficam como texto ("null" é um backend válido); nas
+    anuláveis, "" / "null" / "none" viram None.
+    """
+    spec = SCHEMA.get(key)
+    if spec is not None and spec.type is str:
+        if spec.nullable and text.strip().lower() in ("", "null", "none"):
+            return None
+        return text
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _check_type(value, spec):
+    if value is None:
+        return spec.nullable
+    if isinstance(value, bool):
+        return spec.type is bool
+    return isinstance(value, spec.type)
+
+
+def validate(config):
+    """Raise ConfigError listing every invalid key; returns the config otherwise"""
+    errors = []
+    for key in config:
+        if key not in SCHEMA:
+            errors.append(f"chave desconhecida: '{key}'")
+
+    for key, spec in SCHEMA.items():
+        value = config.get(key)
+        if not _check_type(value, spec):
+            errors.append(f"'{key}' tem tipo inválido: {value!r}")
+            continue
+        if value is None:
+            continue
+        if spec.minimum is not None and value < spec.minimum:
+            errors.append(f"'{key}' deve ser >= {spec.minimum} (recebido {value})")
+        if spec.maximum is not None and value > spec.maximum:
+            errors.append(f"'{key}' deve ser <= {spec.maximum} (recebido {value})")
+        if spec.choices and value not in spec.choices:
+            errors.append(f"'{key}' deve ser um de {', '.join(spec.choices)} (recebido {value!r})")
+
+    modes = config.get("modes")
+    if isinstance(modes, dict):
+        for name, mode in modes.items():
+            if not isinstance(mode, dict):
+                errors.append(f"modes.{name} deve ser um objeto")
+                continue
+            for field in ("blob_id", "width", "height"):
+                if not isinstance(mode.get(field), int) or isinstance(mode.get(field), bool) or mode[field] < 0:
+                    errors.append(f"modes.{name}.{field} deve ser um inteiro >= 0")
+        if isinstance(config.get("mode"), str) and config["mode"] not in modes:
+            errors.append(f"Modo '{config['mode']}' inválido! Use {' ou '.join(repr(m) for m in modes)}")
+
+    if isinstance(config.get("gesture_actions"), dict):
+        errors.extend(validate_actions(config["gesture_actions"]))
+
+    for index, sensor in enumerate(config.get("sensors") or []):
+        if not isinstance(sensor, dict):
+            errors.append(f"sensors[{index}] deve ser um objeto")
+        elif "port" in sensor and not isinstance(sensor["port"], int):
+            errors.append(f"sensors[{index}].port deve ser inteiro")
+
+    output_ids = set()
+    for index, output in enumerate(config.get("outputs") or []):
+        if not isinstance(output, dict):
+            errors.append(f"outputs[{index}] deve ser um objeto")
+            continue
+        if not isinstance(output.get("id"), str) or not output["id"]:
+            errors.append(f"outputs[{index}].id deve ser um texto")
+        elif output["id"] in output_ids:
+            errors.append(f"outputs[{index}].id '{output['id']}' repetido")
+        else:
+            output_ids.add(output["id"])
+        for field, minimum in (("x", 0), ("y", 0), ("width", 1), ("height", 1)):
+            value = output.get(field)
+            if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+                errors.append(f"outputs[{index}].{field} deve ser um inteiro >= {minimum}")
+
+    if errors:
+        raise ConfigError(errors)
+    return config
+
+
+def read_config_file(path):
+    """Read a JSON or TOML config file; missing file -> {}"""
+    if not os.path.exists(path):
+        return {}
+    if path.endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:
+            raise ConfigError([f"{path}: TOML requer Python 3.11+ (use JSON)"])
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path, "r") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ConfigError([f"{path}: o arquivo deve conter um objeto"])
+    return data
+
+
+def env_overrides(environ=None):
+    """AIRSCAN_<KEY> variables for every schema key (e.g. AIRSCAN_MOUSE_UPDATE_RATE=120)"""
+    environ = os.environ if environ is None else environ
+    overrides = {}
+    for key in SCHEMA:
+        name = ENV_PREFIX + key.upper()
+        if name in environ:
+            overrides[key] = parse_value(environ[name], key)
+    return overrides
+
+
+def cli_overrides(argv):
+    """Parse --config / --mode / --port / --headless / --set key=value, ignoring unrelated arguments"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--config", default=None)
+    parser.add_argument("--mode", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--set", action="append", default=[], metavar="CHAVE=VALOR")
+    parser.add_argument("--headless", action="store_true")
+    args, _ = parser.parse_known_args(argv)
+
+    overrides = {}
+    if args.mode is not None:
+        overrides["mode"] = args.mode
+    if args.port is not None:
+        overrides["port"] = args.port
+    if args.headless:
+        # Sem tela: saída nula, pyautogui nunca é importado
+        overrides["output_backend"] = "null"
+    for item in args.set:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ConfigError([f"--set espera chave=valor (recebido {item!r})"])
+        overrides[key.strip()] = parse_value(value, key.strip())
+    return args.config, overrides
+
+
+class ConfigLoader:
+    """Builds the effective config; remembers the overrides so reloads re-apply them"""
+
+    def __init__(self, path=None, argv=None, environ=None):
+        cli_path, self.cli = cli_overrides(argv or [])
+        environ = os.environ if environ is None else environ
+        if path is None:
+            path = cli_path or environ.get(ENV_PREFIX + "CONFIG") or CONFIG_FILE
+        self.path = path
+        self.env = env_overrides(environ)
+
+    def load(self):
+        config = defaults()
+        try:
+            config.update(read_config_file(self.path))
+        except (OSError, ValueError) as e:
+            if isinstance(e, ConfigError):
+                raise
+            raise ConfigError([f"{self.path}: {e}"])
+        config.update(self.env)
+        config.update(self.cli)
+        return validate(config)
+
+
+def load_config(path=None, argv=None, environ=None):
+    """Load, validate and remember the process-wide configuration"""
+    global _active, _active_loader
+    loader = ConfigLoader(path, argv, environ)
+    _active = loader.load()
+    _active_loader = loader
+    return _active
+
+
+def active_config():
+    """Configuration already loaded in this process (e.g. by the control), else load it"""
+    return _active if _active is not None else load_config()
+
+
+class ConfigWatcher:
+    """Re-reads the config file on change and hands hot-reloadable changes to on_change(dict)
+
+    Usa o mesmo caminho e as mesmas sobreposições (env/CLI) da carga inicial.
+    """
+
+    def __init__(self, on_change, loader=None):
+        self.loader = loader or _active_loader or ConfigLoader()
+        self.current = dict(active_config())
+        self.on_change = on_change
+        self.watcher = None
+
+    def reload(self):
+        try:
+            new = self.loader.load()
+        except ConfigError as e:
+            print(f"[WARNING] Configuração não recarregada ({self.loader.path}):")
+            for error in e.errors:
+                print(f"[WARNING]   • {error}")
+            return None
+
+        changed = {key: new[key] for key in SCHEMA if new[key] != self.current.get(key)}
+        if not changed:
+            return {}
+        hot = {key: value for key, value in changed.items() if key in HOT_RELOAD_KEYS}
+        cold = sorted(set(changed) - HOT_RELOAD_KEYS)
+        if cold:
+            print(f"[CONFIG] Alterações que exigem reinício (ignoradas): {', '.join(cold)}")
+        if hot:
+            self.current.update(hot)
+            self.on_change(hot)
+        return hot
+
+    def start(self, poll_interval=0.5):
+        self.watcher = FileWatcher(self.loader.path, self.reload, poll_interval)
+        return self.watcher.start()
+
+    def stop(self):
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
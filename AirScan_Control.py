@@ -1,53 +1,100 @@
-from pythonosc.dispatcher import Dispatcher
-from pythonosc import osc_server
-import pyautogui
 import json
-import subprocess
+import logging
 import sys
 import os
 import time
 import threading
+import queue
 from threading import Event
-from collections import deque
+from functools import partial
 import socket
 import signal
+from AirScan_Clock import CLOCK, DeadlineWatchdog
+from AirScan_Config import ConfigError, ConfigWatcher, load_config
+from AirScan_Log import setup_logging, get_logger
+from AirScan_Metrics import MetricsServer, counter, gauge, histogram
+from AirScan_Filters import MovingAverageFilter
+from AirScan_Gestures import GestureEngine
+from AirScan_AutoTune import AutoTuner, SensorStatsEstimator, load_tuning, transform_scale
+from AirScan_Output import create_output
+from AirScan_Replay import SessionRecorder
+from AirScan_Ingest import SampleTee, MultiSensorIngest, parse_sensor_sources
+from AirScan_Display import DisplayWatcher
+from AirScan_Mapping import compile_transform, rescale_calibration, sensor_calibration
+from AirScan_Storage import CalibrationStore, CALIBRATION_FILE
 
-# Disable PyAutoGUI failsafe
-pyautogui.FAILSAFE = False
-
-# Screen dimensions
-screen_width, screen_height = pyautogui.size()
 
 # ====================================
 # CONFIGURAÇÃO DO AIRSCAN
 # ====================================
-AIRSCAN_MODE = "Cave"  # Opções: "Arena" ou "Cave"
-AIRSCAN_PORT = 8030
+# Valores vêm de AirScan_Config.json (ou AIRSCAN_CONFIG), variáveis de
+# ambiente AIRSCAN_<CHAVE> e da linha de comando (--mode, --port, --set k=v).
+try:
+    CONFIG = load_config(argv=sys.argv[1:] if __name__ == "__main__" else None)
+except ConfigError as e:
+    print("[ERROR] Configuração inválida:")
+    for error in e.errors:
+        print(f"[ERROR]   • {error}")
+    sys.exit(1)
+
+AIRSCAN_MODE = CONFIG["mode"]  # Opções: chaves de "modes" ("Arena" ou "Cave")
+AIRSCAN_PORT = CONFIG["port"]
+
+# Configurações de Performance (recarregadas a quente quando o arquivo muda)
+MOUSE_UPDATE_RATE = CONFIG["mouse_update_rate"]      # Hz - Taxa de atualização do mouse (60Hz recomendado)
+SMOOTHING_SAMPLES = CONFIG["smoothing_samples"]      # Número de amostras para média móvel (3-10 recomendado)
+MOUSE_RELEASE_DELAY = CONFIG["mouse_release_delay"]  # segundos - Delay antes de soltar o mouse (grace period)
+OUTPUT_BACKEND = CONFIG["output_backend"]            # "pyautogui" ou "null" (benchmarks / simulação)
+SESSION_RECORD_PATH = CONFIG["session_record_path"]  # ex.: "sessao.jsonl" grava as amostras para replay (AirScan_Replay.py)
+DISPLAY_POLL_INTERVAL = CONFIG["display_poll_interval"]  # segundos - troca de resolução (RandR no X11); None desliga
+
+# Ajuste automático de suavização e delay de soltura (AirScan_AutoTune.py)
+AUTO_TUNE = CONFIG["auto_tune"]                                # "off", "recommend" (só registra) ou "apply"
+AUTO_TUNE_INTERVAL = CONFIG["auto_tune_interval"]              # segundos entre avaliações
+AUTO_TUNE_RELEASE_FACTOR = CONFIG["auto_tune_release_factor"]  # delay = p99 do intervalo entre amostras x fator
+AUTO_TUNE_TARGET_JITTER = CONFIG["auto_tune_target_jitter"]    # pixels de jitter aceitos com o dedo parado
 
-# Configurações de Performance
-MOUSE_UPDATE_RATE = 60  # Hz - Taxa de atualização do mouse (60Hz recomendado)
-SMOOTHING_SAMPLES = 2   # Número de amostras para média móvel (3-10 recomendado)
-MOUSE_RELEASE_DELAY = 0.1  # segundos - Delay antes de soltar o mouse (grace period)
+# Gestos com vários blobs (AirScan_Gestures.py): swipe, long press, scroll e pinch com dois dedos
+GESTURES_ENABLED = CONFIG["gestures"]
+GESTURE_BLOBS = CONFIG["gesture_blobs"]      # blobs BLOB_ID .. BLOB_ID + GESTURE_BLOBS - 1
+GESTURE_ACTIONS = CONFIG["gesture_actions"]  # gesto -> lista de teclas (atalho), "right_click", ... ou null
+
+# Logs (fila + escrita em thread de fundo; o caminho quente nunca escreve no console)
+LOG_LEVEL = CONFIG["log_level"]
+LOG_JSONL_PATH = CONFIG["log_jsonl_path"]  # ex.: "airscan_log.jsonl" para gravar logs estruturados
+
+# Métricas (formato Prometheus, apenas local). None desabilita.
+METRICS_PORT = CONFIG["metrics_port"]                # http://127.0.0.1:9108/metrics
+METRICS_UNIX_SOCKET = CONFIG["metrics_unix_socket"]  # ex.: "/tmp/airscan_metrics.sock" (substitui o HTTP)
 
 # Configurações padrão por modo
-MODE_CONFIG = {
-    "Arena": {
-        "blob_id": 5,
-        "width": 1920,
-        "height": 1080
-    },
-    "Cave": {
-        "blob_id": 6,
-        "width": 1920,
-        "height": 1080
-    }
-}
+MODE_CONFIG = CONFIG["modes"]
 
-# Carrega configuração do modo selecionado
-if AIRSCAN_MODE not in MODE_CONFIG:
-    print(f"[ERROR] Modo '{AIRSCAN_MODE}' inválido! Use 'Arena' ou 'Cave'")
-    sys.exit(1)
+log_coords = get_logger("airscan")
+log_touch = get_logger("touch")
+log_mapping = get_logger("mapping")
+log_output = get_logger("output")
+
+# Métricas do caminho quente (filhos com labels resolvidos uma única vez)
+_osc_messages = counter("airscan_osc_messages_total", "Mensagens OSC de coordenada recebidas", ("axis",))
+metric_osc_x = _osc_messages.labels("x")
+metric_osc_y = _osc_messages.labels("y")
+metric_samples = counter("airscan_samples_total", "Amostras X/Y completas publicadas no tee")
+metric_sample_interval = histogram("airscan_sample_interval_seconds", "Intervalo entre amostras X/Y consecutivas")
+metric_last_sample = gauge("airscan_last_sample_timestamp_seconds", "Horário (epoch) da última amostra recebida")
+metric_samples_dropped = counter("airscan_samples_dropped_total", "Amostras que não moveram o mouse", ("reason",))
+metric_dropped_throttle = metric_samples_dropped.labels("throttle")
+metric_dropped_calibration = metric_samples_dropped.labels("calibration")
+metric_output_moves = counter("airscan_output_moves_total", "Movimentos do mouse enviados ao sistema")
+metric_output_errors = counter("airscan_output_errors_total", "Falhas ao mover o mouse")
+metric_watchdog_timeouts = counter("airscan_watchdog_timeouts_total", "Disparos do watchdog (sem dados por MOUSE_RELEASE_DELAY)")
+metric_watchdog_releases = counter("airscan_watchdog_releases_total", "MouseUp emitidos pelo watchdog")
+metric_mapping_fallback = counter("airscan_mapping_fallback_total", "Amostras mapeadas pelo mapeamento padrão (sem calibração válida)")
+metric_mapping_errors = counter("airscan_mapping_errors_total", "Erros ao aplicar a transformação de calibração")
+metric_calibration_points = gauge("airscan_calibration_points", "Pontos da calibração ativa")
+metric_calibration_fallback = gauge("airscan_calibration_fallback", "1 se a calibração ativa usa o mapeamento padrão")
 
+# Carrega configuração do modo selecionado (validado em AirScan_Config)
 CURRENT_CONFIG = MODE_CONFIG[AIRSCAN_MODE]
 BLOB_ID = CURRENT_CONFIG["blob_id"]
 DEFAULT_AIRSCAN_WIDTH = CURRENT_CONFIG["width"]
@@ -55,38 +102,98 @@ DEFAULT_AIRSCAN_HEIGHT = CURRENT_CONFIG["height"]
 
 print(f"[INFO] Modo selecionado: {AIRSCAN_MODE} (Blob {BLOB_ID})")
 
+# ====================================
+# MÚLTIPLOS SENSORES (salas Cave grandes)
+# ====================================
+# Vazio = sensor único em AIRSCAN_PORT / BLOB_ID. Cada sensor é calibrado
+# separadamente (Shift+1..9) e mapeado para o mesmo espaço de tela.
+# Ex.: [{"id": "esquerda", "port": 8030}, {"id": "direita", "port": 8031}]
+#      Sensores na mesma porta são separados pelo IP de origem ("address").
+SENSORS = CONFIG["sensors"]
+SENSOR_WORKERS_PER_PORT = CONFIG["sensor_workers_per_port"]  # >1 usa SO_REUSEPORT para distribuir sensores entre threads
+OVERLAP_DEDUPE_RADIUS = CONFIG["overlap_dedupe_radius"]      # pixels - blobs mais próximos que isso na sobreposição são o mesmo toque
+OVERLAP_DEDUPE_WINDOW = CONFIG["overlap_dedupe_window"]      # segundos
+
 class AirScanControl:
-    def __init__(self):
+    def __init__(self, clock=None, output=None):
+        # Relógio injetável: monotônico em produção, virtual em simulação/replay
+        self.clock = clock or CLOCK
         self.server = None
         self.running = True
         self.shutdown_event = Event()
         self.norm_x = None
         self.norm_y = None
-        self.calibration_data = self.load_calibration()
-        self.calibration_area = self.calibration_data.get("calibration_area", None)
-        self.calibration_process = None
+        self.last_sample_time = None
+        self.metrics_server = None
+        self.config_watcher = None
+        self.display_watcher = None
+        
+        # Backend de saída (pyautogui por padrão) e geometria da tela:
+        # resolvidos aqui, não no import (modo headless não carrega o pyautogui)
+        self.output = output or create_output(OUTPUT_BACKEND)
+        self.headless = self.output.headless
+        self.screen_width, self.screen_height = self.output.screen_size()
+        
+        # Calibração ativa: transformação compilada, trocada por referência
+        # quando o arquivo muda (recarga a quente, sem reiniciar a ingestão)
+        self.calibration_store = CalibrationStore(self.compile_calibration, prepare=self.fit_calibration_to_screen)
+        self.area_info = ""
+        self.calibration_store.install(self.load_calibration())
+        self.update_area_info()
+        self.update_calibration_metrics(self.calibration_store.snapshot)
+        self.calibration_store.on_reload = self.on_calibration_reloaded
+        
+        # Estágio tee: a saída do mouse é o consumidor primário; a calibração
+        # em processo se inscreve como segundo consumidor do mesmo socket
+        self.tee = SampleTee()
+        self.gestures = None
+        if GESTURES_ENABLED:
+            # Inscrito antes da saída: o cursor já sabe se um gesto de dois dedos começou
+            self.gestures = GestureEngine(self.output, GESTURE_ACTIONS, MOUSE_RELEASE_DELAY,
+                                          self.get_calibrated_coordinates)
+            self.tee.subscribe(self.on_gesture_sample)
+        self.tee.subscribe(self.on_sample)
+        self.recorder = None
+        if SESSION_RECORD_PATH and not self.clock.virtual:
+            self.recorder = self.tee.subscribe(SessionRecorder(
+                SESSION_RECORD_PATH, {"mode": AIRSCAN_MODE, "blob_id": BLOB_ID}))
+            print(f"[INFO] Gravando sessão em {SESSION_RECORD_PATH}")
+        self.calibration_active = False
         self.calibration_complete = Event()
-        self.last_log_time = 0
-        self.log_interval = 0.5  # 500ms
-        self.last_warning_time = 0
-        self.warning_interval = 1.0  # 1 segundo
+        
+        # Tarefas que precisam da thread principal (ex.: janela Tk da calibração)
+        self.main_thread_tasks = queue.Queue()
+        
+        # Ingestão multi-sensor (apenas quando SENSORS tem mais de um sensor)
+        self.sensor_sources = parse_sensor_sources(SENSORS, AIRSCAN_PORT, BLOB_ID) if len(SENSORS) > 1 else []
+        self.ingest = None
+        # Logs não bloqueantes; limites de taxa por categoria (coordenadas 500ms, avisos 1s)
+        setup_logging(LOG_LEVEL, jsonl_path=LOG_JSONL_PATH)
         
         # Throttling configurável (padrão 60Hz = ~16.67ms)
-        self.last_update_time = 0
+        self.last_update_time = float("-inf")
         self.update_interval = 1.0 / MOUSE_UPDATE_RATE
         
-        # Suavização por média móvel configurável
+        # Suavização por média móvel configurável (soma corrente, custo constante)
         self.smoothing_window = SMOOTHING_SAMPLES
-        self.x_history = deque(maxlen=self.smoothing_window)
-        self.y_history = deque(maxlen=self.smoothing_window)
+        self.smoothing = MovingAverageFilter(self.smoothing_window)
         
         # Sistema de detecção de dados (touch screen)
         self.last_data_time = 0  # Última vez que recebeu dados X/Y
         self.data_timeout = MOUSE_RELEASE_DELAY  # 0.3s sem dados = mouseUp
         self.mouse_pressed = False
-        self.watchdog_timer = None  # Timer para detectar falta de dados
+        # Watchdog por prazo: cada amostra só move o prazo (sem Timer por amostra)
+        self.watchdog = DeadlineWatchdog(self.data_timeout, self.on_data_timeout, self.clock)
+        if not self.clock.virtual:
+            self.watchdog.start()
         self.initial_position_set = False  # Flag para evitar arrasto inicial
         
+        # Ajuste automático: estimador de cadência/jitter inscrito no tee
+        self.sensor_stats = None
+        self.auto_tuner = None
+        if AUTO_TUNE != "off" and not self.clock.virtual:
+            self.setup_auto_tune()
+        
         # Sistema de estabilização por raio
         self.stable_position = None  # Posição estável atual (x, y)
         self.stability_start_time = 0  # Quando começou a estabilização
@@ -95,6 +202,48 @@ class AirScanControl:
         # Setup signal handlers for graceful shutdown
         self.setup_signal_handlers()
     
+    def setup_auto_tune(self):
+        """Measure sensor cadence/jitter live and recommend (or apply) release delay and smoothing"""
+        self.sensor_stats = SensorStatsEstimator()
+        self.tee.subscribe(self.sensor_stats)
+        self.auto_tuner = AutoTuner(
+            self.sensor_stats,
+            self.apply_config,
+            apply=AUTO_TUNE == "apply",
+            interval=AUTO_TUNE_INTERVAL,
+            release_factor=AUTO_TUNE_RELEASE_FACTOR,
+            target_jitter=AUTO_TUNE_TARGET_JITTER,
+            update_rate=MOUSE_UPDATE_RATE
+        )
+        self.update_auto_tune_scale(self.calibration_store.snapshot)
+        if AUTO_TUNE == "apply":
+            # Parte com a última recomendação gravada em vez dos valores fixos
+            persisted = load_tuning(self.auto_tuner.path)
+            if persisted:
+                print(f"[AUTOTUNE] Usando recomendação gravada em {self.auto_tuner.path}")
+                self.auto_tuner.current.update(persisted)
+                self.apply_config(persisted)
+    
+    def apply_config(self, changes):
+        """Apply hot-reloadable settings without restarting the ingest (reference swaps only)"""
+        if "mouse_update_rate" in changes:
+            self.update_interval = 1.0 / changes["mouse_update_rate"]
+            if self.auto_tuner:
+                self.auto_tuner.update_rate = changes["mouse_update_rate"]
+        if "smoothing_samples" in changes:
+            # Novo filtro herda o histórico recente: sem salto na posição
+            self.smoothing_window = changes["smoothing_samples"]
+            self.smoothing = self.smoothing.resized(self.smoothing_window)
+        if "mouse_release_delay" in changes:
+            self.data_timeout = changes["mouse_release_delay"]
+            self.watchdog.timeout = self.data_timeout
+            if self.gestures:
+                self.gestures.tracker.timeout = self.data_timeout
+        if "log_level" in changes:
+            logging.getLogger("airscan").setLevel(changes["log_level"])
+        for key, value in changes.items():
+            print(f"[CONFIG] {key} = {value} (aplicado sem reiniciar)")
+    
     def setup_signal_handlers(self):
         """Setup signal handlers for graceful shutdown"""
         def signal_handler(signum, frame):
@@ -132,6 +281,7 @@ class AirScanControl:
     
     def kill_processes_using_port(self, port):
         """Kill processes using the specified port"""
+        import subprocess
         try:
             if os.name == 'nt':  # Windows
                 # Find processes using the port
@@ -161,11 +311,82 @@ class AirScanControl:
         except Exception as e:
             print(f"[WARNING] Erro ao finalizar processos na porta {port}: {e}")
     
+    @property
+    def calibration_data(self):
+        return self.calibration_store.data
+    
+    @property
+    def calibration_area(self):
+        return self.calibration_store.data.get("calibration_area", None)
+    
+    def fit_calibration_to_screen(self, data):
+        """Scale the calibration to the current screen size when it was made at another resolution"""
+        try:
+            return rescale_calibration(data, self.screen_width, self.screen_height)
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"[WARNING] Calibração não reescalada para {self.screen_width}x{self.screen_height}: {e}")
+            return data
+    
+    def on_display_change(self, size):
+        """New screen geometry: update the bounds and swap in a recompiled, rescaled calibration"""
+        self.screen_width, self.screen_height = size
+        # A recompilação chama on_calibration_reloaded (escala do ajuste automático incluída)
+        self.calibration_store.recompile()
+    
+    def compile_calibration(self, data):
+        """Compile calibration data into the screen transform used on the hot path"""
+        return compile_transform(data, self.screen_width, self.screen_height,
+                                 DEFAULT_AIRSCAN_WIDTH, DEFAULT_AIRSCAN_HEIGHT)
+    
+    def compile_sensor_calibration(self, data, sensor_id):
+        """Compile the transform for one sensor of a multi-sensor room"""
+        return self.compile_calibration(sensor_calibration(data, sensor_id))
+    
+    def update_area_info(self):
+        """Precompute the area suffix used by the coordinate log"""
+        area = self.calibration_area
+        self.area_info = f" [Área: {area['width']}x{area['height']}]" if area else ""
+    
+    def update_calibration_metrics(self, snapshot):
+        metric_calibration_points.set(len(snapshot.data.get("points") or {}))
+        metric_calibration_fallback.set(1 if snapshot.transform.is_fallback else 0)
+    
+    def update_auto_tune_scale(self, snapshot):
+        """Sensor units -> pixels gain of the active transform (jitter in pixels for the auto-tuner)"""
+        if not self.auto_tuner or self.sensor_sources:
+            # Multi-sensor: as amostras já chegam em pixels de tela (escala 1)
+            return
+        scale = transform_scale(snapshot.transform, DEFAULT_AIRSCAN_WIDTH, DEFAULT_AIRSCAN_HEIGHT)
+        # Transformação degenerada: ganho nominal tela / sensor
+        self.auto_tuner.scale = scale or self.screen_width / DEFAULT_AIRSCAN_WIDTH
+    
+    def on_calibration_reloaded(self, snapshot):
+        """Called by the store after a new calibration was swapped in"""
+        self.update_area_info()
+        self.update_calibration_metrics(snapshot)
+        self.update_auto_tune_scale(snapshot)
+        points = snapshot.data.get("points", {})
+        print(f"[CALIBRAÇÃO] Dados de calibração atualizados! ({len(points)} pontos)")
+        area = snapshot.data.get("calibration_area")
+        if area:
+            print(f"[CALIBRAÇÃO] Nova área de trabalho: {area['width']}x{area['height']} pixels")
+        if snapshot.transform.model:
+            print(f"[CALIBRAÇÃO] Modelo de mapeamento: {snapshot.transform.model}")
+        accuracy = snapshot.data.get("accuracy") or {}
+        loo = accuracy.get("loo") or accuracy.get("fit")
+        if loo:
+            print(f"[CALIBRAÇÃO] Precisão ({accuracy.get('model')}): RMS {loo['rms']}px | p95 {loo['p95']}px | "
+                  f"pior ponto {accuracy.get('worst_point')}")
+        if snapshot.transform.is_fallback:
+            print(f"[WARNING] {snapshot.transform.reason}. Usando mapeamento padrão.")
+        elif snapshot.transform.reason:
+            print(f"[WARNING] {snapshot.transform.reason}")
+    
     def load_calibration(self):
         """Load calibration data from file"""
         default_config = {
             "points": {},
-            "screen": {"width": screen_width, "height": screen_height},
+            "screen": {"width": self.screen_width, "height": self.screen_height},
             "airscan": {
                 "width": DEFAULT_AIRSCAN_WIDTH,
                 "height": DEFAULT_AIRSCAN_HEIGHT,
@@ -174,7 +395,7 @@ class AirScanControl:
         }
         
         try:
-            with open('AirScan_Calibration_Data.json', 'r') as f:
+            with open(CALIBRATION_FILE, 'r') as f:
                 data = json.load(f)
                 if "points" in data and data["points"]:
                     print(f"[INFO] Dados de calibração carregados: {len(data['points'])} pontos")
@@ -189,144 +410,132 @@ class AirScanControl:
         
         return default_config
     
-    def map_range(self, value, in_min, in_max, out_min, out_max):
-        """Map a value from one range to another"""
-        if in_max == in_min:
-            return out_min
-        return (value - in_min) * (out_max - out_min) / (in_max - in_min) + out_min
-    
     def get_calibrated_coordinates(self, x, y):
         """Convert AirScan coordinates to screen coordinates using calibration data"""
-        if not self.calibration_data.get("points"):
-            current_time = time.time()
-            if current_time - self.last_warning_time >= self.warning_interval:
-                print("[WARNING] Nenhum dado de calibração disponível. Usando mapeamento padrão.")
-                self.last_warning_time = current_time
-            return self.get_default_coordinates(x, y)
+        # Uma única leitura de referência: a troca pelo store é atômica
+        transform = self.calibration_store.transform
+        
+        if transform.is_fallback:
+            metric_mapping_fallback.inc()
+            log_mapping.warning("%s. Usando mapeamento padrão.", transform.reason)
         
         try:
-            x_values = [p["airscan"]["x"] for p in self.calibration_data["points"].values()]
-            y_values = [p["airscan"]["y"] for p in self.calibration_data["points"].values()]
-            
-            if not x_values or not y_values:
-                current_time = time.time()
-                if current_time - self.last_warning_time >= self.warning_interval:
-                    print("[WARNING] Dados de calibração vazios. Usando mapeamento padrão.")
-                    self.last_warning_time = current_time
-                return self.get_default_coordinates(x, y)
-            
-            min_x, max_x = min(x_values), max(x_values)
-            min_y, max_y = min(y_values), max(y_values)
-            
-            # Validate ranges
-            if min_x == max_x or min_y == max_y:
-                current_time = time.time()
-                if current_time - self.last_warning_time >= self.warning_interval:
-                    print("[WARNING] Dados de calibração inválidos (ranges iguais). Usando mapeamento padrão.")
-                    self.last_warning_time = current_time
-                return self.get_default_coordinates(x, y)
-            
-            # NOVA LÓGICA: Mapear AirScan para a área calibrada
-            if self.calibration_area:
-                # Mapear coordenadas do AirScan para a área calibrada
-                area = self.calibration_area
-                screen_x = self.map_range(x, min_x, max_x, area["x1"], area["x2"])
-                screen_y = self.map_range(y, min_y, max_y, area["y1"], area["y2"])
-                
-                # Clamp coordinates to calibrated area bounds
-                screen_x = max(area["x1"], min(area["x2"], screen_x))
-                screen_y = max(area["y1"], min(area["y2"], screen_y))
-            else:
-                # Mapear para tela cheia (comportamento antigo)
-                screen_x = self.map_range(x, min_x, max_x, 0, screen_width)
-                screen_y = self.map_range(y, min_y, max_y, 0, screen_height)
-                
-                # Clamp coordinates to screen bounds
-                screen_x = max(0, min(screen_width, screen_x))
-                screen_y = max(0, min(screen_height, screen_y))
-            
-            return (int(screen_x), int(screen_y))
-            
-        except (KeyError, ValueError, TypeError) as e:
-            print(f"[ERROR] Erro no mapeamento de calibração: {e}")
-            return self.get_default_coordinates(x, y)
-        except Exception as e:
-            print(f"[ERROR] Erro inesperado no mapeamento: {e}")
+            return transform(x, y)
+        except (ValueError, TypeError) as e:
+            metric_mapping_errors.inc()
+            log_mapping.error("Erro no mapeamento de calibração: %s", e)
             return self.get_default_coordinates(x, y)
     
     def get_default_coordinates(self, x, y):
         """Get default coordinate mapping without calibration"""
         return (
-            int((x / DEFAULT_AIRSCAN_WIDTH) * screen_width),
-            int((y / DEFAULT_AIRSCAN_HEIGHT) * screen_height)
+            int((x / DEFAULT_AIRSCAN_WIDTH) * self.screen_width),
+            int((y / DEFAULT_AIRSCAN_HEIGHT) * self.screen_height)
         )
     
-    def update_mouse_position(self):
+    def on_sample(self, x, y, timestamp):
+        """Primary tee consumer: drives the mouse unless a calibration is running"""
+        if self.calibration_active:
+            metric_dropped_calibration.inc()
+            return
+        if self.gestures is not None and self.gestures.suppress_pointer:
+            # Scroll/pinch com dois dedos: o cursor fica parado, mas o toque continua vivo
+            self.watchdog.feed(timestamp)
+            return
+        self.update_mouse_position(x, y, timestamp)
+    
+    def on_gesture_sample(self, x, y, timestamp):
+        """Tee consumer: the primary blob also feeds the gesture engine"""
+        if not self.calibration_active:
+            self.gestures.on_blob(BLOB_ID, x, y, timestamp)
+    
+    def handle_gesture_blob(self, blob_id, axis, position, unused_addr, value):
+        """Handle X/Y of an extra blob (second finger, ...) used only for gestures"""
+        position[axis] = value
+        if position[0] is not None and position[1] is not None and not self.calibration_active:
+            self.gestures.on_blob(blob_id, position[0], position[1], self.clock.now())
+    
+    def map_gesture_blobs(self, dispatcher):
+        """Route the blobs after BLOB_ID to the gesture engine"""
+        if not self.gestures:
+            return
+        for blob_id in range(BLOB_ID + 1, BLOB_ID + GESTURE_BLOBS):
+            position = [None, None]
+            dispatcher.map(f"/airscan/blob/{blob_id}/x", partial(self.handle_gesture_blob, blob_id, 0, position))
+            dispatcher.map(f"/airscan/blob/{blob_id}/y", partial(self.handle_gesture_blob, blob_id, 1, position))
+    
+    def on_screen_sample(self, sensor_id, screen_x, screen_y, timestamp):
+        """Multi-sensor consumer: sample already mapped and de-duplicated by the ingest"""
+        if self.calibration_active:
+            metric_dropped_calibration.inc()
+            return
+        if self.sensor_stats is not None:
+            self.sensor_stats(screen_x, screen_y, timestamp)
+        self.drive_cursor(screen_x, screen_y, timestamp, sensor_id=sensor_id)
+    
+    def update_mouse_position(self, x, y, current_time):
         """Update mouse position based on AirScan coordinates with throttling and smoothing"""
-        if self.norm_x is not None and self.norm_y is not None:
-            try:
-                current_time = time.time()
-                
-                # Atualiza timestamp de última recepção de dados
-                self.last_data_time = current_time
-                
-                # Reinicia watchdog timer
-                self.reset_watchdog_timer()
-                
-                # Throttling: limita taxa de atualização
-                if current_time - self.last_update_time < self.update_interval:
-                    return  # Ignora esta atualização para manter taxa configurada
-                
-                self.last_update_time = current_time
-                
-                # Obter coordenadas calibradas
-                pixel_x, pixel_y = self.get_calibrated_coordinates(self.norm_x, self.norm_y)
-                
-                # Adicionar ao histórico para suavização
-                self.x_history.append(pixel_x)
-                self.y_history.append(pixel_y)
-                
-                # Calcular média móvel
-                smoothed_x = sum(self.x_history) / len(self.x_history)
-                smoothed_y = sum(self.y_history) / len(self.y_history)
-                
-                # Arredondar para inteiro
-                final_x = int(smoothed_x)
-                final_y = int(smoothed_y)
-                
-                # Mover mouse para posição suavizada (já mapeada corretamente)
-                pyautogui.moveTo(final_x, final_y)
-                
-                # Log coordinates with throttling (500ms)
-                if current_time - self.last_log_time >= self.log_interval:
-                    area_info = f" [Área: {self.calibration_area['width']}x{self.calibration_area['height']}]" if self.calibration_area else ""
-                    print(f"[AIRSCAN] X:{self.norm_x:.2f} Y:{self.norm_y:.2f} -> Tela({final_x}, {final_y}){area_info}")
-                    self.last_log_time = current_time
-                    
-            except Exception as e:
-                print(f"[ERROR] Failed to update mouse position: {e}")
+        if x is not None and y is not None:
+            self.drive_cursor(x, y, current_time, self.get_calibrated_coordinates)
     
-    def reset_watchdog_timer(self):
-        """Reinicia o timer de watchdog - cancela o antigo e cria novo"""
-        # Cancela timer existente
-        if self.watchdog_timer and self.watchdog_timer.is_alive():
-            self.watchdog_timer.cancel()
-        
-        # Cria novo timer que será chamado se não receber dados por 0.3s
-        self.watchdog_timer = threading.Timer(self.data_timeout, self.on_data_timeout)
-        self.watchdog_timer.daemon = True
-        self.watchdog_timer.start()
+    def drive_cursor(self, x, y, current_time, mapper=None, sensor_id=None):
+        """Throttle, map (if mapper is given), smooth and move the cursor"""
+        try:
+            # Atualiza timestamp de última recepção de dados
+            self.last_data_time = current_time
+            
+            # Adia o prazo do watchdog
+            self.watchdog.feed(current_time)
+            
+            # Throttling: limita taxa de atualização
+            if current_time - self.last_update_time < self.update_interval:
+                metric_dropped_throttle.inc()
+                return  # Ignora esta atualização para manter taxa configurada
+            
+            self.last_update_time = current_time
+            
+            # Obter coordenadas calibradas
+            if mapper:
+                pixel_x, pixel_y = mapper(x, y)
+            else:
+                pixel_x, pixel_y = x, y
+            
+            # Calcular média móvel
+            smoothed_x, smoothed_y = self.smoothing(pixel_x, pixel_y)
+            
+            # Arredondar para inteiro
+            final_x = int(smoothed_x)
+            final_y = int(smoothed_y)
+            
+            # Mover mouse para posição suavizada (já mapeada corretamente)
+            self.output.move_to(final_x, final_y)
+            metric_output_moves.inc()
+            
+            # Log coordinates (limite de taxa de 500ms aplicado pelo filtro da categoria)
+            if sensor_id is None:
+                log_coords.info("X:%.2f Y:%.2f -> Tela(%d, %d)%s", x, y, final_x, final_y, self.area_info)
+            else:
+                log_coords.info("%s X:%.2f Y:%.2f -> Tela(%d, %d)%s", sensor_id, x, y, final_x, final_y, self.area_info)
+                
+        except Exception as e:
+            metric_output_errors.inc()
+            log_output.error("Failed to update mouse position: %s", e)
     
     def on_data_timeout(self):
         """Chamado quando não recebe dados do AirScan por 0.3s"""
+        metric_watchdog_timeouts.inc()
+        if self.gestures:
+            # Sem dados: todos os dedos levantaram (avalia swipe)
+            self.gestures.release(self.clock.now())
         if self.mouse_pressed:
-            pyautogui.mouseUp()
+            metric_watchdog_releases.inc()
+            self.output.mouse_up()
             self.mouse_pressed = False
             self.initial_position_set = False  # Reset flag para próximo toque
             # Reset sistema de estabilização
             self.stable_position = None
             self.is_position_stable = False
-            print(f"[TOUCH] MouseUp - sem dados por {self.data_timeout}s")
+            log_touch.info("MouseUp - sem dados por %ss", self.data_timeout)
     
     def check_position_stability(self, x, y, current_time):
         """Verifica se a posição está estável dentro do raio de tolerância"""
@@ -355,26 +564,26 @@ class AirScanControl:
     
     def handle_mouse_x(self, unused_addr, x):
         """Handle X coordinate from AirScan"""
+        metric_osc_x.inc()
         self.norm_x = x
-        # Write coordinates to temp file for calibration process
-        self.write_coordinates_to_temp()
-        self.update_mouse_position()
+        self.publish_sample()
     
     def handle_mouse_y(self, unused_addr, y):
         """Handle Y coordinate from AirScan"""
+        metric_osc_y.inc()
         self.norm_y = y
-        # Write coordinates to temp file for calibration process
-        self.write_coordinates_to_temp()
-        self.update_mouse_position()
+        self.publish_sample()
     
-    def write_coordinates_to_temp(self):
-        """Write current coordinates to temporary file for calibration"""
+    def publish_sample(self):
+        """Publish the latest X/Y pair to every tee consumer"""
         if self.norm_x is not None and self.norm_y is not None:
-            try:
-                with open("airscan_coords.tmp", "w") as f:
-                    json.dump({"x": self.norm_x, "y": self.norm_y}, f)
-            except Exception as e:
-                print(f"[WARNING] Failed to write coordinates to temp file: {e}")
+            now = self.clock.now()
+            metric_samples.inc()
+            metric_last_sample.set(time.time())
+            if self.last_sample_time is not None:
+                metric_sample_interval.observe(now - self.last_sample_time)
+            self.last_sample_time = now
+            self.tee.publish(self.norm_x, self.norm_y, now)
     
     def handle_mouse_click(self, unused_addr, z):
         """Handle click state from AirScan - não usado mais (detecção por falta de dados X/Y)"""
@@ -382,80 +591,65 @@ class AirScanControl:
         # quando para de receber dados X/Y
         pass
     
-    def start_calibration(self):
-        """Launch calibration tool"""
+    def start_calibration(self, sensor_id=None):
+        """Request the calibration window (runs on the main thread, same OSC socket)"""
+        if self.calibration_active:
+            print("[CALIBRAÇÃO] Calibração já está em execução! Ignorando chamada...")
+            return
+        self.main_thread_tasks.put(partial(self.run_calibration, sensor_id))
+    
+    def run_calibration(self, sensor_id=None):
+        """Run calibration in-process as a second consumer of the ingest tee"""
+        if self.calibration_active:
+            return
+        
+        # Multi-sensor: cada sensor é calibrado a partir do seu próprio tee bruto
+        sample_source = self.tee
+        if self.ingest:
+            sensor_id = sensor_id or self.sensor_sources[0].id
+            sample_source = self.ingest.raw_tee(sensor_id)
+            print(f"[CALIBRAÇÃO] Sensor: {sensor_id}")
+        
+        # Import tardio: Tk só é carregado quando a calibração é usada
+        from AirScan_Calibration import CalibrationWindow
+        
+        print("[CALIBRAÇÃO] Iniciando calibração (mesmo socket OSC, sem reiniciar o servidor)...")
+        self.calibration_complete.clear()
+        self.calibration_active = True
+        
+        # Solta o mouse caso um toque esteja em andamento
+        self.on_data_timeout()
+        
         try:
-            # Check if calibration is already running
-            if self.calibration_process and self.calibration_process.poll() is None:
-                print("[CALIBRAÇÃO] Calibração já está em execução! Ignorando chamada...")
-                return
-            
-            # Stop the main server and ensure port is free
-            if self.server:
-                print("[CALIBRAÇÃO] Parando servidor principal para calibração...")
-                self.server.shutdown()
-                self.server = None
-            
-            # Ensure port is free before starting calibration
-            if self.is_port_in_use(AIRSCAN_PORT):
-                print(f"[CALIBRAÇÃO] Porta {AIRSCAN_PORT} ainda em uso, aguardando...")
-                if not self.wait_for_port_free(AIRSCAN_PORT, timeout=5):
-                    print(f"[CALIBRAÇÃO] Forçando liberação da porta {AIRSCAN_PORT}...")
-                    self.kill_processes_using_port(AIRSCAN_PORT)
-                    time.sleep(1)  # Give time for port to be released
-            
-            # Save current directory
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            calibration_script = os.path.join(current_dir, "AirScan_Calibration.py")
-            
-            # Launch calibration in a new process
-            self.calibration_process = subprocess.Popen([sys.executable, calibration_script])
-            print("Ferramenta de calibração iniciada!")
-            
-            # Monitor calibration process
-            self.monitor_calibration()
-            
+            window = CalibrationWindow(sample_source=sample_source, stop_event=self.shutdown_event,
+                                       sensor_id=sensor_id, clock=self.clock)
+            completed = window.start()
         except Exception as e:
+            completed = False
             print(f"[ERROR] Failed to start calibration: {e}")
-    
-    def monitor_calibration(self):
-        """Monitor calibration process and reload data when complete"""
-        def monitor():
-            if self.calibration_process:
-                self.calibration_process.wait()
-                
-                # Check if calibration was cancelled
-                cancelled = os.path.exists('calibration_cancelled.flag')
-                if cancelled:
-                    print("[CALIBRAÇÃO] Calibração cancelada pelo usuário.")
-                    try:
-                        os.remove('calibration_cancelled.flag')
-                    except:
-                        pass
-                else:
-                    print("[CALIBRAÇÃO] Processo de calibração finalizado. Recarregando dados...")
-                    self.calibration_data = self.load_calibration()
-                    self.calibration_area = self.calibration_data.get("calibration_area", None)
-                    print("[CALIBRAÇÃO] Dados de calibração atualizados!")
-                    if self.calibration_area:
-                        print(f"[CALIBRAÇÃO] Nova área de trabalho: {self.calibration_area['width']}x{self.calibration_area['height']} pixels")
-                
-                self.calibration_complete.set()
-                print("[CALIBRAÇÃO] Sistema de controle continua ativo.")
+        finally:
+            self.calibration_active = False
+        
+        if completed:
+            # A recarga é feita pelo observador de arquivo do store
+            print("[CALIBRAÇÃO] Calibração finalizada.")
+        else:
+            print("[CALIBRAÇÃO] Calibração cancelada pelo usuário.")
         
-        # Start monitoring in a separate thread
-        monitor_thread = threading.Thread(target=monitor)
-        monitor_thread.daemon = True
-        monitor_thread.start()
+        self.calibration_complete.set()
+        print("[CALIBRAÇÃO] Sistema de controle continua ativo.")
     
     def restart_server(self):
         """Restart the main OSC server"""
+        from pythonosc import osc_server
+        from pythonosc.dispatcher import Dispatcher
         try:
             # Setup OSC dispatcher
             dispatcher = Dispatcher()
             dispatcher.map(f"/airscan/blob/{BLOB_ID}/x", self.handle_mouse_x)
             dispatcher.map(f"/airscan/blob/{BLOB_ID}/y", self.handle_mouse_y)
             dispatcher.map(f"/airscan/blob/{BLOB_ID}/z", self.handle_mouse_click)
+            self.map_gesture_blobs(dispatcher)
             
             # Start OSC server
             self.server = osc_server.ThreadingOSCUDPServer(("0.0.0.0", AIRSCAN_PORT), dispatcher)
@@ -469,6 +663,41 @@ class AirScanControl:
         except Exception as e:
             print(f"[ERROR] Erro ao reiniciar servidor: {e}")
     
+    def start_multi_sensor_ingest(self):
+        """Start one ingest per sensor port, merged into a single screen-space stream"""
+        self.ingest = MultiSensorIngest(
+            self.sensor_sources,
+            self.compile_sensor_calibration,
+            self.calibration_store,
+            self.on_screen_sample,
+            dedupe_radius=OVERLAP_DEDUPE_RADIUS,
+            dedupe_window=OVERLAP_DEDUPE_WINDOW,
+            workers_per_port=SENSOR_WORKERS_PER_PORT,
+            clock=self.clock
+        )
+        self.ingest.start()
+        if self.gestures:
+            print("[WARNING] Gestos usam apenas o sensor único (AIRSCAN_PORT); desabilitados com SENSORS")
+        if self.auto_tuner:
+            # Amostras já chegam em pixels de tela
+            self.auto_tuner.scale = 1.0
+        print(f"\n[INFO] Ingestão multi-sensor: {len(self.sensor_sources)} sensores, {len(self.ingest.servers)} sockets")
+        for source in self.sensor_sources:
+            origin = f" de {source.address}" if source.address else ""
+            print(f"[INFO]   • {source.id}: 0.0.0.0:{source.port} (Blob {source.blob_id}){origin}")
+    
+    def start_metrics_server(self):
+        """Expose the metrics registry locally (HTTP on 127.0.0.1 or a Unix socket)"""
+        if METRICS_PORT is None and not METRICS_UNIX_SOCKET:
+            return
+        try:
+            self.metrics_server = MetricsServer(port=METRICS_PORT, unix_socket=METRICS_UNIX_SOCKET)
+            endpoint = self.metrics_server.start()
+            print(f"[CONFIG] Métricas: {endpoint}")
+        except OSError as e:
+            self.metrics_server = None
+            print(f"[WARNING] Servidor de métricas não iniciado: {e}")
+    
     def setup_keyboard_shortcuts(self):
         """Setup keyboard shortcuts"""
         try:
@@ -487,8 +716,14 @@ class AirScanControl:
             # Usar add_hotkey que é mais confiável
             keyboard.add_hotkey('shift+c', on_calibration_shortcut)
             keyboard.add_hotkey('ctrl+q', on_exit_shortcut)
+            # Multi-sensor: Shift+1..9 calibra o sensor correspondente
+            for index, source in enumerate(self.sensor_sources[:9]):
+                keyboard.add_hotkey(f'shift+{index + 1}', partial(self.start_calibration, source.id))
+            
             print("✅ Atalhos configurados:")
             print("   • Shift+C: Iniciar calibração")
+            for index, source in enumerate(self.sensor_sources[:9]):
+                print(f"   • Shift+{index + 1}: Calibrar sensor '{source.id}'")
             print("   • Ctrl+Q: Encerrar sistema")
             print("   • Ctrl+C: Encerrar sistema (sinal)")
             
@@ -509,16 +744,44 @@ class AirScanControl:
         print(f"[CONFIG] Suavização: {SMOOTHING_SAMPLES} amostras (média móvel)")
         print(f"[CONFIG] Sistema Touch Screen: Watchdog {MOUSE_RELEASE_DELAY}s (sem dados = mouseUp)")
         print(f"[CONFIG] Resolução AirScan: {DEFAULT_AIRSCAN_WIDTH}x{DEFAULT_AIRSCAN_HEIGHT}")
-        print(f"[CONFIG] Resolução Tela: {screen_width}x{screen_height}")
+        print(f"[CONFIG] Resolução Tela: {self.screen_width}x{self.screen_height}")
+        if self.gestures:
+            print(f"[CONFIG] Gestos: blobs {BLOB_ID}..{BLOB_ID + GESTURE_BLOBS - 1} "
+                  f"(swipe, long press, scroll e pinch com dois dedos)")
         
-        # Setup OSC dispatcher
+        # Setup OSC dispatcher (import tardio: pythonosc carrega asyncio)
+        from pythonosc import osc_server
+        from pythonosc.dispatcher import Dispatcher
         dispatcher = Dispatcher()
         dispatcher.map(f"/airscan/blob/{BLOB_ID}/x", self.handle_mouse_x)
         dispatcher.map(f"/airscan/blob/{BLOB_ID}/y", self.handle_mouse_y)
         dispatcher.map(f"/airscan/blob/{BLOB_ID}/z", self.handle_mouse_click)
+        self.map_gesture_blobs(dispatcher)
+        
+        # Setup keyboard shortcuts (headless: sem teclado/tela)
+        if self.headless:
+            print("[CONFIG] Modo headless: saída nula, atalhos de teclado desabilitados")
+        else:
+            self.setup_keyboard_shortcuts()
         
-        # Setup keyboard shortcuts
-        self.setup_keyboard_shortcuts()
+        # Recarga automática da calibração quando o arquivo for regravado
+        watcher_backend = self.calibration_store.start_watching()
+        print(f"[CONFIG] Recarga de calibração: {CALIBRATION_FILE} ({watcher_backend})")
+        self.start_metrics_server()
+        
+        # Troca de resolução dos projetores sem reiniciar (headless: tamanho fixo)
+        if DISPLAY_POLL_INTERVAL and not self.headless:
+            self.display_watcher = DisplayWatcher(self.output.screen_size, self.on_display_change,
+                                                  DISPLAY_POLL_INTERVAL)
+            print(f"[CONFIG] Geometria da tela: {self.display_watcher.start()}")
+        
+        # Recarga a quente dos parâmetros seguros (taxa, suavização, delay, log)
+        self.config_watcher = ConfigWatcher(self.apply_config)
+        config_backend = self.config_watcher.start()
+        print(f"[CONFIG] Recarga de configuração: {self.config_watcher.loader.path} ({config_backend})")
+        if self.auto_tuner:
+            self.auto_tuner.start()
+            print(f"[CONFIG] Ajuste automático: {AUTO_TUNE} (a cada {AUTO_TUNE_INTERVAL}s, {self.auto_tuner.path})")
         
         # Display calibration status
         if self.calibration_data.get("points"):
@@ -527,12 +790,12 @@ class AirScanControl:
                 print(f"[INFO] Área de trabalho: {self.calibration_area['width']}x{self.calibration_area['height']} pixels")
                 print(f"[INFO] Posição: ({self.calibration_area['x1']}, {self.calibration_area['y1']}) até ({self.calibration_area['x2']}, {self.calibration_area['y2']})")
             else:
-                print(f"[INFO] Área de trabalho: Tela cheia ({screen_width}x{screen_height})")
+                print(f"[INFO] Área de trabalho: Tela cheia ({self.screen_width}x{self.screen_height})")
         else:
             print("[WARNING] Nenhuma calibração encontrada. Pressione Shift+C para calibrar.")
         
         # Check if port is available before starting server
-        if self.is_port_in_use(AIRSCAN_PORT):
+        if not self.sensor_sources and self.is_port_in_use(AIRSCAN_PORT):
             print(f"[WARNING] Porta {AIRSCAN_PORT} está em uso. Tentando liberar...")
             if not self.wait_for_port_free(AIRSCAN_PORT, timeout=5):
                 print(f"[WARNING] Forçando liberação da porta {AIRSCAN_PORT}...")
@@ -541,29 +804,35 @@ class AirScanControl:
         
         # Start OSC server
         try:
-            self.server = osc_server.ThreadingOSCUDPServer(("0.0.0.0", AIRSCAN_PORT), dispatcher)
-            print(f"\n[INFO] Servidor AirScan iniciado em 0.0.0.0:{AIRSCAN_PORT}")
+            if self.sensor_sources:
+                self.start_multi_sensor_ingest()
+            else:
+                self.server = osc_server.ThreadingOSCUDPServer(("0.0.0.0", AIRSCAN_PORT), dispatcher)
+                print(f"\n[INFO] Servidor AirScan iniciado em 0.0.0.0:{AIRSCAN_PORT}")
+                
+                # Start server in a separate thread
+                server_thread = threading.Thread(target=self.server.serve_forever)
+                server_thread.daemon = True
+                server_thread.start()
+            
             print("[INFO] Atalhos disponíveis:")
             print("[INFO]   • Ctrl+C: Encerrar sistema")
             print("[INFO]   • Ctrl+Q: Encerrar sistema")
             print("[INFO]   • Shift+C: Iniciar calibração")
-            print("[INFO] A calibração reiniciará automaticamente o controle")
+            print("[INFO] A calibração usa o mesmo servidor; o controle é retomado ao finalizar")
             print("-" * 50)
             
-            # Start server in a separate thread
-            server_thread = threading.Thread(target=self.server.serve_forever)
-            server_thread.daemon = True
-            server_thread.start()
-            
-            # Main loop - wait for shutdown event
+            # Main loop - wait for shutdown event and run main-thread tasks
             while self.running and not self.shutdown_event.is_set():
                 try:
                     # Check every second if we should shutdown
-                    if self.shutdown_event.wait(1.0):
-                        break
+                    task = self.main_thread_tasks.get(timeout=1.0)
+                except queue.Empty:
+                    continue
                 except KeyboardInterrupt:
                     print("\n[INFO] Ctrl+C detectado. Encerrando...")
                     break
+                task()
             
             print("\n[INFO] Encerrando servidor...")
             
@@ -593,23 +862,34 @@ class AirScanControl:
         except:
             pass
         
-        # Cancelar watchdog timer se existir
-        if self.watchdog_timer and self.watchdog_timer.is_alive():
-            self.watchdog_timer.cancel()
-            print("[INFO] Watchdog timer cancelado")
+        # Parar observadores de arquivo (calibração e configuração)
+        self.calibration_store.stop_watching()
+        if self.display_watcher:
+            self.display_watcher.stop()
+        if self.config_watcher:
+            self.config_watcher.stop()
         
-        # Finalizar processo de calibração se existir
-        if self.calibration_process and self.calibration_process.poll() is None:
-            print("[INFO] Finalizando processo de calibração...")
-            try:
-                self.calibration_process.terminate()
-                self.calibration_process.wait(timeout=3)
-                print("[INFO] Processo de calibração finalizado")
-            except subprocess.TimeoutExpired:
-                print("[WARNING] Forçando encerramento do processo de calibração...")
-                self.calibration_process.kill()
-            except Exception as e:
-                print(f"[WARNING] Erro ao finalizar processo de calibração: {e}")
+        # Fechar gravação da sessão
+        if self.recorder:
+            self.tee.unsubscribe(self.recorder)
+            self.recorder.close()
+            print(f"[INFO] Sessão gravada: {self.recorder.samples} amostras")
+        
+        if self.auto_tuner:
+            self.auto_tuner.stop()
+        
+        # Parar watchdog
+        self.watchdog.stop()
+        print("[INFO] Watchdog parado")
+        
+        # Encerrar servidor de métricas
+        if self.metrics_server:
+            self.metrics_server.stop()
+        
+        # Encerrar ingestão multi-sensor
+        if self.ingest:
+            print("[INFO] Encerrando servidores dos sensores...")
+            self.ingest.stop()
         
         # Encerrar servidor OSC
         if self.server:
@@ -0,0 +1,101 @@
+"""
+Observador da geometria da tela do AirScan.
+
+Quando o servidor de mídia troca a resolução dos projetores, o controle
+precisa dos novos limites sem reiniciar e sem consultar o tamanho da tela a
+cada amostra. DisplayWatcher avisa on_change((largura, altura)) só quando o
+tamanho muda: eventos RandR no X11 (python-xlib, opcional) ou, sem eles,
+consulta periódica do backend de saída.
+"""
+
+import os
+import select
+import sys
+import threading
+
+
+class DisplayWatcher:
+    """Calls on_change((width, height)) when the screen size changes; RandR on X11, polling elsewhere"""
+
+    def __init__(self, get_size, on_change, poll_interval=2.0):
+        self.get_size = get_size
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.size = tuple(get_size())
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.backend = None
+
+    def start(self):
+        """Start watching in a daemon thread; returns the backend name"""
+        display = self._open_randr()
+        if display is not None:
+            self.backend = "randr"
+            target = lambda: self._run_randr(display)
+        else:
+            self.backend = "polling"
+            target = self._run_polling
+
+        self.thread = threading.Thread(target=target, name="airscan-display-watcher", daemon=True)
+        self.thread.start()
+        return self.backend
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _open_randr(self):
+        if not sys.platform.startswith("linux") or not os.environ.get("DISPLAY"):
+            return None
+        try:
+            # Import tardio: python-xlib é opcional (sem ele, polling)
+            from Xlib import display as xdisplay
+            from Xlib.ext import randr
+        except ImportError:
+            return None
+        try:
+            display = xdisplay.Display()
+            if not display.has_extension("RANDR"):
+                display.close()
+                return None
+            display.screen().root.xrandr_select_input(randr.RRScreenChangeNotifyMask)
+            display.flush()
+            return display
+        except Exception:
+            return None
+
+    def _run_randr(self, display):
+        from Xlib.ext import randr
+        try:
+            while not self.stop_event.is_set():
+                readable, _, _ = select.select([display.fileno()], [], [], self.poll_interval)
+                if not readable:
+                    continue
+                size = None
+                # Uma troca de modo gera vários eventos: vale o último
+                while display.pending_events():
+                    event = display.next_event()
+                    if isinstance(event, randr.ScreenChangeNotify):
+                        size = (event.width_in_pixels, event.height_in_pixels)
+                if size is not None:
+                    self._update(size)
+        finally:
+            display.close()
+
+    def _run_polling(self):
+        while not self.stop_event.wait(self.poll_interval):
+            try:
+                size = tuple(self.get_size())
+            except Exception as e:
+                print(f"[WARNING] Tamanho da tela não lido: {e}")
+                continue
+            self._update(size)
+
+    def _update(self, size):
+        if size == self.size:
+            return
+        previous, self.size = self.size, size
+        print(f"[INFO] Resolução da tela mudou: {previous[0]}x{previous[1]} -> {size[0]}x{size[1]}")
+        try:
+            self.on_change(size)
+        except Exception as e:
+            print(f"[WARNING] Erro ao aplicar a nova resolução: {e}")
@@ -0,0 +1,151 @@
+"""
+Segmentação online do fluxo de amostras em permanências (mão parada).
+
+DwellClusterer faz agrupamento sequencial (líder-seguidor): cada amostra
+entra no grupo atual se estiver a até `radius` unidades do sensor da média
+do grupo e chegar até `max_gap` segundos depois da anterior; senão abre um
+novo grupo. Média, variâncias e covariância são incrementais (Welford), com
+custo constante por amostra. Quando um grupo completa `dwell_time` segundos
+ele é emitido uma única vez como Dwell; o deslocamento entre alvos gera só
+grupos curtos, que são descartados.
+
+Usado pela calibração em ordem livre (AirScan_Calibration): cada permanência
+estável é atribuída ao alvo não preenchido mais próximo.
+"""
+
+import math
+from collections import namedtuple
+
+DWELL_RADIUS = 25.0     # unidades do sensor
+DWELL_MAX_GAP = 0.5     # segundos - mesmo limite de interrupção da captura por ponto
+MIN_REFINE_SPREAD = 0.05  # fração da diagonal: espalhamento mínimo dos alvos para refinar o mapeamento
+
+Dwell = namedtuple("Dwell", ["x", "y", "count", "var_x", "var_y", "cov_xy", "start", "end"])
+
+
+class DwellClusterer:
+    """Online leader clustering of (x, y, t) samples; add() returns a Dwell once per stable group"""
+
+    def __init__(self, dwell_time=5.0, radius=DWELL_RADIUS, max_gap=DWELL_MAX_GAP):
+        self.dwell_time = dwell_time
+        self.radius = radius
+        self.max_gap = max_gap
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean_x = self.mean_y = 0.0
+        self._m2_x = self._m2_y = self._c_xy = 0.0
+        self.start = self.last = None
+        self.emitted = False
+
+    def _begin(self, x, y, timestamp):
+        self.reset()
+        self.start = timestamp
+        self._add(x, y, timestamp)
+
+    def _add(self, x, y, timestamp):
+        self.count += 1
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.mean_x += dx / self.count
+        self.mean_y += dy / self.count
+        self._m2_x += dx * (x - self.mean_x)
+        self._m2_y += dy * (y - self.mean_y)
+        self._c_xy += dx * (y - self.mean_y)
+        self.last = timestamp
+
+    def add(self, x, y, timestamp):
+        if (self.last is None or timestamp - self.last > self.max_gap
+                or math.hypot(x - self.mean_x, y - self.mean_y) > self.radius):
+            self._begin(x, y, timestamp)
+            return None
+        self._add(x, y, timestamp)
+        if not self.emitted and self.last - self.start >= self.dwell_time:
+            self.emitted = True
+            return self.dwell()
+        return None
+
+    def expire(self, now):
+        """Drop the current group if no sample arrived for max_gap seconds (hand lifted)"""
+        if self.last is not None and now - self.last > self.max_gap:
+            self.reset()
+
+    @property
+    def progress(self):
+        """Fraction of dwell_time held by the current group (0 after it was emitted)"""
+        if self.start is None or self.emitted:
+            return 0.0
+        return min(1.0, (self.last - self.start) / self.dwell_time)
+
+    def dwell(self):
+        variance = self.count - 1 if self.count > 1 else 1
+        return Dwell(self.mean_x, self.mean_y, self.count, self._m2_x / variance, self._m2_y / variance,
+                     self._c_xy / variance, self.start, self.last)
+
+    @staticmethod
+    def statistics(dwell):
+        """The "samples" entry of a calibration point (same fields as CalibrationPoint.get_statistics)"""
+        return {"count": dwell.count, "var_x": dwell.var_x, "var_y": dwell.var_y, "cov_xy": dwell.cov_xy}
+
+
+class TargetAssigner:
+    """Assigns dwells to the nearest unfilled screen target through a coarse sensor -> screen mapping
+
+    A estimativa grosseira (calibração anterior ou mapeamento proporcional)
+    é substituída por um ajuste afim às atribuições já feitas assim que os
+    alvos preenchidos deixam de ser colineares.
+    """
+
+    def __init__(self, targets, coarse, rect, max_distance):
+        # targets: {nome: (x, y)} em pixels de tela
+        self.targets = dict(targets)
+        self.coarse = coarse
+        self.mapping = coarse
+        self.rect = rect
+        self.max_distance = max_distance
+        self.assigned = {}  # nome -> (sensor_x, sensor_y)
+
+    @property
+    def unfilled(self):
+        return [name for name in self.targets if name not in self.assigned]
+
+    def assign(self, sensor_x, sensor_y):
+        """Name of the target this dwell belongs to, or None (too far, or closer to a filled target)"""
+        screen_x, screen_y = self.mapping(sensor_x, sensor_y)
+        name = min(self.targets, key=lambda n: math.hypot(self.targets[n][0] - screen_x,
+                                                          self.targets[n][1] - screen_y))
+        if name in self.assigned:
+            # Toque repetido em um alvo já preenchido
+            return None
+        if math.hypot(self.targets[name][0] - screen_x, self.targets[name][1] - screen_y) > self.max_distance:
+            return None
+        self.assigned[name] = (sensor_x, sensor_y)
+        self._refine()
+        return name
+
+    def _spread(self):
+        """Smallest standard deviation of the filled targets along any direction (0 when collinear)"""
+        points = [self.targets[name] for name in self.assigned]
+        count = len(points)
+        mean_x = sum(p[0] for p in points) / count
+        mean_y = sum(p[1] for p in points) / count
+        sxx = sum((p[0] - mean_x) ** 2 for p in points) / count
+        syy = sum((p[1] - mean_y) ** 2 for p in points) / count
+        sxy = sum((p[0] - mean_x) * (p[1] - mean_y) for p in points) / count
+        # Menor autovalor da covariância 2x2
+        smallest = (sxx + syy) / 2 - math.sqrt(((sxx - syy) / 2) ** 2 + sxy ** 2)
+        return math.sqrt(max(smallest, 0.0))
+
+    def _refine(self):
+        from AirScan_Mapping import AffineTransform
+        x1, y1, x2, y2 = self.rect
+        # Alvos colineares (ex.: diagonal) não determinam o ajuste: mantém a estimativa grosseira
+        if len(self.assigned) < 3 or self._spread() < MIN_REFINE_SPREAD * math.hypot(x2 - x1, y2 - y1):
+            self.mapping = self.coarse
+            return
+        pairs = [(sensor, self.targets[name]) for name, sensor in self.assigned.items()]
+        try:
+            self.mapping = AffineTransform.fit(pairs, x1, y1, x2, y2)
+        except ValueError:
+            self.mapping = self.coarse
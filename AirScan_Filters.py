@@ -0,0 +1,72 @@
+"""
+Filtros de suavização das coordenadas de tela.
+
+Cada filtro recebe (x, y) e devolve a posição suavizada; o custo por amostra
+é constante (soma corrente em vez de somar o histórico inteiro).
+"""
+
+import threading
+from collections import deque
+
+
+class MovingAverageFilter:
+    """Moving average over the last `window` samples"""
+
+    def __init__(self, window):
+        self.window = max(1, int(window))
+        self.history = deque()
+        self.sum_x = 0.0
+        self.sum_y = 0.0
+        # Chamado por várias threads (uma por datagrama / por socket): uma soma
+        # perdida deslocaria o cursor até reiniciar
+        self.lock = threading.Lock()
+
+    def __call__(self, x, y):
+        with self.lock:
+            history = self.history
+            history.append((x, y))
+            self.sum_x += x
+            self.sum_y += y
+            if len(history) > self.window:
+                old_x, old_y = history.popleft()
+                self.sum_x -= old_x
+                self.sum_y -= old_y
+            count = len(history)
+            return self.sum_x / count, self.sum_y / count
+
+    def resized(self, window):
+        """New filter with another window, seeded with the most recent samples"""
+        resized = MovingAverageFilter(window)
+        with self.lock:
+            recent = list(self.history)[-resized.window:]
+        for x, y in recent:
+            resized(x, y)
+        return resized
+
+    def reset(self):
+        with self.lock:
+            self.history.clear()
+            self.sum_x = 0.0
+            self.sum_y = 0.0
+
+
+class ExponentialFilter:
+    """Exponential moving average; alpha=1 disables smoothing"""
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.x = None
+        self.y = None
+
+    def __call__(self, x, y):
+        if self.x is None:
+            self.x, self.y = x, y
+        else:
+            alpha = self.alpha
+            self.x += alpha * (x - self.x)
+            self.y += alpha * (y - self.y)
+        return self.x, self.y
+
+    def reset(self):
+        self.x = None
+        self.y = None
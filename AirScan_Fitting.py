@@ -0,0 +1,696 @@
+"""
+Avaliação da precisão da calibração do AirScan (NumPy).
+
+Ajusta o modelo ativo aos pontos capturados e calcula, vetorizado sobre
+todos os pontos, o resíduo de cada ponto (posição prevista - alvo na tela,
+em pixels) e o erro leave-one-out (LOO): o ponto é previsto por um modelo
+ajustado sem ele, o que mede o erro esperado longe dos alvos. O resumo
+(média, RMS, mediana, p95, máximo) é gravado em "accuracy" no arquivo de
+calibração, e o erro pode ser visto como mapa de calor (texto ou SVG) sobre
+a área calibrada.
+
+Modelos candidatos (MODELS): linear_range (padrão), linear por eixo, afim,
+bilinear, homografia e malha (afim + interpolação dos resíduos). Ao
+finalizar a calibração, ModelSelection ajusta todos em um pool de processos
+e grava em "model" o de menor RMS LOO, com os parâmetros e as notas de
+todos; compile_transform (AirScan_Mapping) usa esse modelo no controle.
+
+Uso:
+    python AirScan_Fitting.py                       # relatório + mapa em texto
+    python AirScan_Fitting.py --svg precisao.svg    # mapa de calor em SVG
+    python AirScan_Fitting.py --save                # grava "accuracy" no arquivo de calibração
+    python AirScan_Fitting.py --select --save       # escolhe e grava o melhor modelo
+    python AirScan_Fitting.py --output esquerda --select --save   # uma saída de um desktop com vários projetores
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from AirScan_Mapping import calibration_model, output_calibration, sensor_calibration
+from AirScan_Storage import CALIBRATION_FILE, atomic_write_json, load_json
+
+# Caracteres do mapa em texto, do menor para o maior erro
+HEATMAP_CHARS = " .:-=+*#%@"
+
+# Variância mínima (unidades do AirScan ao quadrado) da média de um ponto: o
+# posicionamento da mão não melhora com mais amostras, então pontos muito
+# estáveis não dominam o ajuste
+POINT_VARIANCE_FLOOR = 0.5
+
+
+def point_arrays(data):
+    """(names, airscan (n, 2), screen (n, 2)) from the calibration points"""
+    points = (data or {}).get("points") or {}
+    names = list(points)
+    airscan = np.array([[points[n]["airscan"]["x"], points[n]["airscan"]["y"]] for n in names], dtype=float)
+    screen = np.array([[points[n]["screen"]["x"], points[n]["screen"]["y"]] for n in names], dtype=float)
+    return names, airscan.reshape(-1, 2), screen.reshape(-1, 2)
+
+
+def point_weights(data, names):
+    """Inverse-variance weight of each point's mean position (mean 1), or None without sample statistics
+
+    A variância da média é (var_x + var_y) / count, com o piso
+    POINT_VARIANCE_FLOOR; pontos sem "samples" (calibrações antigas) recebem
+    a variância mediana dos demais.
+    """
+    points = data["points"]
+    variances = np.full(len(names), np.nan)
+    for i, name in enumerate(names):
+        stats = points[name].get("samples")
+        if stats and stats.get("count"):
+            variances[i] = (stats["var_x"] + stats["var_y"]) / stats["count"] + POINT_VARIANCE_FLOOR
+    known = np.isfinite(variances)
+    if not known.any():
+        return None
+    variances[~known] = np.median(variances[known])
+    weights = 1.0 / variances
+    return weights / weights.mean()
+
+
+def target_rect(data, screen_width, screen_height):
+    """Screen rectangle the transform maps onto (calibration area or full screen)"""
+    area = (data or {}).get("calibration_area")
+    if area:
+        return (area["x1"], area["y1"], area["x2"], area["y2"])
+    return (0, 0, screen_width, screen_height)
+
+
+def _clamp_to_rect(predicted, rect):
+    # Mesmo clamp + truncamento para int das transformações compiladas
+    x1, y1, x2, y2 = rect
+    predicted = np.clip(predicted, (x1, y1), (x2, y2))
+    return np.trunc(predicted)
+
+
+def _row_scale(weights, count):
+    # Mínimos quadrados ponderados = linhas multiplicadas por sqrt(peso)
+    if weights is None:
+        return np.ones(count)
+    return np.sqrt(weights)
+
+
+class LinearRangeModel:
+    """Per-axis linear map of the captured AirScan range onto the target rectangle (LinearRangeTransform)
+
+    Usa só os extremos: os pesos por ponto não se aplicam.
+    """
+
+    name = "linear_range"
+    min_points = 2
+
+    def fit(self, airscan, screen, rect, weights=None):
+        low = airscan.min(axis=0)
+        high = airscan.max(axis=0)
+        if np.any(high - low == 0):
+            raise ValueError("Dados de calibração inválidos (ranges iguais)")
+        return low, high
+
+    def predict(self, params, airscan, rect):
+        low, high = params
+        x1, y1, x2, y2 = rect
+        scale = np.array([x2 - x1, y2 - y1], dtype=float) / (high - low)
+        return _clamp_to_rect((airscan - low) * scale + (x1, y1), rect)
+
+    def loo_predict(self, airscan, screen, rect, weights=None):
+        """Prediction of each point by the model fitted without it, (n, 2); NaN where undefined"""
+        n = len(airscan)
+        if n <= self.min_points:
+            return np.full((n, 2), np.nan)
+        # Mínimo/máximo sem o ponto i: o segundo menor/maior quando i é o extremo
+        order = np.argsort(airscan, axis=0)
+        ranked = np.take_along_axis(airscan, order, axis=0)
+        index = np.arange(n)[:, None]
+        low = np.where(index == order[0], ranked[1], ranked[0])
+        high = np.where(index == order[-1], ranked[-2], ranked[-1])
+        span = high - low
+        x1, y1, x2, y2 = rect
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.array([x2 - x1, y2 - y1], dtype=float) / span
+            predicted = _clamp_to_rect((airscan - low) * scale + (x1, y1), rect)
+        predicted[np.any(span == 0, axis=1)] = np.nan
+        return predicted
+
+    def export(self, params):
+        # Compilado direto dos pontos por compile_transform
+        return None
+
+
+class _DesignModel:
+    """(Weighted) linear least squares on one design matrix per screen axis; LOO in closed form (hat matrix)"""
+
+    def design(self, airscan):
+        raise NotImplementedError
+
+    def fit(self, airscan, screen, rect, weights=None):
+        scale = _row_scale(weights, len(airscan))
+        coefficients = []
+        for axis, matrix in enumerate(self.design(airscan)):
+            solution, _, rank, _ = np.linalg.lstsq(matrix * scale[:, None], screen[:, axis] * scale, rcond=None)
+            if rank < matrix.shape[1]:
+                raise ValueError(f"{self.name}: pontos de calibração degenerados")
+            coefficients.append(solution)
+        return coefficients
+
+    def raw_predict(self, params, airscan):
+        return np.column_stack([matrix @ solution for matrix, solution in zip(self.design(airscan), params)])
+
+    def predict(self, params, airscan, rect):
+        return _clamp_to_rect(self.raw_predict(params, airscan), rect)
+
+    def loo_predict(self, airscan, screen, rect, weights=None):
+        n = len(airscan)
+        if n <= self.min_points:
+            return np.full((n, 2), np.nan)
+        params = self.fit(airscan, screen, rect, weights)
+        scale = _row_scale(weights, n)
+        columns = []
+        for axis, (matrix, solution) in enumerate(zip(self.design(airscan), params)):
+            # Resíduo LOO = resíduo / (1 - alavancagem), sem reajustar n vezes
+            # (alavancagem da matriz ponderada; vale também para mínimos quadrados ponderados)
+            q, _ = np.linalg.qr(matrix * scale[:, None])
+            leverage = np.sum(q ** 2, axis=1)
+            residual = screen[:, axis] - matrix @ solution
+            with np.errstate(divide="ignore", invalid="ignore"):
+                column = screen[:, axis] - residual / (1.0 - leverage)
+            column[leverage > 1.0 - 1e-9] = np.nan
+            columns.append(column)
+        return _clamp_to_rect(np.column_stack(columns), rect)
+
+
+class PerAxisLinearModel(_DesignModel):
+    """screen_x = a * x + b and screen_y = c * y + d, least squares over every point"""
+
+    name = "linear"
+    min_points = 2
+
+    def design(self, airscan):
+        ones = np.ones(len(airscan))
+        return (np.column_stack([airscan[:, 0], ones]), np.column_stack([airscan[:, 1], ones]))
+
+    def export(self, params):
+        # Mesmos coeficientes da afim (AffineTransform), com os termos cruzados zerados
+        (a, b), (c, d) = params
+        return [float(a), 0.0, float(b), 0.0, float(c), float(d)]
+
+
+class AffineModel(_DesignModel):
+    """Full affine map (rotation, shear, scale, offset)"""
+
+    name = "affine"
+    min_points = 3
+
+    def design(self, airscan):
+        matrix = np.column_stack([airscan[:, 0], airscan[:, 1], np.ones(len(airscan))])
+        return (matrix, matrix)
+
+    def export(self, params):
+        return [float(v) for v in np.concatenate(params)]
+
+
+class BilinearModel(_DesignModel):
+    """screen = c0 + c1 * x + c2 * y + c3 * x * y per axis (keystone-like distortion)"""
+
+    name = "bilinear"
+    min_points = 4
+
+    def design(self, airscan):
+        x, y = airscan[:, 0], airscan[:, 1]
+        matrix = np.column_stack([np.ones(len(airscan)), x, y, x * y])
+        return (matrix, matrix)
+
+    def export(self, params):
+        return [float(v) for v in np.concatenate(params)]
+
+
+def _normalizer(points):
+    # Translada para o centroide e escala a distância média para sqrt(2) (DLT bem condicionada)
+    center = points.mean(axis=0)
+    distance = np.mean(np.hypot(*(points - center).T))
+    scale = np.sqrt(2.0) / distance if distance > 0 else 1.0
+    return np.array([[scale, 0.0, -scale * center[0]], [0.0, scale, -scale * center[1]], [0.0, 0.0, 1.0]])
+
+
+def _homogeneous(points, transform):
+    mapped = np.column_stack([points, np.ones(len(points))]) @ transform.T
+    return mapped[:, :2]
+
+
+class HomographyModel:
+    """Projective map (HomographyTransform), DLT with h8 = 1 on normalised coordinates"""
+
+    name = "homography"
+    min_points = 4
+
+    def _system(self, airscan, screen, weights=None):
+        # Duas equações por ponto: rows (n, 2, 8), targets (n, 2), já multiplicadas por sqrt(peso)
+        norm_a = _normalizer(airscan)
+        norm_s = _normalizer(screen)
+        a = _homogeneous(airscan, norm_a)
+        s = _homogeneous(screen, norm_s)
+        zeros = np.zeros(len(a))
+        ones = np.ones(len(a))
+        rows = np.stack([
+            np.column_stack([a[:, 0], a[:, 1], ones, zeros, zeros, zeros, -a[:, 0] * s[:, 0], -a[:, 1] * s[:, 0]]),
+            np.column_stack([zeros, zeros, zeros, a[:, 0], a[:, 1], ones, -a[:, 0] * s[:, 1], -a[:, 1] * s[:, 1]]),
+        ], axis=1)
+        scale = _row_scale(weights, len(a))
+        return rows * scale[:, None, None], s * scale[:, None], norm_a, norm_s
+
+    @staticmethod
+    def _denormalize(h, norm_a, norm_s):
+        # h (..., 8) no espaço normalizado -> matrizes (..., 3, 3) em pixels, com h8 = 1
+        matrix = np.concatenate([h, np.ones(h.shape[:-1] + (1,))], axis=-1).reshape(h.shape[:-1] + (3, 3))
+        matrix = np.linalg.inv(norm_s) @ matrix @ norm_a
+        return matrix / matrix[..., 2:3, 2:3]
+
+    def fit(self, airscan, screen, rect, weights=None):
+        rows, targets, norm_a, norm_s = self._system(airscan, screen, weights)
+        ata = np.einsum("nki,nkj->ij", rows, rows)
+        atb = np.einsum("nki,nk->i", rows, targets)
+        try:
+            h = np.linalg.solve(ata, atb)
+        except np.linalg.LinAlgError:
+            raise ValueError("homography: pontos de calibração degenerados")
+        return self._denormalize(h, norm_a, norm_s)
+
+    def predict(self, params, airscan, rect):
+        mapped = np.column_stack([airscan, np.ones(len(airscan))]) @ params.T
+        return _clamp_to_rect(mapped[:, :2] / mapped[:, 2:3], rect)
+
+    def loo_predict(self, airscan, screen, rect, weights=None):
+        n = len(airscan)
+        if n <= self.min_points:
+            return np.full((n, 2), np.nan)
+        rows, targets, norm_a, norm_s = self._system(airscan, screen, weights)
+        # Equações normais sem o ponto i, resolvidas em lote: (n, 8, 8)
+        ata_i = np.einsum("nki,nkj->nij", rows, rows)
+        atb_i = np.einsum("nki,nk->ni", rows, targets)
+        try:
+            h = np.linalg.solve(ata_i.sum(axis=0) - ata_i, (atb_i.sum(axis=0) - atb_i)[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            return np.full((n, 2), np.nan)
+        matrices = self._denormalize(h, norm_a, norm_s)
+        mapped = np.einsum("nij,nj->ni", matrices, np.column_stack([airscan, np.ones(n)]))
+        return _clamp_to_rect(mapped[:, :2] / mapped[:, 2:3], rect)
+
+    def export(self, params):
+        return [float(v) for v in params.reshape(-1)[:8]]
+
+
+def _idw(distance_sq, values):
+    # Inverso do quadrado da distância; exato sobre os pontos (mesmo piso de MeshTransform)
+    weights = 1.0 / np.maximum(distance_sq, 1e-12)
+    return (weights @ values) / weights.sum(axis=-1, keepdims=True)
+
+
+class MeshModel:
+    """Affine base plus inverse-distance interpolation of the residual at every point (exact on the points)
+
+    Os pesos entram só na base afim; a interpolação continua exata nos pontos.
+    """
+
+    name = "mesh"
+    min_points = 4
+    interpolating = True  # erro cai com a densidade de pontos (AirScan_Adaptive)
+    base = AffineModel()
+
+    def fit(self, airscan, screen, rect, weights=None):
+        coefficients = self.base.fit(airscan, screen, rect, weights)
+        return coefficients, airscan.copy(), screen - self.base.raw_predict(coefficients, airscan)
+
+    def predict(self, params, airscan, rect):
+        coefficients, anchors, residual = params
+        distance_sq = ((airscan[:, None, :] - anchors[None, :, :]) ** 2).sum(axis=-1)
+        return _clamp_to_rect(self.base.raw_predict(coefficients, airscan) + _idw(distance_sq, residual), rect)
+
+    def loo_predict(self, airscan, screen, rect, weights=None):
+        n = len(airscan)
+        if n <= self.min_points:
+            return np.full((n, 2), np.nan)
+        # Base afim sem o ponto i, em lote: (n, 3, 2)
+        matrix = self.base.design(airscan)[0]
+        weight = _row_scale(weights, n) ** 2
+        mtm_i = np.einsum("n,ni,nj->nij", weight, matrix, matrix)
+        mts_i = np.einsum("n,ni,nc->nic", weight, matrix, screen)
+        try:
+            coefficients = np.linalg.solve(mtm_i.sum(axis=0) - mtm_i, mts_i.sum(axis=0) - mts_i)
+        except np.linalg.LinAlgError:
+            return np.full((n, 2), np.nan)
+        # base[i, j]: ponto j pela base ajustada sem i
+        base = np.einsum("jk,ikc->ijc", matrix, coefficients)
+        residual = screen[None, :, :] - base
+        distance_sq = ((airscan[:, None, :] - airscan[None, :, :]) ** 2).sum(axis=-1)
+        weights = 1.0 / np.maximum(distance_sq, 1e-12)
+        np.fill_diagonal(weights, 0.0)
+        correction = np.einsum("ij,ijc->ic", weights, residual) / weights.sum(axis=1)[:, None]
+        return _clamp_to_rect(base[np.arange(n), np.arange(n)] + correction, rect)
+
+    def export(self, params):
+        coefficients, anchors, residual = params
+        return {
+            "affine": self.base.export(coefficients),
+            "anchors": [[float(a[0]), float(a[1]), float(r[0]), float(r[1])] for a, r in zip(anchors, residual)],
+        }
+
+
+# Do mais simples ao mais complexo: em empate na seleção vence o primeiro
+MODELS = {model.name: model for model in (LinearRangeModel(), PerAxisLinearModel(), AffineModel(),
+                                          BilinearModel(), HomographyModel(), MeshModel())}
+DEFAULT_MODEL = "linear_range"
+
+# Diferença de RMS LOO (px) abaixo da qual o modelo mais simples é preferido
+# (o truncamento para pixel inteiro já introduz até ~1px)
+MODEL_TIE_TOLERANCE = 1.0
+
+
+def model_name(data):
+    """Name of the model a calibration document was fitted with"""
+    return (calibration_model(data) or {}).get("name") or DEFAULT_MODEL
+
+
+def summarize(errors):
+    """mean / rms / median / p95 / max of an error vector (NaN ignored); None if empty"""
+    errors = errors[np.isfinite(errors)]
+    if not errors.size:
+        return None
+    return {
+        "mean": round(float(errors.mean()), 2),
+        "rms": round(float(np.sqrt(np.mean(errors ** 2))), 2),
+        "median": round(float(np.median(errors)), 2),
+        "p95": round(float(np.percentile(errors, 95)), 2),
+        "max": round(float(errors.max()), 2),
+    }
+
+
+def evaluate(data, screen_width, screen_height, model=None):
+    """Accuracy report of a calibration document (errors in screen pixels)"""
+    model = MODELS[model or model_name(data)]
+    names, airscan, screen = point_arrays(data)
+    if len(names) < model.min_points:
+        raise ValueError(f"{model.name} precisa de pelo menos {model.min_points} pontos")
+    rect = target_rect(data, screen_width, screen_height)
+    weights = point_weights(data, names)
+
+    residual = model.predict(model.fit(airscan, screen, rect, weights), airscan, rect) - screen
+    error = np.hypot(residual[:, 0], residual[:, 1])
+    loo_residual = model.loo_predict(airscan, screen, rect, weights) - screen
+    loo_error = np.hypot(loo_residual[:, 0], loo_residual[:, 1])
+
+    ranking = np.where(np.isfinite(loo_error), loo_error, error)
+    return {
+        "model": model.name,
+        "points": len(names),
+        "weighted": weights is not None,
+        "evaluated_at": time.time(),
+        "rect": list(rect),
+        "fit": summarize(error),
+        "loo": summarize(loo_error),
+        "worst_point": names[int(np.argmax(ranking))],
+        "per_point": {
+            name: {
+                "screen": [float(screen[i, 0]), float(screen[i, 1])],
+                "dx": round(float(residual[i, 0]), 2),
+                "dy": round(float(residual[i, 1]), 2),
+                "error": round(float(error[i]), 2),
+                "loo_error": round(float(loo_error[i]), 2) if np.isfinite(loo_error[i]) else None,
+                "weight": round(float(weights[i]), 3) if weights is not None else None,
+            }
+            for i, name in enumerate(names)
+        },
+    }
+
+
+def score_model(name, airscan, screen, rect, weights=None):
+    """Fit one candidate model and score it (runs in a worker process; arrays in, plain dict out)"""
+    model = MODELS[name]
+    params = model.fit(airscan, screen, rect, weights)
+    residual = model.predict(params, airscan, rect) - screen
+    loo_residual = model.loo_predict(airscan, screen, rect, weights) - screen
+    return {
+        "name": name,
+        "params": model.export(params),
+        "fit": summarize(np.hypot(residual[:, 0], residual[:, 1])),
+        "loo": summarize(np.hypot(loo_residual[:, 0], loo_residual[:, 1])),
+    }
+
+
+def candidate_models(count):
+    """Models whose leave-one-out score is defined for this many points"""
+    return [name for name, model in MODELS.items() if count > model.min_points]
+
+
+def choose_model(results):
+    """Lowest LOO RMS; within MODEL_TIE_TOLERANCE the simpler model (registry order) wins"""
+    scored = [r for r in results if r.get("loo")]
+    if not scored:
+        return None
+    best = min(r["loo"]["rms"] for r in scored)
+    order = list(MODELS)
+    return min((r for r in scored if r["loo"]["rms"] <= best + MODEL_TIE_TOLERANCE),
+               key=lambda r: order.index(r["name"]))
+
+
+class ModelSelection:
+    """Fits every candidate model in a process pool (one job per model) without blocking the caller
+
+    done() pode ser consultado periodicamente (ex.: timer do Tk); result()
+    bloqueia até o fim e devolve o documento gravado em "model".
+    """
+
+    def __init__(self, data, screen_width, screen_height, executor=None):
+        names, airscan, screen = point_arrays(data)
+        rect = target_rect(data, screen_width, screen_height)
+        weights = point_weights(data, names)
+        self.weighted = weights is not None
+        self.candidates = candidate_models(len(names))
+        self.executor = executor
+        self._owns_executor = executor is None
+        self.futures = {}
+        if not self.candidates:
+            return
+        if self.executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn: a calibração roda dentro do controle (threads OSC, log, métricas, Tk);
+            # fork copiaria locks presos por essas threads e poderia travar os workers
+            self.executor = ProcessPoolExecutor(max_workers=min(len(self.candidates), os.cpu_count() or 1),
+                                                mp_context=multiprocessing.get_context("spawn"))
+        self.futures = {name: self.executor.submit(score_model, name, airscan, screen, rect, weights)
+                        for name in self.candidates}
+
+    def done(self):
+        return all(future.done() for future in self.futures.values())
+
+    def progress(self):
+        """(finished, total) candidate fits"""
+        return sum(future.done() for future in self.futures.values()), len(self.futures)
+
+    def result(self):
+        """{"name", "params", "scores", ...} of the winner, or None if no candidate could be scored"""
+        results = []
+        for name, future in self.futures.items():
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({"name": name, "error": str(e)})
+        self._shutdown()
+        winner = choose_model(results)
+        if winner is None:
+            return None
+        scores = {}
+        for r in results:
+            if r.get("loo"):
+                scores[r["name"]] = {"fit_rms": r["fit"]["rms"], "loo_rms": r["loo"]["rms"], "loo_p95": r["loo"]["p95"]}
+            else:
+                scores[r["name"]] = {"error": r.get("error", "leave-one-out indefinido")}
+        return {
+            "name": winner["name"],
+            "params": winner["params"],
+            "selected_by": "loo_rms",
+            "weighted": self.weighted,
+            "selected_at": time.time(),
+            "scores": scores,
+        }
+
+    def cancel(self):
+        for future in self.futures.values():
+            future.cancel()
+        self._shutdown()
+
+    def _shutdown(self):
+        if self._owns_executor and self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+
+def select_model(data, screen_width, screen_height, executor=None):
+    """Blocking model selection (CLI / tools); see ModelSelection"""
+    return ModelSelection(data, screen_width, screen_height, executor).result()
+
+
+def format_selection(selection):
+    """Console lines with every candidate's LOO score and the winner"""
+    lines = []
+    for name, score in sorted(selection["scores"].items(), key=lambda item: item[1].get("loo_rms", float("inf"))):
+        mark = "  <-" if name == selection["name"] else ""
+        if "loo_rms" in score:
+            lines.append(f"[PRECISÃO]   {name:<13} LOO RMS {score['loo_rms']:7.2f}px | p95 {score['loo_p95']:7.2f}px "
+                         f"| ajuste {score['fit_rms']:.2f}px{mark}")
+        else:
+            lines.append(f"[PRECISÃO]   {name:<13} {score['error']}")
+    return [f"[PRECISÃO] Modelo escolhido: {selection['name']} (menor RMS leave-one-out)"] + lines
+
+
+def error_field(report, cols=48, rows=27):
+    """Estimated error (px) over the calibration area: inverse-distance weighting of per-point errors
+
+    Usa o erro LOO de cada ponto (o do ajuste quando o LOO não existe).
+    Retorna uma matriz (rows, cols) com o centro de cada célula.
+    """
+    x1, y1, x2, y2 = report["rect"]
+    per_point = report["per_point"].values()
+    positions = np.array([p["screen"] for p in per_point], dtype=float)
+    errors = np.array([p["loo_error"] if p["loo_error"] is not None else p["error"] for p in per_point],
+                      dtype=float)
+
+    xs = x1 + (np.arange(cols) + 0.5) * (x2 - x1) / cols
+    ys = y1 + (np.arange(rows) + 0.5) * (y2 - y1) / rows
+    grid_x, grid_y = np.meshgrid(xs, ys)
+    # Distâncias célula x ponto, (rows, cols, n)
+    distance_sq = (grid_x[..., None] - positions[:, 0]) ** 2 + (grid_y[..., None] - positions[:, 1]) ** 2
+    weights = 1.0 / np.maximum(distance_sq, 1.0)
+    return (weights * errors).sum(axis=-1) / weights.sum(axis=-1)
+
+
+def render_text(field, scale_max=None):
+    """Heatmap as text lines (one char per cell) plus a legend"""
+    scale_max = scale_max or float(field.max()) or 1.0
+    levels = np.clip((field / scale_max * (len(HEATMAP_CHARS) - 1)).round().astype(int), 0, len(HEATMAP_CHARS) - 1)
+    lines = ["+" + "-" * field.shape[1] + "+"]
+    lines.extend("|" + "".join(HEATMAP_CHARS[level] for level in row) + "|" for row in levels)
+    lines.append("+" + "-" * field.shape[1] + "+")
+    lines.append(f"'{HEATMAP_CHARS[1]}' ~{scale_max / (len(HEATMAP_CHARS) - 1):.1f}px ... "
+                 f"'{HEATMAP_CHARS[-1]}' >= {scale_max:.1f}px")
+    return lines
+
+
+def _color(fraction):
+    # Verde (0) -> amarelo -> vermelho (1)
+    fraction = min(1.0, max(0.0, fraction))
+    red = int(255 * min(1.0, 2 * fraction))
+    green = int(255 * min(1.0, 2 * (1 - fraction)))
+    return f"#{red:02x}{green:02x}40"
+
+
+def render_svg(report, field):
+    """Heatmap over the calibration area as an SVG document (screen pixel coordinates)"""
+    x1, y1, x2, y2 = report["rect"]
+    rows, cols = field.shape
+    cell_w = (x2 - x1) / cols
+    cell_h = (y2 - y1) / rows
+    scale_max = float(field.max()) or 1.0
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{x1} {y1} {x2 - x1} {y2 - y1}" '
+             f'width="{x2 - x1}" height="{y2 - y1}">',
+             f'<title>AirScan - erro de calibração ({report["model"]})</title>']
+    for r in range(rows):
+        for c in range(cols):
+            parts.append(f'<rect x="{x1 + c * cell_w:.1f}" y="{y1 + r * cell_h:.1f}" width="{cell_w + 0.5:.1f}" '
+                         f'height="{cell_h + 0.5:.1f}" fill="{_color(field[r, c] / scale_max)}"/>')
+    for name, point in report["per_point"].items():
+        sx, sy = point["screen"]
+        error = point["loo_error"] if point["loo_error"] is not None else point["error"]
+        parts.append(f'<circle cx="{sx}" cy="{sy}" r="8" fill="none" stroke="#000" stroke-width="3"/>')
+        parts.append(f'<text x="{sx + 12}" y="{sy - 12}" font-family="sans-serif" font-size="22" '
+                     f'fill="#000">{name} {error:.1f}px</text>')
+    loo = report["loo"] or report["fit"]
+    parts.append(f'<text x="{x1 + 20}" y="{y2 - 20}" font-family="sans-serif" font-size="26" fill="#000">'
+                 f'RMS {loo["rms"]}px | p95 {loo["p95"]}px | max {loo["max"]}px (0-{scale_max:.0f}px)</text>')
+    parts.append("</svg>")
+    return "\n".join(parts) + "\n"
+
+
+def format_summary(report):
+    """Console lines summarising a report"""
+    weighted = " (ponderado pela variância de cada ponto)" if report.get("weighted") else ""
+    lines = [f"[PRECISÃO] Modelo {report['model']} com {report['points']} pontos{weighted}"]
+    for label, key in (("ajuste", "fit"), ("leave-one-out", "loo")):
+        stats = report[key]
+        if stats:
+            lines.append(f"[PRECISÃO]   {label}: média {stats['mean']}px | RMS {stats['rms']}px | "
+                         f"p95 {stats['p95']}px | máx {stats['max']}px")
+        else:
+            lines.append(f"[PRECISÃO]   {label}: pontos insuficientes")
+    lines.append(f"[PRECISÃO]   Pior ponto: {report['worst_point']}")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Relatório de precisão da calibração do AirScan")
+    parser.add_argument("--file", default=CALIBRATION_FILE)
+    parser.add_argument("--sensor", default=None, help="sensor de uma sala multi-sensor")
+    parser.add_argument("--output", default=None, help="saída de um desktop com vários projetores")
+    parser.add_argument("--svg", default=None, help="grava o mapa de calor em SVG")
+    parser.add_argument("--select", action="store_true", help="ajusta todos os modelos e escolhe o de menor erro LOO")
+    parser.add_argument("--save", action="store_true", help='grava o resumo em "accuracy" (e "model" com --select) no arquivo')
+    parser.add_argument("--cols", type=int, default=48)
+    parser.add_argument("--rows", type=int, default=18)
+    args = parser.parse_args(argv)
+
+    document = load_json(args.file)
+    if not document:
+        print(f"[ERROR] {args.file} não encontrado")
+        return 2
+    data = sensor_calibration(document, args.sensor) if args.sensor else document
+    screen = data.get("screen") or document.get("screen") or {}
+    outputs = data.get("outputs") or {}
+    if args.output or outputs:
+        # Cada saída tem os seus pontos e o seu modelo: avaliada separadamente
+        if args.output not in outputs:
+            print(f"[ERROR] Escolha a saída com --output ({', '.join(outputs) or 'nenhuma saída no arquivo'})")
+            return 2
+        parent, data = data, output_calibration(data, args.output)
+    screen_width, screen_height = screen.get("width", 1920), screen.get("height", 1080)
+    if args.select:
+        selection = select_model(data, screen_width, screen_height)
+        if selection is None:
+            print("[ERROR] Pontos insuficientes para comparar modelos")
+            return 1
+        for line in format_selection(selection):
+            print(line)
+        data["model"] = selection
+    try:
+        report = evaluate(data, screen_width, screen_height)
+    except (KeyError, ValueError) as e:
+        print(f"[ERROR] Calibração não avaliada: {e}")
+        return 1
+
+    for line in format_summary(report):
+        print(line)
+    for name, point in sorted(report["per_point"].items(), key=lambda item: -item[1]["error"]):
+        loo = f"{point['loo_error']:.1f}px" if point["loo_error"] is not None else "n/d"
+        print(f"    {name:<16} erro {point['error']:6.1f}px (dx {point['dx']:+.1f}, dy {point['dy']:+.1f}) | LOO {loo}")
+
+    field = error_field(report, args.cols, args.rows)
+    for line in render_text(field):
+        print("    " + line)
+    if args.svg:
+        with open(args.svg, "w") as f:
+            f.write(render_svg(report, field))
+        print(f"[PRECISÃO] Mapa de calor gravado em {args.svg}")
+    if args.save:
+        data["accuracy"] = report
+        if args.output:
+            parent["outputs"][args.output].update({key: data[key] for key in ("model", "accuracy") if key in data})
+        atomic_write_json(args.file, document)
+        saved = '"model" e "accuracy"' if args.select else '"accuracy"'
+        print(f'[PRECISÃO] Resumo gravado em {saved} ({args.file})')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""
+Reconhecimento de gestos sobre o fluxo de blobs do AirScan.
+
+BlobTracker junta as mensagens /airscan/blob/<n>/x|y de vários blobs em um
+quadro {blob_id: (x, y)} em pixels de tela; blobs sem atualização por
+`timeout` segundos são considerados levantados. GestureRecognizer recebe um
+quadro por amostra e roda máquinas de estado de custo constante (sem guardar
+trajetórias):
+
+    1 dedo:  long_press (parado por LONG_PRESS_TIME) e swipe_left/right/up/down
+             (deslocamento rápido, avaliado ao levantar)
+    2 dedos: scroll (centroide na vertical) ou pinch_in/pinch_out (distância
+             entre os dedos); o primeiro que passar do limiar trava o modo
+
+Os eventos saem pelo backend de saída: scroll vira roda do mouse; os demais
+seguem GESTURE_ACTIONS (lista de teclas = atalho, "right_click", ...).
+"""
+
+import math
+from collections import namedtuple
+
+from AirScan_Log import get_logger
+from AirScan_Metrics import counter
+
+log = get_logger("gestures")
+metric_gestures = counter("airscan_gestures_total", "Gestos reconhecidos", ("gesture",))
+
+GESTURES = ("swipe_left", "swipe_right", "swipe_up", "swipe_down", "long_press", "pinch_in", "pinch_out", "scroll")
+CLICK_ACTIONS = ("left_click", "right_click", "middle_click", "double_click")
+
+# Limiares (pixels de tela / segundos)
+LONG_PRESS_TIME = 0.8
+LONG_PRESS_RADIUS = 15
+SWIPE_MIN_DISTANCE = 200
+SWIPE_MAX_DURATION = 0.5
+SWIPE_AXIS_RATIO = 2.0      # eixo dominante pelo menos 2x o outro
+SCROLL_START = 20           # deslocamento do centroide que decide "scroll"
+SCROLL_STEP = 40            # pixels por clique da roda
+PINCH_START = 0.15          # variação relativa da distância que decide "pinch"
+PINCH_STEP = 0.25           # variação relativa por evento de zoom
+
+Gesture = namedtuple("Gesture", ["name", "value", "x", "y", "timestamp"])
+
+_IDLE, _ONE, _TWO, _LOCKED = range(4)
+
+
+class BlobTracker:
+    """Latest screen position of each active blob; stale blobs are dropped on the next update"""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.blobs = {}     # blob_id -> (x, y)
+        self.updated = {}   # blob_id -> timestamp
+
+    def update(self, blob_id, x, y, timestamp):
+        """Record a blob position and return the current frame {blob_id: (x, y)}"""
+        self.blobs[blob_id] = (x, y)
+        self.updated[blob_id] = timestamp
+        self.expire(timestamp)
+        return self.blobs
+
+    def expire(self, now):
+        limit = now - self.timeout
+        for blob_id in [b for b, t in self.updated.items() if t < limit]:
+            del self.blobs[blob_id]
+            del self.updated[blob_id]
+        return self.blobs
+
+    def clear(self):
+        self.blobs.clear()
+        self.updated.clear()
+
+
+class GestureRecognizer:
+    """Incremental one/two-finger gesture state machine; feed() is O(1) per frame"""
+
+    def __init__(self, on_gesture):
+        self.on_gesture = on_gesture
+        self.state = _IDLE
+        # Um dedo
+        self.start_x = self.start_y = 0.0
+        self.start_time = 0.0
+        self.last_x = self.last_y = 0.0
+        self.last_time = 0.0
+        self.max_distance = 0.0
+        self.long_press_fired = False
+        # Dois dedos
+        self.mode = None
+        self.reference_y = 0.0
+        self.reference_distance = 1.0
+
+    @property
+    def multi_touch(self):
+        """True while two fingers are (or were, until all lift) on the surface"""
+        return self.state >= _TWO
+
+    def _emit(self, name, value, x, y, timestamp):
+        metric_gestures.labels(name).inc()
+        self.on_gesture(Gesture(name, value, x, y, timestamp))
+
+    def feed(self, frame, timestamp):
+        """Advance the state machine with the current frame {blob_id: (x, y)}"""
+        count = len(frame)
+        if count == 0:
+            self.release(timestamp)
+        elif count == 1:
+            if self.state == _IDLE:
+                self._begin_one(next(iter(frame.values())), timestamp)
+            elif self.state == _ONE:
+                self._update_one(next(iter(frame.values())), timestamp)
+            elif self.state == _TWO:
+                # Um dos dedos saiu: nada de swipe/long press até levantar todos
+                self.state = _LOCKED
+        else:
+            first, second = sorted(frame)[:2]
+            if self.state != _TWO:
+                self._begin_two(frame[first], frame[second])
+            else:
+                self._update_two(frame[first], frame[second], timestamp)
+
+    def release(self, timestamp):
+        """All fingers lifted (also called by the control's data watchdog)"""
+        if self.state == _ONE and not self.long_press_fired:
+            self._finish_swipe()
+        self.state = _IDLE
+        self.mode = None
+
+    # --- um dedo ---------------------------------------------------------
+
+    def _begin_one(self, point, timestamp):
+        self.state = _ONE
+        self.start_x, self.start_y = self.last_x, self.last_y = point
+        self.start_time = self.last_time = timestamp
+        self.max_distance = 0.0
+        self.long_press_fired = False
+
+    def _update_one(self, point, timestamp):
+        self.last_x, self.last_y = point
+        self.last_time = timestamp
+        distance = math.hypot(self.last_x - self.start_x, self.last_y - self.start_y)
+        if distance > self.max_distance:
+            self.max_distance = distance
+        if (not self.long_press_fired and self.max_distance <= LONG_PRESS_RADIUS
+                and timestamp - self.start_time >= LONG_PRESS_TIME):
+            self.long_press_fired = True
+            self._emit("long_press", None, self.start_x, self.start_y, timestamp)
+
+    def _finish_swipe(self):
+        dx = self.last_x - self.start_x
+        dy = self.last_y - self.start_y
+        if self.last_time - self.start_time > SWIPE_MAX_DURATION:
+            return
+        if abs(dx) >= SWIPE_MIN_DISTANCE and abs(dx) >= SWIPE_AXIS_RATIO * abs(dy):
+            name = "swipe_right" if dx > 0 else "swipe_left"
+        elif abs(dy) >= SWIPE_MIN_DISTANCE and abs(dy) >= SWIPE_AXIS_RATIO * abs(dx):
+            name = "swipe_down" if dy > 0 else "swipe_up"
+        else:
+            return
+        self._emit(name, (dx, dy), self.start_x, self.start_y, self.last_time)
+
+    # --- dois dedos ------------------------------------------------------
+
+    def _begin_two(self, a, b):
+        self.state = _TWO
+        self.mode = None
+        self.reference_y = (a[1] + b[1]) / 2
+        self.reference_distance = max(1.0, math.hypot(a[0] - b[0], a[1] - b[1]))
+
+    def _update_two(self, a, b, timestamp):
+        center_x = (a[0] + b[0]) / 2
+        center_y = (a[1] + b[1]) / 2
+        distance = max(1.0, math.hypot(a[0] - b[0], a[1] - b[1]))
+        ratio = distance / self.reference_distance
+
+        if self.mode is None:
+            if abs(center_y - self.reference_y) >= SCROLL_START:
+                self.mode = "scroll"
+            elif abs(ratio - 1.0) >= PINCH_START:
+                self.mode = "pinch"
+            else:
+                return
+
+        if self.mode == "scroll":
+            # Rolagem "natural": arrastar para baixo mostra o conteúdo de cima (roda positiva)
+            clicks = int((center_y - self.reference_y) / SCROLL_STEP)
+            if clicks:
+                self.reference_y += clicks * SCROLL_STEP
+                self._emit("scroll", clicks, center_x, center_y, timestamp)
+        elif ratio >= 1.0 + PINCH_STEP:
+            self.reference_distance = distance
+            self._emit("pinch_out", ratio, center_x, center_y, timestamp)
+        elif ratio <= 1.0 / (1.0 + PINCH_STEP):
+            self.reference_distance = distance
+            self._emit("pinch_in", ratio, center_x, center_y, timestamp)
+
+
+def validate_actions(actions):
+    """Error messages for a gesture -> action mapping (used by AirScan_Config)"""
+    errors = []
+    for name, action in actions.items():
+        if name not in GESTURES or name == "scroll":
+            errors.append(f"gesture_actions.{name}: gesto desconhecido (use {', '.join(GESTURES[:-1])})")
+        elif action is None or action in CLICK_ACTIONS:
+            continue
+        elif not (isinstance(action, list) and action and all(isinstance(key, str) for key in action)):
+            errors.append(f"gesture_actions.{name} deve ser null, {', '.join(CLICK_ACTIONS)} ou uma lista de teclas")
+    return errors
+
+
+class GestureEngine:
+    """Blob tracker + recognizer, dispatching gestures to the output backend"""
+
+    def __init__(self, output, actions, blob_timeout, mapper=None):
+        self.output = output
+        self.actions = dict(actions)
+        self.mapper = mapper
+        self.tracker = BlobTracker(blob_timeout)
+        self.recognizer = GestureRecognizer(self.dispatch)
+
+    @property
+    def suppress_pointer(self):
+        """The cursor should not follow the primary finger during two-finger gestures"""
+        return self.recognizer.multi_touch
+
+    def on_blob(self, blob_id, x, y, timestamp):
+        """Feed one complete blob sample (sensor coordinates)"""
+        if self.mapper:
+            x, y = self.mapper(x, y)
+        self.recognizer.feed(self.tracker.update(blob_id, x, y, timestamp), timestamp)
+
+    def release(self, timestamp):
+        self.tracker.clear()
+        self.recognizer.release(timestamp)
+
+    def dispatch(self, gesture):
+        if gesture.name == "scroll":
+            self.output.scroll(gesture.value)
+            log.debug("Scroll %+d", gesture.value)
+            return
+        action = self.actions.get(gesture.name)
+        if action is None:
+            log.debug("Gesto %s sem ação", gesture.name)
+            return
+        if action == "double_click":
+            self.output.click("left", 2)
+        elif action in CLICK_ACTIONS:
+            self.output.click(action.split("_")[0])
+        else:
+            self.output.hotkey(*action)
+        log.info("Gesto %s -> %s", gesture.name, action)
@@ -0,0 +1,261 @@
+"""
+Pipeline de ingestão do AirScan.
+
+O servidor OSC do controle é o único dono da porta; cada amostra (x, y,
+timestamp) é publicada em um estágio "tee" que repassa para todos os
+consumidores inscritos (saída do mouse, calibração em processo, etc.).
+
+Para salas com vários sensores, MultiSensorIngest escuta várias portas /
+origens, marca cada amostra com o sensor, aplica a calibração daquele
+sensor e entrega tudo em um único espaço de tela, descartando blobs
+duplicados nas zonas de sobreposição.
+"""
+
+import socket
+import threading
+from collections import namedtuple
+
+from AirScan_Clock import CLOCK
+from AirScan_Log import get_logger
+from AirScan_Metrics import counter
+
+log = get_logger("ingest")
+metric_overlap_dropped = counter("airscan_overlap_dropped_total",
+                                 "Amostras descartadas como duplicatas na sobreposição de sensores", ("sensor",))
+metric_sensor_samples = counter("airscan_sensor_samples_total", "Amostras X/Y completas por sensor", ("sensor",))
+
+
+class SampleTee:
+    """Fan-out stage that publishes every (x, y, timestamp) sample to all subscribers"""
+
+    def __init__(self):
+        # Tupla imutável: publish() itera sem lock; inscrições trocam a referência
+        self._consumers = ()
+        self._lock = threading.Lock()
+
+    def subscribe(self, consumer):
+        """Add a consumer(x, y, timestamp); returns the consumer for later unsubscribe"""
+        with self._lock:
+            self._consumers = self._consumers + (consumer,)
+        return consumer
+
+    def unsubscribe(self, consumer):
+        with self._lock:
+            self._consumers = tuple(c for c in self._consumers if c != consumer)
+
+    def publish(self, x, y, timestamp):
+        for consumer in self._consumers:
+            try:
+                consumer(x, y, timestamp)
+            except Exception as e:
+                log.error("Consumidor de amostras falhou: %s", e)
+
+    def __len__(self):
+        return len(self._consumers)
+
+
+# id: nome do sensor; address: IP de origem (opcional, para sensores na mesma porta)
+SensorSource = namedtuple("SensorSource", ["id", "port", "blob_id", "address"])
+
+
+def parse_sensor_sources(sensors, default_port, default_blob_id):
+    """Build SensorSource tuples from config dicts ({"id", "port", "blob_id", "address"})"""
+    return [
+        SensorSource(
+            str(sensor.get("id", index)),
+            int(sensor.get("port", default_port)),
+            int(sensor.get("blob_id", default_blob_id)),
+            sensor.get("address")
+        )
+        for index, sensor in enumerate(sensors)
+    ]
+
+
+_reuse_port_server_class = None
+
+
+def reuse_port_server(address, dispatcher):
+    """Single-threaded OSC server that binds with SO_REUSEPORT when available
+
+    Vários sockets na mesma porta recebem os datagramas distribuídos pelo
+    kernel por hash da origem: cada sensor fica fixo em um worker. A classe
+    é criada no primeiro uso (pythonosc só é importado quando a ingestão sobe).
+    """
+    global _reuse_port_server_class
+    if _reuse_port_server_class is None:
+        from pythonosc import osc_server
+
+        class ReusePortOSCUDPServer(osc_server.BlockingOSCUDPServer):
+            allow_reuse_address = True
+
+            def server_bind(self):
+                if hasattr(socket, "SO_REUSEPORT"):
+                    try:
+                        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+                    except OSError:
+                        pass
+                super().server_bind()
+
+        _reuse_port_server_class = ReusePortOSCUDPServer
+    return _reuse_port_server_class(address, dispatcher)
+
+
+class OverlapDeduplicator:
+    """Drops blobs that a higher-priority sensor already reports nearby (spatial hash)"""
+
+    def __init__(self, radius, window):
+        self.radius = radius
+        self.radius_sq = radius * radius
+        self.window = window
+        # célula -> {prioridade: (x, y, timestamp)}; cada sensor ocupa no máximo uma célula
+        self.grid = {}
+        self.cells = {}
+        # Chamado pelas threads de todos os sockets: pop/limpeza da célula não é atômico
+        self.lock = threading.Lock()
+
+    def accept(self, priority, x, y, timestamp):
+        with self.lock:
+            return self._accept(priority, x, y, timestamp)
+
+    def _accept(self, priority, x, y, timestamp):
+        cx = int(x // self.radius)
+        cy = int(y // self.radius)
+
+        # Atualiza a célula deste sensor
+        previous = self.cells.get(priority)
+        if previous is not None and previous != (cx, cy):
+            entries = self.grid.get(previous)
+            if entries is not None:
+                entries.pop(priority, None)
+                if not entries:
+                    self.grid.pop(previous, None)
+        self.grid.setdefault((cx, cy), {})[priority] = (x, y, timestamp)
+        self.cells[priority] = (cx, cy)
+
+        # Vizinhança 3x3: custo constante por amostra
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                entries = self.grid.get((cx + dx, cy + dy))
+                if not entries:
+                    continue
+                for other, (ox, oy, ot) in list(entries.items()):
+                    if other >= priority or timestamp - ot > self.window:
+                        continue
+                    if (ox - x) ** 2 + (oy - y) ** 2 <= self.radius_sq:
+                        return False
+        return True
+
+
+class _SensorState:
+    __slots__ = ("source", "priority", "x", "y", "tee", "samples", "overlap_dropped")
+
+    def __init__(self, source, priority):
+        self.source = source
+        self.priority = priority
+        self.x = None
+        self.y = None
+        self.tee = SampleTee()
+        self.samples = metric_sensor_samples.labels(source.id)
+        self.overlap_dropped = metric_overlap_dropped.labels(source.id)
+
+
+class MultiSensorIngest:
+    """Listens to several AirScan sensors and merges them into one screen-space stream"""
+
+    def __init__(self, sources, compile_sensor, store, on_screen_sample,
+                 dedupe_radius=40, dedupe_window=0.1, workers_per_port=1, clock=CLOCK):
+        self.sources = list(sources)
+        self.clock = clock
+        self.compile_sensor = compile_sensor
+        self.store = store
+        self.on_screen_sample = on_screen_sample
+        self.workers_per_port = max(1, workers_per_port) if hasattr(socket, "SO_REUSEPORT") else 1
+        self.dedupe = OverlapDeduplicator(dedupe_radius, dedupe_window)
+        self.sensors = {source.id: _SensorState(source, index) for index, source in enumerate(self.sources)}
+        self.servers = []
+        # (snapshot, {sensor_id: transform}) - recompilado só quando o store troca o snapshot
+        self._compiled = (None, {})
+
+    def raw_tee(self, sensor_id):
+        """Tee of raw (x, y, timestamp) samples for one sensor (used by calibration)"""
+        return self.sensors[sensor_id].tee
+
+    def transforms(self):
+        snapshot = self.store.snapshot
+        compiled_for, transforms = self._compiled
+        if compiled_for is not snapshot:
+            transforms = {sensor_id: self.compile_sensor(snapshot.data, sensor_id) for sensor_id in self.sensors}
+            self._compiled = (snapshot, transforms)
+        return transforms
+
+    def _build_dispatcher(self, port):
+        from pythonosc.dispatcher import Dispatcher
+        dispatcher = Dispatcher()
+        by_blob = {}
+        for state in self.sensors.values():
+            if state.source.port == port:
+                by_blob.setdefault(state.source.blob_id, []).append(state)
+
+        for blob_id, states in by_blob.items():
+            for axis in ("x", "y"):
+                dispatcher.map(
+                    f"/airscan/blob/{blob_id}/{axis}",
+                    self._make_handler(states, axis),
+                    needs_reply_address=True
+                )
+        return dispatcher
+
+    def _make_handler(self, states, axis):
+        if len(states) == 1 and states[0].source.address is None:
+            state = states[0]
+
+            def handle(client_address, unused_addr, value):
+                self._on_value(state, axis, value)
+        else:
+            by_address = {s.source.address: s for s in states}
+
+            def handle(client_address, unused_addr, value):
+                state = by_address.get(client_address[0]) or by_address.get(None)
+                if state is not None:
+                    self._on_value(state, axis, value)
+        return handle
+
+    def _on_value(self, state, axis, value):
+        if axis == "x":
+            state.x = value
+        else:
+            state.y = value
+        if state.x is None or state.y is None:
+            return
+
+        timestamp = self.clock.now()
+        x, y = state.x, state.y
+        state.samples.inc()
+        state.tee.publish(x, y, timestamp)
+
+        screen_x, screen_y = self.transforms()[state.source.id](x, y)
+        if self.dedupe.accept(state.priority, screen_x, screen_y, timestamp):
+            self.on_screen_sample(state.source.id, screen_x, screen_y, timestamp)
+        else:
+            state.overlap_dropped.inc()
+
+    def start(self):
+        """Bind one server per port (times workers_per_port) and serve in daemon threads"""
+        for port in sorted({source.port for source in self.sources}):
+            dispatcher = self._build_dispatcher(port)
+            for _ in range(self.workers_per_port):
+                server = reuse_port_server(("0.0.0.0", port), dispatcher)
+                thread = threading.Thread(target=server.serve_forever, daemon=True,
+                                          name=f"airscan-ingest-{port}")
+                thread.start()
+                self.servers.append(server)
+        return self.servers
+
+    def stop(self):
+        for server in self.servers:
+            try:
+                server.shutdown()
+                server.server_close()
+            except Exception as e:
+                print(f"[WARNING] Erro ao encerrar servidor: {e}")
+        self.servers = []
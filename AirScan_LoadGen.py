@@ -0,0 +1,253 @@
+"""
+Gerador de carga OSC sintético para o AirScan (sem hardware).
+
+Emite /airscan/blob/<n>/x|y|z via UDP como o sensor real: uma mensagem por
+datagrama, vários blobs, taxas de até alguns kHz, padrões de movimento
+(linha, círculo, parado com ruído), quedas de toque, rajadas e
+perda/reordenação de pacotes. Roda ao lado do AirScan_Control em loopback.
+
+Uso:
+    python AirScan_LoadGen.py --rate 240 --pattern circle --duration 30
+    python AirScan_LoadGen.py --blobs 3 --rate 2000 --loss 0.02 --reorder 0.01
+    python AirScan_LoadGen.py --pattern line --dropout-period 2 --dropout-duration 0.5
+"""
+
+import argparse
+import math
+import random
+import socket
+import struct
+import sys
+import time
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8030
+DEFAULT_BLOB_ID = 6  # modo "Cave"
+DEFAULT_WIDTH = 1920
+DEFAULT_HEIGHT = 1080
+
+PATTERNS = ("line", "circle", "jitter")
+
+# Abaixo disso o agendador gira em vez de dormir (sleep tem granularidade de ~1ms)
+_SPIN_THRESHOLD_S = 0.002
+
+
+def _osc_string(value):
+    data = value.encode("ascii") + b"\0"
+    return data + b"\0" * (-len(data) % 4)
+
+
+class OscEncoder:
+    """Pre-encodes address + type tag so each message is one struct.pack"""
+
+    _FLOAT = struct.Struct(">f")
+
+    def __init__(self):
+        self._prefixes = {}
+
+    def float_message(self, address, value):
+        prefix = self._prefixes.get(address)
+        if prefix is None:
+            prefix = self._prefixes[address] = _osc_string(address) + _osc_string(",f")
+        return prefix + self._FLOAT.pack(value)
+
+
+def motion(pattern, t, index, width, height, rng, jitter=0.0, speed=0.25):
+    """AirScan-space (x, y) of blob `index` at time t for a motion pattern"""
+    # Cada blob percorre sua própria faixa da tela
+    phase = index * 0.37
+    if pattern == "line":
+        # Vai e volta na horizontal (onda triangular)
+        u = (t * speed + phase) % 2.0
+        u = u if u <= 1.0 else 2.0 - u
+        x = width * (0.1 + 0.8 * u)
+        y = height * (0.2 + 0.6 * ((index * 0.29) % 1.0))
+    elif pattern == "circle":
+        angle = 2 * math.pi * (t * speed + phase)
+        radius = min(width, height) * 0.3
+        x = width / 2 + radius * math.cos(angle)
+        y = height / 2 + radius * math.sin(angle)
+    else:  # "jitter": toque parado com ruído
+        x = width * (0.3 + 0.4 * ((index * 0.41) % 1.0))
+        y = height * (0.3 + 0.4 * ((index * 0.23) % 1.0))
+        jitter = jitter or 3.0
+
+    if jitter:
+        x += rng.gauss(0.0, jitter)
+        y += rng.gauss(0.0, jitter)
+    return min(max(x, 0.0), width), min(max(y, 0.0), height)
+
+
+class LoadGenerator:
+    """Schedules frames at a fixed rate and sends them with optional loss/reordering"""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, blob_ids=(DEFAULT_BLOB_ID,), rate=120.0,
+                 pattern="circle", width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, jitter=0.0, speed=0.25,
+                 send_z=True, loss=0.0, reorder=0.0, dropout_period=0.0, dropout_duration=0.0,
+                 burst_period=0.0, burst_frames=0, seed=None):
+        if pattern not in PATTERNS:
+            raise ValueError(f"Padrão inválido: {pattern} (use {', '.join(PATTERNS)})")
+        if rate <= 0:
+            raise ValueError("A taxa deve ser maior que zero")
+        self.address = (host, port)
+        self.blob_ids = tuple(blob_ids)
+        self.rate = rate
+        self.pattern = pattern
+        self.width = width
+        self.height = height
+        self.jitter = jitter
+        self.speed = speed
+        self.send_z = send_z
+        self.loss = loss
+        self.reorder = reorder
+        self.dropout_period = dropout_period
+        self.dropout_duration = dropout_duration
+        self.burst_period = burst_period
+        self.burst_frames = burst_frames
+        self.rng = random.Random(seed)
+        self.encoder = OscEncoder()
+        self.socket = None
+        self._held = None  # pacote retido para reordenação
+        self.stats = {"frames": 0, "messages": 0, "sent": 0, "lost": 0, "reordered": 0,
+                      "late_frames": 0, "dropout_frames": 0, "burst_frames": 0}
+
+    def in_dropout(self, t):
+        """True while the simulated touch is lifted (no X/Y: the control's watchdog releases)"""
+        if not self.dropout_period or not self.dropout_duration:
+            return False
+        return (t % self.dropout_period) >= self.dropout_period - self.dropout_duration
+
+    def frame_messages(self, t):
+        """Encoded OSC messages for every blob at time t"""
+        messages = []
+        for index, blob_id in enumerate(self.blob_ids):
+            x, y = motion(self.pattern, t, index, self.width, self.height, self.rng, self.jitter, self.speed)
+            base = f"/airscan/blob/{blob_id}/"
+            messages.append(self.encoder.float_message(base + "x", x))
+            messages.append(self.encoder.float_message(base + "y", y))
+            if self.send_z:
+                messages.append(self.encoder.float_message(base + "z", 1.0))
+        return messages
+
+    def _send(self, packet):
+        self.stats["messages"] += 1
+        if self.loss and self.rng.random() < self.loss:
+            self.stats["lost"] += 1
+            return
+        if self.reorder and self._held is None and self.rng.random() < self.reorder:
+            # Retém este pacote e o envia depois do próximo
+            self._held = packet
+            self.stats["reordered"] += 1
+            return
+        self.socket.sendto(packet, self.address)
+        self.stats["sent"] += 1
+        if self._held is not None:
+            held, self._held = self._held, None
+            self.socket.sendto(held, self.address)
+            self.stats["sent"] += 1
+
+    def _emit_frame(self, t):
+        self.stats["frames"] += 1
+        for packet in self.frame_messages(t):
+            self._send(packet)
+
+    def run(self, duration=None, stop_event=None):
+        """Send frames until duration elapses (None = until stop_event / Ctrl+C)"""
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        interval = 1.0 / self.rate
+        next_burst = self.burst_period if self.burst_period and self.burst_frames else None
+        start = time.perf_counter()
+        deadline = start
+        try:
+            while True:
+                now = time.perf_counter()
+                elapsed = deadline - start
+                if duration is not None and elapsed >= duration:
+                    break
+                if stop_event is not None and stop_event.is_set():
+                    break
+
+                # Agendamento absoluto: atrasos não se acumulam
+                wait = deadline - now
+                if wait > _SPIN_THRESHOLD_S:
+                    time.sleep(wait - _SPIN_THRESHOLD_S)
+                    continue
+                while time.perf_counter() < deadline:
+                    pass
+                if now - deadline > interval:
+                    self.stats["late_frames"] += 1
+
+                if self.in_dropout(elapsed):
+                    self.stats["dropout_frames"] += 1
+                else:
+                    self._emit_frame(elapsed)
+                    if next_burst is not None and elapsed >= next_burst:
+                        # Rajada: quadros extras sem espaçamento (ex.: buffer do sensor esvaziando)
+                        for _ in range(self.burst_frames):
+                            self._emit_frame(elapsed)
+                        self.stats["burst_frames"] += self.burst_frames
+                        next_burst += self.burst_period
+                deadline += interval
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if self._held is not None:
+                self.socket.sendto(self._held, self.address)
+                self.stats["sent"] += 1
+                self._held = None
+            self.socket.close()
+            self.socket = None
+
+        self.stats["elapsed"] = time.perf_counter() - start
+        return self.stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gerador de tráfego OSC sintético do AirScan")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--blob", type=int, default=DEFAULT_BLOB_ID, help="primeiro blob id")
+    parser.add_argument("--blobs", type=int, default=1, help="quantidade de blobs simultâneos")
+    parser.add_argument("--rate", type=float, default=120.0, help="quadros por segundo (por blob)")
+    parser.add_argument("--duration", type=float, default=None, help="segundos (padrão: até Ctrl+C)")
+    parser.add_argument("--pattern", choices=PATTERNS, default="circle")
+    parser.add_argument("--speed", type=float, default=0.25, help="voltas/travessias por segundo")
+    parser.add_argument("--jitter", type=float, default=0.0, help="ruído gaussiano (desvio, em unidades AirScan)")
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH)
+    parser.add_argument("--height", type=int, default=DEFAULT_HEIGHT)
+    parser.add_argument("--no-z", action="store_true", help="não envia /z")
+    parser.add_argument("--loss", type=float, default=0.0, help="probabilidade de perder cada pacote")
+    parser.add_argument("--reorder", type=float, default=0.0, help="probabilidade de trocar a ordem de um pacote")
+    parser.add_argument("--dropout-period", type=float, default=0.0, help="a cada N segundos o toque some...")
+    parser.add_argument("--dropout-duration", type=float, default=0.0, help="...por N segundos")
+    parser.add_argument("--burst-period", type=float, default=0.0, help="a cada N segundos envia uma rajada...")
+    parser.add_argument("--burst-frames", type=int, default=0, help="...de N quadros extras")
+    parser.add_argument("--seed", type=int, default=None, help="semente para execuções reproduzíveis")
+    args = parser.parse_args(argv)
+
+    try:
+        generator = LoadGenerator(
+            args.host, args.port, range(args.blob, args.blob + args.blobs), args.rate, args.pattern,
+            args.width, args.height, args.jitter, args.speed, not args.no_z, args.loss, args.reorder,
+            args.dropout_period, args.dropout_duration, args.burst_period, args.burst_frames, args.seed
+        )
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return 2
+
+    blobs = ", ".join(str(b) for b in generator.blob_ids)
+    print(f"[LOADGEN] {args.host}:{args.port} | Blobs {blobs} | {args.rate:g} Hz | padrão {args.pattern}")
+    if args.duration is None:
+        print("[LOADGEN] Ctrl+C para encerrar")
+
+    stats = generator.run(args.duration)
+    elapsed = stats["elapsed"] or 1.0
+    print(f"[LOADGEN] {stats['frames']} quadros em {elapsed:.2f}s ({stats['frames'] / elapsed:.1f} quadros/s), "
+          f"{stats['sent']} pacotes enviados")
+    print(f"[LOADGEN] Perdidos: {stats['lost']} | Reordenados: {stats['reordered']} | "
+          f"Atrasados: {stats['late_frames']} | Quedas: {stats['dropout_frames']} | Rajada: {stats['burst_frames']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
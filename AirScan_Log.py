@@ -0,0 +1,166 @@
+"""
+Logs estruturados e não bloqueantes do AirScan.
+
+O caminho quente no máximo cria um LogRecord e o coloca em uma fila em memória;
+formatação e escrita no console / arquivo JSONL acontecem em uma thread
+de fundo (QueueListener). Cada categoria pode ter um limite de taxa, de
+modo que logs de coordenadas a centenas de Hz não viram centenas de
+escritas por segundo - chamadas suprimidas nem chegam a criar o LogRecord.
+
+Categorias usam o logger "airscan.<categoria>" e aparecem no console como
+"[CATEGORIA] mensagem" (ou "[WARNING]" / "[ERROR]" pelo nível).
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+
+ROOT_LOGGER = "airscan"
+
+# Intervalo mínimo (s) entre mensagens de uma mesma categoria e nível
+DEFAULT_RATE_LIMITS = {
+    "airscan": 0.5,   # coordenadas (antes: log_interval de 500ms)
+    "mapping": 1.0,   # avisos de mapeamento padrão (antes: warning_interval de 1s)
+    "touch": 0.0,
+}
+
+_listener = None
+_loggers = {}
+
+
+def get_logger(category):
+    """Logger for a category, e.g. get_logger("touch") -> [TOUCH] ..."""
+    logger = _loggers.get(category)
+    if logger is None:
+        logger = _loggers[category] = CategoryLogger(category, DEFAULT_RATE_LIMITS.get(category, 0.0))
+    return logger
+
+
+class CategoryLogger:
+    """Rate-limited front for logging.Logger: suppressed calls never build a LogRecord"""
+
+    __slots__ = ("logger", "interval", "last_emit", "suppressed")
+
+    def __init__(self, category, interval):
+        self.logger = logging.getLogger(f"{ROOT_LOGGER}.{category}")
+        self.interval = interval
+        self.last_emit = {}
+        self.suppressed = 0
+
+    def _allow(self, level):
+        if not self.logger.isEnabledFor(level):
+            return False
+        if not self.interval:
+            return True
+        now = time.monotonic()
+        if now - self.last_emit.get(level, -self.interval) < self.interval:
+            self.suppressed += 1
+            return False
+        self.last_emit[level] = now
+        return True
+
+    def debug(self, msg, *args):
+        if self._allow(logging.DEBUG):
+            self.logger.debug(msg, *args)
+
+    def info(self, msg, *args):
+        if self._allow(logging.INFO):
+            self.logger.info(msg, *args)
+
+    def warning(self, msg, *args):
+        if self._allow(logging.WARNING):
+            self.logger.warning(msg, *args)
+
+    def error(self, msg, *args):
+        if self._allow(logging.ERROR):
+            self.logger.error(msg, *args)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread"""
+
+    def prepare(self, record):
+        # Fila em memória no mesmo processo: não é preciso formatar/serializar aqui
+        return record
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Formats records like the existing console output: [TAG] message"""
+
+    def format(self, record):
+        if record.levelno >= logging.WARNING:
+            tag = record.levelname
+        else:
+            tag = record.name.rsplit(".", 1)[-1].upper()
+        message = f"[{tag}] {record.getMessage()}"
+        if record.exc_info:
+            message += "\n" + self.formatException(record.exc_info)
+        return message
+
+
+class JsonLinesHandler(logging.FileHandler):
+    """Optional structured sink: one JSON object per record"""
+
+    def __init__(self, path):
+        super().__init__(path, mode="a", encoding="utf-8")
+
+    def format(self, record):
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "category": record.name.rsplit(".", 1)[-1],
+            "message": record.getMessage(),
+        }
+        if record.args and isinstance(record.args, tuple):
+            entry["args"] = [a if isinstance(a, (int, float, str, bool)) or a is None else repr(a)
+                             for a in record.args]
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(level="INFO", rate_limits=None, jsonl_path=None, console=True):
+    """Route every airscan.* logger through a queue drained by a background writer
+
+    Idempotente: chamadas seguintes apenas retornam o listener existente.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+
+    # Limites de taxa também valem para loggers já criados no import dos módulos
+    limits = dict(DEFAULT_RATE_LIMITS)
+    limits.update(rate_limits or {})
+    for category, interval in limits.items():
+        get_logger(category).interval = interval
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level)
+    root.handlers = [handler]
+    root.propagate = False
+
+    sinks = []
+    if console:
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(ConsoleFormatter())
+        sinks.append(stream)
+    if jsonl_path:
+        sinks.append(JsonLinesHandler(jsonl_path))
+
+    _listener = logging.handlers.QueueListener(log_queue, *sinks, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Flush pending records and stop the background writer"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,686 @@
+"""
+Transformações AirScan -> tela pré-compiladas.
+
+A calibração é compilada uma única vez (ao carregar ou recarregar o arquivo)
+em um objeto chamável; o caminho quente só faz aritmética, sem percorrer os
+pontos de calibração a cada amostra.
+"""
+
+import math
+
+# Folga da grade da malha além dos pontos calibrados (fração do sensor):
+# amostras reais passam da resolução nominal (ex.: y ~ 1150 num sensor 1080)
+MESH_LUT_MARGIN = 0.05
+
+
+class DefaultTransform:
+    """Proportional mapping from the AirScan resolution to the screen (no calibration)"""
+
+    is_fallback = True
+    model = None
+
+    def __init__(self, airscan_width, airscan_height, screen_width, screen_height, reason=None):
+        self.scale_x = screen_width / airscan_width
+        self.scale_y = screen_height / airscan_height
+        self.reason = reason
+
+    def __call__(self, x, y):
+        return (int(x * self.scale_x), int(y * self.scale_y))
+
+
+class LinearRangeTransform:
+    """Per-axis linear mapping of the calibrated AirScan range onto a screen rectangle"""
+
+    is_fallback = False
+    reason = None
+    model = "linear_range"
+
+    def __init__(self, min_x, max_x, min_y, max_y, x1, y1, x2, y2):
+        self.scale_x = (x2 - x1) / (max_x - min_x)
+        self.scale_y = (y2 - y1) / (max_y - min_y)
+        self.offset_x = x1 - min_x * self.scale_x
+        self.offset_y = y1 - min_y * self.scale_y
+        self.x1, self.y1, self.x2, self.y2 = x1, y1, x2, y2
+
+    def project(self, x, y):
+        """Unclamped screen position as floats (LutTransform nodes)"""
+        return (x * self.scale_x + self.offset_x, y * self.scale_y + self.offset_y)
+
+    def __call__(self, x, y):
+        screen_x = x * self.scale_x + self.offset_x
+        screen_y = y * self.scale_y + self.offset_y
+
+        # Clamp nos limites da área calibrada
+        if screen_x < self.x1:
+            screen_x = self.x1
+        elif screen_x > self.x2:
+            screen_x = self.x2
+        if screen_y < self.y1:
+            screen_y = self.y1
+        elif screen_y > self.y2:
+            screen_y = self.y2
+
+        return (int(screen_x), int(screen_y))
+
+
+def _solve(matrix, vector):
+    """Solve a small dense linear system (Gaussian elimination with partial pivoting)"""
+    n = len(vector)
+    rows = [list(matrix[i]) + [vector[i]] for i in range(n)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(rows[r][col]))
+        if abs(rows[pivot][col]) < 1e-12:
+            raise ValueError("Sistema singular (pontos de calibração degenerados)")
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(col + 1, n):
+            factor = rows[r][col] / rows[col][col]
+            if factor:
+                for c in range(col, n + 1):
+                    rows[r][c] -= factor * rows[col][c]
+    solution = [0.0] * n
+    for r in range(n - 1, -1, -1):
+        acc = rows[r][n] - sum(rows[r][c] * solution[c] for c in range(r + 1, n))
+        solution[r] = acc / rows[r][r]
+    return solution
+
+
+class HomographyTransform:
+    """Projective mapping (3x3 homography) with clamping to the screen rectangle"""
+
+    is_fallback = False
+    reason = None
+    model = "homography"
+
+    def __init__(self, h, x1, y1, x2, y2):
+        (self.h0, self.h1, self.h2, self.h3, self.h4, self.h5, self.h6, self.h7) = h[:8]
+        self.x1, self.y1, self.x2, self.y2 = x1, y1, x2, y2
+
+    @classmethod
+    def fit(cls, pairs, x1, y1, x2, y2):
+        """Least-squares homography from [((ax, ay), (sx, sy)), ...] (4+ points)"""
+        if len(pairs) < 4:
+            raise ValueError("Homografia precisa de pelo menos 4 pontos")
+        # Equações normais do sistema linear (DLT com h8 = 1)
+        ata = [[0.0] * 8 for _ in range(8)]
+        atb = [0.0] * 8
+        for (ax, ay), (sx, sy) in pairs:
+            for row, target in (([ax, ay, 1.0, 0.0, 0.0, 0.0, -ax * sx, -ay * sx], sx),
+                                ([0.0, 0.0, 0.0, ax, ay, 1.0, -ax * sy, -ay * sy], sy)):
+                for i in range(8):
+                    if row[i]:
+                        atb[i] += row[i] * target
+                        for j in range(8):
+                            ata[i][j] += row[i] * row[j]
+        return cls(_solve(ata, atb), x1, y1, x2, y2)
+
+    def project(self, x, y):
+        """Unclamped screen position as floats (LutTransform nodes)"""
+        w = self.h6 * x + self.h7 * y + 1.0
+        return ((self.h0 * x + self.h1 * y + self.h2) / w, (self.h3 * x + self.h4 * y + self.h5) / w)
+
+    def __call__(self, x, y):
+        w = self.h6 * x + self.h7 * y + 1.0
+        screen_x = (self.h0 * x + self.h1 * y + self.h2) / w
+        screen_y = (self.h3 * x + self.h4 * y + self.h5) / w
+
+        if screen_x < self.x1:
+            screen_x = self.x1
+        elif screen_x > self.x2:
+            screen_x = self.x2
+        if screen_y < self.y1:
+            screen_y = self.y1
+        elif screen_y > self.y2:
+            screen_y = self.y2
+
+        return (int(screen_x), int(screen_y))
+
+
+class AffineTransform:
+    """Affine mapping (also the per-axis linear model, with zero cross terms) with clamping"""
+
+    is_fallback = False
+    reason = None
+
+    def __init__(self, coefficients, x1, y1, x2, y2, model="affine"):
+        # screen_x = a * x + b * y + c; screen_y = d * x + e * y + f
+        (self.a, self.b, self.c, self.d, self.e, self.f) = coefficients[:6]
+        self.x1, self.y1, self.x2, self.y2 = x1, y1, x2, y2
+        self.model = model
+
+    @classmethod
+    def fit(cls, pairs, x1, y1, x2, y2):
+        """Least-squares affine mapping from [((ax, ay), (sx, sy)), ...] (3+ non-collinear points)"""
+        if len(pairs) < 3:
+            raise ValueError("Afim precisa de pelo menos 3 pontos")
+        # Mesma matriz normal para os dois eixos
+        ata = [[0.0] * 3 for _ in range(3)]
+        atb_x = [0.0] * 3
+        atb_y = [0.0] * 3
+        for (ax, ay), (sx, sy) in pairs:
+            row = (ax, ay, 1.0)
+            for i in range(3):
+                atb_x[i] += row[i] * sx
+                atb_y[i] += row[i] * sy
+                for j in range(3):
+                    ata[i][j] += row[i] * row[j]
+        return cls(_solve(ata, atb_x) + _solve(ata, atb_y), x1, y1, x2, y2)
+
+    def project(self, x, y):
+        """Unclamped screen position as floats (LutTransform nodes)"""
+        return (self.a * x + self.b * y + self.c, self.d * x + self.e * y + self.f)
+
+    def __call__(self, x, y):
+        screen_x = self.a * x + self.b * y + self.c
+        screen_y = self.d * x + self.e * y + self.f
+
+        if screen_x < self.x1:
+            screen_x = self.x1
+        elif screen_x > self.x2:
+            screen_x = self.x2
+        if screen_y < self.y1:
+            screen_y = self.y1
+        elif screen_y > self.y2:
+            screen_y = self.y2
+
+        return (int(screen_x), int(screen_y))
+
+
+class BilinearTransform:
+    """screen = c0 + c1 * x + c2 * y + c3 * x * y per axis, with clamping"""
+
+    is_fallback = False
+    reason = None
+    model = "bilinear"
+
+    def __init__(self, coefficients, x1, y1, x2, y2):
+        (self.cx0, self.cx1, self.cx2, self.cx3, self.cy0, self.cy1, self.cy2, self.cy3) = coefficients[:8]
+        self.x1, self.y1, self.x2, self.y2 = x1, y1, x2, y2
+
+    def project(self, x, y):
+        """Unclamped screen position as floats (LutTransform nodes)"""
+        xy = x * y
+        return (self.cx0 + self.cx1 * x + self.cx2 * y + self.cx3 * xy,
+                self.cy0 + self.cy1 * x + self.cy2 * y + self.cy3 * xy)
+
+    def __call__(self, x, y):
+        xy = x * y
+        screen_x = self.cx0 + self.cx1 * x + self.cx2 * y + self.cx3 * xy
+        screen_y = self.cy0 + self.cy1 * x + self.cy2 * y + self.cy3 * xy
+
+        if screen_x < self.x1:
+            screen_x = self.x1
+        elif screen_x > self.x2:
+            screen_x = self.x2
+        if screen_y < self.y1:
+            screen_y = self.y1
+        elif screen_y > self.y2:
+            screen_y = self.y2
+
+        return (int(screen_x), int(screen_y))
+
+
+class MeshTransform:
+    """Affine base plus inverse-distance interpolation of the calibration residuals
+
+    Custo O(pontos) por amostra: compile_transform embrulha em LutTransform.
+    """
+
+    is_fallback = False
+    reason = None
+    model = "mesh"
+
+    def __init__(self, coefficients, anchors, x1, y1, x2, y2):
+        self.base = AffineTransform(coefficients, float("-inf"), float("-inf"), float("inf"), float("inf"))
+        # [(airscan_x, airscan_y, resíduo_x, resíduo_y), ...]
+        self.anchors = [tuple(anchor[:4]) for anchor in anchors]
+        if not self.anchors:
+            raise ValueError("Malha sem pontos")
+        self.x1, self.y1, self.x2, self.y2 = x1, y1, x2, y2
+
+    def project(self, x, y):
+        """Unclamped screen position as floats (LutTransform nodes)"""
+        base = self.base
+        screen_x = base.a * x + base.b * y + base.c
+        screen_y = base.d * x + base.e * y + base.f
+        total = sum_x = sum_y = 0.0
+        for ax, ay, rx, ry in self.anchors:
+            distance_sq = (x - ax) ** 2 + (y - ay) ** 2
+            # Mesmo piso de AirScan_Fitting (exato sobre os pontos)
+            weight = 1.0 / (distance_sq if distance_sq > 1e-12 else 1e-12)
+            total += weight
+            sum_x += weight * rx
+            sum_y += weight * ry
+        return (screen_x + sum_x / total, screen_y + sum_y / total)
+
+    def __call__(self, x, y):
+        screen_x, screen_y = self.project(x, y)
+
+        if screen_x < self.x1:
+            screen_x = self.x1
+        elif screen_x > self.x2:
+            screen_x = self.x2
+        if screen_y < self.y1:
+            screen_y = self.y1
+        elif screen_y > self.y2:
+            screen_y = self.y2
+
+        return (int(screen_x), int(screen_y))
+
+
+class LutTransform:
+    """Precomputed grid of any transform, bilinearly interpolated
+
+    Custo constante por amostra qualquer que seja o modelo de base (uma
+    consulta à tabela de coeficientes por célula, só multiplicações). Serve
+    para modelos caros como a malha; não é mais rápida que uma homografia.
+    A grade cobre `bounds` (x0, y0, x1, y1 no sensor; padrão 0..largura,
+    0..altura); amostras fora dela vão direto para a transformação de base.
+    Com base.project (posição sem clamp, em float) os nós guardam a função
+    contínua e o clamp na área calibrada vem depois da interpolação, como
+    na transformação direta.
+    """
+
+    is_fallback = False
+    reason = None
+
+    def __init__(self, base, airscan_width, airscan_height, cols=64, rows=36, bounds=None):
+        self.base = base
+        self.model = getattr(base, "model", None)
+        x0, y0, x1, y1 = bounds or (0, 0, airscan_width, airscan_height)
+        self.x0 = x0
+        self.y0 = y0
+        self.cols = cols
+        self.rows = rows
+        self.cell_w = (x1 - x0) / cols
+        self.cell_h = (y1 - y0) / rows
+        self.inv_w = cols / (x1 - x0)
+        self.inv_h = rows / (y1 - y0)
+        self.max_fx = cols - 1e-9
+        self.max_fy = rows - 1e-9
+        project = getattr(base, "project", None)
+        if project is not None:
+            self.clamp = (base.x1, base.y1, base.x2, base.y2)
+        else:
+            # Base sem project: nós já com clamp (interpolação imprecisa junto à borda)
+            project = base
+            self.clamp = (float("-inf"), float("-inf"), float("inf"), float("inf"))
+        nodes = [[project(x0 + c * self.cell_w, y0 + r * self.cell_h) for c in range(cols + 1)]
+                 for r in range(rows + 1)]
+        # Tabela plana por célula com os coeficientes da interpolação bilinear:
+        # tela = a + b * tx + c * ty + d * tx * ty (x e y), tx/ty relativos à célula
+        self.table = []
+        for r in range(rows):
+            for c in range(cols):
+                (x00, y00), (x10, y10) = nodes[r][c], nodes[r][c + 1]
+                (x01, y01), (x11, y11) = nodes[r + 1][c], nodes[r + 1][c + 1]
+                self.table.append((x00, x10 - x00, x01 - x00, x11 - x10 - x01 + x00,
+                                   y00, y10 - y00, y01 - y00, y11 - y10 - y01 + y00))
+
+    def __call__(self, x, y):
+        fx = (x - self.x0) * self.inv_w
+        fy = (y - self.y0) * self.inv_h
+        if fx < 0 or fx > self.max_fx or fy < 0 or fy > self.max_fy:
+            # Fora da grade (raro): cálculo direto, sem clamp para a borda da grade
+            return self.base(x, y)
+        c = int(fx)
+        r = int(fy)
+        tx = fx - c
+        ty = fy - r
+        ax, bx, cx, dx, ay, by, cy, dy = self.table[r * self.cols + c]
+        screen_x = ax + bx * tx + (cx + dx * tx) * ty
+        screen_y = ay + by * tx + (cy + dy * tx) * ty
+
+        x1, y1, x2, y2 = self.clamp
+        if screen_x < x1:
+            screen_x = x1
+        elif screen_x > x2:
+            screen_x = x2
+        if screen_y < y1:
+            screen_y = y1
+        elif screen_y > y2:
+            screen_y = y2
+
+        return (int(screen_x), int(screen_y))
+
+
+def _convex_hull(points):
+    """Convex hull (counter-clockwise, monotone chain) of [(x, y), ...]"""
+    points = sorted(set(points))
+    if len(points) <= 2:
+        return points
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower = []
+    for p in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    upper = []
+    for p in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return lower[:-1] + upper[:-1]
+
+
+def _hull_contains(hull, x, y):
+    if len(hull) < 3:
+        return False
+    for i in range(len(hull)):
+        (ax, ay), (bx, by) = hull[i], hull[i - len(hull) + 1]
+        if (bx - ax) * (y - ay) - (by - ay) * (x - ax) < 0:
+            return False
+    return True
+
+
+def _hull_distance_sq(hull, x, y):
+    """Squared distance from (x, y) to the hull (0 inside)"""
+    if _hull_contains(hull, x, y):
+        return 0.0
+    best = float("inf")
+    for i in range(len(hull)):
+        (ax, ay), (bx, by) = hull[i], hull[(i + 1) % len(hull)]
+        dx, dy = bx - ax, by - ay
+        length_sq = dx * dx + dy * dy
+        t = ((x - ax) * dx + (y - ay) * dy) / length_sq if length_sq else 0.0
+        t = 0.0 if t < 0 else 1.0 if t > 1 else t
+        best = min(best, (ax + t * dx - x) ** 2 + (ay + t * dy - y) ** 2)
+    return best
+
+
+class _SeamCell:
+    """Grid cell shared by several outputs: exact hull test among its few candidates"""
+
+    def __init__(self, candidates):
+        # [(hull, transform), ...] - só as saídas que tocam a célula
+        self.candidates = candidates
+
+    def __call__(self, x, y):
+        for hull, transform in self.candidates:
+            if _hull_contains(hull, x, y):
+                return transform(x, y)
+        hull, transform = min(self.candidates, key=lambda c: _hull_distance_sq(c[0], x, y))
+        return transform(x, y)
+
+
+class MultiOutputTransform:
+    """Several output rectangles, each with its own transform, picked per sample by a grid over sensor space
+
+    Cada saída ocupa no sensor o fecho convexo dos seus pontos de calibração.
+    A grade (cols x rows) é pré-calculada: a célula guarda a transformação da
+    única saída que a cobre ou, nas costuras, um _SeamCell com as poucas
+    candidatas. Custo por amostra constante, qualquer que seja o número de saídas.
+    """
+
+    is_fallback = False
+    reason = None
+
+    def __init__(self, outputs, airscan_width, airscan_height, cols=64, rows=36):
+        # outputs: [(id, transform, hull), ...]
+        self.outputs = [(output_id, transform) for output_id, transform, _ in outputs]
+        self.model = ", ".join(f"{output_id}: {transform.model}" for output_id, transform in self.outputs)
+        self.cols = cols
+        self.rows = rows
+        cell_w = airscan_width / cols
+        cell_h = airscan_height / rows
+        self.inv_w = 1.0 / cell_w
+        self.inv_h = 1.0 / cell_h
+        # Raio do círculo que contém a célula: teste conservador de interseção
+        reach_sq = (cell_w * cell_w + cell_h * cell_h) / 4
+        self.table = []
+        for r in range(rows):
+            for c in range(cols):
+                cx, cy = (c + 0.5) * cell_w, (r + 0.5) * cell_h
+                distances = [(_hull_distance_sq(hull, cx, cy), hull, transform) for _, transform, hull in outputs]
+                touching = [(hull, transform) for distance, hull, transform in distances if distance <= reach_sq]
+                if len(touching) == 1:
+                    self.table.append(touching[0][1])
+                elif touching:
+                    self.table.append(_SeamCell(touching))
+                else:
+                    # Fora de todas as saídas: a mais próxima (o clamp leva à borda dela)
+                    self.table.append(min(distances, key=lambda d: d[0])[2])
+
+    def __call__(self, x, y):
+        c = int(x * self.inv_w)
+        r = int(y * self.inv_h)
+        if c < 0:
+            c = 0
+        elif c >= self.cols:
+            c = self.cols - 1
+        if r < 0:
+            r = 0
+        elif r >= self.rows:
+            r = self.rows - 1
+        return self.table[r * self.cols + c](x, y)
+
+
+def calibration_pairs(data):
+    """[((airscan_x, airscan_y), (screen_x, screen_y)), ...] from calibration points"""
+    return [((p["airscan"]["x"], p["airscan"]["y"]), (p["screen"]["x"], p["screen"]["y"]))
+            for p in ((data or {}).get("points") or {}).values()]
+
+
+def sensor_calibration(data, sensor_id):
+    """Calibration document for one sensor: data["sensors"][id] if present, else the top level"""
+    sensors = (data or {}).get("sensors") or {}
+    if sensor_id in sensors:
+        return sensors[sensor_id]
+    return data
+
+
+def output_rect(output):
+    """Output rectangle as a calibration_area dict (from x1..y2 or x/y/width/height)"""
+    if "x1" in output:
+        x1, y1, x2, y2 = output["x1"], output["y1"], output["x2"], output["y2"]
+    else:
+        x1, y1 = output["x"], output["y"]
+        x2, y2 = x1 + output["width"], y1 + output["height"]
+    return {"x1": x1, "y1": y1, "x2": x2, "y2": y2, "width": x2 - x1, "height": y2 - y1}
+
+
+def output_calibration(data, output_id):
+    """Calibration document of one output: its points, its rectangle as calibration_area and its model"""
+    output = data["outputs"][output_id]
+    document = {key: value for key, value in data.items()
+                if key not in ("outputs", "points", "calibration_area", "model", "accuracy")}
+    document["points"] = {name: point for name, point in (data.get("points") or {}).items()
+                          if point.get("output") == output_id}
+    document["calibration_area"] = output_rect(output)
+    for key in ("model", "accuracy"):
+        if key in output:
+            document[key] = output[key]
+    return document
+
+
+def compile_outputs(data, screen_width, screen_height, airscan_width, airscan_height):
+    """MultiOutputTransform over every calibrated output; outputs without usable points are skipped"""
+    outputs = []
+    reasons = []
+    for output_id in data["outputs"]:
+        try:
+            document = output_calibration(data, output_id)
+        except (KeyError, TypeError) as e:
+            reasons.append(f"saída {output_id} inválida ({e})")
+            continue
+        transform = compile_transform(document, screen_width, screen_height, airscan_width, airscan_height)
+        if transform.is_fallback:
+            reasons.append(f"saída {output_id}: {transform.reason}")
+            continue
+        if transform.reason:
+            reasons.append(f"saída {output_id}: {transform.reason}")
+        hull = _convex_hull([(p["airscan"]["x"], p["airscan"]["y"]) for p in document["points"].values()])
+        outputs.append((output_id, transform, hull))
+    if not outputs:
+        return DefaultTransform(airscan_width, airscan_height, screen_width, screen_height,
+                                "; ".join(reasons) or "Nenhuma saída calibrada")
+    if len(outputs) == 1:
+        # Uma só saída calibrada: nada a escolher
+        return outputs[0][1]
+    transform = MultiOutputTransform(outputs, airscan_width, airscan_height)
+    transform.reason = "; ".join(reasons) or None
+    return transform
+
+
+def calibration_model(data):
+    """The "model" entry chosen at calibration time ({"name", "params", ...}), or None"""
+    model = (data or {}).get("model")
+    if isinstance(model, str):
+        return {"name": model}
+    return model if isinstance(model, dict) else None
+
+
+def scale_area(area, scale_x, scale_y):
+    """calibration_area rescaled proportionally (e.g. after a resolution change)"""
+    x1, y1 = int(round(area["x1"] * scale_x)), int(round(area["y1"] * scale_y))
+    x2, y2 = int(round(area["x2"] * scale_x)), int(round(area["y2"] * scale_y))
+    return dict(area, x1=x1, y1=y1, x2=x2, y2=y2, width=x2 - x1, height=y2 - y1)
+
+
+def scale_model(model, scale_x, scale_y):
+    """Fitted model with its output (screen pixels) rescaled; the sensor side is unchanged"""
+    name = model.get("name")
+    params = model.get("params")
+    if params is None or name == "linear_range":
+        return model
+    if name in ("linear", "affine"):
+        params = [v * scale_x for v in params[:3]] + [v * scale_y for v in params[3:6]]
+    elif name == "bilinear":
+        params = [v * scale_x for v in params[:4]] + [v * scale_y for v in params[4:8]]
+    elif name == "homography":
+        # Só o numerador muda: w = h6 * x + h7 * y + 1 não depende da tela
+        params = [v * scale_x for v in params[:3]] + [v * scale_y for v in params[3:6]] + list(params[6:8])
+    elif name == "mesh":
+        affine = params["affine"]
+        params = {
+            "affine": [v * scale_x for v in affine[:3]] + [v * scale_y for v in affine[3:6]],
+            "anchors": [[ax, ay, rx * scale_x, ry * scale_y] for ax, ay, rx, ry in params["anchors"]],
+        }
+    else:
+        raise ValueError(f"modelo desconhecido: {name!r}")
+    return dict(model, params=params)
+
+
+def rescale_calibration(data, screen_width, screen_height):
+    """Calibration document fitted to a new screen size (area, targets and model scaled proportionally)
+
+    Usa o "screen" gravado na calibração; sem ele, ou com o mesmo tamanho,
+    devolve o próprio documento. Também ajusta cada sensor em "sensors".
+    """
+    if not data:
+        return data
+    screen = data.get("screen") or {}
+    data = dict(data)
+    if data.get("sensors"):
+        data["sensors"] = {sensor_id: rescale_calibration(dict(sensor, screen=sensor.get("screen", screen)),
+                                                          screen_width, screen_height)
+                           for sensor_id, sensor in data["sensors"].items()}
+    width, height = screen.get("width"), screen.get("height")
+    if not width or not height or (width, height) == (screen_width, screen_height):
+        return data
+
+    scale_x = screen_width / width
+    scale_y = screen_height / height
+    data["screen"] = dict(screen, width=screen_width, height=screen_height)
+    if data.get("calibration_area"):
+        data["calibration_area"] = scale_area(data["calibration_area"], scale_x, scale_y)
+    if data.get("outputs"):
+        outputs = {}
+        for output_id, output in data["outputs"].items():
+            output = dict(output, **scale_area(output_rect(output), scale_x, scale_y))
+            model = calibration_model(output)
+            if model:
+                output["model"] = scale_model(model, scale_x, scale_y)
+            outputs[output_id] = output
+        data["outputs"] = outputs
+    if data.get("points"):
+        data["points"] = {
+            name: dict(point, screen={"x": int(round(point["screen"]["x"] * scale_x)),
+                                      "y": int(round(point["screen"]["y"] * scale_y))})
+            for name, point in data["points"].items()
+        }
+    model = calibration_model(data)
+    if model:
+        data["model"] = scale_model(model, scale_x, scale_y)
+    return data
+
+
+def model_transform(model, x1, y1, x2, y2, airscan_width, airscan_height):
+    """Transform for a fitted model from AirScan_Fitting (parameters already in screen pixels)"""
+    name = model.get("name")
+    params = model.get("params")
+    if name in ("linear", "affine"):
+        return AffineTransform(params, x1, y1, x2, y2, model=name)
+    if name == "bilinear":
+        return BilinearTransform(params, x1, y1, x2, y2)
+    if name == "homography":
+        return HomographyTransform(params, x1, y1, x2, y2)
+    if name == "mesh":
+        mesh = MeshTransform(params["affine"], params["anchors"], x1, y1, x2, y2)
+        # Grade sobre o sensor nominal e os pontos calibrados (com folga), que
+        # podem passar da resolução nominal
+        margin_x = MESH_LUT_MARGIN * airscan_width
+        margin_y = MESH_LUT_MARGIN * airscan_height
+        bounds = (min(0, min(a[0] for a in mesh.anchors) - margin_x),
+                  min(0, min(a[1] for a in mesh.anchors) - margin_y),
+                  max(airscan_width, max(a[0] for a in mesh.anchors) + margin_x),
+                  max(airscan_height, max(a[1] for a in mesh.anchors) + margin_y))
+        # Grade mais fina que a padrão (mesmo tamanho de célula de 128x72 no
+        # sensor nominal): a interpolação tem "bicos" sobre os pontos
+        cols = int(math.ceil(128 * (bounds[2] - bounds[0]) / airscan_width))
+        rows = int(math.ceil(72 * (bounds[3] - bounds[1]) / airscan_height))
+        return LutTransform(mesh, airscan_width, airscan_height, cols=cols, rows=rows, bounds=bounds)
+    raise ValueError(f"modelo desconhecido: {name!r}")
+
+
+def compile_transform(data, screen_width, screen_height, airscan_width, airscan_height):
+    """Compile calibration data into a transform; falls back to the default mapping"""
+    def fallback(reason):
+        return DefaultTransform(airscan_width, airscan_height, screen_width, screen_height, reason)
+
+    # Várias saídas (projetores num desktop estendido): uma transformação por saída
+    if (data or {}).get("outputs"):
+        return compile_outputs(data, screen_width, screen_height, airscan_width, airscan_height)
+
+    points = (data or {}).get("points")
+    if not points:
+        return fallback("Nenhum dado de calibração disponível")
+
+    try:
+        x_values = [p["airscan"]["x"] for p in points.values()]
+        y_values = [p["airscan"]["y"] for p in points.values()]
+    except (KeyError, TypeError) as e:
+        return fallback(f"Erro no mapeamento de calibração: {e}")
+
+    if not x_values or not y_values:
+        return fallback("Dados de calibração vazios")
+
+    min_x, max_x = min(x_values), max(x_values)
+    min_y, max_y = min(y_values), max(y_values)
+
+    # Validate ranges
+    if min_x == max_x or min_y == max_y:
+        return fallback("Dados de calibração inválidos (ranges iguais)")
+
+    area = data.get("calibration_area")
+    if area:
+        # Mapear coordenadas do AirScan para a área calibrada
+        rect = (area["x1"], area["y1"], area["x2"], area["y2"])
+    else:
+        # Mapear para tela cheia (comportamento antigo)
+        rect = (0, 0, screen_width, screen_height)
+
+    # Modelo escolhido na calibração (AirScan_Fitting); linear_range é o padrão
+    model = calibration_model(data)
+    reason = None
+    if model and model.get("name", "linear_range") != "linear_range":
+        try:
+            return model_transform(model, *rect, airscan_width, airscan_height)
+        except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+            reason = f"Modelo de calibração '{model.get('name')}' inválido ({e}); usando linear_range"
+
+    transform = LinearRangeTransform(min_x, max_x, min_y, max_y, *rect)
+    transform.reason = reason
+    return transform
@@ -0,0 +1,272 @@
+"""
+Métricas em processo do AirScan (formato texto do Prometheus).
+
+Contadores, gauges e histogramas são atualizados no caminho quente com uma
+operação aritmética sobre um atributo, sem lock e sem alocação; a
+renderização em texto só acontece quando alguém faz a coleta. A exposição
+é local: HTTP em 127.0.0.1 (GET /metrics) ou um socket Unix que devolve o
+texto e fecha a conexão.
+
+    curl -s http://127.0.0.1:9108/metrics
+    socat - UNIX-CONNECT:/tmp/airscan_metrics.sock
+"""
+
+import bisect
+import os
+import threading
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Buckets padrão (segundos) - cobrem de 1ms (OSC a kHz) até 1s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join('%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+                     for k, v in labels)
+    return "{" + pairs + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base: a named metric family whose children are keyed by label values"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), _labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._labels = _labels
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """Child metric for one set of label values (cache it outside the hot path)"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child(tuple(zip(self.labelnames, map(str, values))))
+                    self._children[values] = child
+        return child
+
+    def _new_child(self, labels):
+        return type(self)(self.name, self.documentation, (), labels)
+
+    def _series(self):
+        if self.labelnames:
+            return list(self._children.values())
+        return [self]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for series in self._series():
+            lines.extend(series._samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonic counter; inc() is a single attribute update"""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.value = 0
+
+    def inc(self, amount=1):
+        # Sem lock: sob o GIL uma perda de incremento é rara e irrelevante para monitoramento
+        self.value += amount
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self._labels)} {_format_value(self.value)}"]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def _samples(self):
+        return [f"{self.name}{_format_labels(self._labels)} {_format_value(self.value)}"]
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; observe() is one bisect plus two additions"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), _labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames, _labels)
+        self.buckets = tuple(sorted(buckets))
+        # Contagens não cumulativas por bucket; o último é +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def _new_child(self, labels):
+        return Histogram(self.name, self.documentation, (), labels, self.buckets)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def _samples(self):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), list(self.counts)):
+            cumulative += count
+            labels = self._labels + (("le", _format_value(float(bound))),)
+            lines.append(f"{self.name}_bucket{_format_labels(labels)} {cumulative}")
+        labels = _format_labels(self._labels)
+        lines.append(f"{self.name}_sum{labels} {_format_value(self.sum)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metric families by name and renders them in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Métrica '{name}' já registrada como {metric.kind}")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """Prometheus text exposition of every registered metric"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name, documentation, labelnames=()):
+    return REGISTRY.counter(name, documentation, labelnames)
+
+
+def gauge(name, documentation, labelnames=()):
+    return REGISTRY.gauge(name, documentation, labelnames)
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.histogram(name, documentation, labelnames, buckets)
+
+
+def _http_handler(registry):
+    # Import tardio: http.server puxa email/html/http.client (~30ms de startup)
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHTTPHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Coletas periódicas não devem poluir o console
+            pass
+
+    return MetricsHTTPHandler
+
+
+def _unix_handler(registry):
+    import socketserver
+
+    class MetricsUnixHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            self.wfile.write(registry.render().encode("utf-8"))
+
+    return MetricsUnixHandler
+
+
+class MetricsServer:
+    """Serves a registry on 127.0.0.1:<port> (HTTP) or a Unix socket, in a daemon thread"""
+
+    def __init__(self, registry=REGISTRY, port=None, host="127.0.0.1", unix_socket=None):
+        self.registry = registry
+        self.port = port
+        self.host = host
+        self.unix_socket = unix_socket
+        self.server = None
+
+    def start(self):
+        """Start serving; returns a description of the endpoint"""
+        if self.unix_socket:
+            import socketserver
+            if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+                raise OSError("Sockets Unix não suportados neste sistema")
+            if os.path.exists(self.unix_socket):
+                os.remove(self.unix_socket)
+            self.server = socketserver.ThreadingUnixStreamServer(self.unix_socket, _unix_handler(self.registry))
+            endpoint = f"unix:{self.unix_socket}"
+        else:
+            from http.server import ThreadingHTTPServer
+            self.server = ThreadingHTTPServer((self.host, self.port), _http_handler(self.registry))
+            endpoint = f"http://{self.host}:{self.server.server_address[1]}/metrics"
+
+        self.server.daemon_threads = True
+        thread = threading.Thread(target=self.server.serve_forever, name="airscan-metrics", daemon=True)
+        thread.start()
+        return endpoint
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+            if self.unix_socket:
+                try:
+                    os.remove(self.unix_socket)
+                except OSError:
+                    pass
@@ -0,0 +1,227 @@
+"""
+Calibração offline do AirScan a partir de uma sessão gravada.
+
+A captura acontece no local (sessão gravada com session_record_path durante a
+calibração em processo, Shift+C) e o ajuste pode ser refeito depois, sem
+voltar ao local. As amostras passam pelo mesmo CalibrationPoint da janela de
+calibração (trechos, consistência, estatísticas), num VirtualClock, mais
+rápido que o tempo real, e o resultado é um AirScan_Calibration_Data.json
+completo.
+
+Os alvos vêm de generate_points (nível + área). Sem --windows, a sessão é
+reproduzida no protocolo sequencial da janela (ponto a ponto, com a pausa de
+reposicionamento); com --windows, cada alvo usa só as amostras da sua janela:
+
+    [{"name": "TOP_LEFT", "start": 12.0, "end": 20.5}, ...]   # segundos desde a 1ª amostra
+
+Uso:
+    python AirScan_Offline.py sessao.jsonl --level professional
+    python AirScan_Offline.py sessao.jsonl --level basic --area 200,100,1720,980 --select
+    python AirScan_Offline.py sessao.jsonl --level advanced --windows janelas.json --output refeita.json
+"""
+
+import argparse
+import bisect
+import sys
+import time
+
+from AirScan_Capture import generate_points
+from AirScan_Clock import VirtualClock
+from AirScan_Config import ConfigError, load_config
+from AirScan_Replay import read_session
+from AirScan_Storage import CALIBRATION_FILE, CalibrationSession, load_json
+
+PAUSE_DURATION = 5.0  # segundos - mesma pausa entre pontos da janela de calibração
+
+
+def _feed(point, x, y, timestamp):
+    """One sample through the window's per-point logic; True when the point is captured"""
+    if point.is_capturing and point.check_interruption(timestamp):
+        return False
+    if point.is_ready and not point.is_capturing:
+        point.start_capture(timestamp)
+        return False
+    if point.is_capturing:
+        point.add_data(x, y, timestamp)
+        if point.capture_complete():
+            if point.get_average():
+                return True
+            point.reset_capture()
+    return False
+
+
+def sequential_capture(points, samples, clock, pause_duration=PAUSE_DURATION):
+    """Replay the sequential protocol (capture, pause, next point); returns the captured points"""
+    captured = []
+    index = 0
+    pause_start = None
+    for t, x, y in samples:
+        clock.set(t)
+        if pause_start is not None:
+            # Como na janela: a pausa termina na primeira amostra depois do prazo
+            if t - pause_start >= pause_duration:
+                pause_start = None
+                index += 1
+                if index >= len(points):
+                    break
+                points[index].force_ready()
+            continue
+        if _feed(points[index], x, y, t):
+            captured.append(points[index])
+            pause_start = t
+    return captured
+
+
+def windowed_capture(points, samples, clock, windows):
+    """Capture each point from the samples of its window (seconds since the first sample)"""
+    by_name = {point.name: point for point in points}
+    times = [t for t, _, _ in samples]
+    origin = times[0] if times else 0.0
+    captured = []
+    for window in windows:
+        try:
+            point = by_name[window["name"]]
+            start, end = origin + float(window["start"]), origin + float(window["end"])
+        except KeyError as e:
+            raise ValueError(f"janela inválida {window!r}: {e} (alvos: {', '.join(by_name)})")
+        for t, x, y in samples[bisect.bisect_left(times, start):bisect.bisect_right(times, end)]:
+            clock.set(t)
+            if _feed(point, x, y, t):
+                captured.append(point)
+                break
+    return captured
+
+
+def parse_area(text):
+    """"x1,y1,x2,y2" -> calibration_area dict (same fields the area selector writes)"""
+    try:
+        x1, y1, x2, y2 = (int(value) for value in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"área deve ser x1,y1,x2,y2 (recebido {text!r})")
+    if x2 <= x1 or y2 <= y1:
+        raise argparse.ArgumentTypeError(f"área vazia: {text!r}")
+    return {"x1": x1, "y1": y1, "x2": x2, "y2": y2, "width": x2 - x1, "height": y2 - y1}
+
+
+def parse_size(text):
+    try:
+        width, height = (int(value) for value in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tamanho deve ser LARGURAxALTURA (recebido {text!r})")
+    return width, height
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibração offline a partir de uma sessão gravada do AirScan")
+    parser.add_argument("session", help="arquivo JSONL gravado com session_record_path")
+    parser.add_argument("--level", default="basic", choices=("basic", "advanced", "professional"))
+    parser.add_argument("--area", type=parse_area, default=None, help="área calibrada x1,y1,x2,y2 (padrão: tela cheia)")
+    parser.add_argument("--screen", type=parse_size, default=(1920, 1080), help="resolução da tela (ex.: 1920x1080)")
+    parser.add_argument("--windows", default=None, help="JSON com a janela de permanência de cada alvo")
+    parser.add_argument("--pause", type=float, default=PAUSE_DURATION, help="pausa entre pontos no modo sequencial")
+    parser.add_argument("--mode", default=None, help="modo do AirScan (padrão: o gravado na sessão)")
+    parser.add_argument("--sensor", default=None, help="grava em sensors[id] (sala multi-sensor)")
+    parser.add_argument("--select", action="store_true", help="escolhe o modelo pelo menor erro LOO (NumPy)")
+    parser.add_argument("--partial", action="store_true", help="grava mesmo se algum alvo não foi capturado")
+    parser.add_argument("--output", default=CALIBRATION_FILE)
+    args = parser.parse_args(argv)
+
+    try:
+        config = load_config(argv=[])
+        header, samples = read_session(args.session)
+        windows = load_json(args.windows) if args.windows else None
+    except ConfigError as e:
+        print(f"[ERROR] Configuração inválida: {e}")
+        return 2
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Não foi possível ler a entrada: {e}")
+        return 2
+    if args.windows and not isinstance(windows, list):
+        print(f"[ERROR] {args.windows} deve conter uma lista de janelas")
+        return 2
+    if not samples:
+        print("[ERROR] Sessão sem amostras")
+        return 1
+
+    mode = args.mode or header.get("mode") or config["mode"]
+    if mode not in config["modes"]:
+        print(f"[ERROR] Modo '{mode}' inválido! Use {' ou '.join(repr(m) for m in config['modes'])}")
+        return 2
+    sensor = config["modes"][mode]
+    screen_width, screen_height = args.screen
+    area = args.area or {"x1": 0, "y1": 0, "x2": screen_width, "y2": screen_height}
+
+    clock = VirtualClock(samples[0][0])
+    points = generate_points(args.level, area)
+    for point in points:
+        point.clock = clock
+
+    print(f"[OFFLINE] {args.session}: {len(samples)} amostras | nível {args.level.upper()} ({len(points)} alvos)")
+    wall_start = time.perf_counter()
+    try:
+        if windows is not None:
+            captured = windowed_capture(points, samples, clock, windows)
+        else:
+            captured = sequential_capture(points, samples, clock, args.pause)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return 2
+    wall = time.perf_counter() - wall_start
+    simulated = samples[-1][0] - samples[0][0]
+    print(f"[OFFLINE] {simulated:.1f}s de sessão processados em {wall:.2f}s")
+
+    missing = [point.name for point in points if point not in captured]
+    if missing:
+        print(f"[WARNING] Alvos não capturados: {', '.join(missing)}")
+        if not args.partial or not captured:
+            print("[ERROR] Calibração não gravada (use --partial para gravar os alvos capturados)")
+            return 1
+
+    metadata = {
+        "screen": {"width": screen_width, "height": screen_height},
+        "airscan": {"width": sensor["width"], "height": sensor["height"], "port": config["port"]},
+        "calibration_level": args.level,
+        "total_points": len(captured),
+        "source": {"session": args.session, "started_at": header.get("started_at"), "mode": mode},
+    }
+    if args.area:
+        metadata["calibration_area"] = args.area
+    session = CalibrationSession(metadata, path=args.output, journal_path=None, sensor_id=args.sensor)
+    for point in captured:
+        average = point.get_average()
+        stats = point.get_statistics()
+        session.add_point(point.name, {"x": point.x, "y": point.y}, average, samples=stats)
+        print(f"[OFFLINE] {point.name:<22} tela ({point.x}, {point.y}) <- AirScan ({average['x']:.2f}, "
+              f"{average['y']:.2f}) | {stats['count']} amostras, {point.discarded_segments} trecho(s) descartado(s)")
+
+    extra = {}
+    try:
+        # Import tardio: NumPy só é necessário para o relatório e a escolha do modelo
+        from AirScan_Fitting import evaluate, format_selection, format_summary, select_model
+    except ImportError:
+        print("[WARNING] NumPy não instalado - gravando sem relatório de precisão (pip install numpy)")
+    else:
+        if args.select:
+            selection = select_model(session.build(), screen_width, screen_height)
+            if selection is None:
+                print("[WARNING] Pontos insuficientes para comparar modelos")
+            else:
+                for line in format_selection(selection):
+                    print(line)
+                extra["model"] = selection
+        try:
+            report = evaluate(session.build(**extra), screen_width, screen_height)
+        except (KeyError, ValueError) as e:
+            print(f"[WARNING] Precisão não avaliada: {e}")
+        else:
+            for line in format_summary(report):
+                print(line)
+            extra["accuracy"] = report
+
+    session.commit(**extra)
+    print(f"[OFFLINE] Arquivo {args.output} gravado ({len(captured)} pontos)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
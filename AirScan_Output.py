@@ -0,0 +1,90 @@
+"""
+Backends de saída do AirScan (quem de fato move o mouse).
+
+O controle só conhece a interface move_to / mouse_down / mouse_up /
+scroll / hotkey / click / screen_size; o pyautogui fica atrás de PyAutoGuiOutput e só é importado
+quando esse backend é criado. A saída nula (headless) serve para
+benchmarks, replay e testes, sem tela e sem dependências gráficas.
+"""
+
+from collections import deque
+
+HEADLESS_SCREEN_SIZE = (1920, 1080)
+
+
+class NullOutput:
+    """Discards every event; counts them for benchmarks and tests"""
+
+    name = "null"
+    headless = True
+
+    def __init__(self, screen_size=HEADLESS_SCREEN_SIZE):
+        self._screen_size = tuple(screen_size)
+        self.moves = 0
+        self.last_position = None
+        self.pressed = False
+        # Últimos eventos de gesto (scroll / hotkey / click), para testes e replay
+        self.events = deque(maxlen=100)
+
+    def move_to(self, x, y):
+        self.moves += 1
+        self.last_position = (x, y)
+
+    def mouse_down(self):
+        self.pressed = True
+
+    def mouse_up(self):
+        self.pressed = False
+
+    def scroll(self, clicks):
+        self.events.append(("scroll", clicks))
+
+    def hotkey(self, *keys):
+        self.events.append(("hotkey", keys))
+
+    def click(self, button="left", clicks=1):
+        self.events.append(("click", button, clicks))
+
+    def screen_size(self):
+        return self._screen_size
+
+
+class PyAutoGuiOutput:
+    """Drives the real OS cursor through pyautogui"""
+
+    name = "pyautogui"
+    headless = False
+
+    def __init__(self):
+        # Import tardio: pyautogui carrega Pillow, pymsgbox, pyscreeze...
+        import pyautogui
+        # Disable PyAutoGUI failsafe
+        pyautogui.FAILSAFE = False
+        self.pyautogui = pyautogui
+        self.move_to = pyautogui.moveTo
+        self.mouse_down = pyautogui.mouseDown
+        self.mouse_up = pyautogui.mouseUp
+        self.scroll = pyautogui.scroll
+        self.hotkey = pyautogui.hotkey
+
+    def click(self, button="left", clicks=1):
+        self.pyautogui.click(button=button, clicks=clicks)
+
+    def screen_size(self):
+        width, height = self.pyautogui.size()
+        return width, height
+
+
+OUTPUT_BACKENDS = {
+    "pyautogui": PyAutoGuiOutput,
+    "null": NullOutput,
+}
+
+
+def create_output(name):
+    """Instantiate an output backend by name"""
+    try:
+        backend = OUTPUT_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Backend de saída desconhecido: {name} (use {', '.join(OUTPUT_BACKENDS)})")
+    return backend()
@@ -0,0 +1,256 @@
+"""
+Topologia opcional em dois processos para o AirScan.
+
+    [processo de ingestão]  OSC -> filtro -> anel em memória compartilhada
+    [processo de saída]     anel -> calibração -> suavização -> mouse
+
+Cada processo tem seu próprio GIL: threads do servidor OSC, timers de
+watchdog e chamadas ao pyautogui deixam de competir entre si. Os dois
+processos podem ser fixados em núcleos distintos (os.sched_setaffinity).
+
+Uso:
+    python AirScan_Pipeline.py --ingest-cpu 2 --output-cpu 3
+"""
+
+import argparse
+import math
+import multiprocessing as mp
+import os
+import struct
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
+RING_SLOTS = 1024
+_HEADER = struct.Struct("<Q")      # quadros escritos até agora
+_SEQ = struct.Struct("<Q")
+_SLOT = struct.Struct("<Qqdd")     # seq, t_ns (perf_counter_ns), x, y
+
+
+class FrameRing:
+    """Single-producer ring of (t_ns, x, y) frames in shared memory (per-slot seqlock)"""
+
+    def __init__(self, shm, slots):
+        self.shm = shm
+        self.slots = slots
+        self.buf = shm.buf
+        self.name = shm.name
+
+    @classmethod
+    def create(cls, slots=RING_SLOTS):
+        size = _HEADER.size + slots * _SLOT.size
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        return cls(shm, slots)
+
+    @classmethod
+    def attach(cls, name, slots=RING_SLOTS):
+        return cls(shared_memory.SharedMemory(name=name), slots)
+
+    def frames_written(self):
+        return _HEADER.unpack_from(self.buf, 0)[0]
+
+    def publish(self, x, y, t_ns):
+        """Writer side (one process only)"""
+        count = _HEADER.unpack_from(self.buf, 0)[0]
+        offset = _HEADER.size + (count % self.slots) * _SLOT.size
+        # seq=0 durante a escrita; leitores descartam o slot se seq mudar
+        _SEQ.pack_into(self.buf, offset, 0)
+        _SLOT.pack_into(self.buf, offset, 0, t_ns, x, y)
+        _SEQ.pack_into(self.buf, offset, count + 1)
+        _HEADER.pack_into(self.buf, 0, count + 1)
+
+    def read_since(self, cursor):
+        """Reader side: returns ([(t_ns, x, y), ...], new_cursor, dropped)"""
+        count = _HEADER.unpack_from(self.buf, 0)[0]
+        if count == cursor:
+            return [], cursor, 0
+
+        dropped = 0
+        if count - cursor > self.slots:
+            # Leitor ficou para trás: pula para os quadros mais recentes
+            dropped = count - self.slots - cursor
+            cursor = count - self.slots
+
+        frames = []
+        for n in range(cursor, count):
+            offset = _HEADER.size + (n % self.slots) * _SLOT.size
+            seq, t_ns, x, y = _SLOT.unpack_from(self.buf, offset)
+            if seq != n + 1 or _SEQ.unpack_from(self.buf, offset)[0] != n + 1:
+                dropped += 1
+                continue
+            frames.append((t_ns, x, y))
+        return frames, count, dropped
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def pin_to_cpu(cpu, label):
+    """Pin the current process to one core when the OS supports it"""
+    if cpu is None:
+        return False
+    if not hasattr(os, "sched_setaffinity"):
+        print(f"[PIPELINE] {label}: afinidade de CPU não suportada neste sistema")
+        return False
+    try:
+        os.sched_setaffinity(0, {cpu})
+        print(f"[PIPELINE] {label}: fixado no núcleo {cpu}")
+        return True
+    except OSError as e:
+        print(f"[PIPELINE] {label}: não foi possível fixar no núcleo {cpu}: {e}")
+        return False
+
+
+def run_ingest_process(ring_name, port, blob_id, stop_event, cpu=None, ready_event=None):
+    """Decode OSC, drop invalid values and publish X/Y pairs into the ring"""
+    from pythonosc import osc_server
+    from pythonosc.dispatcher import Dispatcher
+
+    pin_to_cpu(cpu, "ingestão")
+    ring = FrameRing.attach(ring_name)
+    latest = [None, None]
+
+    def handler(axis):
+        def handle(unused_addr, value):
+            if not isinstance(value, (int, float)) or not math.isfinite(value):
+                return
+            latest[axis] = value
+            if latest[0] is not None and latest[1] is not None:
+                ring.publish(latest[0], latest[1], time.perf_counter_ns())
+        return handle
+
+    dispatcher = Dispatcher()
+    dispatcher.map(f"/airscan/blob/{blob_id}/x", handler(0))
+    dispatcher.map(f"/airscan/blob/{blob_id}/y", handler(1))
+
+    server = osc_server.BlockingOSCUDPServer(("0.0.0.0", port), dispatcher)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"[PIPELINE] Ingestão escutando em 0.0.0.0:{port} (Blob {blob_id})")
+    if ready_event is not None:
+        ready_event.set()
+
+    try:
+        stop_event.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        ring.close()
+
+
+def run_output_process(ring_name, consumer_factory, stop_event, cpu=None, idle_sleep=0.0005,
+                       ready_event=None):
+    """Read frames from the ring and hand them to consumer(x, y, t_ns)"""
+    pin_to_cpu(cpu, "saída")
+    ring = FrameRing.attach(ring_name)
+    consumer, finish = consumer_factory()
+    cursor = ring.frames_written()
+    dropped_total = 0
+    if ready_event is not None:
+        ready_event.set()
+
+    try:
+        while not stop_event.is_set():
+            frames, cursor, dropped = ring.read_since(cursor)
+            dropped_total += dropped
+            if not frames:
+                time.sleep(idle_sleep)
+                continue
+            for t_ns, x, y in frames:
+                consumer(x, y, t_ns)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if dropped_total:
+            print(f"[PIPELINE] Quadros descartados pelo leitor: {dropped_total}")
+        if finish:
+            finish()
+        ring.close()
+
+
+def control_consumer():
+    """Output stage backed by AirScanControl (calibration, smoothing, watchdog, pyautogui)"""
+    from AirScan_Control import AirScanControl
+
+    control = AirScanControl()
+    control.calibration_store.start_watching()
+    if control.auto_tuner:
+        control.auto_tuner.start()
+    if control.gestures:
+        # O anel só transporta o blob principal
+        print("[WARNING] Pipeline: gestos de dois dedos desabilitados (só o blob principal chega à saída)")
+    # Mesmo tee do processo único: cursor, gestos de um dedo, ajuste automático e gravação da sessão
+    publish = control.tee.publish
+
+    def consume(x, y, t_ns):
+        # t_ns vem de perf_counter_ns no processo de ingestão: mesma base do relógio do controle
+        publish(x, y, t_ns / 1e9)
+
+    def finish():
+        control.calibration_store.stop_watching()
+        if control.auto_tuner:
+            control.auto_tuner.stop()
+        if control.recorder:
+            control.tee.unsubscribe(control.recorder)
+            control.recorder.close()
+            print(f"[INFO] Sessão gravada: {control.recorder.samples} amostras")
+
+    return consume, finish
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AirScan em dois processos (ingestão + saída)")
+    parser.add_argument("--port", type=int, default=None, help="porta OSC (padrão: AIRSCAN_PORT)")
+    parser.add_argument("--blob", type=int, default=None, help="blob id (padrão: BLOB_ID do modo)")
+    parser.add_argument("--ingest-cpu", type=int, default=None, help="núcleo do processo de ingestão")
+    parser.add_argument("--output-cpu", type=int, default=None, help="núcleo do processo de saída")
+    args = parser.parse_args(argv)
+
+    if args.port is None or args.blob is None:
+        from AirScan_Control import AIRSCAN_PORT, BLOB_ID
+        args.port = AIRSCAN_PORT if args.port is None else args.port
+        args.blob = BLOB_ID if args.blob is None else args.blob
+
+    ctx = mp.get_context("spawn")
+    ring = FrameRing.create()
+    stop_event = ctx.Event()
+
+    processes = [
+        ctx.Process(target=run_ingest_process, name="airscan-ingest",
+                    args=(ring.name, args.port, args.blob, stop_event, args.ingest_cpu)),
+        ctx.Process(target=run_output_process, name="airscan-output",
+                    args=(ring.name, control_consumer, stop_event, args.output_cpu)),
+    ]
+    print("=" * 50)
+    print("AIRSCAN PIPELINE - INGESTÃO + SAÍDA EM PROCESSOS SEPARADOS")
+    print("=" * 50)
+    for process in processes:
+        process.start()
+
+    try:
+        while all(p.is_alive() for p in processes):
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        print("\n[PIPELINE] Ctrl+C detectado. Encerrando...")
+    finally:
+        stop_event.set()
+        for process in processes:
+            process.join(timeout=3)
+            if process.is_alive():
+                process.terminate()
+        ring.close()
+        ring.unlink()
+        print("[PIPELINE] Encerrado.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
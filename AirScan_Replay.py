@@ -0,0 +1,137 @@
+"""
+Gravação e replay de sessões do AirScan.
+
+SessionRecorder se inscreve no tee do controle e grava cada amostra
+(t, x, y) em JSONL, com t no relógio monotônico. replay_session alimenta o
+pipeline inteiro (tee -> calibração -> suavização -> watchdog -> saída) com
+um VirtualClock: o tempo só avança de amostra em amostra, então uma sessão
+de 10 minutos roda em segundos e sempre produz o mesmo resultado.
+
+Uso:
+    SESSION_RECORD_PATH = "sessao.jsonl" em AirScan_Control.py (gravação)
+    python AirScan_Replay.py sessao.jsonl                 # o mais rápido possível
+    python AirScan_Replay.py sessao.jsonl --speed 1.0     # em tempo real
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+
+from AirScan_Clock import VirtualClock
+
+SESSION_FORMAT = "airscan_session"
+SESSION_VERSION = 1
+
+
+class SessionRecorder:
+    """Tee consumer that appends (t, x, y) samples to a JSONL session file"""
+
+    def __init__(self, path, metadata=None):
+        self.path = path
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "w", buffering=64 * 1024)
+        header = {"type": SESSION_FORMAT, "version": SESSION_VERSION, "clock": "monotonic",
+                  "started_at": time.time()}
+        header.update(metadata or {})
+        self._file.write(json.dumps(header) + "\n")
+
+    def __call__(self, x, y, timestamp):
+        line = f"[{timestamp!r}, {x!r}, {y!r}]\n"
+        with self._lock:
+            if self._file:
+                self._file.write(line)
+                self.samples += 1
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+def read_session(path):
+    """Returns (header, [(t, x, y), ...]); a truncated last line is ignored"""
+    samples = []
+    with open(path, "r") as f:
+        header = json.loads(f.readline())
+        if header.get("type") != SESSION_FORMAT:
+            raise ValueError(f"{path} não é uma sessão gravada do AirScan")
+        for line in f:
+            try:
+                t, x, y = json.loads(line)
+            except ValueError:
+                break
+            samples.append((t, x, y))
+    return header, samples
+
+
+def replay_session(samples, control, clock, speed=None):
+    """Feed recorded samples through control.tee on a VirtualClock
+
+    speed=None roda o mais rápido possível; speed=1.0 respeita os intervalos
+    gravados (2.0 = duas vezes mais rápido).
+    """
+    watchdog = control.watchdog
+    previous = None
+    wall_start = time.perf_counter()
+    for t, x, y in samples:
+        # Dispara o watchdog no instante exato do prazo, se ele venceu entre duas amostras
+        deadline = watchdog.deadline
+        if deadline is not None and deadline <= t:
+            clock.set(deadline)
+            watchdog.check(deadline)
+
+        if speed and previous is not None and t > previous:
+            time.sleep((t - previous) / speed)
+        previous = t
+
+        clock.set(t)
+        control.tee.publish(x, y, clock.now())
+
+    # Deixa o último toque expirar
+    deadline = watchdog.deadline
+    if deadline is not None:
+        clock.set(deadline)
+        watchdog.check(deadline)
+
+    simulated = samples[-1][0] - samples[0][0] if samples else 0.0
+    return {"samples": len(samples), "simulated_s": simulated, "wall_s": time.perf_counter() - wall_start}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay de uma sessão gravada do AirScan")
+    parser.add_argument("session", help="arquivo JSONL gravado com SESSION_RECORD_PATH")
+    parser.add_argument("--speed", type=float, default=None, help="fator de tempo real (padrão: sem espera)")
+    args = parser.parse_args(argv)
+
+    try:
+        header, samples = read_session(args.session)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Não foi possível ler a sessão: {e}")
+        return 2
+    if not samples:
+        print("[WARNING] Sessão sem amostras")
+        return 0
+
+    import AirScan_Control
+    from AirScan_Output import NullOutput
+
+    clock = VirtualClock(samples[0][0])
+    output = NullOutput()
+    control = AirScan_Control.AirScanControl(clock=clock, output=output)
+
+    print(f"[REPLAY] {args.session}: {len(samples)} amostras")
+    stats = replay_session(samples, control, clock, args.speed)
+    speedup = stats["simulated_s"] / stats["wall_s"] if stats["wall_s"] else float("inf")
+    print(f"[REPLAY] {stats['simulated_s']:.1f}s de sessão em {stats['wall_s']:.2f}s ({speedup:.0f}x)")
+    print(f"[REPLAY] Movimentos do mouse: {output.moves} | "
+          f"Watchdog: {AirScan_Control.metric_watchdog_timeouts.value} disparos | "
+          f"Última posição: {output.last_position}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
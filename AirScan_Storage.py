@@ -0,0 +1,380 @@
+"""
+Persistência dos dados de calibração do AirScan.
+
+Escritas são transacionais: o arquivo final só é substituído via arquivo
+temporário + fsync + os.replace, então o processo de controle nunca lê um
+JSON parcialmente escrito. Uma sessão de calibração acumula os pontos em
+memória e grava uma única vez ao final; um journal append-only opcional
+permite recuperar os pontos já capturados se o processo cair no meio.
+
+O CalibrationStore observa o arquivo (inotify no Linux, polling de mtime
+nos demais sistemas) e troca a transformação compilada por referência, sem
+lock no caminho quente.
+"""
+
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import namedtuple
+
+CALIBRATION_FILE = "AirScan_Calibration_Data.json"
+JOURNAL_FILE = "AirScan_Calibration_Data.journal"
+TUNING_FILE = "AirScan_Calibration_Tuning.json"  # recomendações do AirScan_AutoTune
+CALIBRATION_VERSION = "1.2"
+
+
+def atomic_write_json(path, data):
+    """Write JSON to path atomically (temp file + fsync + os.replace)"""
+    import tempfile
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".airscan_", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    # Garante que a renomeação também foi persistida (POSIX)
+    if hasattr(os, "O_DIRECTORY"):
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
+
+def rotate_journal(journal_path):
+    """Move an existing journal aside (<journal>.<timestamp>); returns the new path or None"""
+    if not os.path.exists(journal_path):
+        return None
+    rotated = f"{journal_path}.{time.strftime('%Y%m%d-%H%M%S')}"
+    suffix = 1
+    while os.path.exists(rotated):
+        rotated = f"{journal_path}.{time.strftime('%Y%m%d-%H%M%S')}-{suffix}"
+        suffix += 1
+    os.replace(journal_path, rotated)
+    return rotated
+
+
+def load_json(path):
+    """Load a JSON file, returning None if it is missing"""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+class CalibrationSession:
+    """Accumulates calibration points in memory and commits them in one write"""
+
+    def __init__(self, metadata, path=CALIBRATION_FILE, journal_path=JOURNAL_FILE, sensor_id=None):
+        self.path = path
+        self.journal_path = journal_path
+        # Com sensor_id, a sessão grava em data["sensors"][sensor_id] (salas multi-sensor)
+        self.sensor_id = sensor_id
+        self.metadata = dict(metadata)
+        self.points = {}
+        self._journal = None
+
+        if self.journal_path:
+            # Journal de uma calibração não gravada: guardado, nunca truncado
+            rotated = rotate_journal(self.journal_path)
+            if rotated:
+                print(f"[WARNING] Journal de uma calibração não gravada encontrado - guardado em {rotated}")
+                print(f"[INFO] Para gravar aqueles pontos: python AirScan_Calibration.py --recover {rotated}")
+            self._journal = open(self.journal_path, "w")
+            self._append_journal({"type": "begin", "time": time.time(), "metadata": self.metadata,
+                                  "sensor_id": sensor_id})
+
+    def _append_journal(self, record):
+        if not self._journal:
+            return
+        self._journal.write(json.dumps(record) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def _close_journal(self, remove):
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+        if remove and self.journal_path:
+            try:
+                os.remove(self.journal_path)
+            except FileNotFoundError:
+                pass
+
+    def add_point(self, name, screen, airscan, **extra):
+        """Record a captured point (replaces a previous capture with the same name)"""
+        point = {"screen": dict(screen), "airscan": dict(airscan)}
+        point.update(extra)
+        self.points[name] = point
+        self._append_journal({"type": "point", "name": name, "point": point})
+
+    def remove_point(self, name):
+        """Drop a captured point (e.g. before re-capturing it)"""
+        if self.points.pop(name, None) is not None:
+            self._append_journal({"type": "remove", "name": name})
+
+    def build(self, **extra):
+        """Build the calibration document from this session only (no stale points)"""
+        data = dict(self.metadata)
+        data["points"] = dict(self.points)
+        data.setdefault("calibration_version", CALIBRATION_VERSION)
+        data.update(extra)
+        return data
+
+    def commit(self, **extra):
+        """Write the calibration file once, atomically, and drop the journal"""
+        data = self.build(**extra)
+
+        # Preserva a calibração dos demais sensores (salas multi-sensor)
+        try:
+            existing = load_json(self.path) or {}
+        except (OSError, json.JSONDecodeError):
+            existing = {}
+
+        if self.sensor_id is None:
+            document = dict(data)
+            if existing.get("sensors"):
+                document["sensors"] = existing["sensors"]
+        else:
+            document = existing
+            document.setdefault("sensors", {})[self.sensor_id] = data
+        atomic_write_json(self.path, document)
+        self._close_journal(remove=True)
+        return data
+
+    def discard(self):
+        """Abandon the session without touching the calibration file"""
+        self._close_journal(remove=True)
+        self.points.clear()
+
+    @classmethod
+    def recover(cls, journal_path=JOURNAL_FILE, path=CALIBRATION_FILE):
+        """Rebuild a session from a journal left by an interrupted calibration"""
+        metadata = None
+        sensor_id = None
+        points = {}
+        with open(journal_path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Última linha pode ter ficado incompleta na queda
+                    break
+                if record.get("type") == "begin":
+                    metadata = record.get("metadata", {})
+                    sensor_id = record.get("sensor_id")
+                    points.clear()
+                elif record.get("type") == "point":
+                    points[record["name"]] = record["point"]
+                elif record.get("type") == "remove":
+                    points.pop(record["name"], None)
+
+        if metadata is None:
+            return None
+
+        session = cls(metadata, path=path, journal_path=None, sensor_id=sensor_id)
+        session.journal_path = journal_path
+        session.points = points
+        return session
+
+
+class FileWatcher:
+    """Calls on_change() whenever a file is (re)written; inotify on Linux, mtime polling elsewhere"""
+
+    # Constantes de <sys/inotify.h>
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    _EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, path, on_change, poll_interval=0.5):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.backend = None
+
+    def start(self):
+        """Start watching in a daemon thread"""
+        inotify_fd = self._open_inotify()
+        if inotify_fd is not None:
+            self.backend = "inotify"
+            target = lambda: self._run_inotify(inotify_fd)
+        else:
+            self.backend = "polling"
+            target = self._run_polling
+
+        self.thread = threading.Thread(target=target, name="airscan-file-watcher", daemon=True)
+        self.thread.start()
+        return self.backend
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _open_inotify(self):
+        if not sys.platform.startswith("linux"):
+            return None
+        # Import tardio: ctypes.util carrega subprocess/shutil (só necessário aqui)
+        import ctypes
+        import ctypes.util
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+            if fd < 0:
+                return None
+            # Observa o diretório: os.replace troca o inode do arquivo
+            mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+            if libc.inotify_add_watch(fd, os.path.dirname(self.path).encode(), mask) < 0:
+                os.close(fd)
+                return None
+            return fd
+        except (OSError, AttributeError):
+            return None
+
+    def _run_inotify(self, fd):
+        name = os.path.basename(self.path).encode()
+        try:
+            while not self.stop_event.is_set():
+                readable, _, _ = select.select([fd], [], [], self.poll_interval)
+                if not readable:
+                    continue
+                try:
+                    buffer = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+
+                changed = False
+                offset = 0
+                while offset + self._EVENT_HEADER.size <= len(buffer):
+                    _, _, _, length = self._EVENT_HEADER.unpack_from(buffer, offset)
+                    offset += self._EVENT_HEADER.size
+                    event_name = buffer[offset:offset + length].rstrip(b"\0")
+                    offset += length
+                    if event_name == name:
+                        changed = True
+                if changed:
+                    self._notify()
+        finally:
+            os.close(fd)
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size, st.st_ino)
+        except FileNotFoundError:
+            return None
+
+    def _run_polling(self):
+        last = self._signature()
+        while not self.stop_event.wait(self.poll_interval):
+            current = self._signature()
+            if current != last:
+                last = current
+                if current is not None:
+                    self._notify()
+
+    def _notify(self):
+        try:
+            self.on_change()
+        except Exception as e:
+            print(f"[WARNING] Erro ao processar alteração em {self.path}: {e}")
+
+
+CalibrationSnapshot = namedtuple("CalibrationSnapshot", ["data", "transform", "loaded_at"])
+
+
+class CalibrationStore:
+    """Holds the active calibration and swaps in recompiled transforms on file changes"""
+
+    def __init__(self, compiler, path=CALIBRATION_FILE, on_reload=None, prepare=None):
+        self.path = path
+        self.compiler = compiler
+        self.on_reload = on_reload
+        # prepare(data) -> data: ajusta o documento antes de compilar (ex.: à resolução atual)
+        self.prepare = prepare
+        self.watcher = None
+        # Leitores fazem uma única leitura de atributo: troca atômica sem lock
+        self.snapshot = CalibrationSnapshot({}, compiler({}), time.time())
+
+    @property
+    def data(self):
+        return self.snapshot.data
+
+    @property
+    def transform(self):
+        return self.snapshot.transform
+
+    def install(self, data):
+        """Compile data and atomically make it the active calibration"""
+        if self.prepare:
+            data = self.prepare(data)
+        snapshot = CalibrationSnapshot(data, self.compiler(data), time.time())
+        self.snapshot = snapshot
+        if self.on_reload:
+            self.on_reload(snapshot)
+        return snapshot
+
+    def recompile(self):
+        """Recompile the current data (e.g. after the screen geometry changed)"""
+        return self.install(self.snapshot.data)
+
+    def reload(self):
+        """Re-read the calibration file; keeps the current calibration if it is unreadable"""
+        try:
+            data = load_json(self.path)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[WARNING] Calibração não recarregada ({self.path}): {e}")
+            return None
+        if data is None:
+            return None
+        return self.install(data)
+
+    def push(self, data):
+        """Install a calibration from another tool and persist it atomically"""
+        atomic_write_json(self.path, data)
+        return self.install(data)
+
+    def start_watching(self, poll_interval=0.5):
+        """Reload automatically whenever the calibration file is rewritten"""
+        self.watcher = FileWatcher(self.path, self.reload, poll_interval)
+        return self.watcher.start()
+
+    def stop_watching(self):
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+
+
+def push_calibration(source_path, path=CALIBRATION_FILE):
+    """Validate a calibration file and install it where the control process watches"""
+    data = load_json(source_path)
+    if not isinstance(data, dict) or not data.get("points"):
+        print(f"[ERROR] {source_path} não contém pontos de calibração")
+        return False
+    atomic_write_json(path, data)
+    print(f"[INFO] Calibração de {source_path} instalada em {path} ({len(data['points'])} pontos)")
+    return True
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--push":
+        sys.exit(0 if push_calibration(sys.argv[2]) else 1)
+    print("Uso: python AirScan_Storage.py --push <calibracao.json>")
+    sys.exit(2)
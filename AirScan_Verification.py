@@ -0,0 +1,107 @@
+"""
+Verificação da calibração do AirScan com alvos aleatórios.
+
+Depois do último ponto, a janela de calibração mostra alvos em posições
+aleatórias da área calibrada; cada toque é mapeado pela transformação
+recém-ajustada e o erro (pixels de tela) entra em estatísticas incrementais
+(média, desvio, máximo e percentis por histograma, memória constante). O
+erro de cada alvo é atribuído ao ponto de calibração mais próximo, para
+sugerir a recaptura só dos piores pontos em vez de refazer tudo.
+"""
+
+import math
+import random
+
+# Histograma de erros: caixas de 1px até HISTOGRAM_MAX (acima disso vai para a última)
+HISTOGRAM_MAX = 512
+
+VERIFICATION_TARGETS = 5           # alvos por rodada
+VERIFICATION_CAPTURE_DURATION = 1.5  # segundos de toque parado por alvo
+VERIFICATION_TOLERANCE = 25        # pixels - acima disso o ponto é sugerido para recaptura
+MAX_RECAPTURE_POINTS = 3
+
+
+class RunningErrorStats:
+    """Incremental error statistics: Welford mean/std, max and histogram percentiles"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.max = 0.0
+        self.histogram = [0] * (HISTOGRAM_MAX + 1)
+
+    def add(self, error):
+        self.count += 1
+        delta = error - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (error - self.mean)
+        if error > self.max:
+            self.max = error
+        self.histogram[min(HISTOGRAM_MAX, int(error))] += 1
+
+    @property
+    def std(self):
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def percentile(self, fraction):
+        """Upper edge of the histogram bin holding the given fraction (resolution 1px)"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for error, count in enumerate(self.histogram):
+            seen += count
+            if seen >= rank:
+                # A última caixa não tem limite superior: o máximo é o valor exato
+                if error == HISTOGRAM_MAX:
+                    return self.max
+                return min(float(error + 1), self.max)
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return None
+        return {
+            "count": self.count,
+            "mean": round(self.mean, 2),
+            "std": round(self.std, 2),
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "max": round(self.max, 2),
+        }
+
+
+def random_targets(area, count=VERIFICATION_TARGETS, margin=0.1, rng=None):
+    """[(x, y), ...] random screen targets inside the calibration area (away from its border)"""
+    rng = rng or random.Random()
+    x1, y1, x2, y2 = area
+    margin_x = (x2 - x1) * margin
+    margin_y = (y2 - y1) * margin
+    return [(int(rng.uniform(x1 + margin_x, x2 - margin_x)), int(rng.uniform(y1 + margin_y, y2 - margin_y)))
+            for _ in range(count)]
+
+
+class PointErrorAttribution:
+    """Assigns each verification error to the nearest calibration point"""
+
+    def __init__(self, points):
+        # points: {nome: (x, y)} posições de tela dos pontos de calibração
+        self.points = dict(points)
+        self.totals = {name: [0.0, 0] for name in self.points}
+
+    def add(self, target_x, target_y, error):
+        name = min(self.points, key=lambda n: (self.points[n][0] - target_x) ** 2 + (self.points[n][1] - target_y) ** 2)
+        total = self.totals[name]
+        total[0] += error
+        total[1] += 1
+        return name
+
+    def mean_errors(self):
+        return {name: total[0] / total[1] for name, total in self.totals.items() if total[1]}
+
+    def worst(self, tolerance=VERIFICATION_TOLERANCE, limit=MAX_RECAPTURE_POINTS):
+        """Names of the points whose mean error exceeds tolerance, worst first"""
+        errors = self.mean_errors()
+        ranked = sorted((name for name in errors if errors[name] > tolerance), key=errors.get, reverse=True)
+        return ranked[:limit]
@@ -0,0 +1,247 @@
+"""
+Benchmark: latência processo único vs. ingestão/saída em processos separados.
+
+Um processo emissor envia tráfego OSC sintético (/airscan/blob/<n>/x|y) em
+loopback a 120 e 240 Hz. Em cada topologia, o estágio de saída aplica a
+mesma transformação + suavização e uma saída nula com custo fixo; threads
+de carga simulam a contenção de GIL do processo de controle (timers de
+watchdog, logs, chamadas de saída). Latência = recepção na saída - envio,
+ambos em time.perf_counter_ns (relógio monotônico compartilhado).
+
+Uso:
+    python benchmarks/bench_split_process.py --duration 5 --json resultados.json
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AirScan_Pipeline import FrameRing, run_ingest_process, run_output_process  # noqa: E402
+
+BLOB_ID = 6
+OUTPUT_COST_S = 0.0003     # custo aproximado de um moveTo
+WATCHDOG_DELAY_S = 0.1
+
+
+def sender_process(port, rate, duration, send_times, ready_event):
+    """Emit x=k, y=k at a fixed rate; send_times[k] = perf_counter_ns at send"""
+    from pythonosc.udp_client import SimpleUDPClient
+
+    client = SimpleUDPClient("127.0.0.1", port)
+    ready_event.wait()
+    interval_ns = int(1e9 / rate)
+    total = min(int(rate * duration), len(send_times))
+    next_ns = time.perf_counter_ns()
+    for k in range(total):
+        while time.perf_counter_ns() < next_ns:
+            pass
+        # y primeiro: o par só fica completo quando x=k chega
+        client.send_message(f"/airscan/blob/{BLOB_ID}/y", float(k))
+        send_times[k] = time.perf_counter_ns()
+        client.send_message(f"/airscan/blob/{BLOB_ID}/x", float(k))
+        next_ns += interval_ns
+
+
+def _load_thread(stop_event):
+    # Trabalho Python puro competindo pelo GIL (logs, UI, etc.)
+    while not stop_event.is_set():
+        sum(i * i for i in range(2000))
+        time.sleep(0.001)
+
+
+class _OutputStage:
+    """Same work in both topologies: map, smooth, watchdog timer, null output"""
+
+    def __init__(self, load_threads, watchdog_timers):
+        self.received = {}
+        self.history = deque(maxlen=2)
+        self.watchdog = None
+        self.watchdog_timers = watchdog_timers
+        self.stop_event = threading.Event()
+        for _ in range(load_threads):
+            threading.Thread(target=_load_thread, args=(self.stop_event,), daemon=True).start()
+
+    def __call__(self, x, y, t_ns):
+        now = time.perf_counter_ns()
+        if self.watchdog_timers:
+            if self.watchdog:
+                self.watchdog.cancel()
+            self.watchdog = threading.Timer(WATCHDOG_DELAY_S, lambda: None)
+            self.watchdog.daemon = True
+            self.watchdog.start()
+        self.history.append((x * 1.0 + 0.5, y * 1.0 + 0.5))
+        sum(p[0] for p in self.history) / len(self.history)
+        end = time.perf_counter() + OUTPUT_COST_S
+        while time.perf_counter() < end:
+            pass
+        k = int(x)
+        if k not in self.received:
+            self.received[k] = now
+
+    def stop(self):
+        self.stop_event.set()
+        if self.watchdog:
+            self.watchdog.cancel()
+
+
+def split_consumer_factory(results_queue, load_threads, watchdog_timers):
+    stage = _OutputStage(load_threads, watchdog_timers)
+
+    def finish():
+        stage.stop()
+        results_queue.put(stage.received)
+
+    return stage, finish
+
+
+class _SplitFactory:
+    """Picklable consumer factory for the output process"""
+
+    def __init__(self, results_queue, load_threads, watchdog_timers):
+        self.args = (results_queue, load_threads, watchdog_timers)
+
+    def __call__(self):
+        return split_consumer_factory(*self.args)
+
+
+def run_single(ctx, port, rate, duration, load_threads, watchdog_timers):
+    """Control-like topology: ThreadingOSCUDPServer + output stage in one process"""
+    from pythonosc import osc_server
+    from pythonosc.dispatcher import Dispatcher
+
+    stage = _OutputStage(load_threads, watchdog_timers)
+    latest = [None, None]
+
+    def handler(axis):
+        def handle(unused_addr, value):
+            latest[axis] = value
+            if axis == 0 and latest[1] is not None:
+                stage(latest[0], latest[1], time.perf_counter_ns())
+        return handle
+
+    dispatcher = Dispatcher()
+    dispatcher.map(f"/airscan/blob/{BLOB_ID}/x", handler(0))
+    dispatcher.map(f"/airscan/blob/{BLOB_ID}/y", handler(1))
+    server = osc_server.ThreadingOSCUDPServer(("127.0.0.1", port), dispatcher)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    send_times, sender = _start_sender(ctx, port, rate, duration)
+    sender.join()
+    time.sleep(0.3)
+    server.shutdown()
+    server.server_close()
+    stage.stop()
+    return _summarize(send_times, stage.received, rate, duration)
+
+
+def run_split(ctx, port, rate, duration, load_threads, watchdog_timers, ingest_cpu, output_cpu):
+    """Ingest process -> shared-memory ring -> output process"""
+    ring = FrameRing.create()
+    stop_event = ctx.Event()
+    results_queue = ctx.Queue()
+    ingest_ready = ctx.Event()
+    output_ready = ctx.Event()
+
+    ingest = ctx.Process(target=run_ingest_process,
+                         args=(ring.name, port, BLOB_ID, stop_event, ingest_cpu, ingest_ready))
+    output = ctx.Process(target=run_output_process,
+                         args=(ring.name, _SplitFactory(results_queue, load_threads, watchdog_timers),
+                               stop_event, output_cpu, 0.0002, output_ready))
+    ingest.start()
+    output.start()
+    ingest_ready.wait(10)
+    output_ready.wait(10)
+
+    send_times, sender = _start_sender(ctx, port, rate, duration)
+    sender.join()
+    time.sleep(0.3)
+    stop_event.set()
+    received = results_queue.get(timeout=10)
+    ingest.join(5)
+    output.join(5)
+    ring.close()
+    ring.unlink()
+    return _summarize(send_times, received, rate, duration)
+
+
+def _start_sender(ctx, port, rate, duration):
+    send_times = ctx.Array("q", int(rate * duration) + 1, lock=False)
+    ready = ctx.Event()
+    sender = ctx.Process(target=sender_process, args=(port, rate, duration, send_times, ready))
+    sender.start()
+    # Mantém a referência ao Event até o emissor terminar (spawn reabre o semáforo pelo nome)
+    sender.ready_event = ready
+    time.sleep(0.2)
+    ready.set()
+    return send_times, sender
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _summarize(send_times, received, rate, duration):
+    total = int(rate * duration)
+    latencies = sorted(
+        (received[k] - send_times[k]) / 1e6
+        for k in received
+        if 0 <= k < total and send_times[k]
+    )
+    return {
+        "sent": total,
+        "received": len(latencies),
+        "lost": total - len(latencies),
+        "p50_ms": _percentile(latencies, 0.50),
+        "p95_ms": _percentile(latencies, 0.95),
+        "p99_ms": _percentile(latencies, 0.99),
+        "max_ms": latencies[-1] if latencies else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rates", type=int, nargs="+", default=[120, 240])
+    parser.add_argument("--duration", type=float, default=5.0, help="segundos por execução")
+    parser.add_argument("--port", type=int, default=9130)
+    parser.add_argument("--load-threads", type=int, default=1)
+    parser.add_argument("--no-watchdog-timers", action="store_true")
+    parser.add_argument("--ingest-cpu", type=int, default=None)
+    parser.add_argument("--output-cpu", type=int, default=None)
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    args = parser.parse_args(argv)
+
+    ctx = mp.get_context("spawn")
+    watchdog_timers = not args.no_watchdog_timers
+    results = []
+    for rate in args.rates:
+        single = run_single(ctx, args.port, rate, args.duration, args.load_threads, watchdog_timers)
+        results.append({"topology": "single", "rate_hz": rate, **single})
+        split = run_split(ctx, args.port + 1, rate, args.duration, args.load_threads, watchdog_timers,
+                          args.ingest_cpu, args.output_cpu)
+        results.append({"topology": "split", "rate_hz": rate, **split})
+
+    print(f"{'topologia':<10} {'Hz':>5} {'recebidos':>10} {'perdidos':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for r in results:
+        fmt = lambda v: f"{v:8.3f}" if v is not None else f"{'-':>8}"
+        print(f"{r['topology']:<10} {r['rate_hz']:>5} {r['received']:>10} {r['lost']:>9} "
+              f"{fmt(r['p50_ms'])} {fmt(r['p95_ms'])} {fmt(r['p99_ms'])} {fmt(r['max_ms'])}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "split_process", "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
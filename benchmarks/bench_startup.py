@@ -0,0 +1,127 @@
+"""
+Benchmark de inicialização do AirScan_Control em modo headless.
+
+Roda `python -X importtime` em um processo novo que importa o controle e
+cria um AirScanControl com a saída nula, e então:
+  * mede o tempo de import (cumulativo, via -X importtime) e o de partida
+    (import + construção);
+  * lista os módulos mais caros;
+  * falha se módulos pesados que só deveriam carregar sob demanda
+    (pyautogui, pythonosc/asyncio, http.server, PIL) aparecerem, ou se a
+    partida passar de --max-ms.
+
+Uso:
+    python benchmarks/bench_startup.py --runs 5 --max-ms 250 --json startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Não devem ser importados numa partida headless
+FORBIDDEN_MODULES = ("pyautogui", "pythonosc", "asyncio", "http.server", "PIL", "tkinter")
+
+_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import AirScan_Control
+from AirScan_Output import NullOutput
+control = AirScan_Control.AirScanControl(output=NullOutput())
+elapsed = time.perf_counter() - start
+sys.stderr.write("AIRSCAN_STARTUP " + json.dumps({
+    "startup_ms": elapsed * 1000,
+    "forbidden": sorted(m for m in %r if m in sys.modules),
+}) + "\\n")
+"""
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us)] from -X importtime output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        try:
+            modules.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+        except ValueError:
+            continue
+    return modules
+
+
+def run_once(python=sys.executable):
+    env = dict(os.environ, AIRSCAN_OUTPUT_BACKEND="null")
+    result = subprocess.run([python, "-X", "importtime", "-c", _PROBE % (FORBIDDEN_MODULES,)], cwd=ROOT,
+                            env=env, capture_output=True, text=True, timeout=60)
+    probe = None
+    for line in result.stderr.splitlines():
+        if line.startswith("AIRSCAN_STARTUP "):
+            probe = json.loads(line[len("AIRSCAN_STARTUP "):])
+    if result.returncode != 0 or probe is None:
+        raise RuntimeError(f"Processo de teste falhou ({result.returncode}):\n{result.stderr[-2000:]}")
+
+    modules = parse_importtime(result.stderr)
+    control = next((m for m in modules if m[0] == "AirScan_Control"), None)
+    probe["import_ms"] = control[2] / 1000 if control else None
+    probe["modules"] = modules
+    return probe
+
+
+def measure_startup(runs=5, top=10):
+    """Median import/startup time over `runs` fresh interpreters"""
+    samples = [run_once() for _ in range(runs)]
+    # Módulos mais caros da última execução (tempo próprio)
+    heaviest = sorted(samples[-1]["modules"], key=lambda m: m[1], reverse=True)[:top]
+    return {
+        "runs": runs,
+        "import_ms": round(statistics.median(s["import_ms"] for s in samples), 2),
+        "startup_ms": round(statistics.median(s["startup_ms"] for s in samples), 2),
+        "best_startup_ms": round(min(s["startup_ms"] for s in samples), 2),
+        "forbidden_modules": sorted({m for s in samples for m in s["forbidden"]}),
+        "heaviest_modules": [{"module": name, "self_ms": round(self_us / 1000, 2),
+                              "cumulative_ms": round(cumulative_us / 1000, 2)}
+                             for name, self_us, cumulative_us in heaviest],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de inicialização headless do AirScan_Control")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None, help="falha se a partida mediana passar disso")
+    parser.add_argument("--json", default=None, help="arquivo de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    report = measure_startup(args.runs)
+    failures = []
+    if report["forbidden_modules"]:
+        failures.append(f"módulos pesados importados na partida: {', '.join(report['forbidden_modules'])}")
+    if args.max_ms is not None and report["startup_ms"] > args.max_ms:
+        failures.append(f"partida de {report['startup_ms']:.1f}ms excede {args.max_ms:.1f}ms")
+    report["failures"] = failures
+
+    print(f"[BENCH] Import: {report['import_ms']:.1f}ms | Partida headless: {report['startup_ms']:.1f}ms "
+          f"(mediana de {args.runs})", file=sys.stderr)
+    for module in report["heaviest_modules"][:5]:
+        print(f"[BENCH]   {module['module']:<30} {module['self_ms']:>7.2f}ms", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.json:
+        with open(args.json, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    for failure in failures:
+        print(f"[BENCH] FALHA: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,372 @@
+"""
+Suíte de benchmarks do pipeline de controle do AirScan.
+
+Mede cada estágio isolado (decodificação OSC, mapeamento linear /
+homografia / LUT, filtros de suavização, watchdog, gestos, backend de saída) e o
+caminho completo com a saída nula no lugar do pyautogui. Os resultados
+saem em JSON e podem ser comparados com um baseline salvo; estágios que
+ficaram mais lentos que o limite são marcados como regressão (código de
+saída 1).
+
+Uso:
+    python benchmarks/run.py --save-baseline            # grava benchmarks/baseline.json
+    python benchmarks/run.py --json resultados.json     # compara com o baseline
+    python benchmarks/run.py --filter mapping --threshold 0.2
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from AirScan_Filters import ExponentialFilter, MovingAverageFilter  # noqa: E402
+from AirScan_Mapping import HomographyTransform, LinearRangeTransform, LutTransform  # noqa: E402
+from AirScan_Output import NullOutput  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+AIRSCAN_W, AIRSCAN_H = 1920, 1080
+SCREEN_W, SCREEN_H = 1920, 1080
+BLOB_ID = 6
+
+CASES = {}
+
+
+class SkipCase(Exception):
+    """Raised by a case whose dependencies are not available here"""
+
+
+def case(name, iterations):
+    """Register a case: setup() returns body(n) that performs n operations"""
+    def register(setup):
+        CASES[name] = (setup, iterations)
+        return setup
+    return register
+
+
+def _samples(count=1024, seed=42):
+    rng = random.Random(seed)
+    return [(rng.uniform(0, AIRSCAN_W), rng.uniform(0, AIRSCAN_H)) for _ in range(count)]
+
+
+def _homography():
+    # Projeção levemente inclinada (sensor fora do eixo da tela)
+    true = HomographyTransform([1.05, 0.04, 12.0, 0.02, 0.97, -8.0, 1.2e-5, 2.1e-5], -1e9, -1e9, 1e9, 1e9)
+    pairs = [((x, y), true(x, y)) for x in (100, 960, 1820) for y in (80, 540, 1000)]
+    return HomographyTransform.fit(pairs, 0, 0, SCREEN_W, SCREEN_H)
+
+
+def _osc_datagram(address, value):
+    from pythonosc.osc_message_builder import OscMessageBuilder
+    builder = OscMessageBuilder(address=address)
+    builder.add_arg(float(value))
+    return builder.build().dgram
+
+
+def _mapping_body(transform):
+    points = _samples()
+
+    def body(n):
+        pts = points
+        size = len(pts)
+        for i in range(n):
+            x, y = pts[i % size]
+            transform(x, y)
+    return body
+
+
+@case("osc_decode", 20000)
+def bench_osc_decode():
+    try:
+        from pythonosc.dispatcher import Dispatcher
+    except ImportError:
+        raise SkipCase("python-osc não instalado")
+    dispatcher = Dispatcher()
+    dispatcher.map(f"/airscan/blob/{BLOB_ID}/x", lambda addr, value: None)
+    packet = _osc_datagram(f"/airscan/blob/{BLOB_ID}/x", 812.5)
+    client = ("127.0.0.1", 9000)
+
+    def body(n):
+        call = dispatcher.call_handlers_for_packet
+        for _ in range(n):
+            call(packet, client)
+    return body
+
+
+@case("mapping_linear", 200000)
+def bench_mapping_linear():
+    return _mapping_body(LinearRangeTransform(120, 1800, 90, 1000, 0, 0, SCREEN_W, SCREEN_H))
+
+
+@case("mapping_homography", 200000)
+def bench_mapping_homography():
+    return _mapping_body(_homography())
+
+
+@case("mapping_lut", 200000)
+def bench_mapping_lut():
+    return _mapping_body(LutTransform(_homography(), AIRSCAN_W, AIRSCAN_H))
+
+
+@case("smoothing_moving_average", 200000)
+def bench_smoothing_moving_average():
+    return _mapping_body(MovingAverageFilter(5))
+
+
+@case("smoothing_exponential", 200000)
+def bench_smoothing_exponential():
+    return _mapping_body(ExponentialFilter(0.5))
+
+
+@case("watchdog_timer_reset", 2000)
+def bench_watchdog_timer_reset():
+    # Padrão antigo do controle: cancela e recria um threading.Timer por amostra
+    state = {"timer": None}
+
+    def body(n):
+        for _ in range(n):
+            timer = state["timer"]
+            if timer and timer.is_alive():
+                timer.cancel()
+            timer = threading.Timer(0.1, lambda: None)
+            timer.daemon = True
+            timer.start()
+            state["timer"] = timer
+        state["timer"].cancel()
+    return body
+
+
+@case("watchdog_deadline_feed", 200000)
+def bench_watchdog_deadline_feed():
+    # Watchdog por prazo (AirScan_Clock): cada amostra só move o prazo
+    from AirScan_Clock import DeadlineWatchdog, VirtualClock
+    clock = VirtualClock()
+    watchdog = DeadlineWatchdog(0.1, lambda: None, clock)
+
+    def body(n):
+        feed = watchdog.feed
+        for i in range(n):
+            feed(i * 0.001)
+    return body
+
+
+@case("output_null", 500000)
+def bench_output_null():
+    output = NullOutput()
+
+    def body(n):
+        move = output.move_to
+        for i in range(n):
+            move(i, i)
+    return body
+
+
+@case("gestures_two_finger", 100000)
+def bench_gestures_two_finger():
+    # Rastreador + máquina de estados de gestos com dois blobs (scroll), saída nula
+    from AirScan_Gestures import GestureEngine
+    engine = GestureEngine(NullOutput(), {}, 0.1)
+
+    def body(n):
+        on_blob = engine.on_blob
+        for i in range(n):
+            t = i * 0.001
+            offset = (i % 2000) * 0.5
+            on_blob(BLOB_ID, 800.0, 300.0 + offset, t)
+            on_blob(BLOB_ID + 1, 1000.0, 300.0 + offset, t)
+        engine.release(n * 0.001)
+    return body
+
+
+@case("pipeline_components", 50000)
+def bench_pipeline_components():
+    """decode -> map -> smooth -> null output, without AirScanControl"""
+    try:
+        from pythonosc.dispatcher import Dispatcher
+    except ImportError:
+        raise SkipCase("python-osc não instalado")
+    transform = LinearRangeTransform(120, 1800, 90, 1000, 0, 0, SCREEN_W, SCREEN_H)
+    smoothing = MovingAverageFilter(2)
+    output = NullOutput()
+    latest = [0.0, 0.0]
+
+    def handle_x(addr, value):
+        latest[0] = value
+
+    def handle_y(addr, value):
+        latest[1] = value
+        px, py = transform(latest[0], value)
+        sx, sy = smoothing(px, py)
+        output.move_to(int(sx), int(sy))
+
+    dispatcher = Dispatcher()
+    dispatcher.map(f"/airscan/blob/{BLOB_ID}/x", handle_x)
+    dispatcher.map(f"/airscan/blob/{BLOB_ID}/y", handle_y)
+    packets = [(_osc_datagram(f"/airscan/blob/{BLOB_ID}/x", x), _osc_datagram(f"/airscan/blob/{BLOB_ID}/y", y))
+               for x, y in _samples(256)]
+    client = ("127.0.0.1", 9000)
+
+    def body(n):
+        call = dispatcher.call_handlers_for_packet
+        size = len(packets)
+        for i in range(n):
+            px, py = packets[i % size]
+            call(px, client)
+            call(py, client)
+    return body
+
+
+@case("control_end_to_end", 5000)
+def bench_control_end_to_end():
+    """handle_mouse_x/y -> tee -> calibration -> smoothing -> watchdog -> NullOutput"""
+    import AirScan_Control
+    control = AirScan_Control.AirScanControl(output=NullOutput())
+    control.update_interval = 0  # sem throttle: mede todas as amostras
+    points = _samples(256)
+
+    def body(n):
+        size = len(points)
+        for i in range(n):
+            x, y = points[i % size]
+            control.handle_mouse_x(None, x)
+            control.handle_mouse_y(None, y)
+        control.watchdog.cancel()
+    return body
+
+
+@case("startup_headless", 1)
+def bench_startup_headless():
+    """Fresh interpreter: import AirScan_Control + AirScanControl(NullOutput)"""
+    from bench_startup import run_once
+
+    def body(n):
+        for _ in range(n):
+            probe = run_once()
+            if probe["forbidden"]:
+                raise RuntimeError(f"Módulos pesados na partida headless: {', '.join(probe['forbidden'])}")
+    return body
+
+
+def measure(setup, iterations, repeats, warmup=True):
+    """Median and best ns/op over `repeats` runs of body(iterations)"""
+    body = setup()
+    if warmup:
+        body(max(1, iterations // 10))
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        body(iterations)
+        timings.append((time.perf_counter_ns() - start) / iterations)
+    median = statistics.median(timings)
+    return {
+        "ns_per_op": round(median, 2),
+        "best_ns_per_op": round(min(timings), 2),
+        "ops_per_s": round(1e9 / median, 1) if median else None,
+        "iterations": iterations,
+        "repeats": repeats,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment():
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "commit": _git_commit(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Attach baseline ratios; returns the list of regressed case names"""
+    regressions = []
+    for name, result in results.items():
+        reference = (baseline.get("results") or {}).get(name)
+        if not reference or "ns_per_op" not in result or not reference.get("ns_per_op"):
+            continue
+        ratio = result["ns_per_op"] / reference["ns_per_op"]
+        result["baseline_ns_per_op"] = reference["ns_per_op"]
+        result["ratio"] = round(ratio, 3)
+        if ratio > 1 + threshold:
+            result["status"] = "regression"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            result["status"] = "improvement"
+        else:
+            result["status"] = "unchanged"
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline de controle do AirScan")
+    parser.add_argument("--filter", default=None, help="roda apenas casos cujo nome contém o texto")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplica as iterações de cada caso")
+    parser.add_argument("--json", default=None, help="arquivo de saída (padrão: stdout)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="grava os resultados como novo baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="tolerância relativa antes de acusar regressão")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, (setup, iterations) in CASES.items():
+        if args.filter and args.filter not in name:
+            continue
+        try:
+            result = measure(setup, max(1, int(iterations * args.scale)), args.repeats)
+        except SkipCase as e:
+            result = {"skipped": str(e)}
+        results[name] = result
+        summary = result.get("skipped") or f"{result['ns_per_op']:>12.1f} ns/op"
+        print(f"[BENCH] {name:<28} {summary}", file=sys.stderr)
+
+    report = {"environment": environment(), "threshold": args.threshold, "results": results, "regressions": []}
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[BENCH] Baseline gravado em {args.baseline}", file=sys.stderr)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report["baseline"] = baseline.get("environment")
+        report["regressions"] = compare(results, baseline, args.threshold)
+        for name, result in results.items():
+            if "ratio" in result:
+                print(f"[BENCH] {name:<28} {result['ratio']:>6.2f}x baseline ({result['status']})", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.json:
+        with open(args.json, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if report["regressions"]:
+        print(f"[BENCH] REGRESSÕES: {', '.join(report['regressions'])}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
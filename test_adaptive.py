@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Testes da calibração adaptativa (AirScan_Adaptive)
+"""
+
+import math
+
+from AirScan_Adaptive import next_target
+
+RECT = (0, 0, 1920, 1080)
+CORNERS = [(0, 0), (1919, 0), (1919, 1079), (0, 1079)]
+
+
+def flat(sx, sy):
+    """Parede plana: o sensor vê a tela por uma afim"""
+    return 0.8 * sx + 0.1 * sy + 50.0, 0.9 * sy - 0.05 * sx + 30.0
+
+
+def warped(sx, sy):
+    """Parede curva: distorção que nenhum modelo global descreve"""
+    return flat(sx, sy)[0] + 60.0 * math.sin(sx / 300.0), flat(sx, sy)[1] + 45.0 * math.cos(sy / 200.0)
+
+
+def calibration(positions, sensor):
+    points = {}
+    for index, (sx, sy) in enumerate(positions):
+        ax, ay = sensor(sx, sy)
+        points[f"P{index}"] = {"screen": {"x": sx, "y": sy}, "airscan": {"x": ax, "y": ay}}
+    return {"points": points}
+
+
+def capture_until_done(sensor, max_points=16):
+    positions = list(CORNERS)
+    while True:
+        target, worst = next_target(calibration(positions, sensor), RECT, max_points=max_points)
+        if target is None:
+            return positions, worst
+        assert all(math.hypot(target.x - x, target.y - y) > 1 for x, y in positions)
+        positions.append((target.x, target.y))
+
+
+def test_first_target_away_from_corners():
+    """Só os cantos: o próximo alvo vai para o meio da área (pior cobertura)"""
+    target, worst = next_target(calibration(CORNERS, flat), RECT)
+    assert target is not None
+    assert 640 <= target.x <= 1280 and 300 <= target.y <= 780
+    assert math.isfinite(worst)
+
+
+def test_flat_wall_stops_at_min_points():
+    """Parede plana: erro previsto baixo, para no mínimo de pontos"""
+    positions, worst = capture_until_done(flat)
+    assert len(positions) == 6
+    assert worst < 8.0
+
+
+def test_warped_wall_needs_more_points_until_max():
+    """Parede distorcida: continua pedindo pontos e para no máximo"""
+    positions, worst = capture_until_done(warped, max_points=10)
+    assert len(positions) == 10
+    assert worst >= 8.0
+
+
+def test_no_candidate_when_spacing_covers_area():
+    """Todas as células perto de pontos capturados: nenhum alvo, mesmo acima do erro alvo"""
+    target, worst = next_target(calibration(CORNERS, warped), RECT, min_spacing=2.0)
+    assert target is None
+
+
+if __name__ == "__main__":
+    test_first_target_away_from_corners()
+    test_flat_wall_stops_at_min_points()
+    test_warped_wall_needs_more_points_until_max()
+    test_no_candidate_when_spacing_covers_area()
+    print("OK")
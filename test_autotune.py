@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Testes do ajuste automático de suavização e delay de soltura (AirScan_AutoTune)
+"""
+
+import random
+
+from AirScan_AutoTune import SensorStatsEstimator, recommend, transform_scale
+
+
+def stationary_touch(estimator, start, count, rng, sigma=2.0, rate=100.0):
+    for i in range(count):
+        estimator(500.0 + rng.gauss(0.0, sigma), 400.0 + rng.gauss(0.0, sigma), start + i / rate)
+
+
+def test_stationary_jitter_and_touches():
+    """Dedo parado: jitter ~ desvio do ruído; intervalos longos separam toques"""
+    rng = random.Random(7)
+    estimator = SensorStatsEstimator()
+    stationary_touch(estimator, 0.0, 300, rng)
+    stationary_touch(estimator, 10.0, 300, rng)
+    stats = estimator.snapshot()
+    assert stats["touches"] == 2
+    assert stats["intervals"] == 598
+    assert abs(stats["sample_rate"] - 100.0) < 1e-6
+    assert stats["stationary_windows"] > 300
+    # Desvio 2D de um ruído gaussiano de 2 unidades por eixo: ~2.8
+    assert 2.0 < stats["jitter"] < 3.5
+
+
+def test_slow_drag_is_not_jitter():
+    """Arrasto lento cabe no raio de parado, mas a deriva da média o exclui do jitter"""
+    estimator = SensorStatsEstimator(stationary_radius=20.0)
+    for i in range(400):
+        estimator(100.0 + 0.5 * i, 300.0, i / 100.0)
+    stats = estimator.snapshot()
+    assert stats["intervals"] == 399
+    assert stats["stationary_windows"] == 0
+    assert stats["jitter"] is None
+
+
+def test_recommend_release_and_smoothing():
+    """delay = p99 x fator; suavização reduz o jitter em pixels ao alvo, limitada pelo atraso"""
+    stats = {"intervals": 500, "interval_p99": 0.012, "sample_rate": 100.0, "jitter": 1.5}
+    rec = recommend(stats, release_factor=3.0, target_jitter=1.0, scale=2.0)
+    assert rec.mouse_release_delay == 0.036
+    assert rec.smoothing_samples == 9          # (1.5 x 2 / 1)^2
+    assert rec.stats["jitter_px"] == 3.0
+
+    # 60 Hz no throttle: no máximo 1 + 2 x 0.05 x 60 = 7 amostras
+    assert recommend(stats, scale=2.0, update_rate=60).smoothing_samples == 7
+    assert recommend(dict(stats, intervals=10)) is None
+    assert recommend(dict(stats, jitter=None)).smoothing_samples is None
+
+
+def test_transform_scale():
+    """Pixels por unidade do sensor no centro; transformação degenerada devolve None"""
+    assert abs(transform_scale(lambda x, y: (2 * x, 2 * y), 1920, 1080) - 2.0) < 1e-9
+    assert abs(transform_scale(lambda x, y: (int(0.5 * x), int(2 * y)), 1920, 1080) - 1.0) < 0.01
+    assert transform_scale(lambda x, y: (0, 0), 1920, 1080) is None
+
+
+if __name__ == "__main__":
+    test_stationary_jitter_and_touches()
+    test_slow_drag_is_not_jitter()
+    test_recommend_release_and_smoothing()
+    test_transform_scale()
+    print("OK")
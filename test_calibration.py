@@ -6,6 +6,8 @@ Script de teste para verificar se a calibração está sendo reconhecida
 import json
 import os
 
+from AirScan_Storage import CALIBRATION_FILE
+
 def test_calibration_data():
     """Testa se os dados de calibração estão sendo reconhecidos"""
     print("=" * 50)
@@ -13,7 +15,7 @@ def test_calibration_data():
     print("=" * 50)
     
     # Verificar se o arquivo existe
-    calibration_file = "AirScan_Calibration_Data_v1.1.json"
+    calibration_file = CALIBRATION_FILE
     
     if not os.path.exists(calibration_file):
         print(f"[ERRO] Arquivo {calibration_file} nao encontrado!")
@@ -61,6 +63,20 @@ def test_calibration_data():
     print(f"[OK] Versão: {version}")
     print(f"[OK] Total de pontos: {total_points}")
     
+    # Precisão: resíduos por ponto e leave-one-out em pixels de tela
+    try:
+        from AirScan_Fitting import evaluate, format_summary
+    except ImportError:
+        print("[AVISO] NumPy não instalado - precisão não avaliada")
+    else:
+        screen = data["screen"]
+        report = evaluate(data, screen["width"], screen["height"])
+        for line in format_summary(report):
+            print(line)
+        if report["fit"] is None or len(report["per_point"]) != len(points):
+            print("[ERRO] Relatório de precisão incompleto")
+            return False
+    
     print("\n" + "=" * 50)
     print("CALIBRACAO RECONHECIDA COM SUCESSO!")
     print("O sistema de controle deve funcionar corretamente.")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Testes da captura de pontos de calibração (AirScan_Capture)
+"""
+
+from AirScan_Capture import SEGMENT_RESET_GAP, CalibrationPoint, generate_points
+from AirScan_Clock import VirtualClock
+
+
+def feed(point, start, end, x=100.0, y=200.0, rate=50):
+    """Amostras a `rate` Hz com timestamps de recepção entre start e end"""
+    steps = int(round((end - start) * rate))
+    for i in range(steps + 1):
+        point.add_data(x, y, start + i / rate)
+
+
+def test_batched_samples_use_arrival_time():
+    """Um lote drenado de uma vez conta o tempo pelos timestamps dos pacotes, não pelo relógio"""
+    clock = VirtualClock(100.0)
+    point = CalibrationPoint(0, 0, "CENTER", clock=clock)
+    point.start_capture(timestamp=10.0)
+
+    # Fila acumulou 2s de amostras: ainda incompleto, mesmo com o relógio bem à frente
+    feed(point, 10.0, 12.0)
+    assert not point.capture_complete()
+    assert abs(point.captured_duration() - 2.0) < 1e-6
+
+    feed(point, 12.02, 15.0)
+    assert point.capture_complete()
+    assert point.get_average() == {"x": 100.0, "y": 200.0}
+
+
+def test_sample_statistics():
+    """Contagem, variâncias amostrais e covariância das amostras capturadas"""
+    point = CalibrationPoint(0, 0, "CENTER", clock=VirtualClock())
+    assert point.get_statistics() is None
+    point.start_capture(timestamp=0.0)
+    for i, (x, y) in enumerate(((10.0, 20.0), (12.0, 24.0), (14.0, 22.0))):
+        point.add_data(x, y, i * 0.02)
+    assert point.get_statistics() == {"count": 3, "var_x": 4.0, "var_y": 4.0, "cov_xy": 2.0}
+
+
+def test_short_dropout_keeps_accumulated_time():
+    """Falha curta fecha o trecho e mantém o tempo; só uma ausência longa recomeça a captura"""
+    point = CalibrationPoint(0, 0, "CENTER", clock=VirtualClock())
+    point.start_capture(timestamp=0.0)
+    feed(point, 0.0, 3.0)
+    feed(point, 4.0, 5.0)        # 1s sem dados
+    assert len(point.segments) == 1
+    assert abs(point.captured_duration() - 4.0) < 1e-6
+    feed(point, 5.02, 6.2)
+    assert point.capture_complete()
+
+    point.start_capture(timestamp=10.0)
+    feed(point, 10.0, 12.0)
+    point.add_data(100.0, 200.0, 12.0 + SEGMENT_RESET_GAP + 0.1)
+    assert not point.is_capturing and point.captured_duration() == 0.0
+
+
+def test_inconsistent_segment_is_discarded():
+    """Trecho com média longe dos aceitos é descartado; se for o mais longo, os anteriores é que saem"""
+    point = CalibrationPoint(0, 0, "CENTER", clock=VirtualClock())
+    point.start_capture(timestamp=0.0)
+    feed(point, 0.0, 3.0)
+    feed(point, 3.7, 4.2, x=300.0)          # mão escorregou para outro lugar
+    feed(point, 5.0, 7.2)
+    assert point.capture_complete()
+    assert point.discarded_segments == 1
+    assert point.get_average() == {"x": 100.0, "y": 200.0}
+
+    point.start_capture(timestamp=20.0)
+    feed(point, 20.0, 21.0, x=300.0)
+    feed(point, 21.7, 24.0)                 # trecho consistente mais longo vence
+    assert point.discarded_segments == 1
+    feed(point, 24.02, 27.0)
+    assert point.capture_complete()
+    assert point.get_average() == {"x": 100.0, "y": 200.0}
+
+
+def test_generate_points_levels():
+    """Layouts por nível dentro da área; alvos na borda ficam dentro do último pixel"""
+    area = {"x1": 100, "y1": 50, "x2": 1100, "y2": 650}
+    assert [len(generate_points(level, area)) for level in ("basic", "advanced", "professional", "adaptive")] == \
+        [5, 9, 13, 4]
+    assert generate_points("unknown", area) == []
+    points = generate_points("professional", area)
+    assert all(100 <= p.x <= 1099 and 50 <= p.y <= 649 for p in points)
+    assert (points[-1].x, points[-1].y) == (600, 350)
+
+
+if __name__ == "__main__":
+    test_batched_samples_use_arrival_time()
+    test_sample_statistics()
+    test_short_dropout_keeps_accumulated_time()
+    test_inconsistent_segment_is_discarded()
+    test_generate_points_levels()
+    print("OK")
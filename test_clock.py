@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Testes do relógio injetável e do watchdog (AirScan_Clock)
+"""
+
+import time
+
+from AirScan_Clock import CLOCK, DeadlineWatchdog, VirtualClock
+
+
+def test_virtual_clock_never_goes_back():
+    """VirtualClock só avança (amostras reordenadas não voltam o tempo)"""
+    clock = VirtualClock(10.0)
+    clock.set(12.5)
+    clock.set(11.0)
+    assert clock.now() == 12.5
+    clock.advance(0.5)
+    assert clock.now() == 13.0
+    assert clock.now_ns() == 13_000_000_000
+
+
+def test_watchdog_virtual_check():
+    """Com relógio virtual o watchdog dispara uma vez após o prazo sem feed()"""
+    clock = VirtualClock()
+    fired = []
+    watchdog = DeadlineWatchdog(0.5, lambda: fired.append(clock.now()), clock=clock)
+    watchdog.feed(clock.now())
+    clock.advance(0.3)
+    assert not watchdog.check(clock.now())
+    watchdog.feed(clock.now())
+    clock.advance(0.3)
+    assert not watchdog.check(clock.now())
+    clock.advance(0.3)
+    assert watchdog.check(clock.now())
+    assert not watchdog.check(clock.now())
+    assert fired == [clock.now()]
+
+
+def test_watchdog_stop_interrupts_wait():
+    """stop() acorda a thread do watchdog sem esperar o prazo inteiro"""
+    fired = []
+    watchdog = DeadlineWatchdog(30.0, lambda: fired.append(True), clock=CLOCK)
+    thread = watchdog.start()
+    watchdog.feed(CLOCK.now())
+    time.sleep(0.05)
+    started = time.perf_counter()
+    watchdog.stop()
+    thread.join(2.0)
+    assert not thread.is_alive()
+    assert time.perf_counter() - started < 2.0
+    assert not fired
+
+
+if __name__ == "__main__":
+    test_virtual_clock_never_goes_back()
+    test_watchdog_virtual_check()
+    test_watchdog_stop_interrupts_wait()
+    print("OK")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Testes da configuração validada (AirScan_Config)
+"""
+
+import json
+import os
+import tempfile
+
+from AirScan_Config import ConfigError, ConfigLoader, ConfigWatcher, defaults, parse_value, validate
+
+
+def test_defaults_are_valid():
+    """A configuração padrão passa na validação"""
+    config = defaults()
+    assert validate(config) is config
+
+
+def test_validate_lists_every_error():
+    """Todas as chaves inválidas aparecem no mesmo ConfigError"""
+    config = defaults()
+    config.update({"port": 0, "smoothing_samples": "3", "auto_tune": "always", "mode": "Dome", "typo": 1})
+    try:
+        validate(config)
+    except ConfigError as e:
+        errors = e.errors
+    else:
+        raise AssertionError("configuração inválida aceita")
+    assert len(errors) == 5
+    assert any("'port' deve ser >= 1" in error for error in errors)
+    assert any("'smoothing_samples' tem tipo inválido" in error for error in errors)
+    assert any("'auto_tune' deve ser um de" in error for error in errors)
+    assert any("Modo 'Dome' inválido" in error for error in errors)
+    assert any("chave desconhecida: 'typo'" in error for error in errors)
+
+
+def test_parse_value_keeps_text_keys():
+    """Env/CLI: números viram números; chaves de texto ficam texto, anuláveis aceitam null/vazio"""
+    assert parse_value("120", "mouse_update_rate") == 120
+    assert parse_value("null", "output_backend") == "null"
+    assert parse_value("", "session_record_path") is None
+    assert parse_value("[1, 2]") == [1, 2]
+    assert parse_value("Cave") == "Cave"
+
+
+def test_override_precedence_and_hot_reload():
+    """Arquivo < variáveis de ambiente < --set; recarga aplica só as chaves a quente"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.json")
+        with open(path, "w") as f:
+            json.dump({"mouse_update_rate": 90, "smoothing_samples": 4, "port": 9000}, f)
+        loader = ConfigLoader(path, argv=["--set", "smoothing_samples=6"],
+                              environ={"AIRSCAN_MOUSE_UPDATE_RATE": "120"})
+        config = loader.load()
+        assert (config["mouse_update_rate"], config["smoothing_samples"], config["port"]) == (120, 6, 9000)
+
+        changes = []
+        watcher = ConfigWatcher(changes.append, loader)
+        watcher.current = dict(config)
+        with open(path, "w") as f:
+            json.dump({"mouse_release_delay": 0.2, "smoothing_samples": 4, "port": 9001}, f)
+        assert watcher.reload() == {"mouse_release_delay": 0.2}
+        assert changes == [{"mouse_release_delay": 0.2}]
+
+        # Arquivo inválido: mantém a configuração atual
+        with open(path, "w") as f:
+            json.dump({"mouse_release_delay": 50}, f)
+        assert watcher.reload() is None
+        assert watcher.current["mouse_release_delay"] == 0.2
+
+
+def test_validate_outputs():
+    """Saídas do desktop estendido: id de texto único e retângulo com inteiros válidos"""
+    config = defaults()
+    config["outputs"] = [{"id": "esquerda", "x": 0, "y": 0, "width": 1920, "height": 1080},
+                         {"id": "direita", "x": 1920, "y": 0, "width": 1920, "height": 1080}]
+    validate(config)
+    config["outputs"] += [{"id": "direita", "x": 3840, "y": 0, "width": 1920, "height": 1080},
+                          {"id": 3, "x": 0, "y": 0, "width": 0, "height": 1080}, "teto"]
+    try:
+        validate(config)
+    except ConfigError as e:
+        errors = e.errors
+    else:
+        raise AssertionError("saídas inválidas aceitas")
+    assert any("'direita' repetido" in error for error in errors)
+    assert any("outputs[3].id" in error for error in errors)
+    assert any("outputs[3].width" in error for error in errors)
+    assert any("outputs[4] deve ser um objeto" in error for error in errors)
+
+
+if __name__ == "__main__":
+    test_defaults_are_valid()
+    test_validate_lists_every_error()
+    test_parse_value_keeps_text_keys()
+    test_override_precedence_and_hot_reload()
+    test_validate_outputs()
+    print("OK")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Testes do observador de resolução da tela (AirScan_Display)
+"""
+
+import threading
+
+from AirScan_Display import DisplayWatcher
+
+
+def test_update_fires_only_on_change():
+    """on_change só é chamado quando o tamanho muda; erro no callback não derruba o observador"""
+    changes = []
+    watcher = DisplayWatcher(lambda: (1920, 1080), changes.append)
+    watcher._update((1920, 1080))
+    watcher._update((3840, 2160))
+    watcher._update((3840, 2160))
+    assert changes == [(3840, 2160)]
+
+    watcher.on_change = lambda size: 1 / 0
+    watcher._update((1280, 720))
+    assert watcher.size == (1280, 720)
+
+
+def test_polling_picks_up_new_resolution():
+    """Sem RandR, a consulta periódica do backend detecta a troca"""
+    size = [(1920, 1080)]
+    changed = threading.Event()
+    changes = []
+
+    def on_change(new_size):
+        changes.append(new_size)
+        changed.set()
+
+    watcher = DisplayWatcher(lambda: size[0], on_change, poll_interval=0.01)
+    watcher._open_randr = lambda: None
+    assert watcher.start() == "polling"
+    try:
+        size[0] = (2560, 1440)
+        assert changed.wait(2.0)
+    finally:
+        watcher.stop()
+        watcher.thread.join(2.0)
+    assert changes == [(2560, 1440)]
+
+
+if __name__ == "__main__":
+    test_update_fires_only_on_change()
+    test_polling_picks_up_new_resolution()
+    print("OK")
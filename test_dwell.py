@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Testes da calibração em ordem livre (AirScan_Dwell)
+"""
+
+import os
+import random
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+from AirScan_Dwell import DwellClusterer, TargetAssigner
+
+
+def hold(clusterer, x, y, start, duration, rng, rate=50.0, noise=3.0):
+    """Amostras de uma mão parada; devolve as permanências emitidas"""
+    dwells = []
+    for i in range(int(duration * rate) + 1):
+        dwell = clusterer.add(x + rng.gauss(0.0, noise), y + rng.gauss(0.0, noise), start + i / rate)
+        if dwell:
+            dwells.append(dwell)
+    return dwells
+
+
+def test_dwell_emitted_once_per_stable_group():
+    """Mão parada por dwell_time gera uma única permanência; o deslocamento não gera nenhuma"""
+    rng = random.Random(5)
+    clusterer = DwellClusterer(dwell_time=2.0)
+    # Deslocamento: amostras a 40 unidades umas das outras
+    assert [clusterer.add(100.0 + 40 * i, 100.0, i * 0.02) for i in range(20)] == [None] * 20
+
+    dwells = hold(clusterer, 500.0, 400.0, 1.0, 3.0, rng)
+    assert len(dwells) == 1
+    dwell = dwells[0]
+    assert abs(dwell.x - 500.0) < 2.0 and abs(dwell.y - 400.0) < 2.0
+    assert dwell.count == 101 and abs(dwell.end - dwell.start - 2.0) < 1e-9
+    assert 4.0 < dwell.var_x < 16.0
+    assert clusterer.progress == 0.0
+    assert DwellClusterer.statistics(dwell)["count"] == 101
+
+
+def test_gap_and_expire_restart_group():
+    """Falha maior que max_gap recomeça o grupo; expire() descarta a mão levantada"""
+    rng = random.Random(6)
+    clusterer = DwellClusterer(dwell_time=2.0, max_gap=0.5)
+    assert hold(clusterer, 500.0, 400.0, 0.0, 1.5, rng) == []
+    assert abs(clusterer.progress - 0.75) < 1e-9
+    assert hold(clusterer, 500.0, 400.0, 2.2, 1.0, rng) == []   # 0.7s sem dados
+    assert abs(clusterer.progress - 0.5) < 1e-9
+    clusterer.expire(4.0)
+    assert clusterer.progress == 0.0 and clusterer.count == 0
+
+
+def test_assigner_nearest_unfilled_target():
+    """Permanência vai para o alvo mais próximo pela estimativa; repetida ou longe demais é ignorada"""
+    targets = {"TOP_LEFT": (100, 100), "TOP_RIGHT": (1800, 100), "BOTTOM_RIGHT": (1800, 980),
+               "BOTTOM_LEFT": (100, 980), "CENTER": (950, 540)}
+    # Sensor deslocado 80px da estimativa proporcional
+    sensor = {name: (x - 80, y + 60) for name, (x, y) in targets.items()}
+    coarse = lambda x, y: (int(x), int(y))
+    assigner = TargetAssigner(targets, coarse, (0, 0, 1920, 1080), max_distance=200)
+
+    assert assigner.assign(*sensor["CENTER"]) == "CENTER"
+    assert assigner.assign(*sensor["CENTER"]) is None            # alvo já preenchido
+    assert assigner.assign(600, 300) is None                      # longe de qualquer alvo
+    assert assigner.assign(*sensor["TOP_LEFT"]) == "TOP_LEFT"
+    assert assigner.mapping is coarse
+    assert assigner.assign(*sensor["TOP_RIGHT"]) == "TOP_RIGHT"
+    # Três alvos não colineares: ajuste afim substitui a estimativa e acerta os demais
+    assert assigner.mapping is not coarse
+    x, y = assigner.mapping(*sensor["BOTTOM_LEFT"])
+    assert abs(x - 100) <= 1 and abs(y - 980) <= 1
+    assert assigner.unfilled == ["BOTTOM_RIGHT", "BOTTOM_LEFT"]
+
+
+def test_previous_transform_survives_unreadable_file():
+    """Calibração anterior corrompida: ordem livre usa o mapeamento proporcional em vez de falhar"""
+    pytest.importorskip("pyautogui")
+    import AirScan_Calibration
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, AirScan_Calibration.CALIBRATION_FILE), "w") as f:
+            f.write('{"points": {"CENTER"')
+        os.chdir(directory)
+        try:
+            transform = AirScan_Calibration.CalibrationWindow.previous_transform(SimpleNamespace(sensor_id=None))
+        finally:
+            os.chdir(cwd)
+    assert transform(0, 0) == (0, 0)
+
+
+if __name__ == "__main__":
+    test_dwell_emitted_once_per_stable_group()
+    test_gap_and_expire_restart_group()
+    test_assigner_nearest_unfilled_target()
+    test_previous_transform_survives_unreadable_file()
+    print("OK")
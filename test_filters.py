@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Testes dos filtros de suavização (AirScan_Filters)
+"""
+
+import threading
+
+from AirScan_Filters import MovingAverageFilter
+
+
+def test_moving_average_window():
+    """Média das últimas `window` amostras"""
+    smoothing = MovingAverageFilter(3)
+    assert smoothing(3, 30) == (3, 30)
+    smoothing(6, 60)
+    smoothing(9, 90)
+    assert smoothing(12, 120) == (9, 90)
+
+
+def test_moving_average_interleaved_callers():
+    """Outra thread chamando o filtro no meio de uma atualização não faz a soma corrente divergir"""
+    smoothing = MovingAverageFilter(4)
+    others = []
+
+    class Interleaving(float):
+        # Coordenada cuja soma dispara uma chamada concorrente entre a leitura
+        # e a escrita de sum_x (a intercalação que perde uma atualização)
+        def __radd__(self, other):
+            if not others:
+                other_thread = threading.Thread(target=smoothing, args=(50.0, 50.0))
+                others.append(other_thread)
+                other_thread.start()
+                other_thread.join(0.2)
+            return float(self) + other
+
+    smoothing(10.0, 10.0)
+    smoothing(Interleaving(20.0), 20.0)
+    others[0].join()
+
+    assert len(smoothing.history) == 3
+    assert smoothing.sum_x == sum(float(x) for x, _ in smoothing.history)
+    assert smoothing.sum_y == sum(y for _, y in smoothing.history)
+
+
+if __name__ == "__main__":
+    test_moving_average_window()
+    test_moving_average_interleaved_callers()
+    print("OK")
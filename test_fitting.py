@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Testes da avaliação e seleção de modelos da calibração (AirScan_Fitting)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from AirScan_Fitting import (POINT_VARIANCE_FLOOR, choose_model, error_field, evaluate, point_weights,
+                             render_svg, render_text, select_model)
+from AirScan_Mapping import compile_transform
+
+AREA = {"x1": 100, "y1": 50, "x2": 1820, "y2": 1030}
+
+
+def affine(x, y):
+    """Projeção do sensor na tela com escala, rotação leve e deslocamento"""
+    return 0.9 * x + 0.05 * y + 60.0, -0.03 * x + 0.92 * y + 40.0
+
+
+def calibration(offsets=None):
+    """Documento com 9 pontos em grade; offsets desloca a posição capturada de alguns pontos"""
+    points = {}
+    for row, y in enumerate((80, 540, 1000)):
+        for col, x in enumerate((120, 960, 1800)):
+            name = f"P{row}{col}"
+            sx, sy = affine(x, y)
+            dx, dy = (offsets or {}).get(name, (0.0, 0.0))
+            points[name] = {"screen": {"x": sx, "y": sy}, "airscan": {"x": x + dx, "y": y + dy}}
+    return {"points": points, "calibration_area": dict(AREA), "screen": {"width": 1920, "height": 1080}}
+
+
+def test_evaluate_residuals_and_worst_point():
+    """Modelo exato: resíduo abaixo do truncamento; um ponto mal capturado é o pior no LOO"""
+    report = evaluate(calibration(), 1920, 1080, model="affine")
+    assert report["model"] == "affine" and report["points"] == 9
+    assert report["fit"]["max"] <= 1.5 and report["loo"]["max"] <= 1.5
+    assert report["rect"] == [100, 50, 1820, 1030]
+
+    report = evaluate(calibration({"P11": (40.0, -30.0)}), 1920, 1080, model="affine")
+    assert report["worst_point"] == "P11"
+    per_point = report["per_point"]
+    assert per_point["P11"]["loo_error"] == max(p["loo_error"] for p in per_point.values())
+    assert per_point["P11"]["loo_error"] > per_point["P11"]["error"]
+
+
+def test_heatmap_rendering():
+    """Mapa de erro na área calibrada: grade pedida, texto com moldura e SVG com os pontos"""
+    report = evaluate(calibration({"P00": (30.0, 30.0)}), 1920, 1080, model="affine")
+    field = error_field(report, cols=24, rows=12)
+    assert field.shape == (12, 24)
+    # Maior erro estimado no canto do ponto ruim
+    assert field[0, 0] == field.max()
+    lines = render_text(field)
+    assert len(lines) == 12 + 3 and all(len(line) == 26 for line in lines[:-1])
+    svg = render_svg(report, field)
+    assert svg.count("<rect") == 12 * 24 and svg.count("<circle") == 9
+
+
+def test_choose_model_prefers_simpler_within_tolerance():
+    """Menor RMS LOO vence, mas dentro de MODEL_TIE_TOLERANCE fica o modelo mais simples"""
+    results = [{"name": "mesh", "loo": {"rms": 2.0}}, {"name": "affine", "loo": {"rms": 2.8}},
+               {"name": "linear", "loo": {"rms": 9.0}}, {"name": "homography", "error": "degenerado"}]
+    assert choose_model(results)["name"] == "affine"
+    results[1]["loo"]["rms"] = 3.5
+    assert choose_model(results)["name"] == "mesh"
+    assert choose_model([{"name": "affine", "error": "degenerado"}]) is None
+
+
+def test_select_model_finds_affine():
+    """Seleção por LOO escolhe a afim para uma projeção afim, e o modelo compilado reproduz os alvos"""
+    data = calibration()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        selection = select_model(data, 1920, 1080, executor=executor)
+    assert selection["name"] == "affine"
+    assert selection["scores"]["affine"]["loo_rms"] <= 1.5
+    assert selection["scores"]["linear_range"]["loo_rms"] > selection["scores"]["affine"]["loo_rms"]
+
+    data["model"] = {"name": selection["name"], "params": selection["params"]}
+    transform = compile_transform(data, 1920, 1080, 1920, 1080)
+    for point in data["points"].values():
+        x, y = transform(point["airscan"]["x"], point["airscan"]["y"])
+        assert abs(x - point["screen"]["x"]) <= 1.5 and abs(y - point["screen"]["y"]) <= 1.5
+
+
+def test_point_weights_inverse_variance():
+    """Peso = 1 / variância da média (com piso), média 1; pontos sem estatística recebem a mediana"""
+    data = calibration()
+    assert point_weights(data, list(data["points"])) is None
+
+    points = data["points"]
+    points["P00"]["samples"] = {"count": 100, "var_x": 25.0, "var_y": 25.0, "cov_xy": 0.0}   # 0.5 + piso
+    points["P01"]["samples"] = {"count": 100, "var_x": 0.0, "var_y": 0.0, "cov_xy": 0.0}     # só o piso
+    points["P02"]["samples"] = {"count": 10, "var_x": 45.0, "var_y": 45.0, "cov_xy": 0.0}    # 9 + piso
+    names = list(points)
+    weights = point_weights(data, names)
+    assert abs(weights.mean() - 1.0) < 1e-9
+    variance = {"P00": 0.5 + POINT_VARIANCE_FLOOR, "P01": POINT_VARIANCE_FLOOR, "P02": 9.0 + POINT_VARIANCE_FLOOR}
+    assert abs(weights[0] / weights[1] - variance["P01"] / variance["P00"]) < 1e-9
+    # Demais pontos: variância mediana (a do P00)
+    assert all(abs(w - weights[0]) < 1e-9 for w in weights[3:])
+
+
+def test_weighted_fit_discounts_noisy_point():
+    """Ponto instável e deslocado pesa menos: os demais ficam mais perto dos alvos"""
+    data = calibration({"P11": (30.0, -25.0)})
+    unweighted = evaluate(data, 1920, 1080, model="affine")
+    for name, point in data["points"].items():
+        noisy = name == "P11"
+        point["samples"] = {"count": 20 if noisy else 200, "var_x": 400.0 if noisy else 4.0,
+                            "var_y": 400.0 if noisy else 4.0, "cov_xy": 0.0}
+    weighted = evaluate(data, 1920, 1080, model="affine")
+    assert weighted["weighted"] and not unweighted["weighted"]
+    others = [name for name in data["points"] if name != "P11"]
+    error = lambda report: max(report["per_point"][name]["error"] for name in others)
+    assert error(weighted) < error(unweighted)
+    assert weighted["per_point"]["P11"]["weight"] < 0.1
+
+
+if __name__ == "__main__":
+    test_evaluate_residuals_and_worst_point()
+    test_heatmap_rendering()
+    test_choose_model_prefers_simpler_within_tolerance()
+    test_select_model_finds_affine()
+    test_point_weights_inverse_variance()
+    test_weighted_fit_discounts_noisy_point()
+    print("OK")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Testes do reconhecimento de gestos (AirScan_Gestures)
+"""
+
+from AirScan_Gestures import (BlobTracker, Gesture, GestureEngine, GestureRecognizer, LONG_PRESS_TIME, SCROLL_STEP,
+                              SWIPE_MAX_DURATION, SWIPE_MIN_DISTANCE, validate_actions)
+from AirScan_Output import NullOutput
+
+
+def drag(path, duration, steps=10, start=0.0):
+    """Gestos reconhecidos para um dedo indo de path[0] a path[1] em `duration` segundos"""
+    gestures = []
+    recognizer = GestureRecognizer(gestures.append)
+    (x0, y0), (x1, y1) = path
+    for i in range(steps + 1):
+        f = i / steps
+        recognizer.feed({6: (x0 + (x1 - x0) * f, y0 + (y1 - y0) * f)}, start + duration * f)
+    recognizer.feed({}, start + duration + 0.1)
+    return [gesture.name for gesture in gestures]
+
+
+def test_swipe_thresholds():
+    """Swipe exige distância mínima, duração máxima e eixo dominante"""
+    assert drag(((100, 500), (100 + SWIPE_MIN_DISTANCE, 520)), 0.2) == ["swipe_right"]
+    assert drag(((900, 500), (600, 480)), 0.2) == ["swipe_left"]
+    assert drag(((500, 800), (510, 500)), 0.3) == ["swipe_up"]
+    assert drag(((100, 500), (100 + SWIPE_MIN_DISTANCE - 1, 500)), 0.2) == []      # curto demais
+    assert drag(((100, 500), (600, 500)), SWIPE_MAX_DURATION + 0.1) == []         # lento demais
+    assert drag(((100, 100), (400, 300)), 0.2) == []                               # diagonal
+
+
+def test_long_press_suppresses_swipe():
+    """Dedo parado por LONG_PRESS_TIME dispara long_press uma vez"""
+    gestures = []
+    recognizer = GestureRecognizer(gestures.append)
+    for i in range(20):
+        recognizer.feed({6: (300 + i % 3, 300)}, i * LONG_PRESS_TIME / 10)
+    recognizer.feed({}, 3.0)
+    assert [gesture.name for gesture in gestures] == ["long_press"]
+
+
+def test_two_finger_scroll_and_pinch():
+    """Centroide vertical vira scroll em passos; variação da distância vira pinch; o modo trava"""
+    gestures = []
+    recognizer = GestureRecognizer(gestures.append)
+    recognizer.feed({6: (400, 400), 7: (600, 400)}, 0.0)
+    for i, dy in enumerate((10, 30, 50, 2 * SCROLL_STEP + 5)):
+        # Afastar os dedos depois que o scroll travou não vira pinch
+        recognizer.feed({6: (400 - i * 40, 400 + dy), 7: (600 + i * 40, 400 + dy)}, 0.1 * (i + 1))
+    assert [(g.name, g.value) for g in gestures] == [("scroll", 1), ("scroll", 1)]
+    assert recognizer.multi_touch
+
+    # Um dedo levanta: nada de swipe até levantar todos
+    recognizer.feed({6: (100, 400)}, 0.6)
+    recognizer.feed({6: (900, 400)}, 0.7)
+    recognizer.feed({}, 0.8)
+    assert len(gestures) == 2 and not recognizer.multi_touch
+
+    gestures.clear()
+    recognizer.feed({6: (400, 400), 7: (600, 400)}, 1.0)
+    recognizer.feed({6: (380, 400), 7: (620, 400)}, 1.1)   # distância x1.2: decide pinch
+    recognizer.feed({6: (340, 400), 7: (660, 400)}, 1.2)   # x1.6: pinch_out
+    recognizer.feed({6: (420, 400), 7: (580, 400)}, 1.3)   # x0.5 da referência: pinch_in
+    assert [g.name for g in gestures] == ["pinch_out", "pinch_in"]
+
+
+def test_blob_tracker_expires_stale_blobs():
+    """Blob sem atualização por `timeout` sai do quadro"""
+    tracker = BlobTracker(0.1)
+    tracker.update(6, 10, 10, 0.0)
+    assert tracker.update(7, 20, 20, 0.05) == {6: (10, 10), 7: (20, 20)}
+    assert tracker.update(7, 21, 21, 0.2) == {7: (21, 21)}
+
+
+def test_validate_actions():
+    """Gesto desconhecido ou ação inválida viram mensagens de erro"""
+    assert validate_actions({"swipe_left": ["alt", "left"], "long_press": "right_click", "pinch_in": None}) == []
+    assert len(validate_actions({"wave": None, "swipe_up": "jump", "scroll": ["ctrl"]})) == 3
+
+
+def test_engine_dispatches_actions():
+    """Scroll vira roda do mouse; demais gestos seguem o mapeamento (atalho, clique ou nada)"""
+    output = NullOutput()
+    engine = GestureEngine(output, {"swipe_left": ["alt", "left"], "long_press": "right_click",
+                                    "pinch_in": "double_click", "swipe_up": None}, 0.1)
+    for name, value in (("scroll", -2), ("swipe_left", (-300, 0)), ("long_press", None),
+                        ("pinch_in", 0.7), ("swipe_up", (0, -300))):
+        engine.dispatch(Gesture(name, value, 0, 0, 0.0))
+    assert list(output.events) == [("scroll", -2), ("hotkey", ("alt", "left")), ("click", "right", 1),
+                                   ("click", "left", 2)]
+
+
+if __name__ == "__main__":
+    test_swipe_thresholds()
+    test_long_press_suppresses_swipe()
+    test_two_finger_scroll_and_pinch()
+    test_blob_tracker_expires_stale_blobs()
+    test_validate_actions()
+    test_engine_dispatches_actions()
+    print("OK")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Testes do estágio de ingestão (AirScan_Ingest)
+"""
+
+import threading
+
+from AirScan_Ingest import OverlapDeduplicator, SampleTee, parse_sensor_sources
+
+
+def test_tee_fans_out_to_subscribers():
+    """Cada amostra chega a todos os inscritos; um consumidor com erro não derruba os demais"""
+    tee = SampleTee()
+    received = []
+
+    def failing(x, y, timestamp):
+        raise RuntimeError("consumidor quebrado")
+
+    mouse = tee.subscribe(lambda x, y, t: received.append(("mouse", x, y, t)))
+    tee.subscribe(failing)
+    calibration = tee.subscribe(lambda x, y, t: received.append(("calibration", x, y, t)))
+    assert len(tee) == 3
+
+    tee.publish(10, 20, 1.5)
+    assert received == [("mouse", 10, 20, 1.5), ("calibration", 10, 20, 1.5)]
+
+    tee.unsubscribe(calibration)
+    tee.unsubscribe(failing)
+    tee.publish(11, 21, 1.6)
+    assert received[-1] == ("mouse", 11, 21, 1.6)
+    assert len(received) == 3
+    tee.unsubscribe(mouse)
+    assert len(tee) == 0
+
+
+def test_parse_sensor_sources_defaults():
+    """Sensores sem porta/blob herdam os padrões; o id padrão é o índice"""
+    sources = parse_sensor_sources([{"id": "left"}, {"port": 7001, "blob_id": 3, "address": "10.0.0.2"}],
+                                   7000, 6)
+    assert [tuple(source) for source in sources] == [("left", 7000, 6, None), ("1", 7001, 3, "10.0.0.2")]
+
+
+def test_overlap_prefers_higher_priority_sensor():
+    """Blob perto de um reportado por sensor de maior prioridade (menor índice) é descartado"""
+    dedupe = OverlapDeduplicator(40, 0.1)
+    assert dedupe.accept(0, 100, 100, 0.0)
+    assert not dedupe.accept(1, 120, 110, 0.05)   # mesma região, dentro da janela
+    assert dedupe.accept(1, 300, 300, 0.06)       # longe
+    assert dedupe.accept(1, 101, 101, 0.2)        # amostra do sensor 0 já expirou
+    assert dedupe.accept(0, 101, 101, 0.21)       # maior prioridade nunca é descartada
+    # Sensor 0 mudou de célula: a posição antiga não descarta mais nada
+    assert dedupe.accept(0, 900, 900, 0.22)
+    assert dedupe.accept(1, 100, 100, 0.23)
+
+
+def test_overlap_concurrent_move_keeps_entry():
+    """Um sensor saindo da célula enquanto outro entra nela não apaga a entrada do outro"""
+    dedupe = OverlapDeduplicator(40, 0.1)
+    assert dedupe.accept(1, 100, 100, 0.0)
+    threads = []
+
+    class Interleaving(int):
+        # Prioridade cujo hash (na inserção na célula) roda o outro socket no meio do accept
+        calls = 0
+
+        def __hash__(self):
+            Interleaving.calls += 1
+            if Interleaving.calls == 2:
+                thread = threading.Thread(target=dedupe.accept, args=(1, 500, 500, 0.01))
+                thread.start()
+                thread.join(0.2)
+                threads.append(thread)
+            return int.__hash__(self)
+
+    assert dedupe.accept(Interleaving(0), 110, 110, 0.0)
+    for thread in threads:
+        thread.join()
+    assert threads
+    # O sensor 0 continua registrado: o sensor 1 de volta à região é descartado
+    assert not dedupe.accept(1, 105, 105, 0.02)
+
+
+if __name__ == "__main__":
+    test_tee_fans_out_to_subscribers()
+    test_parse_sensor_sources_defaults()
+    test_overlap_prefers_higher_priority_sensor()
+    test_overlap_concurrent_move_keeps_entry()
+    print("OK")
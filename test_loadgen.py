@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Testes do gerador de carga OSC (AirScan_LoadGen)
+"""
+
+import socket
+
+from pythonosc.osc_message import OscMessage
+
+from AirScan_LoadGen import LoadGenerator, OscEncoder
+
+
+def test_encoder_matches_osc_format():
+    """Mensagem pré-codificada é decodificada pelo pythonosc como o sensor real"""
+    encoder = OscEncoder()
+    message = OscMessage(encoder.float_message("/airscan/blob/6/x", 512.5))
+    assert message.address == "/airscan/blob/6/x"
+    assert message.params == [512.5]
+    # Prefixo reaproveitado: mesma mensagem, outro valor
+    assert OscMessage(encoder.float_message("/airscan/blob/6/x", 1.0)).params == [1.0]
+
+
+def test_frames_dropouts_and_loss_stats():
+    """Quadros com x/y/z por blob, janelas de queda e contagem de pacotes perdidos/enviados"""
+    generator = LoadGenerator(blob_ids=(6, 7), pattern="line", dropout_period=2.0, dropout_duration=0.5,
+                              loss=0.5, reorder=0.2, seed=1)
+    addresses = [OscMessage(packet).address for packet in generator.frame_messages(0.0)]
+    assert addresses == ["/airscan/blob/6/x", "/airscan/blob/6/y", "/airscan/blob/6/z",
+                         "/airscan/blob/7/x", "/airscan/blob/7/y", "/airscan/blob/7/z"]
+    assert not generator.in_dropout(1.4)
+    assert generator.in_dropout(1.6)
+    assert not generator.in_dropout(2.1)
+
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    generator.address = receiver.getsockname()
+    try:
+        stats = generator.run(duration=0.1)
+    finally:
+        receiver.close()
+    assert stats["frames"] > 0
+    assert stats["messages"] == stats["frames"] * 6
+    assert stats["lost"] > 0
+    assert stats["sent"] + stats["lost"] == stats["messages"]
+
+
+if __name__ == "__main__":
+    test_encoder_matches_osc_format()
+    test_frames_dropouts_and_loss_stats()
+    print("OK")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Testes dos logs com limite de taxa (AirScan_Log)
+"""
+
+import logging
+
+from AirScan_Log import CategoryLogger, ConsoleFormatter
+
+
+class Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_rate_limit_per_level():
+    """Dentro do intervalo só a primeira mensagem de cada nível passa; as demais são contadas"""
+    log = CategoryLogger("test_rate", 60.0)
+    collect = Collect()
+    log.logger.addHandler(collect)
+    log.logger.setLevel(logging.DEBUG)
+    try:
+        for n in range(5):
+            log.info("coordenada %d", n)
+        log.warning("aviso")
+        log.warning("aviso repetido")
+        assert [record.getMessage() for record in collect.records] == ["coordenada 0", "aviso"]
+        assert log.suppressed == 5
+
+        # Sem limite (intervalo 0) tudo passa
+        log.interval = 0.0
+        log.info("livre")
+        log.info("livre")
+        assert len(collect.records) == 4
+    finally:
+        log.logger.removeHandler(collect)
+
+
+def test_console_format_tags():
+    """Console: categoria em maiúsculas para INFO/DEBUG, nível para avisos e erros"""
+    formatter = ConsoleFormatter()
+    info = logging.LogRecord("airscan.touch", logging.INFO, __file__, 1, "mouseDown em (%d, %d)", (10, 20), None)
+    warning = logging.LogRecord("airscan.mapping", logging.WARNING, __file__, 1, "fora da área", None, None)
+    assert formatter.format(info) == "[TOUCH] mouseDown em (10, 20)"
+    assert formatter.format(warning) == "[WARNING] fora da área"
+
+
+if __name__ == "__main__":
+    test_rate_limit_per_level()
+    test_console_format_tags()
+    print("OK")
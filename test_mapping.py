@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Testes das transformações pré-compiladas (AirScan_Mapping)
+"""
+
+from AirScan_Mapping import (HomographyTransform, LutTransform, MeshTransform, MultiOutputTransform, compile_transform,
+                             model_transform, rescale_calibration)
+
+AFFINE = [0.95, 0.02, 10.0, 0.01, 0.9, -60.0]
+# Pontos calibrados passam da resolução nominal do sensor (y até 1157 num sensor 1080)
+ANCHORS = [[130, 120, 2.0, -1.5], [1612, 110, -1.0, 2.0], [884, 729, 0.5, 0.5],
+           [130, 1140, 3.0, -2.0], [1612, 1157, -2.0, 1.0]]
+
+
+def test_mesh_lut_beyond_nominal_sensor():
+    """A malha compilada (LUT) alcança a faixa do sensor além de 1920x1080"""
+    model = {"name": "mesh", "params": {"affine": AFFINE, "anchors": ANCHORS}}
+    lut = model_transform(model, 0, 0, 1920, 1080, 1920, 1080)
+    direct = MeshTransform(AFFINE, ANCHORS, 0, 0, 1920, 1080)
+
+    samples = [(x, y) for x in (0, 130, 500, 884, 1612, 1919) for y in (1080, 1100, 1120, 1140, 1150, 1157)]
+    samples += [(-40, 1200), (2000, 1150), (960, -25)]
+    for x, y in samples:
+        lx, ly = lut(x, y)
+        dx, dy = direct(x, y)
+        assert abs(lx - dx) <= 1 and abs(ly - dy) <= 1, ((x, y), (lx, ly), (dx, dy))
+
+    # Linhas distintas do sensor não colapsam na borda da grade
+    assert lut(500, 1120)[1] < lut(500, 1150)[1]
+
+
+def test_lut_matches_wrapped_transform():
+    """LutTransform concorda com a transformação de base (até 1px) em todo o sensor, bordas incluídas"""
+    # Projeção inclinada (sensor fora do eixo) calibrada numa área da tela
+    homography = HomographyTransform([1.05, 0.04, 12.0, 0.02, 0.97, -8.0, 1.2e-5, 2.1e-5], 40, 30, 1880, 1050)
+    lut = LutTransform(homography, 1920, 1080)
+
+    xs = [0, 0.5, 29.99, 30, 480.25, 959.7, 1440, 1890.01, 1919.5, 1920]
+    ys = [0, 0.5, 29.99, 30, 270.25, 539.7, 810, 1050.01, 1079.5, 1080]
+    samples = [(x, y) for x in xs for y in ys]
+    # Grade densa sobre o sensor (cruza as bordas das células)
+    samples += [(x * 7.3, y * 6.1) for x in range(264) for y in range(178)]
+    # Fora da grade: transformação de base direta
+    samples += [(-15, 500), (1935, 500), (900, -10), (900, 1160)]
+    for x, y in samples:
+        lx, ly = lut(x, y)
+        hx, hy = homography(x, y)
+        assert abs(lx - hx) <= 1 and abs(ly - hy) <= 1, ((x, y), (lx, ly), (hx, hy))
+
+
+def test_rescale_calibration_to_new_resolution():
+    """Troca de resolução: área, alvos e modelo escalados; o mesmo toque cai no mesmo lugar relativo"""
+    data = {
+        "screen": {"width": 1920, "height": 1080},
+        "calibration_area": {"x1": 100, "y1": 50, "x2": 1820, "y2": 1030, "width": 1720, "height": 980},
+        "points": {"CENTER": {"screen": {"x": 960, "y": 540}, "airscan": {"x": 950.0, "y": 560.0}}},
+        "model": {"name": "affine", "params": AFFINE},
+    }
+    assert rescale_calibration(data, 1920, 1080) == data
+    scaled = rescale_calibration(data, 3840, 2160)
+    assert scaled["screen"] == {"width": 3840, "height": 2160}
+    assert scaled["calibration_area"]["x1"] == 200 and scaled["calibration_area"]["y2"] == 2060
+    assert scaled["points"]["CENTER"]["screen"] == {"x": 1920, "y": 1080}
+    # O documento original não é alterado
+    assert data["screen"] == {"width": 1920, "height": 1080}
+
+    before = compile_transform(data, 1920, 1080, 1920, 1080)
+    after = compile_transform(scaled, 3840, 2160, 1920, 1080)
+    for x, y in ((300, 200), (960, 540), (1500, 900)):
+        bx, by = before(x, y)
+        ax, ay = after(x, y)
+        assert abs(ax - 2 * bx) <= 2 and abs(ay - 2 * by) <= 2, ((x, y), (bx, by), (ax, ay))
+
+
+def test_outputs_map_to_their_own_rectangles():
+    """Desktop com dois projetores: cada metade do sensor vai para a sua saída; saída sem pontos é ignorada"""
+    outputs = {"esquerda": {"x": 0, "y": 0, "width": 1920, "height": 1080},
+               "direita": {"x": 1920, "y": 0, "width": 1920, "height": 1080},
+               "teto": {"x": 3840, "y": 0, "width": 1280, "height": 720}}
+    points = {}
+    for output_id, offset in (("esquerda", 0), ("direita", 960)):
+        rect = outputs[output_id]
+        for name, (u, v) in {"TOP_LEFT": (0, 0), "TOP_RIGHT": (1, 0), "BOTTOM_RIGHT": (1, 1),
+                             "BOTTOM_LEFT": (0, 1), "CENTER": (0.5, 0.5)}.items():
+            points[f"{output_id}_{name}"] = {
+                "output": output_id,
+                "screen": {"x": rect["x"] + u * (rect["width"] - 1), "y": v * (rect["height"] - 1)},
+                "airscan": {"x": offset + u * 959, "y": v * 1079},
+            }
+    data = {"screen": {"width": 5120, "height": 1080}, "outputs": outputs, "points": points}
+
+    transform = compile_transform(data, 5120, 1080, 1920, 1080)
+    assert isinstance(transform, MultiOutputTransform)
+    assert "teto" in transform.reason
+    left_x, left_y = transform(480, 540)
+    right_x, right_y = transform(1440, 540)
+    assert abs(left_x - 960) <= 2 and abs(left_y - 540) <= 2
+    assert abs(right_x - 2880) <= 2 and abs(right_y - 540) <= 2
+    # Perto da costura cada lado continua na sua saída
+    assert transform(955, 300)[0] < 1920 <= transform(965, 300)[0]
+
+
+if __name__ == "__main__":
+    test_mesh_lut_beyond_nominal_sensor()
+    test_lut_matches_wrapped_transform()
+    test_rescale_calibration_to_new_resolution()
+    test_outputs_map_to_their_own_rectangles()
+    print("OK")
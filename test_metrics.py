@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Testes do registro de métricas (AirScan_Metrics)
+"""
+
+import urllib.request
+
+from AirScan_Metrics import MetricsRegistry, MetricsServer
+
+
+def test_render_counters_gauges_histograms():
+    """Exposição em texto do Prometheus: labels, buckets cumulativos, soma e contagem"""
+    registry = MetricsRegistry()
+    samples = registry.counter("airscan_samples_total", "Amostras", ("sensor",))
+    samples.labels("left").inc()
+    samples.labels("left").inc(2)
+    samples.labels('a"b').inc()
+    registry.gauge("airscan_pressed", "Mouse pressionado").set(1)
+    latency = registry.histogram("airscan_latency_seconds", "Latência", buckets=(0.01, 0.1))
+    for value in (0.005, 0.01, 0.05, 2.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE airscan_samples_total counter" in lines
+    assert 'airscan_samples_total{sensor="left"} 3' in lines
+    assert 'airscan_samples_total{sensor="a\\"b"} 1' in lines
+    assert "airscan_pressed 1" in lines
+    assert 'airscan_latency_seconds_bucket{le="0.01"} 2' in lines
+    assert 'airscan_latency_seconds_bucket{le="0.1"} 3' in lines
+    assert 'airscan_latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "airscan_latency_seconds_sum 2.065" in lines
+    assert "airscan_latency_seconds_count 4" in lines
+
+
+def test_register_same_name_returns_existing():
+    """Registrar de novo devolve a mesma família; tipo diferente é erro"""
+    registry = MetricsRegistry()
+    assert registry.counter("airscan_x_total", "X") is registry.counter("airscan_x_total", "X")
+    try:
+        registry.gauge("airscan_x_total", "X")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("tipo diferente deveria falhar")
+
+
+def test_http_endpoint_serves_metrics():
+    """GET /metrics em 127.0.0.1 devolve a renderização do registro"""
+    registry = MetricsRegistry()
+    registry.counter("airscan_requests_total", "Coletas").inc()
+    server = MetricsServer(registry, port=0)
+    endpoint = server.start()
+    try:
+        with urllib.request.urlopen(endpoint, timeout=5) as response:
+            body = response.read().decode("utf-8")
+        assert "airscan_requests_total 1" in body.splitlines()
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    test_render_counters_gauges_histograms()
+    test_register_same_name_returns_existing()
+    test_http_endpoint_serves_metrics()
+    print("OK")
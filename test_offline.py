@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Testes da calibração offline a partir de uma sessão gravada (AirScan_Offline)
+"""
+
+import argparse
+import os
+import tempfile
+
+from AirScan_Capture import generate_points
+from AirScan_Clock import VirtualClock
+from AirScan_Offline import main, parse_area, parse_size, sequential_capture, windowed_capture
+from AirScan_Replay import SessionRecorder
+from AirScan_Storage import load_json
+
+AREA = {"x1": 0, "y1": 0, "x2": 1920, "y2": 1080}
+
+
+def sensor(x, y):
+    return 0.9 * x + 40.0, 0.85 * y + 60.0
+
+
+def recorded_samples(points, hold=6.0, travel=5.5, rate=50, start=100.0):
+    """Mão parada em cada alvo por `hold` segundos, sem dados no deslocamento"""
+    samples = []
+    t = start
+    for point in points:
+        ax, ay = sensor(point.x, point.y)
+        for i in range(int(hold * rate)):
+            samples.append((t + i / rate, ax, ay))
+        t += hold + travel
+    return samples
+
+
+def test_sequential_capture_follows_window_protocol():
+    """Ponto a ponto com a pausa da janela: todos os alvos capturados na posição do sensor"""
+    points = generate_points("basic", AREA)
+    clock = VirtualClock()
+    for point in points:
+        point.clock = clock
+    captured = sequential_capture(points, recorded_samples(points), clock)
+    assert [point.name for point in captured] == [point.name for point in points]
+    for point in captured:
+        ax, ay = sensor(point.x, point.y)
+        average = point.get_average()
+        assert abs(average["x"] - ax) < 1e-6 and abs(average["y"] - ay) < 1e-6
+
+
+def test_windowed_capture_uses_each_window():
+    """Com janelas, cada alvo usa só as amostras da sua janela (segundos desde a 1ª amostra)"""
+    points = generate_points("basic", AREA)
+    samples = recorded_samples(points)
+    windows = [{"name": point.name, "start": index * 11.5, "end": index * 11.5 + 6.0}
+               for index, point in enumerate(points)][::-1]
+    captured = windowed_capture(points, samples, VirtualClock(), windows)
+    assert [point.name for point in captured] == [point.name for point in points][::-1]
+
+    short = [{"name": "CENTER", "start": 46.0, "end": 48.0}]
+    assert windowed_capture(generate_points("basic", AREA), samples, VirtualClock(), short) == []
+    try:
+        windowed_capture(points, samples, VirtualClock(), [{"name": "MIDDLE", "start": 0, "end": 1}])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("janela de alvo inexistente aceita")
+
+
+def test_parse_area_and_size():
+    """--area x1,y1,x2,y2 e --screen LARGURAxALTURA"""
+    assert parse_area("200,100,1720,980") == {"x1": 200, "y1": 100, "x2": 1720, "y2": 980,
+                                              "width": 1520, "height": 880}
+    assert parse_size("2560X1440") == (2560, 1440)
+    for parse, text in ((parse_area, "200,100,100,980"), (parse_area, "1,2,3"), (parse_size, "1920")):
+        try:
+            parse(text)
+        except argparse.ArgumentTypeError:
+            continue
+        raise AssertionError(f"{text!r} aceito")
+
+
+def test_offline_cli_writes_calibration():
+    """Sessão gravada -> arquivo de calibração completo com os pontos capturados"""
+    points = generate_points("basic", AREA)
+    with tempfile.TemporaryDirectory() as directory:
+        session = os.path.join(directory, "sessao.jsonl")
+        output = os.path.join(directory, "calibracao.json")
+        recorder = SessionRecorder(session, {"mode": "Cave"})
+        for t, x, y in recorded_samples(points):
+            recorder(x, y, t)
+        recorder.close()
+
+        assert main([session, "--level", "basic", "--output", output]) == 0
+        data = load_json(output)
+    assert sorted(data["points"]) == sorted(point.name for point in points)
+    center = data["points"]["CENTER"]
+    ax, ay = sensor(960, 540)
+    assert abs(center["airscan"]["x"] - ax) < 1e-6 and abs(center["airscan"]["y"] - ay) < 1e-6
+    assert center["samples"]["count"] > 0
+
+
+if __name__ == "__main__":
+    test_sequential_capture_follows_window_protocol()
+    test_windowed_capture_uses_each_window()
+    test_parse_area_and_size()
+    test_offline_cli_writes_calibration()
+    print("OK")
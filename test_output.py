@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Testes dos backends de saída e da partida headless (AirScan_Output)
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from AirScan_Config import cli_overrides
+from AirScan_Output import NullOutput, create_output
+
+# Mesma lista do benchmarks/bench_startup.py
+HEAVY_MODULES = ("pyautogui", "pythonosc", "asyncio", "http.server", "PIL", "tkinter")
+
+
+def test_create_output_by_name():
+    """Backend por nome; nome desconhecido é ValueError"""
+    output = create_output("null")
+    assert isinstance(output, NullOutput) and output.headless
+    output.move_to(10, 20)
+    output.hotkey("alt", "left")
+    assert (output.moves, output.last_position) == (1, (10, 20))
+    assert list(output.events) == [("hotkey", ("alt", "left"))]
+    try:
+        create_output("x11")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("backend desconhecido aceito")
+
+
+def test_headless_flag_selects_null_output():
+    """--headless equivale a output_backend=null"""
+    assert cli_overrides(["--headless"])[1] == {"output_backend": "null"}
+
+
+def test_headless_import_skips_heavy_modules():
+    """Importar o controle em modo headless não carrega pyautogui, pythonosc nem http.server"""
+    code = ("import json, sys, AirScan_Control; "
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+    env = dict(os.environ, AIRSCAN_OUTPUT_BACKEND="null")
+    result = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+
+if __name__ == "__main__":
+    test_create_output_by_name()
+    test_headless_flag_selects_null_output()
+    test_headless_import_skips_heavy_modules()
+    print("OK")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Testes da topologia em dois processos (AirScan_Pipeline)
+"""
+
+import os
+import tempfile
+
+import AirScan_Control
+from AirScan_Pipeline import FrameRing, control_consumer
+from AirScan_Replay import read_session
+
+
+def test_frame_ring_reads_in_order_and_reports_overrun():
+    """O leitor recebe os quadros em ordem; atrasado mais que o anel, pula para os recentes"""
+    ring = FrameRing.create(slots=4)
+    try:
+        for n in range(3):
+            ring.publish(float(n), float(n * 10), 1000 + n)
+        frames, cursor, dropped = ring.read_since(0)
+        assert frames == [(1000, 0.0, 0.0), (1001, 1.0, 10.0), (1002, 2.0, 20.0)]
+        assert (cursor, dropped) == (3, 0)
+        assert ring.read_since(cursor) == ([], 3, 0)
+
+        for n in range(3, 10):
+            ring.publish(float(n), float(n * 10), 1000 + n)
+        frames, cursor, dropped = ring.read_since(cursor)
+        assert [frame[0] for frame in frames] == [1006, 1007, 1008, 1009]
+        assert (cursor, dropped) == (10, 3)
+    finally:
+        ring.close()
+        ring.unlink()
+
+
+def test_control_consumer_publishes_through_tee():
+    """No processo de saída as amostras passam pelo tee do controle (a gravação da sessão as recebe)"""
+    saved = (AirScan_Control.OUTPUT_BACKEND, AirScan_Control.SESSION_RECORD_PATH)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sessao.jsonl")
+        AirScan_Control.OUTPUT_BACKEND = "null"
+        AirScan_Control.SESSION_RECORD_PATH = path
+        try:
+            consume, finish = control_consumer()
+            consume(100.0, 200.0, 1_000_000_000)
+            consume(101.0, 201.0, 1_010_000_000)
+            finish()
+        finally:
+            AirScan_Control.OUTPUT_BACKEND, AirScan_Control.SESSION_RECORD_PATH = saved
+
+        header, samples = read_session(path)
+        assert samples == [(1.0, 100.0, 200.0), (1.01, 101.0, 201.0)]
+
+
+if __name__ == "__main__":
+    test_frame_ring_reads_in_order_and_reports_overrun()
+    test_control_consumer_publishes_through_tee()
+    print("OK")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Testes de gravação e replay determinístico de sessões (AirScan_Replay)
+"""
+
+import os
+import tempfile
+
+from AirScan_Clock import VirtualClock
+from AirScan_Control import AirScanControl
+from AirScan_Output import NullOutput
+from AirScan_Replay import SessionRecorder, read_session, replay_session
+
+
+def record_session(path):
+    """Dois toques de 0,5s a 100 Hz separados por 1s sem dados"""
+    recorder = SessionRecorder(path, {"mode": "Cave"})
+    for start, x0 in ((10.0, 400.0), (11.5, 1200.0)):
+        for i in range(50):
+            recorder(x0 + i * 4.0, 500.0 + i, start + i * 0.01)
+    recorder.close()
+    # Queda durante a escrita da última linha
+    with open(path, "a") as f:
+        f.write("[12.2, 10")
+
+
+def replay(samples):
+    clock = VirtualClock(samples[0][0])
+    output = NullOutput()
+    control = AirScanControl(clock=clock, output=output)
+    timeouts = []
+    on_timeout = control.watchdog.on_timeout
+
+    def record_timeout():
+        timeouts.append(clock.now())
+        on_timeout()
+
+    control.watchdog.on_timeout = record_timeout
+    stats = replay_session(samples, control, clock)
+    return stats, output, timeouts, control.data_timeout
+
+
+def test_replay_is_deterministic():
+    """O mesmo arquivo produz a mesma saída; o watchdog dispara no instante do prazo de cada toque"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sessao.jsonl")
+        record_session(path)
+        header, samples = read_session(path)
+    assert header["mode"] == "Cave"
+    assert len(samples) == 100
+
+    stats, output, timeouts, data_timeout = replay(samples)
+    again, output_again, timeouts_again, _ = replay(samples)
+    assert stats["samples"] == again["samples"] == 100
+    assert abs(stats["simulated_s"] - 1.99) < 1e-9
+    assert output.moves == output_again.moves > 0
+    assert output.last_position == output_again.last_position
+    # Um disparo do watchdog por toque, no instante exato do prazo
+    assert timeouts == timeouts_again
+    expected = [10.49 + data_timeout, 11.99 + data_timeout]
+    assert len(timeouts) == 2
+    assert all(abs(t - e) < 1e-9 for t, e in zip(timeouts, expected))
+
+
+if __name__ == "__main__":
+    test_replay_is_deterministic()
+    print("OK")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Testes da persistência da calibração (AirScan_Storage)
+"""
+
+import json
+import os
+import tempfile
+
+from AirScan_Storage import CalibrationSession, CalibrationStore, atomic_write_json, load_json
+
+METADATA = {"screen": {"width": 1920, "height": 1080}, "airscan": {"width": 1920, "height": 1080}}
+
+
+def test_session_commits_once_and_drops_journal():
+    """A sessão grava o arquivo só no commit e remove o journal"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "calibration.json")
+        journal = os.path.join(directory, "calibration.journal")
+        session = CalibrationSession(METADATA, path=path, journal_path=journal)
+        session.add_point("TOP_LEFT", {"x": 0, "y": 0}, {"x": 10.0, "y": 12.0})
+        session.add_point("CENTER", {"x": 960, "y": 540}, {"x": 950.0, "y": 530.0})
+        session.remove_point("TOP_LEFT")
+        assert not os.path.exists(path)
+
+        session.commit()
+        data = load_json(path)
+        assert list(data["points"]) == ["CENTER"]
+        assert data["screen"] == METADATA["screen"]
+        assert not os.path.exists(journal)
+
+
+def test_recover_ignores_truncated_last_line():
+    """recover() reconstrói os pontos até a última linha completa do journal"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "calibration.json")
+        journal = os.path.join(directory, "calibration.journal")
+        session = CalibrationSession(METADATA, path=path, journal_path=journal)
+        session.add_point("TOP_LEFT", {"x": 0, "y": 0}, {"x": 10.0, "y": 12.0})
+        session.add_point("CENTER", {"x": 960, "y": 540}, {"x": 950.0, "y": 530.0})
+        session._journal.close()
+        # Queda no meio da escrita do terceiro ponto
+        with open(journal, "a") as f:
+            f.write('{"type": "point", "name": "TOP_RIGHT", "point": {"scr')
+
+        recovered = CalibrationSession.recover(journal, path)
+        assert recovered.metadata == METADATA
+        assert sorted(recovered.points) == ["CENTER", "TOP_LEFT"]
+
+        recovered.commit()
+        assert sorted(load_json(path)["points"]) == ["CENTER", "TOP_LEFT"]
+        assert not os.path.exists(journal)
+
+
+def test_new_session_keeps_unsaved_journal():
+    """Uma nova sessão guarda o journal de uma calibração não gravada em vez de truncá-lo"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "calibration.json")
+        journal = os.path.join(directory, "calibration.journal")
+        crashed = CalibrationSession(METADATA, path=path, journal_path=journal)
+        crashed.add_point("CENTER", {"x": 960, "y": 540}, {"x": 950.0, "y": 530.0})
+        crashed._journal.close()
+
+        session = CalibrationSession(METADATA, path=path, journal_path=journal)
+        rotated = [name for name in os.listdir(directory) if name.startswith("calibration.journal.")]
+        assert len(rotated) == 1
+        recovered = CalibrationSession.recover(os.path.join(directory, rotated[0]), path)
+        assert list(recovered.points) == ["CENTER"]
+
+        # O journal novo só tem o início da sessão atual
+        with open(journal) as f:
+            records = [json.loads(line) for line in f]
+        assert [record["type"] for record in records] == ["begin"]
+        session.discard()
+
+
+def test_store_reload_keeps_snapshot_on_bad_file():
+    """reload() troca o snapshot por um novo compilado e mantém o atual se o arquivo for ilegível"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "calibration.json")
+        reloads = []
+        store = CalibrationStore(lambda data: len(data.get("points", {})), path=path,
+                                 on_reload=reloads.append)
+        assert store.transform == 0
+        assert store.reload() is None  # arquivo ausente
+
+        atomic_write_json(path, {"points": {"CENTER": {}, "TOP_LEFT": {}}})
+        snapshot = store.reload()
+        assert store.snapshot is snapshot and store.transform == 2
+        assert reloads == [snapshot]
+
+        with open(path, "w") as f:
+            f.write('{"points": {"CENTER"')
+        assert store.reload() is None
+        assert store.snapshot is snapshot
+        assert len(reloads) == 1
+
+
+if __name__ == "__main__":
+    test_session_commits_once_and_drops_journal()
+    test_recover_ignores_truncated_last_line()
+    test_new_session_keeps_unsaved_journal()
+    test_store_reload_keeps_snapshot_on_bad_file()
+    print("OK")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Testes da verificação com alvos aleatórios (AirScan_Verification)
+"""
+
+import random
+import statistics
+
+from AirScan_Verification import HISTOGRAM_MAX, PointErrorAttribution, RunningErrorStats, random_targets
+
+
+def test_running_error_stats():
+    """Média/desvio de Welford e percentis pela borda superior da caixa de 1px"""
+    errors = [1.2, 2.7, 3.1, 10.4, 30.0]
+    stats = RunningErrorStats()
+    assert stats.percentile(0.5) is None and stats.summary() is None
+    for error in errors:
+        stats.add(error)
+    assert abs(stats.mean - statistics.mean(errors)) < 1e-9
+    assert abs(stats.std - statistics.stdev(errors)) < 1e-9
+    assert stats.percentile(0.50) == 4.0
+    assert stats.percentile(0.95) == 30.0      # limitado ao máximo observado
+    assert stats.summary()["max"] == 30.0
+
+    # Erro acima do histograma: o percentil da última caixa é o máximo real
+    stats.add(HISTOGRAM_MAX * 2.5)
+    assert stats.percentile(1.0) == HISTOGRAM_MAX * 2.5
+    assert stats.percentile(0.5) == 4.0
+
+
+def test_random_targets_stay_inside_margin():
+    """Alvos dentro da área, longe da borda (margem de 10%)"""
+    targets = random_targets((100, 50, 1100, 550), count=200, rng=random.Random(3))
+    assert len(targets) == 200
+    assert all(200 <= x <= 1000 and 100 <= y <= 500 for x, y in targets)
+
+
+def test_attribution_suggests_worst_points():
+    """Erro vai para o ponto de calibração mais próximo; só os acima da tolerância, piores primeiro"""
+    attribution = PointErrorAttribution({"TOP_LEFT": (0, 0), "CENTER": (960, 540), "BOTTOM_RIGHT": (1919, 1079)})
+    assert attribution.add(100, 80, 40.0) == "TOP_LEFT"
+    attribution.add(900, 500, 10.0)
+    attribution.add(1000, 600, 50.0)
+    attribution.add(1800, 1000, 12.0)
+    assert attribution.mean_errors() == {"TOP_LEFT": 40.0, "CENTER": 30.0, "BOTTOM_RIGHT": 12.0}
+    assert attribution.worst(tolerance=25) == ["TOP_LEFT", "CENTER"]
+    assert attribution.worst(tolerance=25, limit=1) == ["TOP_LEFT"]
+
+
+if __name__ == "__main__":
+    test_running_error_stats()
+    test_random_targets_stay_inside_margin()
+    test_attribution_suggests_worst_points()
+    print("OK")